@@ -36,12 +36,17 @@ Phase 2: CSP scheduling with optimized execution (NEW)
 Phase 3: GA optimization
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor
 import asyncio
+import multiprocessing
+import os
+import random
 import time
+import uuid
 from typing import Dict, Any
 
 # v3.0.1: Import updated models with simplified room logic
@@ -53,15 +58,26 @@ from src.models_phase1_v30 import (
 # v2.5 models still used for request/response (backward compatible)
 from src.models_phase1_v25 import (
     GenerateRequest, GenerateResponse, TimetableSolution,
-    ValidateRequest, ValidationResult, OptimizationWeights
+    ValidateRequest, ValidationResult, OptimizationWeights,
+    ResolveRequest
 )
 
 # v3.0.1: Import performance-optimized CSP solver
 from src.csp_solver_complete_v301 import CSPSolverCompleteV301
 
+# v3.0.1: OR-Tools CP-SAT engine (selected per request via GenerateRequest.solver)
+from src.cpsat_solver import CPSATSolverV301
+from src.solve_control import Deadline, CancellationToken
+
 # v2.5: GA optimizer (unchanged)
 from src.algorithms.core.ga_optimizer_v25 import GAOptimizerV25
 
+# v3.0.1: Teacher-preserving tabu search (runs when GA evolution is skipped)
+from src.algorithms.core.local_search import TabuSearchOptimizer
+
+# v3.0.1: Generated timetables are cached so a later request can warm-start from them
+from src.persistence.timetable_cache import TimetableCache
+
 # v2.5: Import validators for pre and post verification
 from src.validators import validate_request, validate_timetable
 
@@ -97,10 +113,36 @@ async def lifespan(app: FastAPI):
 
     # Initialize solvers globally (reused across requests)
     app.state.csp_solver = CSPSolverCompleteV301(debug=True)  # v3.0.1
-    app.state.ga_optimizer = GAOptimizerV25()
+    app.state.cpsat_solver = CPSATSolverV301(debug=True)  # v3.0.1 CP-SAT backend
+    app.state.timetable_cache = TimetableCache()  # v3.0.1: warm-start references
+    # v3.0.1: The GA caches its run results in its own directory, so they never
+    # crowd out (or get the size cleanup to evict) the warm-start references
+    app.state.ga_optimizer = GAOptimizerV25(cache=TimetableCache(
+        cache_dir=str(app.state.timetable_cache.cache_dir / "ga")))
+    app.state.local_search = TabuSearchOptimizer(debug=True)  # v3.0.1
+    app.state.jobs = {}  # v3.0.1: job_id -> CancellationToken of running requests
+
+    # v3.0.1: One process pool for the whole service, sized to the machine
+    # (TIMETABLE_SOLVER_WORKERS overrides): every /generate runs its CSP
+    # attempts on it, so concurrent requests share the cores instead of each
+    # starting a pool. Cancellation tokens come from a Manager so they can
+    # travel with the pickled tasks. Decomposition is off unless enabled
+    app.state.solver_workers = max(1, int(os.environ.get("TIMETABLE_SOLVER_WORKERS", os.cpu_count() or 1)))
+    app.state.solver_decompose = os.environ.get("TIMETABLE_SOLVER_DECOMPOSE", "0").lower() in ("1", "true", "yes")
+    if app.state.solver_workers > 1:
+        app.state.solver_pool = ProcessPoolExecutor(max_workers=app.state.solver_workers)
+        app.state.solver_manager = multiprocessing.Manager()
+    else:
+        app.state.solver_pool = app.state.solver_manager = None
+    print(f"[*] CSP worker pool: {app.state.solver_workers} processes, "
+          f"decomposition: {'on' if app.state.solver_decompose else 'off'}")
 
     yield
 
+    if app.state.solver_pool is not None:
+        app.state.solver_pool.shutdown(wait=False, cancel_futures=True)
+        app.state.solver_manager.shutdown()
+
     # Shutdown
     print("\n" + "=" * 80)
     print("<<< TIMETABLE GENERATION API v3.0 - SHUTTING DOWN")
@@ -258,6 +300,59 @@ def calculate_metadata_coverage(timetable: Any) -> Dict[str, Any]:
         }
 
 
+# =============================================================================
+# CANCELLATION (v3.0.1)
+# =============================================================================
+
+async def watch_disconnect(http_request: Request, cancel_token: CancellationToken,
+                           poll_interval: float = 0.5):
+    """Cancel the job once the client has gone away (e.g. the backend's axios timeout)."""
+    while not cancel_token.cancelled:
+        if await http_request.is_disconnected():
+            cancel_token.cancel("Client disconnected")
+            return
+        await asyncio.sleep(poll_interval)
+
+
+@asynccontextmanager
+async def cancellable_job(job_id, http_request: Request):
+    """
+    Register a running request under job_id with a fresh CancellationToken.
+
+    The token is cancelled by POST /jobs/{job_id}/cancel or by a client
+    disconnect; solver, GA and tabu loops then stop at their next check so
+    the worker thread is free for the next request.
+    """
+    job_id = job_id or uuid.uuid4().hex
+    if job_id in app.state.jobs:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is already running")
+    manager = app.state.solver_manager
+    cancel_token = CancellationToken(manager.Event() if manager is not None else None)
+    app.state.jobs[job_id] = cancel_token
+    watcher = asyncio.create_task(watch_disconnect(http_request, cancel_token))
+    try:
+        yield job_id, cancel_token
+    finally:
+        watcher.cancel()
+        app.state.jobs.pop(job_id, None)
+
+
+def cancelled_response(job_id: str, cancel_token: CancellationToken, start_time: float):
+    """Response for a cancelled job (HTTP 499, as for a closed client request)."""
+    print(f"[CANCELLED] Job {job_id}: {cancel_token.reason}")
+    return JSONResponse(
+        status_code=499,
+        content={
+            "status": "cancelled",
+            "solutions": [],
+            "generation_time": time.time() - start_time,
+            "conflicts": [f"Solve cancelled: {cancel_token.reason}"],
+            "suggestions": [],
+            "diagnostics": {"version": "3.0.1", "job_id": job_id, "cancelled": True}
+        }
+    )
+
+
 # =============================================================================
 # API ENDPOINTS
 # =============================================================================
@@ -290,6 +385,8 @@ async def root():
         },
         "endpoints": {
             "generate": "/generate",
+            "resolve": "/resolve",
+            "cancel": "/jobs/{job_id}/cancel",
             "validate": "/validate",
             "health": "/health"
         }
@@ -304,6 +401,7 @@ async def health_check():
         "version": "2.5.2",
         "solvers": {
             "csp": "ready",
+            "cpsat": "ready",
             "ga": "ready"
         }
     }
@@ -344,8 +442,133 @@ async def validate_entities(request: ValidateRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """
+    Cancel a running /generate or /resolve request.
+
+    v3.0.1: job_id is GenerateRequest.job_id. The request stops at its next
+    solver check and answers 499 with status "cancelled".
+    """
+    cancel_token = app.state.jobs.get(job_id)
+    if cancel_token is None:
+        raise HTTPException(status_code=404, detail=f"No running job {job_id}")
+    cancel_token.cancel("Cancelled by request")
+    print(f"[CANCEL] Job {job_id} cancelled")
+    return {"status": "cancelling", "job_id": job_id}
+
+
+@app.post("/resolve", response_model=GenerateResponse)
+async def resolve_timetable(request: ResolveRequest, http_request: Request):
+    """
+    Incrementally re-solve a previous timetable after small data changes.
+
+    v3.0.1: Instead of re-running /generate, entries touching the changed
+    teachers, classes or subjects (request.changes) are freed and re-placed
+    around the rest of request.previous_timetable, which stays fixed. Returns
+    one solution in the /generate response format. Cancelled by a client
+    disconnect or POST /jobs/{request.job_id}/cancel.
+    """
+    async with cancellable_job(request.job_id, http_request) as (job_id, cancel_token):
+        return await run_resolve(request, job_id, cancel_token)
+
+
+async def run_resolve(request: ResolveRequest, job_id: str, cancel_token: CancellationToken):
+    """/resolve pipeline for a registered job."""
+    overall_start_time = time.time()
+
+    print("\n" + "=" * 70)
+    print("[RESOLVE] Incremental re-solve")
+    print("=" * 70)
+    print(f"  Changed teachers: {request.changes.teacher_ids}")
+    print(f"  Changed classes: {request.changes.class_ids}")
+    print(f"  Changed subjects: {request.changes.subject_ids}")
+
+    seed = request.seed if request.seed is not None else random.randrange(2 ** 31)
+
+    subject_requirements_dict = None
+    if request.subject_requirements:
+        subject_requirements_dict = [
+            {
+                'grade': req.grade,
+                'subject_id': req.subject_id,
+                'periods_per_week': req.periods_per_week
+            }
+            for req in request.subject_requirements
+        ]
+
+    try:
+        timetables, _, conflicts, suggestions = await asyncio.to_thread(
+            app.state.csp_solver.resolve,
+            previous_timetable=request.previous_timetable,
+            classes=request.classes,
+            subjects=request.subjects,
+            teachers=request.teachers,
+            time_slots=request.time_slots,
+            rooms=request.rooms,
+            changed_teacher_ids=request.changes.teacher_ids,
+            changed_class_ids=request.changes.class_ids,
+            changed_subject_ids=request.changes.subject_ids,
+            subject_requirements=subject_requirements_dict,
+            seed=seed,
+            timeout=request.timeout,
+            cancel_token=cancel_token
+        )
+    except Exception as e:
+        print(f"[ERROR] Incremental re-solve error: {e}")
+        raise HTTPException(status_code=500, detail=f"Incremental re-solve failed: {str(e)}")
+
+    if cancel_token.cancelled:
+        return cancelled_response(job_id, cancel_token, overall_start_time)
+
+    total_duration = time.time() - overall_start_time
+
+    if not timetables:
+        print(f"[FAILED] Incremental re-solve failed: {conflicts}")
+        return GenerateResponse(
+            solutions=[],
+            generation_time=total_duration,
+            conflicts=conflicts,
+            suggestions=suggestions
+        )
+
+    timetable = timetables[0]
+    solution = convert_timetable_to_solution(
+        timetable=timetable,
+        score=800.0,  # Default score (GA fitness is not run on repairs)
+        feasible=True,
+        conflicts=[],
+        metrics={
+            "solution_rank": 1,
+            "metadata_coverage": calculate_metadata_coverage(timetable),
+            "generation_method": "Incremental CSP v3.0.1"
+        }
+    )
+
+    incremental = timetable.metadata["incremental"]
+    print(f"[OK] Re-solve complete in {total_duration:.3f}s")
+    print(f"  Kept: {incremental['kept_entries']}, freed: {incremental['freed_entries']}, "
+          f"placed: {incremental['placed_entries']}")
+
+    return JSONResponse(content={
+        "status": "success",
+        "solutions": [solution.model_dump()],
+        "generation_time": total_duration,
+        "conflicts": None,
+        "suggestions": [],
+        "diagnostics": {
+            "version": "3.0.1",
+            "job_id": job_id,
+            "seed": seed,
+            "timed_out": timetable.metadata["timed_out"],
+            "coverage": timetable.metadata["coverage"],
+            "incremental": incremental
+        }
+    })
+
+
 @app.post("/generate", response_model=GenerateResponse)
-async def generate_timetable(request: GenerateRequest):
+async def generate_timetable(request: GenerateRequest, http_request: Request):
     """
     Generate optimized timetable using CSP + GA approach.
     
@@ -362,6 +585,20 @@ async def generate_timetable(request: GenerateRequest):
     - GA runs in thread pool (CPU-intensive task)
     - Proper async/await throughout
     - Detailed timing for each phase
+    - Anytime: request.timeout bounds CSP + GA; on expiry the best solutions
+      so far are returned with diagnostics["timed_out"] = True
+
+    WARM START (v3.0.1):
+    - Every returned timetable is cached; its id is in diagnostics["timetable_ids"]
+    - request.reference_timetable (inline, e.g. last term's) or
+      request.reference_timetable_id (cached) seeds phase 1: entries still
+      valid under the new data are kept and only the rest is searched, then
+      tabu search / GA start from the seeded solutions
+
+    CANCELLATION (v3.0.1):
+    - Registered as request.job_id (generated if not given) while it runs
+    - A client disconnect or POST /jobs/{job_id}/cancel stops CSP, tabu and
+      GA at their next check; the response is then 499 "cancelled"
     
     METADATA USAGE:
     - Subject.prefer_morning → time preference optimization
@@ -369,7 +606,16 @@ async def generate_timetable(request: GenerateRequest):
     - Teacher.max_consecutive_periods → teacher workload limits
     - OptimizationWeights.morning_period_cutoff → school structure
     """
+    async with cancellable_job(request.job_id, http_request) as (job_id, cancel_token):
+        return await run_generate(request, job_id, cancel_token)
+
+
+async def run_generate(request: GenerateRequest, job_id: str, cancel_token: CancellationToken):
+    """/generate pipeline for a registered job (phases 0-4)."""
     overall_start_time = time.time()
+
+    # v3.0.1: One wall-clock budget for every phase (GenerateRequest.timeout)
+    deadline = Deadline(request.timeout, cancel_token)
     
     # ==================================================================
     # PHASE 0: Input Validation & Configuration
@@ -455,6 +701,20 @@ async def generate_timetable(request: GenerateRequest):
     except Exception as e:
         print(f"[FAILED] Validation failed: {e}")
         raise HTTPException(status_code=400, detail=f"Invalid request: {str(e)}")
+
+    # v3.0.1: Warm-start reference (inline wins over a cached id)
+    reference_timetable = request.reference_timetable
+    if reference_timetable is None and request.reference_timetable_id:
+        reference_timetable = app.state.timetable_cache.retrieve_timetable(request.reference_timetable_id)
+        if reference_timetable is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Reference timetable {request.reference_timetable_id} not found in cache"
+            )
+    if reference_timetable is not None:
+        print(f"[OK] Warm start from reference timetable "
+              f"{request.reference_timetable_id or '(inline)'}: "
+              f"{len(reference_timetable.get('entries', []))} entries")
     
     # ==================================================================
     # PHASE 1: CSP Solver - Generate Base Solutions
@@ -466,13 +726,14 @@ async def generate_timetable(request: GenerateRequest):
     csp_start_time = time.time()
     
     try:
-        # Get CSP solver from app state
-        csp_solver = app.state.csp_solver
+        # Get CSP solver from app state (per-request engine selection)
+        csp_solver = app.state.cpsat_solver if request.solver == "cpsat" else app.state.csp_solver
         
         # CRITICAL: Offload to thread pool to prevent blocking
         # CSP solving is CPU-intensive and synchronous
         print(f"[RUNNING] CSP solver in thread pool...")
         print(f"   Generating {request.options} base solutions...")
+        print(f"   Engine: {request.solver}")
         
         # Convert subject_requirements to dict format for CSP solver
         subject_requirements_dict = None
@@ -498,22 +759,75 @@ async def generate_timetable(request: GenerateRequest):
                     print(f"[CONFIG] One teacher per subject constraint: {'ENABLED' if enforce_teacher_consistency else 'DISABLED'}")
                     break
 
-        base_solutions, csp_time, csp_conflicts, csp_suggestions = await asyncio.to_thread(
-            csp_solver.solve,
-            classes=classes,
-            subjects=subjects,
-            teachers=teachers,
-            time_slots=time_slots,
-            rooms=rooms,
-            constraints=constraints,
-            num_solutions=request.options,
-            subject_requirements=subject_requirements_dict,
-            enforce_teacher_consistency=enforce_teacher_consistency,
-            max_violations=request.max_violations
-        )
+        # Reproducibility: one seed drives CSP and GA; echoed in diagnostics
+        seed = request.seed if request.seed is not None else random.randrange(2 ** 31)
+        print(f"   Seed: {seed}")
+
+        # Both engines stop at the request deadline with their best solutions so far
+        engine_options = {}
+        if request.solver == "cpsat":
+            engine_options = {
+                "timeout": deadline.remaining(),
+                "morning_period_cutoff": weights.morning_period_cutoff,
+                "cancel_token": cancel_token
+            }
+        else:
+            # Independent CSP attempts (and, with decomposition, independent
+            # wings of the school) run on the shared app.state.solver_pool;
+            # the solver caps workers at the number of tasks
+            engine_options = {
+                "timeout": deadline.remaining(),
+                "workers": app.state.solver_workers,
+                "executor": app.state.solver_pool,
+                "decompose": app.state.solver_decompose,
+                "cancel_token": cancel_token
+            }
+
+        if reference_timetable is not None:
+            # v3.0.1: Warm start - keep the reference entries the new data still
+            # allows and search only the rest (incremental repair, as /resolve).
+            # One seeded solution per option; always the CSP repair engine
+            print(f"   Warm start: repairing reference timetable (engine {request.solver} not used)")
+            base_solutions, csp_conflicts, csp_suggestions = [], None, None
+            for idx in range(request.options):
+                repaired, _, csp_conflicts, csp_suggestions = await asyncio.to_thread(
+                    app.state.csp_solver.resolve,
+                    previous_timetable=reference_timetable,
+                    classes=classes,
+                    subjects=subjects,
+                    teachers=teachers,
+                    time_slots=time_slots,
+                    rooms=rooms,
+                    subject_requirements=subject_requirements_dict,
+                    seed=seed + idx,
+                    timeout=deadline.remaining() / (request.options - idx),
+                    cancel_token=cancel_token
+                )
+                if not repaired or cancel_token.cancelled:
+                    break
+                base_solutions.extend(repaired)
+        else:
+            base_solutions, csp_time, csp_conflicts, csp_suggestions = await asyncio.to_thread(
+                csp_solver.solve,
+                classes=classes,
+                subjects=subjects,
+                teachers=teachers,
+                time_slots=time_slots,
+                rooms=rooms,
+                constraints=constraints,
+                num_solutions=request.options,
+                subject_requirements=subject_requirements_dict,
+                enforce_teacher_consistency=enforce_teacher_consistency,
+                max_violations=request.max_violations,
+                seed=seed,
+                **engine_options
+            )
         
         csp_end_time = time.time()
         csp_duration = csp_end_time - csp_start_time
+
+        if cancel_token.cancelled:
+            return cancelled_response(job_id, cancel_token, overall_start_time)
         
         if not base_solutions:
             print(f"[FAILED] CSP solver failed to generate solutions")
@@ -530,6 +844,17 @@ async def generate_timetable(request: GenerateRequest):
         print(f"[OK] CSP solver completed successfully")
         print(f"  Solutions generated: {len(base_solutions)}")
         print(f"  Time: {csp_duration:.2f}s")
+
+        csp_timed_out = any(s.metadata.get("timed_out", False) for s in base_solutions)
+        warm_start = None
+        if reference_timetable is not None:
+            warm_start = dict(base_solutions[0].metadata["incremental"],
+                              reference_timetable_id=request.reference_timetable_id,
+                              inline=request.reference_timetable is not None)
+            print(f"  Warm start: kept {warm_start['kept_entries']}, "
+                  f"freed {warm_start['freed_entries']}, placed {warm_start['placed_entries']}")
+        if csp_timed_out:
+            print(f"  [TIMEOUT] Budget of {request.timeout}s reached - using best solutions so far")
         
         # v2.5: Verify metadata coverage
         metadata_stats = calculate_metadata_coverage(base_solutions[0])
@@ -633,6 +958,12 @@ async def generate_timetable(request: GenerateRequest):
     # CSP solver already produces valid timetables with teacher consistency
     skip_ga_evolution = enforce_teacher_consistency  # Skip GA to preserve teacher consistency
 
+    local_search_stats = []
+    local_search_duration = 0.0
+    # v3.0.1: This request's GA run (metadata["ga"] of its result); the shared
+    # optimizer's attributes may already belong to a concurrent request
+    ga_run = {}
+
     if skip_ga_evolution:
         print("[SKIP] GA evolution disabled to preserve teacher consistency")
         print("  CSP solutions already have 100% teacher consistency")
@@ -640,9 +971,37 @@ async def generate_timetable(request: GenerateRequest):
         print("  GA fitness scoring will still be used for solution ranking")
         optimized_timetables = base_solutions
         ga_duration = 0.0
+
+        # v3.0.1: Tabu search still optimizes soft constraints, using only
+        # moves that keep the (class, subject) -> teacher mapping
+        print(f"[RUNNING] Tabu search on {len(base_solutions)} solutions (teacher-preserving moves)...")
+        local_search_start_time = time.time()
+        try:
+            improved_timetables = []
+            for idx, timetable in enumerate(base_solutions):
+                improved = await asyncio.to_thread(
+                    app.state.local_search.optimize,
+                    timetable.model_dump() if hasattr(timetable, 'model_dump') else timetable,
+                    weights=weights,
+                    teachers=teachers,
+                    time_slots=time_slots,
+                    seed=seed + idx,
+                    timeout=deadline.remaining() / (len(base_solutions) - idx),
+                    cancel_token=cancel_token
+                )
+                improved_timetables.append(improved)
+                local_search_stats.append(improved["metadata"]["local_search"])
+            optimized_timetables = improved_timetables
+            print(f"[OK] Tabu search complete")
+        except Exception as e:
+            print(f"[WARNING] Tabu search failed: {e}")
+            print(f"   Falling back to CSP solutions")
+            local_search_stats = []
+        local_search_duration = time.time() - local_search_start_time
     else:
         try:
-            print(f"[RUNNING] Evolving {len(base_solutions)} solutions over 30 generations...")
+            print(f"[RUNNING] Evolving {len(base_solutions)} solutions (up to 200 generations, "
+                  f"stop after 10 without 0.1% gain)...")
             print(f"   Mutation rate: 0.15")
             print(f"   Crossover rate: 0.7")
             print(f"   Elitism: 2 best solutions preserved")
@@ -673,15 +1032,26 @@ async def generate_timetable(request: GenerateRequest):
             optimized_timetables = await asyncio.to_thread(
                 ga_optimizer.evolve,
                 population=base_solutions_dicts,
-                generations=30,
+                # v3.0.1: Easy schools converge in a few generations; hard
+                # ones keep improving until the cap or the request deadline
+                generations=200,
+                stall_generations=10,
+                min_improvement=0.001,
+                cache_intermediate=False,  # 200 generations: cache only the best
                 mutation_rate=0.15,
                 crossover_rate=0.7,
                 elitism_count=2,
-                weights=weights
+                weights=weights,
+                seed=seed,
+                timeout=deadline.remaining(),
+                cancel_token=cancel_token,
+                teachers=teachers,
+                time_slots=time_slots
             )
 
             ga_end_time = time.time()
             ga_duration = ga_end_time - ga_start_time
+            ga_run = optimized_timetables[0].get("metadata", {}).get("ga", {}) if optimized_timetables else {}
 
             print(f"[OK] GA optimization complete")
             print(f"  Time: {ga_duration:.2f}s")
@@ -715,6 +1085,9 @@ async def generate_timetable(request: GenerateRequest):
                     optimized_timetables.append(timetable)
             ga_duration = 0.0
     
+    if cancel_token.cancelled:
+        return cancelled_response(job_id, cancel_token, overall_start_time)
+
     # ==================================================================
     # PHASE 3: Solution Selection & Packaging
     # ==================================================================
@@ -784,29 +1157,62 @@ async def generate_timetable(request: GenerateRequest):
             sol_dict = solution
         solutions_dicts.append(sol_dict)
 
+    # v3.0.1: Cache the returned timetables; a later request can warm-start
+    # from one by passing its id as reference_timetable_id
+    timetable_ids = []
+    try:
+        for idx, sol_dict in enumerate(solutions_dicts):
+            timetable_ids.append(app.state.timetable_cache.store_timetable(
+                sol_dict["timetable"],
+                session_id=f"generate_{request.school_id}_{request.academic_year_id}",
+                fitness_score=sol_dict["total_score"],
+                metadata={"seed": seed, "solution_rank": idx + 1}
+            ))
+    except Exception as e:
+        print(f"[WARNING] Could not cache timetables: {e}")
+        timetable_ids = []
+
+    ga_timed_out = ga_run.get("timed_out", False)
+    local_search_timed_out = any(stats["timed_out"] for stats in local_search_stats)
+
     # Build diagnostics
     diagnostics = {
         "version": "3.0.1",
+        "job_id": job_id,
+        "seed": seed,  # Send back as GenerateRequest.seed to replay this run
+        "timeout": request.timeout,
+        "timed_out": csp_timed_out or ga_timed_out or local_search_timed_out,
+        "timetable_ids": timetable_ids,  # Pass one as reference_timetable_id to warm-start
+        "warm_start": warm_start,
         "metadata_enabled": True,
         "timing": {
             "total": round(total_duration, 2),
             "csp": round(csp_duration, 2),
             "ga": round(ga_duration, 2),
-            "packaging": round(total_duration - csp_duration - ga_duration, 2)
+            "local_search": round(local_search_duration, 2),
+            "packaging": round(total_duration - csp_duration - ga_duration - local_search_duration, 2)
         },
         "phases": {
             "csp": {
                 "solutions_generated": len(base_solutions),
-                "time": round(csp_duration, 2)
+                "time": round(csp_duration, 2),
+                "timed_out": csp_timed_out
             },
             "ga": {
-                "generations": 30 if not skip_ga_evolution else 0,
+                "generations": ga_run.get("generations", 0),
+                "timed_out": ga_timed_out,
+                "stop_reason": ga_run.get("stop_reason"),
                 "time": round(ga_duration, 2),
-                "improvement": (ga_optimizer.stats_history[-1].best_fitness -
-                              ga_optimizer.stats_history[0].best_fitness
-                              if ga_optimizer.stats_history else 0) if not skip_ga_evolution else 0,
+                "improvement": ga_run.get("improvement", 0),
                 "skipped": skip_ga_evolution,
                 "reason": "Preserving teacher consistency" if skip_ga_evolution else None
+            },
+            "local_search": {
+                "method": "tabu",
+                "ran": bool(local_search_stats),
+                "time": round(local_search_duration, 2),
+                "timed_out": local_search_timed_out,
+                "solutions": local_search_stats
             }
         },
         "metadata_coverage": metadata_stats,
@@ -0,0 +1,124 @@
+"""
+Shared fixtures for the top-level test scripts (v3.0.1)
+
+A small synthetic school and the solutions built from it, imported by the
+test_*.py scripts instead of from each other:
+
+- build_school(): classes, subjects, teachers, time slots and home rooms
+- payload(): the same school as a /generate request body
+- baseline(): a seeded timetable to re-solve or warm-start from
+- population(): seeded CSP timetables for the GA
+- assert_valid(), teachers_by_class(): checks on generated timetables
+"""
+
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.models_phase1_v30 import (
+    Class, Subject, Teacher, TimeSlot, Room, RoomType
+)
+from src.csp_solver_complete_v301 import CSPSolverCompleteV301
+
+
+DAYS = ["MONDAY", "TUESDAY", "WEDNESDAY", "THURSDAY", "FRIDAY"]
+
+
+def build_school(num_classes=4, periods_per_day=6):
+    """Small school: every class needs Math/English/Science/History."""
+    time_slots = [
+        TimeSlot(id=f"{day[:3]}_P{p}", school_id="S1", day_of_week=day, period_number=p,
+                 start_time=f"{7 + p}:00", end_time=f"{7 + p}:45")
+        for day in DAYS for p in range(1, periods_per_day + 1)
+    ]
+    subjects = [
+        Subject(id="MATH", school_id="S1", name="Mathematics", code="MATH", periods_per_week=8),
+        Subject(id="ENG", school_id="S1", name="English", code="ENG", periods_per_week=8),
+        Subject(id="SCI", school_id="S1", name="Science", code="SCI", periods_per_week=7),
+        Subject(id="HIST", school_id="S1", name="History", code="HIST", periods_per_week=7),
+    ]
+    teachers = []
+    for subject in subjects:
+        for i in range(num_classes // 2):
+            teachers.append(Teacher(
+                id=f"T_{subject.code}_{i}", user_id=f"U_{subject.code}_{i}",
+                subjects=[subject.name], max_periods_per_day=4, max_periods_per_week=20
+            ))
+    classes = [
+        Class(id=f"C{i}", school_id="S1", name=f"Grade 6-{i}", grade=6, section=str(i),
+              student_count=30, home_room_id=f"R{i}")
+        for i in range(num_classes)
+    ]
+    rooms = [
+        Room(id=f"R{i}", school_id="S1", name=f"Room {i}", capacity=40, type=RoomType.CLASSROOM)
+        for i in range(num_classes)
+    ]
+    return classes, subjects, teachers, time_slots, rooms
+
+
+def payload(num_classes=6):
+    """build_school() as a /generate request body (teachers list subject codes)."""
+    classes, subjects, teachers, time_slots, rooms = build_school(num_classes=num_classes)
+    for teacher in teachers:
+        teacher.subjects = [s.code for s in subjects if s.name in teacher.subjects]
+        teacher.max_periods_per_day = 6
+        teacher.max_periods_per_week = 30
+    return dict(
+        school_id="S1", academic_year_id="AY1",
+        classes=[c.model_dump() for c in classes], subjects=[s.model_dump() for s in subjects],
+        teachers=[t.model_dump() for t in teachers], time_slots=[t.model_dump() for t in time_slots],
+        rooms=[r.model_dump() for r in rooms], constraints=[], options=1, timeout=10, seed=5
+    )
+
+
+def baseline():
+    """6-class school and its seeded backtracking timetable (dict), for re-solves."""
+    classes, subjects, teachers, time_slots, rooms = build_school(num_classes=6)
+    for teacher in teachers:
+        teacher.max_periods_per_day = 6
+        teacher.max_periods_per_week = 30
+    timetables, _, _, _ = CSPSolverCompleteV301(debug=False).solve(
+        classes=classes, subjects=subjects, teachers=teachers,
+        time_slots=time_slots, rooms=rooms, constraints=[],
+        num_solutions=1, allow_partial_solutions=False,
+        search_mode="backtracking", seed=1
+    )
+    return (classes, subjects, teachers, time_slots, rooms), timetables[0].model_dump()
+
+
+def population(num_solutions=4):
+    """Seeded CSP timetables (dicts) of a 6-class school, as a GA population."""
+    classes, subjects, teachers, time_slots, rooms = build_school(num_classes=6)
+    timetables, _, _, _ = CSPSolverCompleteV301(debug=False).solve(
+        classes=classes, subjects=subjects, teachers=teachers, time_slots=time_slots,
+        rooms=rooms, constraints=[], num_solutions=num_solutions,
+        allow_partial_solutions=False, seed=11
+    )
+    return [tt.model_dump() for tt in timetables]
+
+
+def assert_valid(timetable, teachers):
+    """No class/teacher/room double booking; teacher daily and weekly caps hold."""
+    limits = {t.id: t for t in teachers}
+    class_slots = Counter((e.class_id, e.time_slot_id) for e in timetable.entries)
+    teacher_slots = Counter((e.teacher_id, e.time_slot_id) for e in timetable.entries
+                            if e.subject_id != "SELF_STUDY")
+    room_slots = Counter((e.room_id, e.time_slot_id) for e in timetable.entries)
+    assert max(class_slots.values()) == 1
+    assert max(teacher_slots.values()) == 1
+    assert max(room_slots.values()) == 1
+
+    week = Counter(e.teacher_id for e in timetable.entries if e.subject_id != "SELF_STUDY")
+    day = Counter((e.teacher_id, e.day_of_week) for e in timetable.entries
+                  if e.subject_id != "SELF_STUDY")
+    for teacher_id, load in week.items():
+        assert load <= limits[teacher_id].max_periods_per_week
+    for (teacher_id, _), load in day.items():
+        assert load <= limits[teacher_id].max_periods_per_day
+
+
+def teachers_by_class(timetable):
+    """(class, subject, teacher) triples of a timetable dict."""
+    return {(e["class_id"], e["subject_id"], e["teacher_id"]) for e in timetable["entries"]}
@@ -0,0 +1,138 @@
+"""
+Evaluation Executor - pluggable population scoring for GAOptimizerV25
+
+PURPOSE:
+evolve() scored every generation on one core in the API worker thread. The
+executor decides where the genomes of a generation are scored:
+
+- "serial": in-process. The GenomeTable gets the evaluator, so children are
+  already scored by delta evaluation when they are created; only genomes
+  without a score (none in practice) are evaluated in full
+- "thread": full evaluations on a ThreadPoolExecutor
+- "process": full evaluations on a ProcessPoolExecutor. The GenomeTable
+  (templates, slot table, shells) and the evaluator are shipped to every
+  worker ONCE (pool initializer); tasks carry only compact genomes - the
+  slot and room arrays and the shell index - and return scores
+
+Scores do not depend on the backend, so a seeded evolve() gives the same
+result with any of them. Pools live for one evolve() run (start/close).
+
+USAGE:
+    executor = EvaluationExecutor("process", workers=4)
+    ga.evolve(population, seed=1, executor=executor)
+
+    executor.start(table, evaluator)     # what evolve() does
+    executor.score(genomes)              # fills genome.score where None
+    executor.close()
+
+VERSION: 1.0.0
+"""
+
+from typing import Any, List, Optional, Sequence, Tuple
+from array import array
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import os
+
+import sys
+from pathlib import Path
+
+# Add parent directories to path for imports
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from algorithms.core.genome import Genome, GenomeTable
+
+
+BACKENDS = ("serial", "thread", "process")
+
+
+# Worker-side state, set once per process by the pool initializer
+_WORKER_TABLE: Optional[GenomeTable] = None
+_WORKER_EVALUATOR: Optional[Any] = None
+
+
+def _init_worker(table: GenomeTable, evaluator: Any):
+    global _WORKER_TABLE, _WORKER_EVALUATOR
+    _WORKER_TABLE = table
+    _WORKER_EVALUATOR = evaluator
+
+
+def _score_chunk(table: GenomeTable, evaluator: Any,
+                 chunk: Sequence[Tuple[array, array, int]]) -> List[float]:
+    """Full evaluation of (slots, rooms, shell) genomes."""
+    return [evaluator.evaluate(table.decode(Genome(slots, rooms, shell))).total_score
+            for slots, rooms, shell in chunk]
+
+
+def _score_in_worker(chunk: Sequence[Tuple[array, array, int]]) -> List[float]:
+    return _score_chunk(_WORKER_TABLE, _WORKER_EVALUATOR, chunk)
+
+
+class EvaluationExecutor:
+    """
+    Scores GA genomes serially, on threads or on worker processes.
+
+    Args:
+        backend: "serial", "thread" or "process"
+        workers: Threads/processes for the parallel backends (None = CPU count)
+    """
+
+    def __init__(self, backend: str = "serial", workers: Optional[int] = None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown evaluation backend '{backend}'. Use one of: {', '.join(BACKENDS)}")
+        self.backend = backend
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.table: Optional[GenomeTable] = None
+        self.evaluator: Optional[Any] = None
+        self._pool: Optional[Executor] = None
+
+    @property
+    def delta(self) -> bool:
+        """Whether children are scored by delta evaluation in-process."""
+        return self.backend == "serial"
+
+    def start(self, table: GenomeTable, evaluator: Any) -> "EvaluationExecutor":
+        """Bind to one evolve() run; parallel backends start their pool here."""
+        self.close()
+        self.table = table
+        self.evaluator = evaluator
+        if self.backend == "thread":
+            self._pool = ThreadPoolExecutor(max_workers=self.workers)
+        elif self.backend == "process":
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(table, evaluator)
+            )
+        return self
+
+    def score(self, genomes: List[Genome]) -> List[float]:
+        """Score the genomes that have no score yet; returns all scores."""
+        pending = [g for g in genomes if g.score is None]
+        if pending:
+            chunk = [(g.slots, g.rooms, g.shell) for g in pending]
+            if self._pool is None or len(pending) == 1:
+                scores = _score_chunk(self.table, self.evaluator, chunk)
+            else:
+                size = -(-len(chunk) // min(self.workers, len(chunk)))
+                parts = [chunk[i:i + size] for i in range(0, len(chunk), size)]
+                if self.backend == "process":
+                    futures = [self._pool.submit(_score_in_worker, part) for part in parts]
+                else:
+                    futures = [self._pool.submit(_score_chunk, self.table, self.evaluator, part)
+                               for part in parts]
+                scores = [score for future in futures for score in future.result()]
+            for genome, score in zip(pending, scores):
+                genome.score = score
+        return [g.score for g in genomes]
+
+    def close(self):
+        """Stop the pool of the current run."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
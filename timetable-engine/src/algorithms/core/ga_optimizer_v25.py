@@ -21,13 +21,26 @@ COMPATIBILITY:
 - Requires models_phase1_v25.py (OptimizationWeights with new fields)
 - Requires csp_solver_complete_v25.py (TimetableEntry with metadata)
 - Backward compatible (graceful degradation if metadata missing)
+
+v3.0.1: Individuals are compact Genomes (algorithms/core/genome.py) - int
+arrays over a shared GenomeTable - instead of deep-copied timetable dicts.
+Dicts are only built to score a genome and for the returned population.
+
+v3.0.1: evolve() stops early once the best fitness stalls
+(stall_generations without a min_improvement relative gain), reaches
+target_fitness or the wall-clock budget runs out; stop_reason records why.
+
+v3.0.1: Given teachers and time slots, mutations never move a period into a
+slot where its teacher is unavailable (Teacher.availability).
+
+v3.0.1: Per-generation population caching (cache_intermediate) is opt-in;
+by default only the final best timetable is cached.
 """
 
 from typing import List, Dict, Tuple, Any, Optional
 import random
 import copy
 import statistics
-from collections import defaultdict
 from dataclasses import dataclass
 import uuid
 
@@ -39,6 +52,16 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from evaluation import TimetableEvaluator, EvaluationConfig
 from persistence.timetable_cache import TimetableCache
+from solve_control import Deadline
+from teacher_availability import TeacherAvailability
+from algorithms.core.genome import Genome, GenomeTable
+from algorithms.core.evaluation_executor import EvaluationExecutor
+from algorithms.core.island_model import IslandSettings, run_islands
+
+
+# Why evolve() ended: generation cap, stalled best fitness, target fitness
+# reached, wall-clock budget spent, cancelled
+STOP_REASONS = ("generations", "stalled", "target_fitness", "timeout", "cancelled")
 
 
 @dataclass
@@ -110,6 +133,22 @@ class GAOptimizerV25:
         
         # Session management
         self.current_session_id: Optional[str] = None
+
+        # Reproducibility: every evolve() draws from its own seeded RNG, local
+        # to the call (one optimizer serves concurrent requests). self.seed is
+        # the seed of the last run; self.rng only serves the dict wrappers
+        self.seed: Optional[int] = None
+        self.rng = random.Random()
+
+        # Anytime evolution: set when the last evolve() stopped at its timeout.
+        # Per-run results travel in the returned timetables' metadata["ga"]
+        self.timed_out = False
+
+        # Why the last run stopped (see STOP_REASONS)
+        self.stop_reason: Optional[str] = None
+
+        # Island mode: per-island summary of the last evolve_islands() run
+        self.islands: List[Dict[str, Any]] = []
     
     def evolve(
         self,
@@ -120,7 +159,16 @@ class GAOptimizerV25:
         elitism_count: int = 2,
         weights: Optional[Any] = None,
         session_id: Optional[str] = None,
-        cache_intermediate: bool = True
+        cache_intermediate: bool = False,
+        seed: Optional[int] = None,
+        timeout: Optional[float] = None,
+        cancel_token: Optional[Any] = None,
+        executor: Optional[EvaluationExecutor] = None,
+        stall_generations: Optional[int] = None,
+        min_improvement: float = 0.0,
+        target_fitness: Optional[float] = None,
+        teachers: Optional[List] = None,
+        time_slots: Optional[List] = None
     ) -> List[Dict]:
         """
         Evolve population of timetables using genetic algorithm.
@@ -129,22 +177,54 @@ class GAOptimizerV25:
         
         Args:
             population: Initial timetables from CSP solver (with metadata)
-            generations: Number of evolution cycles
+            generations: Maximum number of evolution cycles
             mutation_rate: Probability of mutation (0.0-1.0)
             crossover_rate: Probability of crossover (0.0-1.0)
             elitism_count: Number of best solutions to preserve
             weights: OptimizationWeights with v2.5 fields
             session_id: Optional session ID for cache organization
-            cache_intermediate: Whether to cache intermediate generations
+            cache_intermediate: Whether to cache every generation (decodes and
+                writes the whole population each generation; off by default)
+            seed: Seed for selection/crossover/mutation (drawn if None); the same
+                seed and population always evolve the same way
+            timeout: Wall-clock budget in seconds (None = unlimited), checked
+                between generations. On expiry the current population is
+                returned (elitism keeps the best so far), marked timed_out
+            cancel_token: Optional CancellationToken; a cancelled run stops
+                between generations like an expired timeout
+            executor: Optional EvaluationExecutor choosing where genomes are
+                scored ("serial" delta scoring if None; "thread"/"process"
+                score each generation's new genomes in parallel)
+            stall_generations: Stop after this many generations without
+                improvement of the best fitness (None = never)
+            min_improvement: Relative gain of the best fitness that counts
+                as improvement for stall_generations (0.01 = 1%)
+            target_fitness: Stop as soon as the best fitness reaches this
+            teachers, time_slots: Optional teachers and time slots; with both,
+                mutations keep every period inside its teacher's availability
         
         Returns:
-            Optimized timetables sorted by fitness (best first)
+            Optimized timetables sorted by fitness (best first). Each carries
+            metadata["ga"]: seed, generations, timed_out, stop_reason (why
+            evolution ended, one of STOP_REASONS) and improvement of this run.
+            The optimizer may be shared by concurrent runs, so read run
+            results from here, not from its attributes
         
         METADATA REQUIREMENTS:
         - Each timetable entry must have subject_metadata
         - Each timetable entry must have teacher_metadata
         - Graceful degradation if metadata missing
         
+        GENOMES (v3.0.1):
+        - The population is encoded once into a GenomeTable; children are
+          int-array genomes built by slicing/swapping, never dict copies
+        - Unchanged children share their parent's arrays and fitness, so
+          elites and clones are not re-evaluated
+        - Changed children are scored by delta evaluation from their parent
+          (TimetableEvaluator.apply_move): only the class-days and
+          teacher-days a crossover or mutation touched are recomputed
+        - Only the returned population is materialized as independent dicts
+
         CACHING:
         - All generations cached if enabled
         - Best result preserved after completion
@@ -155,6 +235,13 @@ class GAOptimizerV25:
         
         # Setup session for caching
         self.current_session_id = session_id or str(uuid.uuid4())
+
+        # Seeded RNG for this run
+        seed = seed if seed is not None else random.randrange(2 ** 31)
+        rng = random.Random(seed)
+        self.seed = seed
+
+        deadline = Deadline(timeout, cancel_token)
         
         # Store weights for fitness calculation
         self.weights = weights or OptimizationWeights()
@@ -164,85 +251,271 @@ class GAOptimizerV25:
             config = EvaluationConfig.from_optimization_weights(self.weights)
             self.evaluator = TimetableEvaluator(config)
         
-        # Reset stats
-        self.stats_history = []
+        stats: List[GenerationStats] = []
         
         # Convert to internal format if needed
-        current_population = [self._ensure_dict(t) for t in population]
-        
-        # Evaluate initial population
-        fitness_scores = [self.evaluator.evaluate(t).total_score for t in current_population]
+        timetables = [self._ensure_dict(t) for t in population]
+
+        # v3.0.1: Encode once; the table is shared and immutable from here on.
+        # Serial: genomes are scored on encode, children by delta evaluation.
+        # Thread/process: the executor scores every generation's new genomes
+        executor = executor or EvaluationExecutor()
+        table = GenomeTable(timetables, evaluator=self.evaluator if executor.delta else None,
+                            availability=self._availability(teachers, time_slots))
+        executor.start(table, self.evaluator)
+        try:
+            current_population = [table.encode(i) for i in range(len(timetables))]
+            fitness_scores = executor.score(current_population)
+            initial_best = max(fitness_scores)
+            current_population, fitness_scores, stop_reason = self._run_generations(
+                table, executor, rng, current_population, fitness_scores, timetables, deadline,
+                generations, mutation_rate, crossover_rate, elitism_count, cache_intermediate,
+                stats, stall_generations, min_improvement, target_fitness
+            )
+        finally:
+            executor.close()
+
+        run = self._run_summary(seed, initial_best, stats, stop_reason)
+
+        # Last run, for get_evolution_report()
+        self.stats_history = stats
+        self.timed_out = run["timed_out"]
+        self.stop_reason = stop_reason
+        self.islands = []
         
+        return self._finish_run(table, current_population, fitness_scores, cache_intermediate, run)
+    
+    def evolve_islands(
+        self,
+        population: List[Dict],
+        islands: int = 4,
+        generations: int = 30,
+        migration_interval: int = 5,
+        migration_size: int = 1,
+        mutation_rate: float = 0.15,
+        mutation_rates: Optional[List[float]] = None,
+        crossover_rate: float = 0.7,
+        elitism_count: int = 2,
+        weights: Optional[Any] = None,
+        session_id: Optional[str] = None,
+        cache_intermediate: bool = False,
+        seed: Optional[int] = None,
+        timeout: Optional[float] = None,
+        cancel_token: Optional[Any] = None,
+        processes: bool = True,
+        teachers: Optional[List] = None,
+        time_slots: Optional[List] = None
+    ) -> List[Dict]:
+        """
+        Island-model evolution: `islands` sub-populations in separate processes.
+
+        v3.0.1: Every island starts from the full population and evolves it
+        with its own seed (seed + island index) and mutation rate; every
+        `migration_interval` generations the best `migration_size` genomes
+        of each island replace the worst of the next island in a ring. See
+        algorithms/core/island_model.py.
+
+        Args:
+            population: Initial timetables from CSP solver (with metadata)
+            islands: Number of sub-populations (one process each)
+            generations: Generations per island
+            migration_interval: Generations between migrations
+            migration_size: Genomes each island sends per migration
+            mutation_rate: Central mutation rate; islands spread from half to
+                twice this rate unless mutation_rates is given
+            mutation_rates: Optional explicit mutation rate per island
+            crossover_rate, elitism_count, weights, session_id,
+            cache_intermediate, seed, timeout, cancel_token, teachers,
+            time_slots: As for evolve()
+            processes: False runs the islands in-process with the same
+                migration schedule (same result for the same seed)
+
+        Returns:
+            The best len(population) distinct timetables over all islands,
+            best first. stats_history holds the per-generation best/avg/worst
+            over all islands, self.islands a summary per island.
+        """
+        if not population:
+            return []
+        if mutation_rates is not None and len(mutation_rates) != islands:
+            raise ValueError(f"mutation_rates has {len(mutation_rates)} entries for {islands} islands")
+
+        self.current_session_id = session_id or str(uuid.uuid4())
+        seed = seed if seed is not None else random.randrange(2 ** 31)
+        self.seed = seed
+        self.weights = weights or OptimizationWeights()
+        if self.evaluator is None:
+            self.evaluator = TimetableEvaluator(EvaluationConfig.from_optimization_weights(self.weights))
+
+        timetables = [self._ensure_dict(t) for t in population]
+        islands = max(1, islands)
+        if mutation_rates is None:
+            spread = [0.5 + 1.5 * i / (islands - 1) for i in range(islands)] if islands > 1 else [1.0]
+            mutation_rates = [min(1.0, mutation_rate * factor) for factor in spread]
+        settings = IslandSettings(
+            generations=generations,
+            crossover_rate=crossover_rate,
+            elitism_count=elitism_count,
+            migration_interval=migration_interval,
+            migration_size=migration_size
+        )
+        results = run_islands(
+            type(self), self.evaluator, timetables, [seed + i for i in range(islands)],
+            mutation_rates, settings, timeout=timeout, cancel_token=cancel_token, processes=processes,
+            availability=self._availability(teachers, time_slots)
+        )
+
+        # Per-generation statistics over all islands that reached the generation
+        stats: List[GenerationStats] = []
+        for gen in range(max(len(result["stats"]) for result in results)):
+            reached = [result["stats"][gen] for result in results if len(result["stats"]) > gen]
+            stats.append(GenerationStats(
+                generation=gen + 1,
+                best_fitness=max(s.best_fitness for s in reached),
+                avg_fitness=statistics.mean(s.avg_fitness for s in reached),
+                worst_fitness=min(s.worst_fitness for s in reached),
+                diversity=statistics.mean(s.diversity for s in reached)
+            ))
+        stop_reason = "generations"
+        if any(result["timed_out"] for result in results):
+            stop_reason = "cancelled" if cancel_token is not None and cancel_token.cancelled else "timeout"
+        island_summaries = [{
+            "island": result["index"],
+            "seed": result["seed"],
+            "mutation_rate": result["mutation_rate"],
+            "generations": len(result["stats"]),
+            "migrations": result["migrations"],
+            "best_fitness": max(result["scores"]),
+            "timed_out": result["timed_out"]
+        } for result in results]
+
+        # Last run, for get_evolution_report()
+        self.stats_history = stats
+        self.timed_out = stop_reason in ("timeout", "cancelled")
+        self.stop_reason = stop_reason
+        self.islands = island_summaries
+
+        # Best distinct schedules over all islands first (ties keep island
+        # order), then the best repeats if the islands found fewer
+        table = GenomeTable(timetables)
+        candidates = sorted(
+            ((score, table.adopt(slots, rooms, shell)) for result in results
+             for score, (slots, rooms, shell) in zip(result["scores"], result["genomes"])),
+            key=lambda c: c[0], reverse=True
+        )
+        distinct, repeats, seen = [], [], set()
+        for candidate in candidates:
+            key = table.schedule_key(candidate[1])
+            (repeats if key in seen else distinct).append(candidate)
+            seen.add(key)
+        chosen = (distinct + repeats)[:len(timetables)]
+        genomes = [genome for _, genome in chosen]
+        fitness_scores = [score for score, _ in chosen]
+        initial_best = max(result["initial_best"] for result in results)
+        run = self._run_summary(seed, initial_best, stats, stop_reason)
+        run["islands"] = island_summaries
+        return self._finish_run(table, genomes, fitness_scores, cache_intermediate, run)
+    
+    def _run_generations(self, table: GenomeTable, executor: EvaluationExecutor,
+                         rng: random.Random, current_population: List[Genome], fitness_scores: List[float],
+                         timetables: List[Dict], deadline: Deadline, generations: int,
+                         mutation_rate: float, crossover_rate: float, elitism_count: int,
+                         cache_intermediate: bool, stats: List[GenerationStats],
+                         stall_generations: Optional[int] = None, min_improvement: float = 0.0,
+                         target_fitness: Optional[float] = None) -> Tuple[List[Genome], List[float], str]:
+        """
+        Evolution loop of evolve(); appends each generation's statistics to
+        stats and returns the final genomes, their scores and the stop reason.
+        """
         # Cache initial population if enabled
         if self.enable_caching and self.cache and cache_intermediate:
             self.cache.store_ga_population(
-                population=current_population,
+                population=timetables,
                 session_id=self.current_session_id,
                 generation=0,
                 fitness_scores=fitness_scores
             )
         
-        # Evolution loop
+        # Evolution loop: best fitness of the last improvement, generations since
+        reference = max(fitness_scores)
+        stalled = 0
+        stop_reason = "generations"
+        if target_fitness is not None and reference >= target_fitness:
+            stop_reason = "target_fitness"
+            generations = 0
+
         for gen in range(generations):
-            # Create next generation
-            next_population = []
-            
-            # Elitism: keep best solutions
-            elite_indices = sorted(range(len(fitness_scores)), 
-                                 key=lambda i: fitness_scores[i], 
-                                 reverse=True)[:elitism_count]
-            next_population.extend([current_population[i] for i in elite_indices])
-            
-            # Generate offspring
-            while len(next_population) < len(current_population):
-                # Selection
-                parent1 = self._tournament_selection(current_population, fitness_scores)
-                parent2 = self._tournament_selection(current_population, fitness_scores)
-                
-                # Crossover
-                if random.random() < crossover_rate:
-                    child1, child2 = self._safe_crossover(parent1, parent2)
-                else:
-                    child1, child2 = copy.deepcopy(parent1), copy.deepcopy(parent2)
-                
-                # Mutation
-                if random.random() < mutation_rate:
-                    child1 = self._safe_mutate(child1)
-                if random.random() < mutation_rate:
-                    child2 = self._safe_mutate(child2)
-                
-                next_population.extend([child1, child2])
-            
-            # Trim to population size
-            next_population = next_population[:len(current_population)]
-            
-            # Evaluate new population
-            current_population = next_population
-            fitness_scores = [self.evaluator.evaluate(t).total_score for t in current_population]
+            if deadline.expired():
+                stop_reason = "cancelled" if deadline.cancelled else "timeout"
+                break
+
+            current_population, fitness_scores = self._next_generation(
+                table, executor, rng, current_population, fitness_scores,
+                mutation_rate, crossover_rate, elitism_count
+            )
             
             # Cache generation if enabled
             if self.enable_caching and self.cache and cache_intermediate:
                 self.cache.store_ga_population(
-                    population=current_population,
+                    population=[table.decode(g) for g in current_population],
                     session_id=self.current_session_id,
                     generation=gen + 1,
                     fitness_scores=fitness_scores
                 )
             
             # Track statistics
-            stats = GenerationStats(
-                generation=gen + 1,
-                best_fitness=max(fitness_scores),
-                avg_fitness=statistics.mean(fitness_scores),
-                worst_fitness=min(fitness_scores),
-                diversity=self._calculate_diversity(fitness_scores)
-            )
-            self.stats_history.append(stats)
-        
-        # Sort by fitness (best first)
-        sorted_population = [t for _, t in sorted(zip(fitness_scores, current_population),
-                                                  key=lambda x: x[0],
-                                                  reverse=True)]
+            stats.append(self._generation_stats(gen + 1, fitness_scores))
+
+            # Convergence: stop at the target or once the best fitness stalls
+            best = max(fitness_scores)
+            if target_fitness is not None and best >= target_fitness:
+                stop_reason = "target_fitness"
+                break
+            if best - reference > min_improvement * max(abs(reference), 1.0):
+                reference = best
+                stalled = 0
+            else:
+                stalled += 1
+            if stall_generations is not None and stalled >= stall_generations:
+                stop_reason = "stalled"
+                break
+        
+        return current_population, fitness_scores, stop_reason
+
+    @staticmethod
+    def _availability(teachers: Optional[List], time_slots: Optional[List]) -> TeacherAvailability:
+        """Teacher.availability over the non-break slots (unrestricted without teachers)."""
+        return TeacherAvailability(
+            teachers or [], [slot for slot in time_slots or [] if not slot.is_break]
+        )
+
+    @staticmethod
+    def _run_summary(seed: int, initial_best: float, stats: List[GenerationStats],
+                     stop_reason: str) -> Dict[str, Any]:
+        """
+        Results of one run, stamped on every returned timetable as metadata["ga"].
+
+        improvement is measured from the best fitness of the initial
+        population (stats[0] is already generation 1).
+        """
+        return {
+            "seed": seed,
+            "generations": len(stats),
+            "timed_out": stop_reason in ("timeout", "cancelled"),
+            "stop_reason": stop_reason,
+            "best_fitness": stats[-1].best_fitness if stats else None,
+            "improvement": stats[-1].best_fitness - initial_best if stats else 0
+        }
+    
+    def _finish_run(self, table: GenomeTable, genomes: List[Genome], fitness_scores: List[float],
+                    cache_intermediate: bool, run: Dict[str, Any]) -> List[Dict]:
+        """Rank the final genomes, materialize them, stamp the run summary and cache the best."""
+        # Sort by fitness (best first); materialize independent dicts for output
+        ranked = sorted(zip(fitness_scores, range(len(genomes))),
+                        key=lambda x: x[0], reverse=True)
+        sorted_population = [table.materialize(genomes[i]) for _, i in ranked]
+        for timetable in sorted_population:
+            timetable["metadata"] = dict(timetable.get("metadata") or {}, ga=dict(run))
         
         # Cache final result if enabled
         if self.enable_caching and self.cache:
@@ -253,9 +526,10 @@ class GAOptimizerV25:
             final_id = self.cache.store_timetable(
                 timetable=best_timetable,
                 session_id=self.current_session_id,
-                generation=generations,  # Mark as final generation
+                generation=run["generations"],  # Mark as final generation
                 fitness_score=best_fitness,
-                metadata={'session_final': True, 'total_generations': generations}
+                metadata={'session_final': True, 'total_generations': run["generations"],
+                          'timed_out': run["timed_out"]}
             )
             
             # Complete session (keeps best, cleans up intermediate results)
@@ -264,6 +538,57 @@ class GAOptimizerV25:
         
         return sorted_population
     
+    def _next_generation(self, table: GenomeTable, executor: EvaluationExecutor,
+                         rng: random.Random, current_population: List[Genome],
+                         fitness_scores: List[float], mutation_rate: float,
+                         crossover_rate: float, elitism_count: int) -> Tuple[List[Genome], List[float]]:
+        """One generation (elitism, selection, crossover, mutation, scoring) drawing from rng."""
+        # Create next generation
+        next_population = []
+
+        # Elitism: keep best solutions
+        elite_indices = sorted(range(len(fitness_scores)), 
+                             key=lambda i: fitness_scores[i], 
+                             reverse=True)[:elitism_count]
+        next_population.extend([current_population[i] for i in elite_indices])
+
+        # Generate offspring
+        while len(next_population) < len(current_population):
+            # Selection
+            parent1 = self._tournament_selection(current_population, fitness_scores, rng)
+            parent2 = self._tournament_selection(current_population, fitness_scores, rng)
+
+            # Crossover (v3.0.1: without crossover the children are the
+            # parents themselves - genomes are never modified in place)
+            if rng.random() < crossover_rate:
+                child1, child2 = table.crossover(parent1, parent2, rng)
+            else:
+                child1, child2 = parent1, parent2
+
+            # Mutation
+            if rng.random() < mutation_rate:
+                child1 = table.mutate(child1, rng)
+            if rng.random() < mutation_rate:
+                child2 = table.mutate(child2, rng)
+
+            next_population.extend([child1, child2])
+
+        # Trim to population size
+        next_population = next_population[:len(current_population)]
+
+        # Evaluate new population (only genomes without a delta score)
+        return next_population, executor.score(next_population)
+    
+    def _generation_stats(self, generation: int, fitness_scores: List[float]) -> GenerationStats:
+        """Statistics of one generation's fitness scores."""
+        return GenerationStats(
+            generation=generation,
+            best_fitness=max(fitness_scores),
+            avg_fitness=statistics.mean(fitness_scores),
+            worst_fitness=min(fitness_scores),
+            diversity=self._calculate_diversity(fitness_scores)
+        )
+    
     # FITNESS CALCULATION NOW HANDLED BY TimetableEvaluator
     # All penalty calculation methods moved to evaluation module for reusability
     
@@ -301,13 +626,13 @@ class GAOptimizerV25:
         
         return []
     
-    def _tournament_selection(self, population: List[Dict], fitness_scores: List[float],
-                             tournament_size: int = 3) -> Dict:
+    def _tournament_selection(self, population: List[Any], fitness_scores: List[float],
+                             rng: random.Random, tournament_size: int = 3) -> Any:
         """
         Select individual using tournament selection.
         Higher fitness = more likely to be selected.
         """
-        tournament_indices = random.sample(range(len(population)), tournament_size)
+        tournament_indices = rng.sample(range(len(population)), tournament_size)
         tournament_fitness = [fitness_scores[i] for i in tournament_indices]
         winner_index = tournament_indices[tournament_fitness.index(max(tournament_fitness))]
         return population[winner_index]
@@ -340,59 +665,17 @@ class GAOptimizerV25:
         - Teacher consistency is NEVER violated
         - Diversity comes from different time/room arrangements
         - Hard constraints are preserved
-        """
-        child1 = copy.deepcopy(parent1)
-        child2 = copy.deepcopy(parent2)
 
+        v3.0.1: Dict-level wrapper around GenomeTable.crossover(); evolve()
+        works on genomes directly and never calls this.
+        """
         try:
-            assignments1 = self._extract_assignments(child1)
-            assignments2 = self._extract_assignments(child2)
-
-            if not assignments1 or not assignments2:
-                return child1, child2
-
-            # Group assignments by class
-            class_groups1 = defaultdict(list)
-            class_groups2 = defaultdict(list)
-
-            for entry in assignments1:
-                class_groups1[entry.get("class_id")].append(entry)
-
-            for entry in assignments2:
-                class_groups2[entry.get("class_id")].append(entry)
-
-            # Get common classes between parents
-            common_classes = list(set(class_groups1.keys()) & set(class_groups2.keys()))
-
-            if len(common_classes) > 1:
-                # Select a random crossover point (which class to split at)
-                crossover_class_idx = random.randint(1, len(common_classes) - 1)
-                swap_classes = common_classes[crossover_class_idx:]
-
-                # Swap entire class schedules
-                for class_id in swap_classes:
-                    class_groups1[class_id], class_groups2[class_id] = \
-                        class_groups2[class_id], class_groups1[class_id]
-
-                # Rebuild assignments lists
-                new_assignments1 = []
-                new_assignments2 = []
-
-                for class_id in class_groups1:
-                    new_assignments1.extend(class_groups1[class_id])
-
-                for class_id in class_groups2:
-                    new_assignments2.extend(class_groups2[class_id])
-
-                # Update timetable dicts
-                self._update_assignments(child1, new_assignments1)
-                self._update_assignments(child2, new_assignments2)
-
+            table = GenomeTable([parent1, parent2])
+            child1, child2 = table.crossover(table.encode(0), table.encode(1), self.rng)
+            return table.materialize(child1), table.materialize(child2)
         except Exception:
             # If crossover fails for any reason, return parent clones
-            pass
-
-        return child1, child2
+            return copy.deepcopy(parent1), copy.deepcopy(parent2)
     
     def _safe_mutate(self, timetable_dict: Dict) -> Dict:
         """
@@ -425,55 +708,17 @@ class GAOptimizerV25:
         - PRO: Still provides mutation diversity
         - PRO: No risk of breaking critical constraints
         - CON: Slightly more limited mutation space (acceptable trade-off)
-        """
-        mutated = copy.deepcopy(timetable_dict)
 
+        v3.0.1: Dict-level wrapper around GenomeTable.mutate(); evolve()
+        works on genomes directly and never calls this.
+        """
         try:
-            entries = self._extract_assignments(mutated)
-
-            if len(entries) < 2:
-                return mutated  # Nothing to swap
-
-            # Strategy: Try time slot swap first (safer for teacher consistency)
-            # Find two entries with same (class_id, subject_id)
-            class_subject_map = defaultdict(list)
-            for idx, entry in enumerate(entries):
-                key = (entry.get("class_id"), entry.get("subject_id"))
-                class_subject_map[key].append(idx)
-
-            # Find a class-subject pair with multiple entries
-            swappable_pairs = [(k, v) for k, v in class_subject_map.items() if len(v) >= 2]
-
-            if swappable_pairs:
-                # Swap time slots between two entries of same class-subject
-                # This is SAFE - same teacher, same class, same subject, different times
-                key, indices = random.choice(swappable_pairs)
-                idx1, idx2 = random.sample(indices, 2)
-                entry1 = entries[idx1]
-                entry2 = entries[idx2]
-
-                # Swap time-related fields (preserves teacher assignment)
-                entry1["time_slot_id"], entry2["time_slot_id"] = entry2["time_slot_id"], entry1["time_slot_id"]
-                entry1["day_of_week"], entry2["day_of_week"] = entry2["day_of_week"], entry1["day_of_week"]
-                entry1["period_number"], entry2["period_number"] = entry2["period_number"], entry1["period_number"]
-
-                self._update_assignments(mutated, entries)
-            else:
-                # Fallback: Swap rooms between any two entries (always safe)
-                idx1, idx2 = random.sample(range(len(entries)), 2)
-                entry1 = entries[idx1]
-                entry2 = entries[idx2]
-
-                entry1["room_id"], entry2["room_id"] = entry2["room_id"], entry1["room_id"]
-
-                self._update_assignments(mutated, entries)
-            
+            table = GenomeTable([timetable_dict])
+            return table.materialize(table.mutate(table.encode(0), self.rng))
         except Exception:
             # If mutation fails for any reason, return original
             # This ensures we always return a valid timetable structure
-            pass
-        
-        return mutated
+            return copy.deepcopy(timetable_dict)
     
     def get_cached_best_timetable(self, session_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
@@ -588,7 +833,10 @@ class GAOptimizerV25:
   Configuration:
     Metadata-Driven: [ENABLED]
     Morning Cutoff: Period {getattr(self.weights, 'morning_period_cutoff', 4)}
-    Generations: {len(self.stats_history)}
+    Generations: {len(self.stats_history)}{' (timed out)' if self.timed_out else ''}
+    Stopped: {self.stop_reason}
+    Seed: {self.seed}
+    Islands: {len(self.islands) or 1}
 ===============================================================
   Initial State (Gen 1):
     Best Fitness:  {first_gen.best_fitness:8.2f}
@@ -0,0 +1,326 @@
+"""
+Genome - compact GA chromosomes over a shared, immutable problem table
+
+PURPOSE:
+GAOptimizerV25 used to evolve whole timetable dicts: every child started as
+copy.deepcopy(parent), thousands of entry dicts with nested subject and
+teacher metadata, only to change a few time slots or one class block.
+
+A GenomeTable is built once per evolve() from the initial population and is
+never modified afterwards. It holds everything the individuals share:
+
+- GENES: one per (class, subject, teacher, occurrence) seen in any input
+  timetable, sorted by class, so every class is one contiguous block
+- TEMPLATES: the entry dict each gene was first seen in (ids, teacher,
+  metadata)
+- SLOT TABLE: (time_slot_id, day_of_week, period_number) per slot index
+- ROOM TABLE: room_id per room index
+- SHELLS: the non-entry fields (id, metadata, unfilled slots, ...) of each
+  input timetable
+
+An individual (Genome) is then just two int arrays, slot index and room
+index per gene (-1 where its timetable has no such period), plus the index
+of the shell it inherits. Crossover swaps class blocks by array slicing,
+mutation swaps two array values; entry dicts are only built when a genome is
+scored (shallow, sharing the templates' metadata) or returned (deep copy).
+
+v1.1.0: With an evaluator, every genome also carries an EvaluationState over
+all genes (absent genes have no position). Children are scored by delta
+evaluation from their parent's state: a time swap rescores two class-days and
+the teacher-days involved, a crossover only the exchanged class blocks. A
+room swap does not change the score and shares the parent's state.
+
+USAGE:
+    table = GenomeTable(population)
+    genomes = [table.encode(i) for i in range(len(population))]
+    child1, child2 = table.crossover(genomes[0], genomes[1], rng)
+    child = table.mutate(child1, rng)
+    timetable = table.materialize(child)       # independent dict for output
+
+    table = GenomeTable(population, evaluator=evaluator)
+    table.encode(0).score                       # scored on encode ...
+    table.mutate(genome, rng).score             # ... and by delta on every child
+
+v1.2.0: adopt() rebuilds a genome received from another table of the same
+population (island migration); schedule_key() identifies equal schedules.
+
+v1.3.0: With a TeacherAvailability, mutate() rejects time swaps that would
+put a teacher into a slot they cannot teach. Crossover needs no check: every
+gene keeps its teacher and takes the slot one of its parents gave it.
+
+VERSION: 1.3.0
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from array import array
+from collections import defaultdict
+import copy
+import random
+
+import sys
+from pathlib import Path
+
+# Add parent directories to path for imports
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from evaluation import TimeSwap, ClassBlockExchange
+
+
+MISSING = -1  # Gene not present in this individual
+
+
+class Genome:
+    """One individual: slot and room index per gene, shell index, cached score."""
+
+    __slots__ = ("slots", "rooms", "shell", "score", "state")
+
+    def __init__(self, slots: array, rooms: array, shell: int, score: Optional[float] = None,
+                 state: Optional[Any] = None):
+        self.slots = slots
+        self.rooms = rooms
+        self.shell = shell
+        self.score = score   # Fitness once evaluated; genomes are never modified in place
+        self.state = state   # EvaluationState (delta scoring); shared, never modified
+
+    def nbytes(self) -> int:
+        """Memory held by the chromosome arrays."""
+        return self.slots.itemsize * len(self.slots) + self.rooms.itemsize * len(self.rooms)
+
+
+class GenomeTable:
+    """
+    Shared problem table of one GA run.
+
+    Args:
+        population: Timetable dicts (Timetable.model_dump() format, entries
+            under "entries" or "assignments")
+        evaluator: Optional TimetableEvaluator; genomes are then scored on
+            encode and children by delta evaluation
+        availability: Optional TeacherAvailability; mutations never move a
+            period into a slot its teacher cannot teach
+    """
+
+    def __init__(self, population: List[Dict[str, Any]], evaluator: Optional[Any] = None,
+                 availability: Optional[Any] = None):
+        self.entries_key: List[Optional[str]] = []
+        self.shells: List[Dict[str, Any]] = []
+        per_timetable: List[List[Tuple[Tuple, Dict]]] = []
+        templates: Dict[Tuple, Dict] = {}
+
+        for timetable in population:
+            key = next((k for k in ("entries", "assignments") if k in timetable), None)
+            entries = timetable[key] if key else []
+            self.entries_key.append(key)
+            self.shells.append({k: v for k, v in timetable.items() if k != key})
+
+            seen: Dict[Tuple, int] = defaultdict(int)
+            genes = []
+            for entry in entries:
+                base = (str(entry.get("class_id")), str(entry.get("subject_id")),
+                        str(entry.get("teacher_id")))
+                gene = base + (seen[base],)
+                seen[base] += 1
+                templates.setdefault(gene, entry)
+                genes.append((gene, entry))
+            per_timetable.append(genes)
+
+        # Class-major gene order: every class is one contiguous block
+        order = sorted(templates)
+        self.gene_index = {gene: i for i, gene in enumerate(order)}
+        self.templates = [templates[gene] for gene in order]
+        self.size = len(order)
+        self._bases = [gene[:3] for gene in order]   # (class, subject, teacher) per gene
+
+        self.class_starts: List[int] = []
+        previous_class = None
+        for i, gene in enumerate(order):
+            if gene[0] != previous_class:
+                self.class_starts.append(i)
+                previous_class = gene[0]
+
+        # Genes of one (class, subject): the periods a time swap may exchange
+        groups: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        for i, gene in enumerate(order):
+            groups[gene[:2]].append(i)
+        self.groups = [genes for genes in groups.values() if len(genes) >= 2]
+
+        self.slot_table: List[Tuple] = []
+        self.room_table: List[Any] = []
+        slot_index: Dict[Tuple, int] = {}
+        room_index: Dict[Any, int] = {}
+        self._encoded: List[Tuple[array, array]] = []
+        for genes in per_timetable:
+            slots = array("i", [MISSING]) * self.size
+            rooms = array("i", [MISSING]) * self.size
+            for gene, entry in genes:
+                slot = (entry.get("time_slot_id"), entry.get("day_of_week"), entry.get("period_number"))
+                if slot not in slot_index:
+                    slot_index[slot] = len(self.slot_table)
+                    self.slot_table.append(slot)
+                room = entry.get("room_id")
+                if room not in room_index:
+                    room_index[room] = len(self.room_table)
+                    self.room_table.append(room)
+                g = self.gene_index[gene]
+                slots[g] = slot_index[slot]
+                rooms[g] = room_index[room]
+            self._encoded.append((slots, rooms))
+
+        # Only restricted teachers need a check
+        self.availability = availability if availability else None
+
+        # Delta scoring: one state per input timetable, over all genes
+        self.evaluator = evaluator
+        self.positions = [slot[1:] for slot in self.slot_table]   # (day, period) per slot index
+        self._states = []
+        if evaluator is not None:
+            for shell, (slots, _) in enumerate(self._encoded):
+                self._states.append(self._build_state(slots, shell))
+
+    # ------------------------------------------------------------------
+    # Conversion
+    # ------------------------------------------------------------------
+
+    def encode(self, index: int) -> Genome:
+        """Genome of population[index] (the timetable the table was built from)."""
+        slots, rooms = self._encoded[index]
+        genome = Genome(array("i", slots), array("i", rooms), index)
+        if self._states:
+            genome.state = self._states[index]
+            genome.score = genome.state.score
+        return genome
+
+    def adopt(self, slots: array, rooms: array, shell: int) -> Genome:
+        """
+        Genome from another table built from the same population (island
+        migration); scored with a fresh state if the table has an evaluator.
+        """
+        genome = Genome(array("i", slots), array("i", rooms), shell)
+        if self.evaluator is not None:
+            genome.state = self._build_state(genome.slots, shell)
+            genome.score = genome.state.score
+        return genome
+
+    def decode(self, genome: Genome) -> Dict[str, Any]:
+        """
+        Timetable dict for scoring: shallow entries that share the templates'
+        nested metadata and the shell. Treat as read-only.
+        """
+        entries = []
+        slot_table, room_table, templates = self.slot_table, self.room_table, self.templates
+        for g, s in enumerate(genome.slots):
+            if s == MISSING:
+                continue
+            entry = dict(templates[g])
+            entry["time_slot_id"], entry["day_of_week"], entry["period_number"] = slot_table[s]
+            entry["room_id"] = room_table[genome.rooms[g]]
+            entries.append(entry)
+        timetable = dict(self.shells[genome.shell])
+        timetable[self.entries_key[genome.shell] or "entries"] = entries
+        return timetable
+
+    def materialize(self, genome: Genome) -> Dict[str, Any]:
+        """Independent timetable dict (deep copy) for the GA's output."""
+        return copy.deepcopy(self.decode(genome))
+
+    def schedule_key(self, genome: Genome) -> Tuple:
+        """
+        Hashable placements of a genome; equal for genomes that only differ
+        in the order of interchangeable periods (same class, subject, teacher).
+        """
+        bases = self._bases
+        return tuple(sorted(
+            (bases[g], s, genome.rooms[g]) for g, s in enumerate(genome.slots) if s != MISSING
+        ))
+
+    # ------------------------------------------------------------------
+    # Operators (children are new genomes; parents are never modified)
+    # ------------------------------------------------------------------
+
+    def crossover(self, parent1: Genome, parent2: Genome,
+                  rng: random.Random) -> Tuple[Genome, Genome]:
+        """
+        Swap the class blocks after a random class between the two parents.
+
+        Whole class schedules move together, so every class keeps the
+        teachers it had in its parent.
+        """
+        if len(self.class_starts) < 2:
+            return parent1, parent2
+        cut = self.class_starts[rng.randint(1, len(self.class_starts) - 1)]
+        child1 = Genome(parent1.slots[:cut] + parent2.slots[cut:],
+                        parent1.rooms[:cut] + parent2.rooms[cut:], parent1.shell)
+        child2 = Genome(parent2.slots[:cut] + parent1.slots[cut:],
+                        parent2.rooms[:cut] + parent1.rooms[cut:], parent2.shell)
+        if self.evaluator is not None:
+            self._rescore(child1, parent1, self._block_exchange(parent1, parent2, cut))
+            self._rescore(child2, parent2, self._block_exchange(parent2, parent1, cut))
+        return child1, child2
+
+    def mutate(self, genome: Genome, rng: random.Random) -> Genome:
+        """
+        Swap the time slots of two periods of one (class, subject); if no
+        (class, subject) has two periods, swap the rooms of any two periods.
+
+        A time swap that would put a teacher outside their availability is
+        rejected and the genome is returned unchanged.
+        """
+        slots = genome.slots
+        swappable = []
+        for genes in self.groups:
+            present = [g for g in genes if slots[g] != MISSING]
+            if len(present) >= 2:
+                swappable.append(present)
+
+        if swappable:
+            g1, g2 = rng.sample(rng.choice(swappable), 2)
+            if not (self._available(g1, slots[g2]) and self._available(g2, slots[g1])):
+                return genome
+            slots = array("i", slots)
+            slots[g1], slots[g2] = slots[g2], slots[g1]
+            child = Genome(slots, genome.rooms, genome.shell)
+            if self.evaluator is not None:
+                self._rescore(child, genome, TimeSwap(g1, g2))
+            return child
+
+        present = [g for g, s in enumerate(slots) if s != MISSING]
+        if len(present) < 2:
+            return genome
+        g1, g2 = rng.sample(present, 2)
+        rooms = array("i", genome.rooms)
+        rooms[g1], rooms[g2] = rooms[g2], rooms[g1]
+        # Rooms are not scored: the child shares the parent's state and score
+        return Genome(genome.slots, rooms, genome.shell, genome.score, genome.state)
+
+    def _available(self, gene: int, slot: int) -> bool:
+        """True if the gene's teacher can teach in slot (slot index)."""
+        if self.availability is None:
+            return True
+        return self.availability.allows(self._bases[gene][2], self.slot_table[slot][0])
+
+    # ------------------------------------------------------------------
+    # Delta scoring
+    # ------------------------------------------------------------------
+
+    def _build_state(self, slots: array, shell: int):
+        """Evaluation state over all genes; absent genes have no position."""
+        return self.evaluator.build_state(
+            dict(self.shells[shell], entries=self.templates),
+            [self.positions[s] if s != MISSING else None for s in slots]
+        )
+
+    def _block_exchange(self, base: Genome, donor: Genome, cut: int) -> ClassBlockExchange:
+        """Positions of the genes from cut on that differ between base and donor."""
+        positions = self.positions
+        base_slots, donor_slots = base.slots, donor.slots
+        return ClassBlockExchange({
+            g: positions[donor_slots[g]] if donor_slots[g] != MISSING else None
+            for g in range(cut, self.size) if donor_slots[g] != base_slots[g]
+        })
+
+    def _rescore(self, child: Genome, parent: Genome, move: Any):
+        """Child state and score from the parent's state plus move."""
+        if parent.state is None:
+            return
+        child.state = parent.state.copy()
+        child.score = self.evaluator.apply_move(child.state, move)
@@ -0,0 +1,252 @@
+"""
+Island Model - GA sub-populations in worker processes with ring migration
+
+PURPOSE:
+GAOptimizerV25.evolve() runs one small population (the 3-5 CSP seeds) and
+converges prematurely; more generations on one core do not help. The island
+model runs N copies of that population ("islands"), each in its own process
+with its own seed and mutation rate, so they explore different regions:
+
+- Every island starts from the full CSP population and evolves it with the
+  usual generation step (elitism, tournament, class-block crossover, delta
+  scoring)
+- Every `migration_interval` generations each island sends its best
+  `migration_size` genomes to the next island of a ring, where they replace
+  the worst ones. Migrants travel as compact genomes (slot and room arrays,
+  shell index) over multiprocessing queues
+- Migration is synchronous (every island waits for its neighbour's
+  migrants), so a seeded run gives the same result in processes as the
+  in-process runner; an island that stops (timeout, cancel, error) sends a
+  sentinel and its neighbour carries on without migrants
+
+USAGE:
+    ga.evolve_islands(population, islands=4, generations=30,
+                      migration_interval=5, migration_size=2, seed=7)
+    ga.islands        # per-island seed, mutation rate, best fitness, ...
+
+VERSION: 1.0.0
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+from array import array
+import multiprocessing
+import queue
+import random
+
+import sys
+from pathlib import Path
+
+# Add parent directories to path for imports
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from algorithms.core.genome import GenomeTable
+from algorithms.core.evaluation_executor import EvaluationExecutor
+from solve_control import Deadline
+
+
+Migrant = Tuple[array, array, int]   # (slots, rooms, shell)
+
+
+@dataclass(frozen=True)
+class IslandSettings:
+    """GA parameters shared by all islands of one run."""
+    generations: int
+    crossover_rate: float
+    elitism_count: int
+    migration_interval: int
+    migration_size: int
+
+    def epochs(self) -> List[int]:
+        """Generations between migrations (the last epoch has no migration)."""
+        interval = max(1, self.migration_interval)
+        epochs = [interval] * (self.generations // interval)
+        if self.generations % interval:
+            epochs.append(self.generations % interval)
+        return epochs
+
+
+class Island:
+    """
+    One sub-population with its own GA instance, seed and mutation rate.
+
+    Args:
+        index: Position in the ring
+        ga_class: GAOptimizerV25 (or subclass) providing the generation step
+        evaluator: TimetableEvaluator used for delta scoring
+        timetables: Initial CSP population (dicts)
+        seed: Seed of this island's RNG
+        mutation_rate: This island's mutation probability
+        settings: IslandSettings of the run
+        availability: Optional TeacherAvailability for the genome table
+    """
+
+    def __init__(self, index: int, ga_class: type, evaluator: Any, timetables: List[Dict],
+                 seed: int, mutation_rate: float, settings: IslandSettings,
+                 availability: Optional[Any] = None):
+        self.index = index
+        self.seed = seed
+        self.mutation_rate = mutation_rate
+        self.settings = settings
+        self.ga = ga_class(evaluator=evaluator, enable_caching=False)
+        self.rng = random.Random(seed)
+        self.table = GenomeTable(timetables, evaluator=evaluator, availability=availability)
+        self.executor = EvaluationExecutor().start(self.table, evaluator)
+        self.population = [self.table.encode(i) for i in range(len(timetables))]
+        self.scores = self.executor.score(self.population)
+        self.initial_best = max(self.scores)
+        self.stats = []
+        self.migrations = 0
+        self.timed_out = False
+
+    def run(self, generations: int, deadline: Deadline) -> bool:
+        """Evolve `generations` generations; False if the deadline stopped it."""
+        for _ in range(generations):
+            if deadline.expired():
+                self.timed_out = True
+                return False
+            self.population, self.scores = self.ga._next_generation(
+                self.table, self.executor, self.rng, self.population, self.scores,
+                self.mutation_rate, self.settings.crossover_rate, self.settings.elitism_count
+            )
+            self.stats.append(self.ga._generation_stats(len(self.stats) + 1, self.scores))
+        return True
+
+    def emigrants(self) -> List[Migrant]:
+        """Copies of the best `migration_size` genomes, best first."""
+        ranked = sorted(range(len(self.scores)), key=lambda i: self.scores[i], reverse=True)
+        return [(self.population[i].slots, self.population[i].rooms, self.population[i].shell)
+                for i in ranked[:self.settings.migration_size]]
+
+    def immigrate(self, migrants: Sequence[Migrant]):
+        """Replace the worst genomes with the migrants (elites are never replaced)."""
+        limit = max(0, len(self.population) - self.settings.elitism_count)
+        worst = sorted(range(len(self.scores)), key=lambda i: self.scores[i])[:min(len(migrants), limit)]
+        for i, (slots, rooms, shell) in zip(worst, migrants):
+            self.population[i] = self.table.adopt(slots, rooms, shell)
+            self.scores[i] = self.population[i].score
+        self.migrations += 1
+
+    def result(self) -> Dict[str, Any]:
+        """Final genomes, scores and statistics (picklable)."""
+        return {
+            "index": self.index,
+            "seed": self.seed,
+            "mutation_rate": self.mutation_rate,
+            "genomes": [(g.slots, g.rooms, g.shell) for g in self.population],
+            "scores": list(self.scores),
+            "initial_best": self.initial_best,
+            "stats": self.stats,
+            "migrations": self.migrations,
+            "timed_out": self.timed_out
+        }
+
+
+def run_islands(ga_class: type, evaluator: Any, timetables: List[Dict], seeds: List[int],
+                mutation_rates: List[float], settings: IslandSettings,
+                timeout: Optional[float] = None, cancel_token: Optional[Any] = None,
+                processes: bool = True, availability: Optional[Any] = None) -> List[Dict[str, Any]]:
+    """
+    Run one island per seed and return every island's result(), in ring order.
+    availability (a TeacherAvailability) restricts every island's mutations.
+
+    processes=False runs the islands in-process, epoch by epoch, with the
+    same migration schedule (identical results for the same seeds).
+    """
+    if not processes or len(seeds) == 1:
+        return _run_in_process(ga_class, evaluator, timetables, seeds, mutation_rates,
+                               settings, Deadline(timeout, cancel_token), availability)
+
+    context = multiprocessing.get_context()
+    inboxes = [context.Queue() for _ in seeds]
+    results = context.Queue()
+    workers = [
+        context.Process(
+            target=_island_main,
+            args=(i, ga_class, evaluator, timetables, seeds[i], mutation_rates[i], settings,
+                  inboxes[i], inboxes[(i + 1) % len(seeds)], results, timeout, cancel_token,
+                  availability),
+            daemon=True
+        )
+        for i in range(len(seeds))
+    ]
+    for worker in workers:
+        worker.start()
+
+    collected: Dict[int, Dict[str, Any]] = {}
+    try:
+        while len(collected) < len(workers):
+            try:
+                result = results.get(timeout=0.5)
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in workers):
+                    try:
+                        result = results.get(timeout=0.5)
+                    except queue.Empty:
+                        break
+                else:
+                    continue
+            collected[result["index"]] = result
+    finally:
+        for worker in workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+
+    if len(collected) < len(workers):
+        missing = sorted(set(range(len(workers))) - set(collected))
+        raise RuntimeError(f"Island worker(s) {missing} exited without a result")
+    return [collected[i] for i in range(len(workers))]
+
+
+def _run_in_process(ga_class, evaluator, timetables, seeds, mutation_rates, settings, deadline,
+                    availability=None):
+    islands = [Island(i, ga_class, evaluator, timetables, seed, rate, settings, availability)
+               for i, (seed, rate) in enumerate(zip(seeds, mutation_rates))]
+    epochs = settings.epochs()
+    for e, length in enumerate(epochs):
+        finished = [island.run(length, deadline) for island in islands]
+        if e == len(epochs) - 1 or not all(finished):
+            break
+        outgoing = [island.emigrants() for island in islands]
+        for i, island in enumerate(islands):
+            island.immigrate(outgoing[i - 1])
+    return [island.result() for island in islands]
+
+
+def _island_main(index, ga_class, evaluator, timetables, seed, mutation_rate, settings,
+                 inbox, outbox, results, timeout, cancel_token, availability=None):
+    """Process entry point: evolve one island, migrating over the ring queues."""
+    # Migrants nobody reads any more must not block this process's exit
+    outbox.cancel_join_thread()
+    deadline = Deadline(timeout, cancel_token)
+    island = None
+    neighbour_running = True
+    try:
+        island = Island(index, ga_class, evaluator, timetables, seed, mutation_rate, settings,
+                        availability)
+        epochs = settings.epochs()
+        for e, length in enumerate(epochs):
+            if not island.run(length, deadline) or e == len(epochs) - 1:
+                break
+            outbox.put(island.emigrants())
+            if neighbour_running:
+                migrants = _receive(inbox, deadline)
+                if migrants is None:
+                    neighbour_running = False
+                else:
+                    island.immigrate(migrants)
+    finally:
+        outbox.put(None)   # Sentinel: this island sends no more migrants
+        if island is not None:
+            results.put(island.result())
+
+
+def _receive(inbox, deadline: Deadline) -> Optional[List[Migrant]]:
+    """Next migrants from the neighbour; None once it stopped or the deadline passed."""
+    while True:
+        try:
+            return inbox.get(timeout=0.2)
+        except queue.Empty:
+            if deadline.expired():
+                return None
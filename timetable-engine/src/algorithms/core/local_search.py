@@ -0,0 +1,357 @@
+"""
+Tabu Search Optimizer - soft-constraint improvement that keeps teacher consistency
+
+PURPOSE:
+main_v301 skips GA evolution whenever one-teacher-per-subject is enforced (the
+default), because crossover and mutation can reassign teachers. Soft
+constraints (time preferences, student gaps, consecutive periods) were then
+never optimized. This phase improves a CSP timetable using only moves that
+keep every entry's class, subject, teacher and room:
+
+- SWAP: exchange the time slots of two periods of the same class
+- MOVE: move a period into a free slot of its class (partial timetables)
+
+Every candidate is checked in O(1) against occupancy indexes (class, teacher
+and shared room per slot, teacher daily load) and the teachers'
+availability masks (Teacher.availability), and scored incrementally with
+the evaluator's delta API (v1.1.0): a SWAP is a TimeSwap, a MOVE a one-entry
+ClassBlockExchange, and only the (class, day), (teacher, day) and per-entry
+penalty terms the move touches are recomputed. Workload balance and coverage
+cannot change under these moves.
+
+SEARCH:
+Tabu search over a sampled neighbourhood. The best non-tabu candidate is
+applied even when it is worse, so the search walks out of local optima.
+Moving a period back into a slot it just left is tabu for `tabu_tenure`
+iterations unless it beats the best timetable found (aspiration). Stops on
+max_iterations, patience (iterations without improvement), a zero penalty or
+timeout; the best timetable found is returned.
+
+USAGE:
+    optimizer = TabuSearchOptimizer()
+    improved = optimizer.optimize(timetable_dict, weights=weights, teachers=teachers,
+                                  seed=seed, timeout=5.0)
+    improved["metadata"]["local_search"]   # iterations, penalty before/after, ...
+
+VERSION: 1.2.0
+"""
+
+from typing import List, Dict, Tuple, Any, Optional
+import copy
+import random
+import time
+
+import sys
+from pathlib import Path
+
+# Add parent directories to path for imports
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from evaluation import TimetableEvaluator, EvaluationConfig, TimeSwap, ClassBlockExchange
+from solve_control import Deadline
+from teacher_availability import TeacherAvailability
+
+
+class TabuSearchOptimizer:
+    """
+    Tabu search over teacher-preserving time moves.
+
+    Args:
+        evaluator: TimetableEvaluator whose penalties are optimized (built
+            from the optimize() weights if None)
+        max_iterations: Applied moves per optimize() call
+        tabu_tenure: Iterations a period may not return to a slot it left
+        neighbourhood_size: Candidate moves sampled per iteration
+        patience: Stop after this many iterations without improvement
+    """
+
+    def __init__(self,
+                 evaluator: Optional[TimetableEvaluator] = None,
+                 max_iterations: int = 5000,
+                 tabu_tenure: int = 15,
+                 neighbourhood_size: int = 40,
+                 patience: int = 1000,
+                 debug: bool = False):
+        self.version = "1.2.0"
+        self.evaluator = evaluator
+        self.max_iterations = max_iterations
+        self.tabu_tenure = tabu_tenure
+        self.neighbourhood_size = neighbourhood_size
+        self.patience = patience
+        self.debug = debug
+
+    def optimize(self,
+                 timetable: Dict[str, Any],
+                 weights: Optional[Any] = None,
+                 teachers: Optional[List] = None,
+                 time_slots: Optional[List] = None,
+                 seed: Optional[int] = None,
+                 timeout: Optional[float] = None,
+                 cancel_token: Optional[Any] = None) -> Dict[str, Any]:
+        """
+        Improve one timetable; the input dict is not modified.
+
+        Args:
+            timetable: Timetable dict (Timetable.model_dump() format)
+            weights: OptimizationWeights for the evaluator (if none was given)
+            teachers: Teachers, for max_periods_per_day and availability.
+                Without them a teacher's busiest day in the input is used as
+                its daily cap and every slot counts as available
+            time_slots: Time slots; non-break slots no class uses become free
+                targets. Slots are otherwise taken from entries and unfilled_slots
+            seed: Seed for neighbourhood sampling (drawn if None)
+            timeout: Wall-clock budget in seconds (None = unlimited)
+            cancel_token: Optional CancellationToken; stops the search like
+                an expired timeout (the best timetable so far is returned)
+
+        Returns:
+            Improved timetable dict with metadata["local_search"] statistics
+        """
+        start = time.perf_counter()
+        deadline = Deadline(timeout, cancel_token)
+        rng = random.Random(seed if seed is not None else random.randrange(2 ** 31))
+        evaluator = self.evaluator or TimetableEvaluator(
+            EvaluationConfig.from_optimization_weights(weights) if weights is not None
+            else EvaluationConfig()
+        )
+        config = evaluator.config
+
+        result = copy.deepcopy(timetable)
+        entries: List[Dict] = result.get("entries", [])
+        metadata = result.setdefault("metadata", {})
+        score_before = evaluator.evaluate(result).total_score
+
+        # --------------------------------------------------------------
+        # Slot universe: slot_id -> (day, period)
+        # --------------------------------------------------------------
+        slot_info: Dict[str, Tuple[Any, int]] = {}
+        for slot in time_slots or []:
+            if not slot.is_break:
+                slot_info[slot.id] = (slot.day_of_week, slot.period_number)
+        for entry in entries:
+            slot_info.setdefault(entry["time_slot_id"], (entry["day_of_week"], entry["period_number"]))
+        for gap in metadata.get("unfilled_slots", []):
+            slot_info.setdefault(gap["time_slot_id"], (gap["day"], gap["period"]))
+        slot_ids = sorted(slot_info)
+
+        # --------------------------------------------------------------
+        # Occupancy indexes (hard constraints) and penalty groups
+        # --------------------------------------------------------------
+        class_at: Dict[Tuple[str, str], int] = {}
+        teacher_at: Dict[Tuple[str, str], int] = {}
+        room_at: Dict[Tuple[str, str], int] = {}
+        teacher_day_load: Dict[Tuple[str, Any], int] = {}
+        # SELF_STUDY is a filler: it does not occupy its placeholder teacher
+        real = [entry["subject_id"] != "SELF_STUDY" for entry in entries]
+
+        for i, entry in enumerate(entries):
+            slot_id, day = entry["time_slot_id"], entry["day_of_week"]
+            class_at[(entry["class_id"], slot_id)] = i
+            if real[i]:
+                key = (entry["teacher_id"], slot_id)
+                teacher_at[key] = teacher_at.get(key, 0) + 1
+                key = (entry["teacher_id"], day)
+                teacher_day_load[key] = teacher_day_load.get(key, 0) + 1
+            if entry.get("is_shared_room"):
+                room_at[(entry["room_id"], slot_id)] = i
+
+        if teachers:
+            daily_cap = {t.id: t.max_periods_per_day for t in teachers}
+        else:
+            daily_cap = {}
+            for (teacher_id, _), load in teacher_day_load.items():
+                daily_cap[teacher_id] = max(daily_cap.get(teacher_id, 0), load)
+
+        # Teacher.availability over the non-break slots (slots known only
+        # from entries count as available)
+        availability = TeacherAvailability(
+            teachers or [], [slot for slot in time_slots or [] if not slot.is_break]
+        )
+
+        # --------------------------------------------------------------
+        # Incremental penalty terms (TimetableEvaluator delta state)
+        # --------------------------------------------------------------
+        state = evaluator.build_state(result)
+
+        def move_of(a: int, target: str, b: Optional[int]):
+            """a to target and b (if any) to a's slot, as an evaluator move."""
+            if b is not None:
+                return TimeSwap(a, b)
+            return ClassBlockExchange({a: slot_info[target]})
+
+        def place(i: int, slot_id: str):
+            """Move entry i to slot_id."""
+            entry = entries[i]
+            entry["time_slot_id"] = slot_id
+            entry["day_of_week"], entry["period_number"] = slot_info[slot_id]
+
+        def occupy(i: int, slot_id: str, sign: int):
+            """Add (sign=1) or remove (sign=-1) entry i at slot_id in the occupancy indexes."""
+            entry = entries[i]
+            if real[i]:
+                key = (entry["teacher_id"], slot_id)
+                teacher_at[key] = teacher_at.get(key, 0) + sign
+                key = (entry["teacher_id"], slot_info[slot_id][0])
+                teacher_day_load[key] = teacher_day_load.get(key, 0) + sign
+            if entry.get("is_shared_room"):
+                if sign > 0:
+                    room_at[(entry["room_id"], slot_id)] = i
+                else:
+                    room_at.pop((entry["room_id"], slot_id), None)
+            if sign > 0:
+                class_at[(entry["class_id"], slot_id)] = i
+            else:
+                class_at.pop((entry["class_id"], slot_id), None)
+
+        def can_go(i: int, slot_id: str, partner: Optional[int]) -> bool:
+            """O(1): entry i may take slot_id (partner = entry leaving that slot)."""
+            entry = entries[i]
+            if real[i]:
+                teacher_id = entry["teacher_id"]
+                shared = partner is not None and real[partner] and entries[partner]["teacher_id"] == teacher_id
+                if teacher_at.get((teacher_id, slot_id), 0) - shared > 0:
+                    return False
+                if availability and not availability.allows(teacher_id, slot_id):
+                    return False
+                day = slot_info[slot_id][0]
+                if day != entry["day_of_week"]:
+                    # A same-teacher partner leaves that day in exchange
+                    load = teacher_day_load.get((teacher_id, day), 0) + 1 - shared
+                    if load > daily_cap.get(teacher_id, 0):
+                        return False
+            if entry.get("is_shared_room"):
+                holder = room_at.get((entry["room_id"], slot_id))
+                if holder is not None and holder != partner:
+                    return False
+            return True
+
+        def evaluate_move(a: int, target: str, b: Optional[int]) -> float:
+            """Penalty delta of moving a to target (and b to a's slot)."""
+            return evaluator.move_penalty(state, move_of(a, target, b))
+
+        def apply_move(a: int, target: str, b: Optional[int]):
+            source = entries[a]["time_slot_id"]
+            evaluator.apply_move(state, move_of(a, target, b))
+            occupy(a, source, -1)
+            if b is not None:
+                occupy(b, target, -1)
+            place(a, target)
+            occupy(a, target, 1)
+            if b is not None:
+                place(b, source)
+                occupy(b, source, 1)
+            return source
+
+        # --------------------------------------------------------------
+        # Tabu search
+        # --------------------------------------------------------------
+        all_keys_penalty = (config.gap_minimization_weight * state.gaps
+                            + config.consecutive_periods_weight * state.consecutive
+                            + config.time_preferences_weight * state.preferences)
+        current = best = all_keys_penalty
+        best_positions: Optional[List[str]] = None  # None = current positions are the best
+        tabu: Dict[Tuple[int, str], int] = {}
+        movable = list(range(len(entries)))
+        iterations = 0
+        evaluated = 0
+        since_improvement = 0
+        timed_out = False
+
+        while movable and len(slot_ids) > 1 and iterations < self.max_iterations:
+            if since_improvement >= self.patience or best <= 0:
+                break
+            if deadline.expired():
+                timed_out = True
+                break
+            iterations += 1
+
+            chosen = None
+            for _ in range(self.neighbourhood_size):
+                a = rng.choice(movable)
+                target = rng.choice(slot_ids)
+                source = entries[a]["time_slot_id"]
+                if target == source:
+                    continue
+                b = class_at.get((entries[a]["class_id"], target))
+                if not can_go(a, target, b) or (b is not None and not can_go(b, source, a)):
+                    continue
+                delta = evaluate_move(a, target, b)
+                evaluated += 1
+                is_tabu = tabu.get((a, target), 0) > iterations or (
+                    b is not None and tabu.get((b, source), 0) > iterations
+                )
+                if is_tabu and current + delta >= best - 1e-9:
+                    continue
+                if chosen is None or delta < chosen[0]:
+                    chosen = (delta, a, target, b)
+
+            if chosen is None:
+                since_improvement += 1
+                continue
+
+            delta, a, target, b = chosen
+            if delta >= 0 and best_positions is None and current <= best + 1e-9:
+                # Leaving the best timetable found so far: remember it
+                best_positions = [entry["time_slot_id"] for entry in entries]
+            source = apply_move(a, target, b)
+            tabu[(a, source)] = iterations + self.tabu_tenure
+            if b is not None:
+                tabu[(b, target)] = iterations + self.tabu_tenure
+            current += delta
+
+            if current < best - 1e-9:
+                best = current
+                best_positions = None
+                since_improvement = 0
+            else:
+                since_improvement += 1
+
+        if best_positions is not None:
+            for i, slot_id in enumerate(best_positions):
+                place(i, slot_id)
+            class_at = {(entry["class_id"], entry["time_slot_id"]): i for i, entry in enumerate(entries)}
+
+        self._retarget_unfilled_slots(metadata, class_at, slot_info)
+
+        elapsed = time.perf_counter() - start
+        score_after = evaluator.evaluate(result).total_score
+        metadata["local_search"] = {
+            "method": "tabu",
+            "iterations": iterations,
+            "moves_evaluated": evaluated,
+            "moves_per_second": round(evaluated / elapsed) if elapsed > 0 else 0,
+            "penalty_before": round(all_keys_penalty, 4),
+            "penalty_after": round(best, 4),
+            "score_before": score_before,
+            "score_after": score_after,
+            "elapsed": round(elapsed, 4),
+            "timed_out": timed_out,
+            "cancelled": deadline.cancelled
+        }
+
+        if self.debug:
+            print(f"  [TABU] {iterations} iterations, {evaluated} moves evaluated in {elapsed:.2f}s, "
+                  f"penalty {all_keys_penalty:.1f} -> {best:.1f}")
+
+        return result
+
+    def _retarget_unfilled_slots(self, metadata, class_at, slot_info):
+        """Point unfilled_slots records at the slots that are free after the moves."""
+        unfilled = metadata.get("unfilled_slots")
+        if not unfilled:
+            return
+        by_class: Dict[str, List[Dict]] = {}
+        for gap in unfilled:
+            by_class.setdefault(gap["class_id"], []).append(gap)
+        for class_id, gaps in by_class.items():
+            recorded = {gap["time_slot_id"] for gap in gaps}
+            free = {s for s in slot_info if (class_id, s) not in class_at}
+            newly_free = sorted(free - recorded)
+            for gap in gaps:
+                if gap["time_slot_id"] in free or not newly_free:
+                    continue
+                slot_id = newly_free.pop(0)
+                day, period = slot_info[slot_id]
+                gap["time_slot_id"] = slot_id
+                gap["day"] = getattr(day, "value", day)
+                gap["period"] = period
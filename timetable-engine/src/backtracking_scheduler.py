@@ -0,0 +1,524 @@
+"""
+Backtracking Scheduler - complete search mode for the v3.0.1 CSP solver
+
+PURPOSE:
+The greedy pass in _generate_complete_solution fills slots in input order and
+never revisits a choice; unfillable slots become SELF_STUDY and large schools
+need several blind restarts. This module is a real search:
+
+- VARIABLES: one per (class, subject) with a remaining period count. All
+  periods of a (class, subject) are interchangeable, so one variable covers
+  them all (teacher fixed by the greedy pre-assignment).
+- DOMAINS: bitmask of active-slot indices where the period may still go.
+- ORDERING: minimum remaining values (domain size minus periods still
+  needed) divided by a conflict weight, ties broken by degree (how many other
+  variables share the class, teacher or shared room pool). A variable's
+  weight grows every time forward checking wipes it out (dom/wdeg).
+- FORWARD CHECKING: after each placement, prune the slot from every variable
+  of the same class and the same teacher, prune the whole day / week when the
+  teacher hits a cap, and prune the slot for shared-room variables whose
+  candidate rooms are now all booked. A variable whose domain is smaller than
+  its remaining count is a wipeout.
+- BRANCHING: binary (v = s | v != s). Refuting a failed slot removes it from
+  the variable's domain for the remaining siblings, which also breaks the
+  symmetry between interchangeable periods.
+- RESTARTS: when a run exceeds its backtrack cutoff (growing geometrically)
+  the search restarts from the root with the learned weights, so the
+  variables that caused deep failures are placed first next time.
+- BUDGET: node limit and time limit over all runs. On exhaustion the deepest
+  partial assignment found is returned.
+
+Demand that is provably unplaceable (teacher weekly cap, daily caps, class
+slots, shared room pool size) is trimmed before search, so the search never
+thrashes on a pigeonhole conflict.
+
+FIXED PLACEMENTS (v1.1.0): periods that must stay where they are (incremental
+re-solve) are passed as `fixed`. They occupy their class, teacher and shared
+room up front and count towards teacher loads, so only the freed demand is
+searched.
+
+TEACHER AVAILABILITY (v1.2.0): slots a teacher cannot teach (teacher_slots)
+are busy for that teacher from the start, so they never enter a domain and
+the pigeonhole trim counts only the slots the teacher can actually use.
+
+CANCELLATION (v1.3.0): a CancellationToken (solve_control.py) is checked
+every 256 nodes; a cancelled search stops like an exhausted budget and
+returns the deepest partial assignment so far.
+
+VERSION: 1.3.0
+"""
+
+from typing import List, Dict, Tuple, Optional, Callable
+from dataclasses import dataclass, field
+import random
+import time
+
+
+@dataclass
+class SearchResult:
+    """Outcome of one backtracking search."""
+    placements: List[Tuple[str, str, str, int, Optional[str]]]  # class, subject, teacher, slot index, room
+    complete: bool                 # every placeable period was placed
+    nodes: int
+    backtracks: int
+    restarts: int
+    elapsed: float
+    budget_exhausted: bool
+    unplaceable: Dict[Tuple[str, str], int] = field(default_factory=dict)  # (class, subject) -> periods
+
+
+class _Frame:
+    """One decision level of the iterative search."""
+    __slots__ = ("var", "values", "pos", "base_mark", "assign_mark", "slot")
+
+    def __init__(self, var: int, values: List[int], base_mark: int):
+        self.var = var
+        self.values = values
+        self.pos = 0
+        self.base_mark = base_mark
+        self.assign_mark = base_mark
+        self.slot = -1
+
+
+class BacktrackingScheduler:
+    """
+    MRV + forward checking backtracking search over (class, subject) variables.
+    """
+
+    def __init__(self, node_limit: int = 200000, time_limit: float = 10.0,
+                 restart_cutoff: int = 100, restart_growth: float = 1.5, debug: bool = False):
+        self.node_limit = node_limit
+        self.time_limit = time_limit
+        self.restart_cutoff = restart_cutoff
+        self.restart_growth = restart_growth
+        self.debug = debug
+
+    def search(
+        self,
+        classes: List,
+        active_slots: List,
+        shared_rooms: List,
+        class_subject_distributions: Dict[str, Dict[str, int]],
+        teacher_for: Dict[Tuple[str, str], str],
+        teacher_lookup: Dict,
+        subject_lookup: Dict,
+        room_candidates: Callable,
+        slot_domains: Optional[Dict[Tuple[str, str], int]] = None,
+        rng: Optional[random.Random] = None,
+        fixed: Optional[List[Tuple[str, Optional[str], int, Optional[str]]]] = None,
+        teacher_slots: Optional[Dict[str, int]] = None,
+        cancel_token=None
+    ) -> SearchResult:
+        """
+        Place every (class, subject) period into a slot.
+
+        Args:
+            classes: Classes to schedule
+            active_slots: Non-break time slots (bit i = active_slots[i])
+            shared_rooms: Shared amenities (bit k = shared_rooms[k])
+            class_subject_distributions: class_id -> {subject_id: periods}
+            teacher_for: (class_id, subject_id) -> teacher_id
+            teacher_lookup: teacher_id -> Teacher
+            subject_lookup: subject_id -> Subject
+            room_candidates: f(class_obj, subject) -> None if the subject uses the
+                home classroom, else list of shared-room indices that fit
+            slot_domains: Optional pre-reduced slot masks per (class, subject)
+            rng: Random source for tie-breaking
+            fixed: Placements kept as they are, as (class_id, teacher_id or
+                None, slot index, shared room id or None). Not part of the result
+            teacher_slots: Available-slot masks of restricted teachers
+                (TeacherAvailability.masks); other teachers can use every slot
+            cancel_token: Optional CancellationToken; stops the search like
+                an exhausted budget
+
+        Returns:
+            SearchResult with the placements of the best assignment found
+        """
+        rng = rng or random.Random()
+        start = time.perf_counter()
+        n_slots = len(active_slots)
+        all_slots = (1 << n_slots) - 1
+
+        day_mask: Dict = {}
+        slot_day = []
+        for i, slot in enumerate(active_slots):
+            day_mask[slot.day_of_week] = day_mask.get(slot.day_of_week, 0) | (1 << i)
+            slot_day.append(slot.day_of_week)
+
+        # ------------------------------------------------------------------
+        # Fixed placements occupy resources before the search starts
+        # ------------------------------------------------------------------
+        teacher_day_load: Dict[Tuple[str, object], int] = {}
+        teacher_week_load: Dict[str, int] = {}
+        room_busy = [0] * n_slots
+        class_busy: Dict[str, int] = {}
+        teacher_busy: Dict[str, int] = {}
+        room_index = {r.id: k for k, r in enumerate(shared_rooms)}
+        for teacher_id, open_slots in (teacher_slots or {}).items():
+            teacher_busy[teacher_id] = all_slots & ~open_slots
+        for class_id, teacher_id, s, room_id in fixed or []:
+            class_busy[class_id] = class_busy.get(class_id, 0) | (1 << s)
+            if teacher_id is not None:
+                teacher_busy[teacher_id] = teacher_busy.get(teacher_id, 0) | (1 << s)
+                key = (teacher_id, slot_day[s])
+                teacher_day_load[key] = teacher_day_load.get(key, 0) + 1
+                teacher_week_load[teacher_id] = teacher_week_load.get(teacher_id, 0) + 1
+            if room_id in room_index:
+                room_busy[s] |= 1 << room_index[room_id]
+
+        # ------------------------------------------------------------------
+        # Build variables
+        # ------------------------------------------------------------------
+        var_class, var_subject, var_teacher, var_rooms = [], [], [], []
+        remaining, domain = [], []
+        unplaceable: Dict[Tuple[str, str], int] = {}
+
+        for class_obj in classes:
+            distribution = class_subject_distributions.get(class_obj.id, {})
+            for subject_id, count in distribution.items():
+                subject = subject_lookup.get(subject_id)
+                key = (class_obj.id, subject_id)
+                if not subject or count <= 0:
+                    continue
+                teacher_id = teacher_for.get(key)
+                rooms = room_candidates(class_obj, subject)
+                if teacher_id not in teacher_lookup or rooms == []:
+                    unplaceable[key] = count
+                    continue
+                var_class.append(class_obj.id)
+                var_subject.append(subject_id)
+                var_teacher.append(teacher_id)
+                room_mask = None
+                if rooms is not None:
+                    room_mask = 0
+                    for k in rooms:
+                        room_mask |= 1 << k
+                var_rooms.append(room_mask)
+                remaining.append(count)
+                dom = all_slots & ~class_busy.get(class_obj.id, 0) & ~teacher_busy.get(teacher_id, 0)
+                if slot_domains and key in slot_domains:
+                    dom &= slot_domains[key]
+                if fixed:
+                    dom &= self._free_capacity_mask(
+                        teacher_lookup[teacher_id], teacher_day_load, teacher_week_load,
+                        day_mask, room_mask, room_busy, all_slots
+                    )
+                domain.append(dom)
+
+        n_vars = len(remaining)
+        self._trim_pigeonholes(
+            var_class, var_teacher, var_rooms, remaining, domain,
+            teacher_lookup, day_mask, n_slots, unplaceable, var_subject,
+            class_busy, teacher_busy, teacher_day_load, teacher_week_load, room_busy,
+            teacher_slots
+        )
+
+        # Peer lists for forward checking
+        class_vars: Dict[str, List[int]] = {}
+        teacher_vars: Dict[str, List[int]] = {}
+        for v in range(n_vars):
+            class_vars.setdefault(var_class[v], []).append(v)
+            teacher_vars.setdefault(var_teacher[v], []).append(v)
+        room_peers: List[List[int]] = [[] for _ in range(n_vars)]
+        room_vars = [v for v in range(n_vars) if var_rooms[v]]
+        for v in room_vars:
+            room_peers[v] = [u for u in room_vars if var_rooms[u] & var_rooms[v]]
+
+        degree = [
+            len(class_vars[var_class[v]]) + len(teacher_vars[var_teacher[v]]) + len(room_peers[v])
+            for v in range(n_vars)
+        ]
+        tie_break = [rng.random() for _ in range(n_vars)]
+        weight = [1] * n_vars
+
+        # Value ordering: morning-preferring subjects try early periods first
+        slot_order = list(range(n_slots))
+        rng.shuffle(slot_order)
+        morning_order = sorted(range(n_slots), key=lambda i: (active_slots[i].period_number, i))
+        var_prefers_morning = [
+            bool(getattr(subject_lookup[var_subject[v]], "prefer_morning", False))
+            for v in range(n_vars)
+        ]
+
+        # ------------------------------------------------------------------
+        # Mutable search state (restored through the trail; fixed loads stay)
+        # ------------------------------------------------------------------
+        placements: List[Tuple[int, int, Optional[int]]] = []
+        active = set(v for v in range(n_vars) if remaining[v] > 0)
+        trail: List[tuple] = []
+
+        def set_domain(u: int, new: int) -> bool:
+            old = domain[u]
+            if new != old:
+                trail.append(("dom", u, old))
+                domain[u] = new
+            if new.bit_count() >= remaining[u]:
+                return True
+            weight[u] += 1
+            return False
+
+        def undo(mark: int):
+            while len(trail) > mark:
+                record = trail.pop()
+                if record[0] == "dom":
+                    domain[record[1]] = record[2]
+                else:
+                    _, v, s, k = record
+                    t = var_teacher[v]
+                    teacher_day_load[(t, slot_day[s])] -= 1
+                    teacher_week_load[t] -= 1
+                    if k is not None:
+                        room_busy[s] &= ~(1 << k)
+                    if remaining[v] == 0:
+                        active.add(v)
+                    remaining[v] += 1
+                    placements.pop()
+
+        def assign(v: int, s: int) -> bool:
+            k = None
+            if var_rooms[v] is not None:
+                free = var_rooms[v] & ~room_busy[s]
+                if not free:
+                    return False
+                k = (free & -free).bit_length() - 1
+
+            t = var_teacher[v]
+            teacher = teacher_lookup[t]
+            day = slot_day[s]
+            trail.append(("assign", v, s, k))
+            teacher_day_load[(t, day)] = teacher_day_load.get((t, day), 0) + 1
+            teacher_week_load[t] = teacher_week_load.get(t, 0) + 1
+            if k is not None:
+                room_busy[s] |= 1 << k
+            remaining[v] -= 1
+            if remaining[v] == 0:
+                active.discard(v)
+            placements.append((v, s, k))
+
+            bit = 1 << s
+            # Same class and same teacher can no longer use this slot
+            for u in class_vars[var_class[v]]:
+                if domain[u] & bit and not set_domain(u, domain[u] & ~bit):
+                    return False
+            for u in teacher_vars[t]:
+                if domain[u] & bit and not set_domain(u, domain[u] & ~bit):
+                    return False
+            # Teacher caps
+            if teacher_day_load[(t, day)] >= teacher.max_periods_per_day:
+                for u in teacher_vars[t]:
+                    if domain[u] & day_mask[day] and not set_domain(u, domain[u] & ~day_mask[day]):
+                        return False
+            if teacher_week_load[t] >= teacher.max_periods_per_week:
+                for u in teacher_vars[t]:
+                    if not set_domain(u, 0):
+                        return False
+            # Shared room pool exhausted for some variables at this slot
+            if k is not None:
+                busy = room_busy[s]
+                for u in room_peers[v]:
+                    if domain[u] & bit and not (var_rooms[u] & ~busy):
+                        if not set_domain(u, domain[u] & ~bit):
+                            return False
+            # Class still has enough distinct slots for everything it needs
+            union, need = 0, 0
+            for u in class_vars[var_class[v]]:
+                if remaining[u]:
+                    union |= domain[u]
+                    need += remaining[u]
+            if union.bit_count() >= need:
+                return True
+            for u in class_vars[var_class[v]]:
+                if remaining[u]:
+                    weight[u] += 1
+            return False
+
+        def select_var() -> Optional[int]:
+            best, best_key = None, None
+            for v in active:
+                key = ((domain[v].bit_count() - remaining[v]) / weight[v], -degree[v], tie_break[v])
+                if best_key is None or key < best_key:
+                    best, best_key = v, key
+            return best
+
+        def ordered_values(v: int) -> List[int]:
+            order = morning_order if var_prefers_morning[v] else slot_order
+            dom = domain[v]
+            return [i for i in order if dom >> i & 1]
+
+        def advance(frame: _Frame) -> bool:
+            v = frame.var
+            while frame.pos < len(frame.values):
+                s = frame.values[frame.pos]
+                frame.pos += 1
+                if not domain[v] >> s & 1:
+                    continue
+                frame.assign_mark = len(trail)
+                frame.slot = s
+                if assign(v, s):
+                    return True
+                undo(frame.assign_mark)
+                # Refute: no period of v goes into s in this subtree
+                if not set_domain(v, domain[v] & ~(1 << s)):
+                    return False
+            return False
+
+        # ------------------------------------------------------------------
+        # Iterative search
+        # ------------------------------------------------------------------
+        nodes = 0
+        backtracks = 0
+        restarts = 0
+        cutoff = float(self.restart_cutoff)
+        run_backtracks = 0
+        best: List[Tuple[int, int, Optional[int]]] = []
+        stack: List[_Frame] = []
+        complete = False
+        exhausted = False
+
+        while True:
+            if nodes >= self.node_limit or time.perf_counter() - start > self.time_limit:
+                exhausted = True
+                break
+            if cancel_token is not None and not nodes & 255 and cancel_token.cancelled:
+                exhausted = True
+                break
+
+            if run_backtracks > cutoff:
+                # Restart from the root; weights keep what this run learned
+                undo(0)
+                stack.clear()
+                restarts += 1
+                run_backtracks = 0
+                cutoff *= self.restart_growth
+
+            v = select_var()
+            if v is None:
+                complete = True
+                best = list(placements)
+                break
+
+            nodes += 1
+            frame = _Frame(v, ordered_values(v), len(trail))
+            stack.append(frame)
+            ok = advance(frame)
+
+            while not ok:
+                backtracks += 1
+                run_backtracks += 1
+                undo(frame.base_mark)
+                stack.pop()
+                if not stack:
+                    break
+                frame = stack[-1]
+                undo(frame.assign_mark)
+                if not set_domain(frame.var, domain[frame.var] & ~(1 << frame.slot)):
+                    ok = False
+                    continue
+                ok = advance(frame)
+
+            if not stack and not ok:
+                # Search space exhausted without a full assignment (weights
+                # only reorder variables, so a finished run is a proof)
+                break
+
+            if len(placements) > len(best):
+                best = list(placements)
+
+        elapsed = time.perf_counter() - start
+
+        result_placements = [
+            (var_class[v], var_subject[v], var_teacher[v], s,
+             shared_rooms[k].id if k is not None else None)
+            for v, s, k in best
+        ]
+
+        if self.debug:
+            status = "COMPLETE" if complete else ("BUDGET EXHAUSTED" if exhausted else "INFEASIBLE")
+            print(f"  [BACKTRACK] {status}: {len(best)} periods placed, "
+                  f"{nodes} nodes, {backtracks} backtracks, {restarts} restarts, {elapsed:.2f}s")
+
+        return SearchResult(
+            placements=result_placements,
+            complete=complete,
+            nodes=nodes,
+            backtracks=backtracks,
+            restarts=restarts,
+            elapsed=elapsed,
+            budget_exhausted=exhausted,
+            unplaceable=unplaceable
+        )
+
+    def _free_capacity_mask(self, teacher, teacher_day_load, teacher_week_load,
+                            day_mask, room_mask, room_busy, all_slots):
+        """Slots still open after fixed placements: teacher caps and room pool."""
+        if teacher_week_load.get(teacher.id, 0) >= teacher.max_periods_per_week:
+            return 0
+        mask = all_slots
+        for day, bits in day_mask.items():
+            if teacher_day_load.get((teacher.id, day), 0) >= teacher.max_periods_per_day:
+                mask &= ~bits
+        if room_mask:
+            for s, busy in enumerate(room_busy):
+                if not room_mask & ~busy:
+                    mask &= ~(1 << s)
+        return mask
+
+    def _trim_pigeonholes(self, var_class, var_teacher, var_rooms, remaining, domain,
+                          teacher_lookup, day_mask, n_slots, unplaceable, var_subject,
+                          class_busy=None, teacher_busy=None, teacher_day_load=None,
+                          teacher_week_load=None, room_busy=None, teacher_slots=None):
+        """
+        Reduce demand that can never fit, so search does not thrash on it.
+
+        Checks variable domain size, class slots, teacher weekly cap, teacher
+        daily cap x days and shared room pool size (rooms x slots), net of
+        what fixed placements already use. Trimmed periods are recorded in
+        `unplaceable`.
+        """
+        class_busy = class_busy or {}
+        teacher_busy = teacher_busy or {}
+        teacher_day_load = teacher_day_load or {}
+        teacher_week_load = teacher_week_load or {}
+        room_busy = room_busy or [0] * n_slots
+        teacher_slots = teacher_slots or {}
+
+        def trim(indices, capacity):
+            excess = sum(remaining[v] for v in indices) - capacity
+            while excess > 0:
+                v = max(indices, key=lambda u: remaining[u])
+                if remaining[v] == 0:
+                    break
+                remaining[v] -= 1
+                key = (var_class[v], var_subject[v])
+                unplaceable[key] = unplaceable.get(key, 0) + 1
+                excess -= 1
+
+        for v in range(len(remaining)):
+            if domain[v].bit_count() < remaining[v]:
+                trim([v], domain[v].bit_count())
+
+        by_class: Dict[str, List[int]] = {}
+        by_teacher: Dict[str, List[int]] = {}
+        for v in range(len(remaining)):
+            by_class.setdefault(var_class[v], []).append(v)
+            by_teacher.setdefault(var_teacher[v], []).append(v)
+
+        for class_id, indices in by_class.items():
+            trim(indices, n_slots - class_busy.get(class_id, 0).bit_count())
+        for teacher_id, indices in by_teacher.items():
+            teacher = teacher_lookup[teacher_id]
+            daily_capacity = sum(
+                max(0, min(teacher.max_periods_per_day, (bits & teacher_slots.get(teacher_id, bits)).bit_count())
+                    - teacher_day_load.get((teacher_id, day), 0))
+                for day, bits in day_mask.items()
+            )
+            trim(indices, max(0, min(
+                teacher.max_periods_per_week - teacher_week_load.get(teacher_id, 0),
+                daily_capacity,
+                n_slots - teacher_busy.get(teacher_id, 0).bit_count()
+            )))
+
+        # Every variable restricted to a room pool competes for pool x slots
+        for pool in set(m for m in var_rooms if m):
+            indices = [v for v in range(len(remaining)) if var_rooms[v] and not var_rooms[v] & ~pool]
+            trim(indices, pool.bit_count() * n_slots - sum((busy & pool).bit_count() for busy in room_busy))
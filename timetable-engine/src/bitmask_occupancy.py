@@ -0,0 +1,311 @@
+"""
+Bitmask Occupancy - slot-domain engine for the v3.0.1 CSP solver
+
+PURPOSE:
+Stores free slots per teacher, per shared room and per class as Python int
+bitmasks over the active-slot index (and, transposed, free teachers and free
+rooms per slot as bitmasks over the teacher/room index). Candidate search
+becomes a handful of AND operations instead of dict-membership probes:
+
+    "which qualified teachers are free at this slot"
+        qualified_mask & slot_free_teachers[slot] & ~week_full & ~day_full[day]
+
+    "which slots have both teacher X and a lab free"
+        teacher_free_slots[X] & room_type_free_slots[LAB]
+
+Teacher bits follow input list order and room bits follow capacity order
+(ties in input order), so the lowest set bit is always the candidate the dict
+engine would have picked - the first free teacher and the best-fit room.
+Both engines produce identical timetables for the same random state.
+
+Teacher availability is folded into the initial free-slot rows, so a slot a
+teacher cannot teach is never free to begin with.
+
+USAGE:
+    layout = BitmaskLayout(teachers, shared_rooms, active_slots,   # once per solve
+                           availability)                           # optional
+    occupancy = layout.new_state()                                 # per attempt
+
+VERSION: 1.2.0
+"""
+
+from typing import Dict, List, Optional, Hashable, Tuple, Any
+from collections import defaultdict
+
+
+def iter_bits(mask: int):
+    """Yield indices of set bits, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class BitmaskLayout:
+    """
+    Immutable index layout shared by every attempt of one solve.
+
+    Maps slots, teachers and shared rooms to bit positions and caches
+    candidate-group masks (qualified teachers per subject, rooms per type).
+    """
+
+    def __init__(self, teachers: List, shared_rooms: List, active_slots: List,
+                 availability=None):
+        self.teachers = list(teachers)
+        # Smallest room first, so the lowest free bit is the best fit
+        self.rooms = sorted(shared_rooms, key=lambda room: room.capacity)
+        self.slots = list(active_slots)
+
+        self.slot_index = {s.id: i for i, s in enumerate(self.slots)}
+        self.teacher_index = {t.id: j for j, t in enumerate(self.teachers)}
+        self.room_index = {r.id: k for k, r in enumerate(self.rooms)}
+
+        self.all_slots = (1 << len(self.slots)) - 1
+        self.all_teachers = (1 << len(self.teachers)) - 1
+        self.all_rooms = (1 << len(self.rooms)) - 1
+
+        self.slot_day = [s.day_of_week for s in self.slots]
+        self.day_slots: Dict[Any, int] = defaultdict(int)
+        for i, day in enumerate(self.slot_day):
+            self.day_slots[day] |= 1 << i
+
+        self.room_type_mask: Dict[Any, int] = defaultdict(int)
+        for k, room in enumerate(self.rooms):
+            self.room_type_mask[room.type] |= 1 << k
+
+        # Initial free slots per teacher and free teachers per slot
+        # (TeacherAvailability masks; everyone everywhere without one)
+        self.teacher_open_slots = [
+            availability.slots(t.id) if availability else self.all_slots for t in self.teachers
+        ]
+        self.slot_open_teachers = [self.all_teachers] * len(self.slots)
+        for j, open_slots in enumerate(self.teacher_open_slots):
+            for i in iter_bits(self.all_slots & ~open_slots):
+                self.slot_open_teachers[i] &= ~(1 << j)
+
+        self._group_masks: Dict[Tuple[str, Hashable], int] = {}
+        self._capacity_masks: Dict[int, int] = {}
+
+    def new_state(self) -> "BitmaskOccupancy":
+        """Create empty occupancy state for one attempt."""
+        return BitmaskOccupancy(self)
+
+    def slot_mask(self, slot_ids) -> int:
+        """Bitmask of the given slot ids (unknown ids are ignored)."""
+        mask = 0
+        for slot_id in slot_ids:
+            i = self.slot_index.get(slot_id)
+            if i is not None:
+                mask |= 1 << i
+        return mask
+
+    def teacher_mask(self, candidates: List, group: Hashable = None) -> int:
+        """Bitmask of a teacher list, cached by group key when given."""
+        key = ("teacher", group)
+        if group is not None and key in self._group_masks:
+            return self._group_masks[key]
+        mask = 0
+        for teacher in candidates:
+            j = self.teacher_index.get(teacher.id)
+            if j is not None:
+                mask |= 1 << j
+        if group is not None:
+            self._group_masks[key] = mask
+        return mask
+
+    def room_mask(self, rooms: List, group: Hashable = None) -> int:
+        """Bitmask of a room list, cached by group key when given."""
+        key = ("room", group)
+        if group is not None and key in self._group_masks:
+            return self._group_masks[key]
+        mask = 0
+        for room in rooms:
+            k = self.room_index.get(room.id)
+            if k is not None:
+                mask |= 1 << k
+        if group is not None:
+            self._group_masks[key] = mask
+        return mask
+
+    def capacity_mask(self, min_capacity: int) -> int:
+        """Bitmask of rooms with capacity >= min_capacity."""
+        mask = self._capacity_masks.get(min_capacity)
+        if mask is None:
+            mask = 0
+            for k, room in enumerate(self.rooms):
+                if room.capacity >= min_capacity:
+                    mask |= 1 << k
+            self._capacity_masks[min_capacity] = mask
+        return mask
+
+
+class BitmaskOccupancy:
+    """
+    Bitmask-backed occupancy state. Drop-in replacement for OccupancyIndex.
+    """
+
+    engine = "bitmask"
+
+    def __init__(self, layout: BitmaskLayout):
+        self.layout = layout
+        n_slots = len(layout.slots)
+
+        # Per-resource free slots (rows over the slot index)
+        self.teacher_free_slots = list(layout.teacher_open_slots)
+        self.room_free_slots = [layout.all_slots] * len(layout.rooms)
+        self.class_free_slots: Dict[str, int] = defaultdict(lambda: layout.all_slots)
+
+        # Per-slot free resources (columns)
+        self.slot_free_teachers = list(layout.slot_open_teachers)
+        self.slot_free_rooms = [layout.all_rooms] * n_slots
+
+        # Load accounting
+        self.week_load = [0] * len(layout.teachers)
+        self.day_load: Dict[Tuple[int, Any], int] = defaultdict(int)
+        self.week_full = 0
+        self.day_full: Dict[Any, int] = defaultdict(int)
+
+        # Teachers outside the layout (should not happen, kept for safety)
+        self._extra_busy = set()
+
+        # Teachers with zero caps are full from the start
+        for j, teacher in enumerate(layout.teachers):
+            if teacher.max_periods_per_week <= 0:
+                self.week_full |= 1 << j
+            if teacher.max_periods_per_day <= 0:
+                for day in layout.day_slots:
+                    self.day_full[day] |= 1 << j
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        teacher_id, slot_id = key
+        return not self.is_teacher_free(teacher_id, slot_id)
+
+    # ------------------------------------------------------------------
+    # Teachers
+    # ------------------------------------------------------------------
+
+    def is_teacher_free(self, teacher_id: str, slot_id: str) -> bool:
+        j = self.layout.teacher_index.get(teacher_id)
+        i = self.layout.slot_index.get(slot_id)
+        if j is None or i is None:
+            return (teacher_id, slot_id) not in self._extra_busy
+        return bool(self.teacher_free_slots[j] >> i & 1)
+
+    def within_limits(self, teacher, day) -> bool:
+        j = self.layout.teacher_index.get(teacher.id)
+        if j is None:
+            return True
+        bit = 1 << j
+        return not (self.week_full & bit or self.day_full[day] & bit)
+
+    def can_assign(self, teacher, slot) -> bool:
+        # Hot path: resolve both indexes once instead of via the helpers
+        j = self.layout.teacher_index.get(teacher.id)
+        i = self.layout.slot_index.get(slot.id)
+        if j is None or i is None:
+            return (teacher.id, slot.id) not in self._extra_busy
+        if not self.teacher_free_slots[j] >> i & 1:
+            return False
+        bit = 1 << j
+        return not (self.week_full & bit or self.day_full[slot.day_of_week] & bit)
+
+    def available_teacher_mask(self, slot, candidates_mask: int) -> int:
+        """Candidates free at this slot and within daily/weekly caps."""
+        i = self.layout.slot_index[slot.id]
+        return (candidates_mask & self.slot_free_teachers[i]
+                & ~self.week_full & ~self.day_full[slot.day_of_week])
+
+    def first_available_teacher(self, candidates: List, slot, group: Hashable = None):
+        if slot.id not in self.layout.slot_index:
+            return None
+        mask = self.available_teacher_mask(slot, self.layout.teacher_mask(candidates, group))
+        if not mask:
+            return None
+        return self.layout.teachers[(mask & -mask).bit_length() - 1]
+
+    def teacher_slots(self, teacher_id: str) -> int:
+        """Slots where the teacher is still free (ignores load caps)."""
+        j = self.layout.teacher_index.get(teacher_id)
+        return self.teacher_free_slots[j] if j is not None else 0
+
+    # ------------------------------------------------------------------
+    # Shared rooms
+    # ------------------------------------------------------------------
+
+    def is_room_free(self, room_id: str, slot_id: str) -> bool:
+        k = self.layout.room_index.get(room_id)
+        i = self.layout.slot_index.get(slot_id)
+        if k is None or i is None:
+            return True
+        return bool(self.room_free_slots[k] >> i & 1)
+
+    def first_free_room(self, rooms: List, slot, min_capacity: int = 0,
+                        group: Hashable = None):
+        """Best-fit free room: rooms are bit-ordered by capacity, so the lowest bit fits tightest."""
+        i = self.layout.slot_index.get(slot.id)
+        if i is None:
+            return None
+        mask = (self.layout.room_mask(rooms, group) & self.layout.capacity_mask(min_capacity)
+                & self.slot_free_rooms[i])
+        if not mask:
+            return None
+        return self.layout.rooms[(mask & -mask).bit_length() - 1]
+
+    def room_type_free_slots(self, room_type, min_capacity: int = 0) -> int:
+        """Slots where at least one room of this type (and size) is free."""
+        mask = 0
+        rooms = self.layout.room_type_mask.get(room_type, 0) & self.layout.capacity_mask(min_capacity)
+        for k in iter_bits(rooms):
+            mask |= self.room_free_slots[k]
+        return mask
+
+    def common_free_slots(self, teacher_id: str, room_type=None, class_id: Optional[str] = None,
+                          min_capacity: int = 0) -> int:
+        """
+        Slots where the teacher, the class and a room of the given type are all free.
+
+        Example: common_free_slots("T1", RoomType.LAB) answers
+        "which slots have both teacher T1 and a lab free".
+        """
+        mask = self.teacher_slots(teacher_id)
+        if room_type is not None:
+            mask &= self.room_type_free_slots(room_type, min_capacity)
+        if class_id is not None:
+            mask &= self.class_free_slots[class_id]
+        return mask
+
+    # ------------------------------------------------------------------
+    # Commit
+    # ------------------------------------------------------------------
+
+    def commit(self, teacher_id: str, slot, room_id: Optional[str] = None,
+               class_id: Optional[str] = None) -> None:
+        layout = self.layout
+        i = layout.slot_index.get(slot.id)
+        j = layout.teacher_index.get(teacher_id)
+        day = slot.day_of_week
+
+        if i is None or j is None:
+            self._extra_busy.add((teacher_id, slot.id))
+        else:
+            slot_bit = 1 << i
+            teacher_bit = 1 << j
+            self.teacher_free_slots[j] &= ~slot_bit
+            self.slot_free_teachers[i] &= ~teacher_bit
+
+            self.week_load[j] += 1
+            self.day_load[(j, day)] += 1
+            teacher = layout.teachers[j]
+            if self.week_load[j] >= teacher.max_periods_per_week:
+                self.week_full |= teacher_bit
+            if self.day_load[(j, day)] >= teacher.max_periods_per_day:
+                self.day_full[day] |= teacher_bit
+
+        if i is not None:
+            if room_id is not None:
+                k = layout.room_index.get(room_id)
+                if k is not None:
+                    self.room_free_slots[k] &= ~(1 << i)
+                    self.slot_free_rooms[i] &= ~(1 << k)
+            if class_id is not None:
+                self.class_free_slots[class_id] &= ~(1 << i)
@@ -0,0 +1,460 @@
+"""
+CP-SAT Solver v3.0.1 - OR-Tools constraint programming backend
+
+PURPOSE:
+Drop-in alternative to CSPSolverCompleteV301 (same solve() arguments and
+return tuple) that hands the whole week to OR-Tools CP-SAT instead of filling
+slots greedily. CP-SAT runs a portfolio of search workers on all cores and
+proves (or approaches) the optimum within the request timeout.
+
+MODEL:
+- x[class, subject, slot] in {0, 1}, one teacher per (class, subject) taken
+  from the teacher pre-assignment (balanced min-cost flow by default, as in
+  CSPSolverCompleteV301)
+- Demand is soft: sum_slot x + shortage == periods, shortage minimized first,
+  so overfull schools still get the best partial schedule instead of INFEASIBLE
+- Class: at most one period per slot
+- Teacher: at most one period per slot, daily and weekly caps, nothing
+  outside Teacher.availability
+- Shared rooms: for every candidate room pool (room type x capacity), the
+  periods that can only use that pool fit in it at every slot; concrete rooms
+  are matched per slot after solving (pools are nested by capacity, so the
+  smallest-pool-first matching always succeeds)
+- Objective (secondary): morning-preferring subjects placed after
+  morning_period_cutoff
+- Warm start: the backtracking search (search_mode="backtracking") finds a
+  full placement in a fraction of the timeout; it is passed to CP-SAT as a
+  solution hint, so the first incumbent is already good and CP-SAT spends
+  its time improving and proving. If CP-SAT finds no incumbent in time
+  (UNKNOWN), the warm start placement itself is returned
+- Diversity: every later solution differs from each earlier one in at
+  least 5% of its placements
+- Cancellation: a CancellationToken stops the warm start search, and a
+  watcher thread calls StopSearch() on the running CP-SAT solve, so the
+  best incumbent so far is returned at once
+
+VERSION: 1.1.0
+"""
+
+from typing import List, Dict, Tuple, Optional
+import os
+import random
+import threading
+import time
+
+from ortools.sat.python import cp_model
+
+from src.models_phase1_v30 import (
+    Class, Subject, Teacher, TimeSlot, Room, Constraint, Timetable, V30Validator
+)
+from src.csp_solver_complete_v301 import CSPSolverCompleteV301
+from src.backtracking_scheduler import BacktrackingScheduler
+from src.solve_control import CancellationToken
+from src.teacher_availability import TeacherAvailability
+
+
+class CPSATSolverV301(CSPSolverCompleteV301):
+    """
+    CP-SAT timetable engine with the CSPSolverCompleteV301 solve() contract.
+
+    Reuses the v3.0.1 helpers (validation, subject distributions, greedy
+    teacher pre-assignment, shared room rules); only the slot assignment is
+    delegated to CP-SAT.
+    """
+
+    SHORTAGE_WEIGHT = 1000  # One missing period outweighs any preference penalty
+    HINT_TIME_SHARE = 0.25  # Part of the timeout the backtracking warm start may use
+
+    def __init__(self, debug: bool = False, num_workers: Optional[int] = None):
+        super().__init__(debug=debug)
+        self.num_workers = num_workers or os.cpu_count() or 1
+
+    def solve(
+        self,
+        classes: List[Class],
+        subjects: List[Subject],
+        teachers: List[Teacher],
+        time_slots: List[TimeSlot],
+        rooms: List[Room],
+        constraints: List[Constraint],
+        num_solutions: int = 3,
+        subject_requirements: Optional[List[Dict]] = None,
+        enforce_teacher_consistency: bool = True,
+        max_violations: int = 0,
+        allow_partial_solutions: bool = True,
+        min_coverage: float = 0.70,
+        timeout: float = 60.0,
+        morning_period_cutoff: int = 4,
+        seed: Optional[int] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        teacher_assignment: str = "flow"
+    ) -> Tuple[List[Timetable], float, Optional[List[str]], Optional[List[str]]]:
+        """
+        Generate timetables with CP-SAT.
+
+        Args:
+            classes .. max_violations: Same as CSPSolverCompleteV301.solve
+                (teacher consistency is always enforced - the model fixes one
+                teacher per (class, subject))
+            allow_partial_solutions: If True, unfilled slots are reported as gaps,
+                otherwise they become SELF_STUDY
+            min_coverage: Minimum coverage for partial solutions (0.0-1.0)
+            timeout: Wall-clock limit in seconds for all solutions together
+                (GenerateRequest.timeout)
+            morning_period_cutoff: Last "morning" period for prefer_morning subjects
+            seed: Seed for the warm start and CP-SAT (drawn if None), returned in
+                metadata["seed"]. Runs are exactly reproducible with one worker;
+                with several, CP-SAT's portfolio may still vary under a time limit
+            cancel_token: Optional CancellationToken; stops the warm start and
+                the running CP-SAT search (no further solutions are started)
+            teacher_assignment: Teacher pre-assignment, as in
+                CSPSolverCompleteV301.solve ("flow" by default, or "greedy")
+
+        Returns:
+            Tuple of (timetables, generation_time, conflicts, suggestions)
+        """
+        start_time = time.time()
+
+        if seed is None:
+            seed = random.randrange(2 ** 31)
+
+        if teacher_assignment not in self.TEACHER_ASSIGNMENTS:
+            return [], 0.0, [f"Unknown teacher assignment: {teacher_assignment}"], [
+                f"Use one of: {', '.join(self.TEACHER_ASSIGNMENTS)}"
+            ]
+
+        is_valid, errors = V30Validator.validate_home_classrooms_assigned(classes)
+        if not is_valid:
+            return [], 0.0, errors, [
+                "Please assign home classrooms to all classes before generating timetables.",
+                "Use the Home Classroom Assignment UI in the admin dashboard."
+            ]
+        is_unique, uniqueness_errors = V30Validator.validate_home_classroom_uniqueness(classes)
+        if not is_unique:
+            return [], 0.0, uniqueness_errors, [
+                "Each home classroom can only be assigned to one class.",
+                "Please review and fix duplicate home classroom assignments."
+            ]
+
+        shared_rooms = V30Validator.extract_shared_rooms(rooms)
+        active_slots = [ts for ts in time_slots if not ts.is_break]
+        try:
+            availability = TeacherAvailability(teachers, active_slots)
+        except ValueError as exc:
+            return [], 0.0, [str(exc)], [
+                "Use 'HH:MM-HH:MM' windows or period numbers per day in teacher availability"
+            ]
+        subject_lookup = {s.id: s for s in subjects}
+        teacher_lookup = {t.id: t for t in teachers}
+        room_plan = self._build_room_plan(subjects, shared_rooms)
+
+        if self.debug:
+            print(f"\n[CP-SAT v{self.version}] Starting generation")
+            print(f"  Classes: {len(classes)}, Teachers: {len(teachers)}, "
+                  f"Active Slots: {len(active_slots)}, Shared Amenities: {len(shared_rooms)}")
+            print(f"  Timeout: {timeout}s, Workers: {self.num_workers}")
+
+        assigner = self.flow_assigner if teacher_assignment == "flow" else self.greedy_assigner
+        greedy_assignment = assigner.assign_teachers(
+            classes, subjects, teachers, time_slots, subject_requirements,
+            availability=availability
+        )
+        teacher_subjects = self._build_teacher_subject_map(teachers, subjects)
+        class_subject_distributions = self._build_distributions(
+            classes, subjects, subject_requirements, len(active_slots)
+        )
+        teacher_for = self._build_fixed_teacher_map(
+            classes, class_subject_distributions, greedy_assignment, teacher_subjects
+        )
+
+        variables, unplaceable = self._collect_variables(
+            classes, class_subject_distributions, subject_lookup, teacher_lookup,
+            teacher_for, shared_rooms, room_plan
+        )
+        model, x, shortage = self._build_model(
+            variables, active_slots, teacher_lookup, subject_lookup, morning_period_cutoff,
+            availability
+        )
+        hint = self._add_search_hint(
+            model, x, shortage, variables, classes, active_slots, shared_rooms,
+            class_subject_distributions, teacher_for, teacher_lookup, subject_lookup,
+            room_plan, availability,
+            time_limit=timeout * self.HINT_TIME_SHARE,
+            rng=random.Random(seed),
+            cancel_token=cancel_token
+        )
+
+        solutions = []
+        conflicts = None
+        for attempt in range(num_solutions):
+            remaining_time = timeout - (time.time() - start_time)
+            if remaining_time <= 0 or (cancel_token is not None and cancel_token.cancelled):
+                break
+
+            solver = cp_model.CpSolver()
+            solver.parameters.max_time_in_seconds = remaining_time / (num_solutions - attempt)
+            solver.parameters.num_search_workers = self.num_workers
+            solver.parameters.random_seed = (seed + attempt) % (2 ** 31)
+            status = self._solve_cancellable(solver, model, cancel_token)
+
+            if self.debug:
+                print(f"\n[CP-SAT v{self.version}] Solution {attempt + 1}/{num_solutions}: "
+                      f"{solver.StatusName(status)} in {solver.WallTime():.2f}s, "
+                      f"objective {solver.ObjectiveValue() if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else '-'}")
+
+            if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                # Anytime: no incumbent in time - fall back to the warm start
+                # placement, unless earlier solutions were found
+                if status == cp_model.UNKNOWN and not solutions and hint.placements:
+                    solutions.append(self._build_timetable_from_placements(
+                        hint.placements, classes, active_slots,
+                        subject_lookup, teacher_lookup, teachers,
+                        allow_partial_solutions,
+                        "Time budget exhausted",
+                        metadata={
+                            "solver": "cpsat",
+                            "cpsat_status": solver.StatusName(status),
+                            "cpsat_wall_time": solver.WallTime(),
+                            "warm_start_only": True,
+                            "seed": seed,
+                            "unplaceable_periods": sum(v["count"] for v in variables)
+                            - len(hint.placements) + unplaceable,
+                            "timed_out": True
+                        }
+                    ))
+                    if self.debug:
+                        print("  No CP-SAT incumbent; returning the warm start placement")
+                else:
+                    conflicts = [f"CP-SAT found no solution ({solver.StatusName(status)})"]
+                break
+
+            # Every later solution must differ from this one (the cuts stay
+            # in the model, so from every earlier one) in at least 5% of placements
+            chosen = [lit for row in x for lit in row if lit is not None and solver.Value(lit)]
+            model.Add(sum(chosen) <= max(0, len(chosen) - max(1, len(chosen) // 20)))
+
+            placements, room_misses = self._extract_placements(
+                solver, variables, x, shared_rooms
+            )
+            total_shortage = sum(solver.Value(s) for s in shortage) + room_misses
+            solution = self._build_timetable_from_placements(
+                placements, classes, active_slots,
+                subject_lookup, teacher_lookup, teachers,
+                allow_partial_solutions,
+                "Demand exceeds teacher or shared room capacity" if total_shortage or unplaceable
+                else "No subject demand left",
+                metadata={
+                    "solver": "cpsat",
+                    "cpsat_status": solver.StatusName(status),
+                    "cpsat_objective": solver.ObjectiveValue(),
+                    "cpsat_best_bound": solver.BestObjectiveBound(),
+                    "cpsat_wall_time": solver.WallTime(),
+                    "seed": seed,
+                    "unplaceable_periods": total_shortage + unplaceable,
+                    # FEASIBLE = stopped by the time limit before proving optimality
+                    "timed_out": status == cp_model.FEASIBLE
+                }
+            )
+
+            if allow_partial_solutions and solution.metadata["coverage"] < min_coverage:
+                continue
+            solutions.append(solution)
+            if self.debug:
+                self._log_solution_stats(solution, len(classes), len(active_slots))
+
+        generation_time = time.time() - start_time
+
+        if solutions:
+            solutions.sort(key=lambda s: s.metadata.get('coverage', 0), reverse=True)
+            return solutions, generation_time, None, None
+        if cancel_token is not None and cancel_token.cancelled:
+            return [], generation_time, [f"Solve cancelled: {cancel_token.reason}"], []
+        if conflicts:
+            return [], generation_time, conflicts, [
+                "Increase the timeout or relax teacher load limits"
+            ]
+        return [], generation_time, \
+            [f"Could not generate timetable with minimum {min_coverage*100:.0f}% coverage"], \
+            ["Try reducing minimum coverage requirement or adding more teachers/rooms"]
+
+    # ============================================================================
+    # MODEL
+    # ============================================================================
+
+    def _collect_variables(self, classes, class_subject_distributions, subject_lookup,
+                           teacher_lookup, teacher_for, shared_rooms, room_plan):
+        """
+        One entry per schedulable (class, subject): ids, teacher, periods, room pool.
+
+        Returns:
+            Tuple of (variables, unplaceable period count)
+        """
+        variables = []
+        unplaceable = 0
+        for class_obj in classes:
+            for subject_id, count in class_subject_distributions.get(class_obj.id, {}).items():
+                subject = subject_lookup.get(subject_id)
+                if not subject or count <= 0:
+                    continue
+                teacher_id = teacher_for.get((class_obj.id, subject_id))
+                pool = self._shared_room_candidates(class_obj, subject, shared_rooms, room_plan)
+                if teacher_id not in teacher_lookup or pool == []:
+                    unplaceable += count
+                    continue
+                variables.append({
+                    "class_id": class_obj.id,
+                    "subject_id": subject_id,
+                    "teacher_id": teacher_id,
+                    "count": count,
+                    "pool": frozenset(pool) if pool is not None else None
+                })
+        return variables, unplaceable
+
+    def _build_model(self, variables, active_slots, teacher_lookup, subject_lookup,
+                     morning_period_cutoff, availability):
+        """Build the CP-SAT model. Returns (model, x[var][slot], shortage[var])."""
+        model = cp_model.CpModel()
+        n_slots = len(active_slots)
+
+        x = []
+        shortage = []
+        for v, var in enumerate(variables):
+            row = [model.NewBoolVar(f"x_{v}_{i}") for i in range(n_slots)]
+            short = model.NewIntVar(0, var["count"], f"short_{v}")
+            model.Add(sum(row) + short == var["count"])
+            mask = availability.masks.get(var["teacher_id"])
+            if mask is not None:
+                for i in range(n_slots):
+                    if not mask >> i & 1:
+                        model.Add(row[i] == 0)
+            x.append(row)
+            shortage.append(short)
+
+        by_class: Dict[str, List[int]] = {}
+        by_teacher: Dict[str, List[int]] = {}
+        for v, var in enumerate(variables):
+            by_class.setdefault(var["class_id"], []).append(v)
+            by_teacher.setdefault(var["teacher_id"], []).append(v)
+
+        day_slots: Dict = {}
+        for i, slot in enumerate(active_slots):
+            day_slots.setdefault(slot.day_of_week, []).append(i)
+
+        for indices in by_class.values():
+            for i in range(n_slots):
+                model.AddAtMostOne(x[v][i] for v in indices)
+
+        for teacher_id, indices in by_teacher.items():
+            teacher = teacher_lookup[teacher_id]
+            for i in range(n_slots):
+                model.AddAtMostOne(x[v][i] for v in indices)
+            for slots in day_slots.values():
+                model.Add(sum(x[v][i] for v in indices for i in slots) <= teacher.max_periods_per_day)
+            model.Add(sum(x[v][i] for v in indices for i in range(n_slots)) <= teacher.max_periods_per_week)
+
+        # Shared room pools: periods restricted to a pool fit in it at every slot
+        pools = set(var["pool"] for var in variables if var["pool"])
+        for pool in pools:
+            indices = [v for v, var in enumerate(variables) if var["pool"] and var["pool"] <= pool]
+            for i in range(n_slots):
+                model.Add(sum(x[v][i] for v in indices) <= len(pool))
+
+        penalties = []
+        for v, var in enumerate(variables):
+            subject = subject_lookup[var["subject_id"]]
+            if getattr(subject, "prefer_morning", False):
+                penalties.extend(x[v][i] for i, slot in enumerate(active_slots)
+                                 if slot.period_number > morning_period_cutoff)
+
+        model.Minimize(self.SHORTAGE_WEIGHT * sum(shortage) + sum(penalties))
+        return model, x, shortage
+
+    def _solve_cancellable(self, solver, model, cancel_token):
+        """Solve the model; StopSearch() as soon as cancel_token is cancelled."""
+        if cancel_token is None:
+            return solver.Solve(model)
+
+        done = threading.Event()
+
+        def watch():
+            while not done.is_set():
+                if cancel_token.wait(0.05):
+                    solver.StopSearch()
+                    return
+
+        watcher = threading.Thread(target=watch, daemon=True)
+        watcher.start()
+        try:
+            return solver.Solve(model)
+        finally:
+            done.set()
+            watcher.join()
+
+    def _add_search_hint(self, model, x, shortage, variables, classes, active_slots, shared_rooms,
+                         class_subject_distributions, teacher_for, teacher_lookup,
+                         subject_lookup, room_plan, availability, time_limit, rng,
+                         cancel_token=None):
+        """
+        Hint CP-SAT with the placement found by the backtracking search.
+
+        Returns:
+            The backtracking SearchResult (the fallback when CP-SAT finds
+            no incumbent in time)
+        """
+        scheduler = BacktrackingScheduler(time_limit=time_limit)
+        result = scheduler.search(
+            classes, active_slots, shared_rooms, class_subject_distributions,
+            teacher_for, teacher_lookup, subject_lookup,
+            lambda class_obj, subject: self._shared_room_candidates(
+                class_obj, subject, shared_rooms, room_plan
+            ),
+            rng=rng,
+            teacher_slots=availability.masks,
+            cancel_token=cancel_token
+        )
+        placed = set((c, s, i) for c, s, _, i, _ in result.placements)
+        for v, var in enumerate(variables):
+            hinted = 0
+            for i, lit in enumerate(x[v]):
+                value = (var["class_id"], var["subject_id"], i) in placed
+                model.AddHint(lit, value)
+                hinted += value
+            model.AddHint(shortage[v], var["count"] - hinted)
+
+        if self.debug:
+            print(f"  Warm start: {len(result.placements)} periods from backtracking "
+                  f"in {result.elapsed:.2f}s")
+        return result
+
+    def _extract_placements(self, solver, variables, x, shared_rooms):
+        """
+        Read placements from the solver and match concrete shared rooms per slot.
+
+        Returns:
+            Tuple of (placements, periods dropped because no room matched)
+        """
+        by_slot: Dict[int, List[int]] = {}
+        placements = []
+        for v, var in enumerate(variables):
+            for i, lit in enumerate(x[v]):
+                if solver.Value(lit):
+                    if var["pool"]:
+                        by_slot.setdefault(i, []).append(v)
+                    else:
+                        placements.append((var["class_id"], var["subject_id"], var["teacher_id"], i, None))
+
+        room_misses = 0
+        for i, indices in by_slot.items():
+            used = set()
+            for v in sorted(indices, key=lambda u: len(variables[u]["pool"])):
+                var = variables[v]
+                room = next((k for k in sorted(var["pool"]) if k not in used), None)
+                if room is None:
+                    room_misses += 1
+                    continue
+                used.add(room)
+                placements.append((var["class_id"], var["subject_id"], var["teacher_id"], i,
+                                   shared_rooms[room].id))
+
+        placements.sort(key=lambda p: (p[0], p[3]))
+        return placements, room_misses
@@ -40,15 +40,29 @@ BACKWARD COMPATIBILITY:
 """
 
 from typing import List, Dict, Tuple, Optional, Any, Set
+import math
 import time
 import random
+from functools import partial
+from concurrent.futures import Executor
+from dataclasses import replace
 
 from src.models_phase1_v30 import (
     Class, Subject, Teacher, TimeSlot, Room, Constraint,
-    TimetableEntry, Timetable, TimetableStatus, RoomType,
+    TimetableEntry, Timetable, TimetableStatus, RoomType, DayOfWeek,
     SharedRoom, V30Validator, RoomAllocationSummary
 )
 from src.greedy_teacher_assignment import GreedyTeacherAssignment
+from src.flow_teacher_assignment import FlowTeacherAssignment
+from src.occupancy_index import OccupancyIndex
+from src.backtracking_scheduler import BacktrackingScheduler
+from src.parallel_attempts import Attempt, AttemptRunner, plan_seeds
+from src.bitmask_occupancy import BitmaskLayout
+from src.solve_control import Deadline, CancellationToken
+from src.solution_draft import SolutionDraft, describe_gap
+from src.teacher_availability import TeacherAvailability
+from src.domain_propagation import DomainPropagator
+from src.decomposition import find_components, merge_drafts
 
 
 class CSPSolverCompleteV301:
@@ -68,12 +82,38 @@ class CSPSolverCompleteV301:
        - Optimized teacher search with dict-based indexing
        - Reduced redundant calculations
        - Early termination in loops
+       - O(1) teacher daily/weekly load checks (OccupancyIndex)
+       - Optional bitmask slot-domain engine (state_engine="bitmask")
+       - Optional backtracking search with MRV + forward checking
+         (search_mode="backtracking")
+       - Independent attempts across a process pool (workers > 1)
+       - Anytime solving: best-so-far result when the timeout expires
+       - Incremental re-solve of a previous timetable (resolve())
+       - Optional most-constrained-first class ordering
+         (class_ordering="difficulty")
+       - Attempts record compact placements (SolutionDraft); entries are
+         built only for the returned solutions
+       - Arc-consistency propagation of slot domains before scheduling
+         (DomainPropagator); provably hopeless partial requests fail fast
+       - Balanced min-cost-flow teacher pre-assignment
+         (teacher_assignment="flow")
+       - Optional decomposition: wings that share no teacher or shared room
+         are solved as separate sub-problems, in parallel (decompose=True)
     """
 
+    STATE_ENGINES = ("dict", "bitmask")
+    SEARCH_MODES = ("greedy", "backtracking")
+    CLASS_ORDERINGS = ("input", "difficulty")
+    TEACHER_ASSIGNMENTS = ("flow", "greedy")
+    RELAXATION_LEVELS = (0.0, 0.3, 0.5, 0.8)
+    RESOLVE_WIDENINGS = 2  # Incremental re-solve: max times the freed region grows
+
     def __init__(self, debug: bool = False):
         self.debug = debug
         self.version = "3.0.1"
         self.greedy_assigner = GreedyTeacherAssignment(debug=debug)
+        self.flow_assigner = FlowTeacherAssignment(debug=debug)
+        self.propagator = DomainPropagator(debug=debug)
 
     def solve(
         self,
@@ -88,7 +128,19 @@ class CSPSolverCompleteV301:
         enforce_teacher_consistency: bool = True,
         max_violations: int = 0,
         allow_partial_solutions: bool = True,
-        min_coverage: float = 0.70
+        min_coverage: float = 0.70,
+        state_engine: str = "dict",
+        search_mode: str = "greedy",
+        search_node_limit: int = 200000,
+        search_time_limit: float = 10.0,
+        workers: int = 1,
+        seed: Optional[int] = None,
+        timeout: Optional[float] = None,
+        class_ordering: str = "input",
+        teacher_assignment: str = "flow",
+        decompose: bool = False,
+        cancel_token: Optional[CancellationToken] = None,
+        executor: Optional[Executor] = None
     ) -> Tuple[List[Timetable], float, Optional[List[str]], Optional[List[str]]]:
         """
         Generate COMPLETE timetables with simplified room allocation.
@@ -112,11 +164,87 @@ class CSPSolverCompleteV301:
             max_violations: Maximum violations allowed (for tolerance)
             allow_partial_solutions: If True, return partial solutions instead of failing
             min_coverage: Minimum coverage required for partial solutions (0.0-1.0)
+            state_engine: Occupancy engine for candidate search:
+                "dict" (default) - set/dict membership probes
+                "bitmask" - int bitmasks over the active-slot index
+            search_mode: Slot filling strategy:
+                "greedy" (default) - single pass per attempt, relaxation ladder
+                "backtracking" - MRV + forward checking search that revisits
+                choices until every period is placed (teachers always come
+                from the greedy pre-assignment); with allow_partial_solutions
+                the relaxation ladder then fills the slots it left empty
+            search_node_limit: Node budget per backtracking attempt
+            search_time_limit: Time budget (seconds) shared by all backtracking attempts
+            workers: Worker processes for independent attempts (1 = sequential,
+                in-process). Results are merged in plan order with per-attempt
+                seeds, so they do not depend on the worker count
+            seed: Base seed for all random choices (drawn if None). The same
+                seed and input always give the same timetables; it is returned
+                in every solution's metadata["seed"]
+            timeout: Wall-clock budget in seconds (None = unlimited). Checked
+                between classes and between attempts; when it expires the
+                best solution so far is returned (even below min_coverage)
+                with metadata["timed_out"] = True
+            class_ordering: Order in which the greedy generators fill classes:
+                "input" (default) - request order (v3.0 behaviour)
+                "difficulty" - most constrained classes first
+            teacher_assignment: How (class, subject) pairs get their teacher:
+                "flow" (default) - min-cost flow over teacher capacity with
+                load-balancing costs (FlowTeacherAssignment)
+                "greedy" - priority-ordered greedy loop (v2.5.2 behaviour)
+            decompose: Split the school into components that share no
+                pre-assigned teacher and no shared room, and run every
+                attempt per component (one worker task each); the component
+                drafts are merged into one timetable. Relaxed fallbacks then
+                only borrow teachers and rooms of the same component, and the
+                backtracking node budget is shared out by class count. Needs
+                a teacher pre-assignment; metadata["components"] records the
+                split
+            cancel_token: Optional CancellationToken. Once cancelled the
+                solve stops at its next deadline check (between classes,
+                attempts and every 256 search nodes, worker processes
+                included); solutions so far get metadata["cancelled"] = True
+            executor: Optional shared ProcessPoolExecutor (one per service,
+                created at startup) that runs the attempts when workers > 1,
+                instead of a pool started for this solve
+
+        Before any attempt runs, slot domains are propagated over the teacher
+        plan, availability, caps and shared-room pools. Only
+        search_mode="backtracking" searches the pruned domains; the greedy
+        generators use the propagation for its reasons alone. Every solution
+        gets metadata["propagation"] (pruned slots, unplaceable periods,
+        reasons aggregated to a few lines per teacher/class/room kind). In
+        partial mode, a request whose coverage upper bound is below
+        min_coverage fails at once with those reasons as conflicts.
 
         Returns:
             Tuple of (timetables, generation_time, conflicts, suggestions)
         """
         start_time = time.time()
+        deadline = Deadline(timeout, cancel_token)
+
+        if seed is None:
+            seed = random.randrange(2 ** 31)
+
+        if state_engine not in self.STATE_ENGINES:
+            return [], 0.0, [f"Unknown state engine: {state_engine}"], [
+                f"Use one of: {', '.join(self.STATE_ENGINES)}"
+            ]
+
+        if search_mode not in self.SEARCH_MODES:
+            return [], 0.0, [f"Unknown search mode: {search_mode}"], [
+                f"Use one of: {', '.join(self.SEARCH_MODES)}"
+            ]
+
+        if class_ordering not in self.CLASS_ORDERINGS:
+            return [], 0.0, [f"Unknown class ordering: {class_ordering}"], [
+                f"Use one of: {', '.join(self.CLASS_ORDERINGS)}"
+            ]
+
+        if teacher_assignment not in self.TEACHER_ASSIGNMENTS:
+            return [], 0.0, [f"Unknown teacher assignment: {teacher_assignment}"], [
+                f"Use one of: {', '.join(self.TEACHER_ASSIGNMENTS)}"
+            ]
 
         # ============================================================================
         # v3.0 VALIDATION: Ensure home classrooms are assigned
@@ -164,6 +292,14 @@ class CSPSolverCompleteV301:
         # Filter active slots
         active_slots = [ts for ts in time_slots if not ts.is_break]
 
+        # v3.0.1: Teacher.availability as slot bitmasks, once per solve
+        try:
+            availability = TeacherAvailability(teachers, active_slots)
+        except ValueError as exc:
+            return [], 0.0, [str(exc)], [
+                "Use 'HH:MM-HH:MM' windows or period numbers per day in teacher availability"
+            ]
+
         # Build lookup dictionaries
         subject_lookup = {s.id: s for s in subjects}
         teacher_lookup = {t.id: t for t in teachers}
@@ -174,16 +310,31 @@ class CSPSolverCompleteV301:
             print(f"  Teacher Consistency: {'ENABLED' if enforce_teacher_consistency else 'DISABLED'}")
             print(f"  Max Violations Allowed: {max_violations}")
             print(f"  Room Allocation: SIMPLIFIED (v3.0)")
+            print(f"  State Engine: {state_engine}")
+            print(f"  Search Mode: {search_mode}")
+            print(f"  Seed: {seed}")
+            print(f"  Timeout: {'none' if timeout is None else f'{timeout:.1f}s'}")
+            print(f"  Teachers with limited availability: {len(availability.masks)}")
+
+        # v3.0.1: Subject -> room type and capacity-sorted rooms, once per solve
+        room_plan = self._build_room_plan(subjects, shared_rooms)
+
+        # v3.0.1: Occupancy factory (one fresh state per attempt)
+        occupancy_factory = self._build_occupancy_factory(
+            state_engine, teachers, shared_rooms, active_slots, availability
+        )
 
         # ============================================================================
-        # PHASE 1: Greedy teacher pre-assignment (unchanged from v2.5.2)
+        # PHASE 1: Teacher pre-assignment (min-cost flow, or v2.5.2 greedy)
         # ============================================================================
-        if enforce_teacher_consistency:
+        if enforce_teacher_consistency or search_mode == "backtracking":
             if self.debug:
-                print(f"\n[CSP v{self.version}] === PHASE 1: GREEDY TEACHER ASSIGNMENT ===")
+                print(f"\n[CSP v{self.version}] === PHASE 1: TEACHER ASSIGNMENT ({teacher_assignment}) ===")
 
-            greedy_assignment = self.greedy_assigner.assign_teachers(
-                classes, subjects, teachers, time_slots, subject_requirements
+            assigner = self.flow_assigner if teacher_assignment == "flow" else self.greedy_assigner
+            greedy_assignment = assigner.assign_teachers(
+                classes, subjects, teachers, time_slots, subject_requirements,
+                availability=availability
             )
 
             if self.debug:
@@ -195,17 +346,58 @@ class CSPSolverCompleteV301:
         teacher_subjects = self._build_teacher_subject_map(teachers, subjects)
 
         # Calculate subject distribution
-        if subject_requirements:
-            class_subject_distributions = self._build_class_specific_distributions(
-                classes, subjects, subject_requirements, len(active_slots)
+        class_subject_distributions = self._build_distributions(
+            classes, subjects, subject_requirements, len(active_slots)
+        )
+
+        # v3.0.1: Most-constrained-first - classes competing for scarce
+        # teachers and shared rooms are filled before the easy ones
+        if class_ordering == "difficulty":
+            classes = self._order_by_difficulty(
+                classes, class_subject_distributions, teacher_subjects,
+                subject_lookup, teacher_lookup, shared_rooms,
+                greedy_assignment, len(active_slots), availability, room_plan
             )
             if self.debug:
-                print(f"\n[CSP v{self.version}] Using grade-specific subject requirements")
+                print(f"  Class order (hardest first): {', '.join(c.name for c in classes[:5])}"
+                      f"{' ...' if len(classes) > 5 else ''}")
+
+        # v3.0.1: Arc-consistency over the teacher plan - pre-reduced slot
+        # domains (used by the backtracking search) and unplaceable demand
+        if greedy_assignment:
+            teacher_for = self._build_fixed_teacher_map(
+                classes, class_subject_distributions, greedy_assignment, teacher_subjects
+            )
+            propagation = self.propagator.propagate(
+                classes, active_slots, class_subject_distributions, teacher_for,
+                teacher_lookup, subject_lookup,
+                lambda class_obj, subject: self._shared_room_candidates(
+                    class_obj, subject, shared_rooms, room_plan
+                ),
+                availability.masks
+            )
         else:
-            subject_distribution = self._calculate_subject_distribution(
-                len(active_slots), subjects
+            propagation = None
+
+        # Fail fast when no attempt can reach min_coverage
+        if allow_partial_solutions:
+            coverage_bound = self._coverage_bound(
+                classes, active_slots, teachers, availability,
+                class_subject_distributions, subject_lookup
             )
-            class_subject_distributions = {c.id: subject_distribution for c in classes}
+            if coverage_bound < min_coverage:
+                conflicts = [
+                    f"At most {coverage_bound*100:.1f}% coverage is achievable "
+                    f"(minimum {min_coverage*100:.0f}% required)"
+                ] + (propagation.reasons if propagation else [])
+                if self.debug:
+                    print(f"\n[CSP v{self.version}] Infeasible before search:")
+                    for conflict in conflicts:
+                        print(f"  - {conflict}")
+                return [], time.time() - start_time, conflicts, [
+                    "Add teachers or availability for the subjects listed above",
+                    "Try reducing minimum coverage requirement"
+                ]
 
         # ============================================================================
         # PHASE 2: CSP scheduling with PARTIAL SOLUTION support
@@ -216,80 +408,179 @@ class CSPSolverCompleteV301:
             print(f"  Min Coverage Required: {min_coverage*100:.1f}%")
 
         solutions = []
-        
-        if allow_partial_solutions:
-            # Try multiple relaxation levels to get partial solutions
-            relaxation_levels = [0.0, 0.3, 0.5, 0.8]  # 0.0 = strict, 0.8 = very relaxed
-            
-            for relaxation in relaxation_levels:
-                if self.debug:
-                    print(f"\n[CSP v{self.version}] Trying relaxation level: {relaxation}")
-                
-                for attempt in range(max(1, num_solutions // len(relaxation_levels))):
-                    solution = self._generate_partial_solution(
-                        classes, subjects, teachers, active_slots,
-                        rooms, shared_rooms,
-                        teacher_subjects, class_subject_distributions,
-                        subject_lookup, teacher_lookup, room_lookup,
-                        enforce_teacher_consistency,
-                        greedy_assignment,
-                        relaxation_level=relaxation,
-                        min_coverage=min_coverage
-                    )
-                    
-                    if solution and self._calculate_coverage(solution, len(classes), len(active_slots)) >= min_coverage:
-                        # Add coverage and quality metrics
+
+        # v3.0.1: Attempts only share this read-only problem instance, so they
+        # can run in worker processes (shipped once per worker)
+        plan = self._build_attempt_plan(search_mode, allow_partial_solutions, num_solutions, seed)
+
+        # v3.0.1: Wings that share no teacher and no shared room are solved
+        # as independent sub-problems - one task per (attempt, component)
+        components = []
+        if decompose and greedy_assignment:
+            components = find_components(
+                classes,
+                {key: teacher_id for key, teacher_id in teacher_for.items()
+                 if class_subject_distributions.get(key[0], {}).get(key[1], 0) > 0},
+                lambda class_obj: self._shared_room_ids(class_obj, class_subject_distributions, room_plan),
+                teachers, shared_rooms
+            )
+            if len(components) > 1:
+                plan = [replace(attempt, component=c) for attempt in plan for c in range(len(components))]
+            else:
+                components = []
+            if self.debug:
+                print(f"  Components: {max(1, len(components))} "
+                      f"({', '.join(str(len(c.classes)) for c in components) or len(classes)} classes)")
+
+        workers = max(1, min(workers, len(plan)))
+        problem = {
+            "classes": classes, "subjects": subjects, "teachers": teachers,
+            "active_slots": active_slots, "rooms": rooms, "shared_rooms": shared_rooms,
+            "teacher_subjects": teacher_subjects,
+            "class_subject_distributions": class_subject_distributions,
+            "subject_lookup": subject_lookup, "teacher_lookup": teacher_lookup,
+            "room_lookup": room_lookup,
+            "enforce_teacher_consistency": enforce_teacher_consistency,
+            "greedy_assignment": greedy_assignment,
+            "allow_partial_solutions": allow_partial_solutions,
+            "min_coverage": min_coverage,
+            "occupancy_factory": occupancy_factory,
+            "room_plan": room_plan,
+            "teacher_slots": availability.masks,
+            "slot_domains": propagation.domains if propagation else None,
+            "seed": seed,
+            "deadline": deadline,
+            # Backtracking: the time budget is shared by the attempts each worker runs
+            "scheduler": BacktrackingScheduler(
+                node_limit=search_node_limit,
+                time_limit=min(search_time_limit, deadline.remaining()) / -(-len(plan) // workers),
+                debug=self.debug
+            ) if search_mode == "backtracking" else None
+        }
+        problem["components"] = [
+            self._component_problem(problem, component, state_engine, availability)
+            for component in components
+        ]
+        worker_solver = self if workers == 1 else type(self)(debug=False)
+
+        if self.debug:
+            print(f"  Attempts planned: {len(plan)} (workers: {workers})")
+
+        # v3.0.1: Anytime solving - best result below min_coverage, returned
+        # only if the deadline cuts the run short
+        incumbent = None
+        timed_out = False
+        attempts_run = 0
+
+        def out_of_time():
+            # A cancelled solve stops at once, even with nothing to return
+            return deadline.cancelled or (deadline.expired() and (solutions or incumbent is not None))
+
+        def keep_incumbent(solution):
+            nonlocal incumbent, timed_out
+            timed_out = timed_out or solution.metadata.get("timed_out", False)
+            coverage = solution.metadata.get("coverage", 0)
+            if incumbent is None or coverage > incumbent.metadata.get("coverage", 0):
+                incumbent = solution
+
+        with AttemptRunner(problem, worker_solver._run_attempt, workers, executor) as runner:
+            results = runner.run(plan)
+            if components:
+                results = self._merge_component_results(results, len(components))
+            if search_mode == "backtracking":
+                # Each search keeps going until every period is placed or its
+                # budget runs out
+                for attempt, result in results:
+                    if out_of_time():
+                        timed_out = True
+                        break
+                    if self.debug:
+                        print(f"\n[CSP v{self.version}] Backtracking search {attempt.index + 1}/{num_solutions}")
+
+                    solution = result()
+                    attempts_run += 1
+                    coverage = solution.metadata["coverage"]
+                    if allow_partial_solutions and coverage < min_coverage:
+                        keep_incumbent(solution)
+                        continue
+
+                    solutions.append(solution)
+                    if self.debug:
+                        self._log_solution_stats(solution, len(classes), len(active_slots))
+
+            elif allow_partial_solutions:
+                # v3.0.1: Each attempt climbs the relaxation ladder itself
+                # (strict pass, then looser levels for the leftover slots only)
+                for attempt, result in results:
+                    if out_of_time():
+                        timed_out = True
+                        break
+                    if self.debug:
+                        print(f"\n[CSP v{self.version}] Partial solution {attempt.index + 1}/{num_solutions} "
+                              f"(relaxation up to {attempt.relaxation})")
+
+                    solution = result()
+                    attempts_run += 1
+
+                    if solution and solution.metadata["coverage"] >= min_coverage:
+                        solutions.append(solution)
+                        if self.debug:
+                            self._log_solution_stats(solution, len(classes), len(active_slots))
+                    elif solution:
+                        # Only returned below min_coverage when it ran out of time
+                        keep_incumbent(solution)
+            else:
+                # Original complete solution generation
+                for attempt, result in results:
+                    if out_of_time():
+                        timed_out = True
+                        break
+                    if self.debug:
+                        print(f"\n[CSP v{self.version}] Generating complete solution {attempt.index + 1}/{num_solutions}")
+
+                    solution = result()
+                    attempts_run += 1
+
+                    if solution:
                         coverage = self._calculate_coverage(solution, len(classes), len(active_slots))
                         solution.metadata["coverage"] = coverage
-                        solution.metadata["relaxation_level"] = relaxation
-                        
                         solutions.append(solution)
                         if self.debug:
                             self._log_solution_stats(solution, len(classes), len(active_slots))
-                        
-                        # If we got good coverage, don't need more relaxed attempts
-                        if coverage >= 0.95:
-                            break
-                
-                # If we have enough good solutions, stop trying more relaxed levels
-                if len(solutions) >= num_solutions:
-                    break
-        else:
-            # Original complete solution generation
-            for attempt in range(num_solutions):
-                if self.debug:
-                    print(f"\n[CSP v{self.version}] Generating complete solution {attempt + 1}/{num_solutions}")
-
-                solution = self._generate_complete_solution(
-                    classes, subjects, teachers, active_slots,
-                    rooms, shared_rooms,
-                    teacher_subjects, class_subject_distributions,
-                    subject_lookup, teacher_lookup, room_lookup,
-                    enforce_teacher_consistency,
-                    greedy_assignment
-                )
 
-                if solution:
-                    coverage = self._calculate_coverage(solution, len(classes), len(active_slots))
-                    solution.metadata["coverage"] = coverage
-                    solutions.append(solution)
-                    if self.debug:
-                        self._log_solution_stats(solution, len(classes), len(active_slots))
+        timed_out = timed_out or any(s.metadata.get("timed_out", False) for s in solutions)
+        if timed_out and not solutions and incumbent is not None:
+            solutions = [incumbent]
+        for solution in solutions:
+            solution.metadata["timed_out"] = timed_out
+            solution.metadata["cancelled"] = deadline.cancelled
+            solution.metadata["attempts"] = attempts_run
+            solution.metadata["components"] = max(1, len(components))
+
+        # Sort solutions by coverage and quality
+        solutions.sort(key=lambda s: (s.metadata.get('coverage', 0), -s.metadata.get('relaxation_level', 0)), reverse=True)
+        # v3.0.1: Only the returned drafts are built into Timetable objects
+        timetables = [self._materialize_draft(s, problem) for s in solutions[:num_solutions]]
+        if propagation is not None:
+            for timetable in timetables:
+                timetable.metadata["propagation"] = propagation.summary()
 
         generation_time = time.time() - start_time
 
         if self.debug:
             print(f"\n[CSP v{self.version}] Generation complete")
+            if timed_out:
+                print(f"  ⏱️  Timed out after {generation_time:.2f}s - returning best solution so far")
             print(f"  Solutions: {len(solutions)}")
             print(f"  Time: {generation_time:.2f}s")
             if solutions:
                 avg_coverage = sum(s.metadata.get('coverage', 0) for s in solutions) / len(solutions)
                 print(f"  Average Coverage: {avg_coverage*100:.1f}%")
 
-        if solutions:
-            # Sort solutions by coverage and quality
-            solutions.sort(key=lambda s: (s.metadata.get('coverage', 0), -s.metadata.get('relaxation_level', 0)), reverse=True)
-            return solutions[:num_solutions], generation_time, None, None
+        if timetables:
+            return timetables, generation_time, None, None
+        elif deadline.cancelled:
+            return [], generation_time, [f"Solve cancelled: {cancel_token.reason}"], []
         else:
             if allow_partial_solutions:
                 return [], generation_time, \
@@ -300,6 +591,331 @@ class CSPSolverCompleteV301:
                        ["Could not generate complete timetable"], \
                        ["Try adjusting teacher availability or add more teachers"]
 
+    def resolve(
+        self,
+        previous_timetable: Dict[str, Any],
+        classes: List[Class],
+        subjects: List[Subject],
+        teachers: List[Teacher],
+        time_slots: List[TimeSlot],
+        rooms: List[Room],
+        changed_teacher_ids: Optional[List[str]] = None,
+        changed_class_ids: Optional[List[str]] = None,
+        changed_subject_ids: Optional[List[str]] = None,
+        subject_requirements: Optional[List[Dict]] = None,
+        allow_partial_solutions: bool = True,
+        search_node_limit: int = 200000,
+        search_time_limit: float = 10.0,
+        seed: Optional[int] = None,
+        timeout: Optional[float] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Tuple[List[Timetable], float, Optional[List[str]], Optional[List[str]]]:
+        """
+        Incrementally re-solve a previous timetable after small data changes.
+
+        Entries that touch a changed teacher, class or subject are freed, as
+        are SELF_STUDY fillers and entries the new data no longer supports
+        (removed entities, unqualified teacher, periods above the new subject
+        requirement). Everything else stays fixed; only the freed demand is
+        placed again with BacktrackingScheduler around the fixed entries.
+        A freed (class, subject) keeps its previous teacher if still qualified.
+
+        If the freed periods do not fit around the fixed entries, the freed
+        region is widened (up to RESOLVE_WIDENINGS times): first the classes
+        left short are freed entirely, then every class sharing a teacher
+        with them.
+
+        Args:
+            previous_timetable: Timetable (or its dict form) to repair
+            classes, subjects, teachers, time_slots, rooms: Current (updated) data
+            changed_teacher_ids: Teachers edited since previous_timetable
+            changed_class_ids: Classes edited since previous_timetable
+            changed_subject_ids: Subjects edited since previous_timetable
+            subject_requirements: Optional grade-specific subject requirements
+            allow_partial_solutions: Leave unplaced periods as unfilled_slots
+                (else SELF_STUDY)
+            search_node_limit: Node budget for the repair search
+            search_time_limit: Time budget (seconds) for the repair search
+            seed: Seed for the repair search (drawn if None)
+            timeout: Wall-clock budget in seconds (None = unlimited)
+            cancel_token: Optional CancellationToken; stops the repair search
+                like an expired timeout
+
+        Returns:
+            Tuple of (timetables, generation_time, conflicts, suggestions) with
+            a single repaired timetable; metadata["incremental"] counts kept,
+            freed and placed entries and the widening used
+        """
+        start_time = time.time()
+        deadline = Deadline(timeout, cancel_token)
+
+        if seed is None:
+            seed = random.randrange(2 ** 31)
+
+        is_valid, errors = V30Validator.validate_home_classrooms_assigned(classes)
+        if not is_valid:
+            return [], 0.0, errors, [
+                "Please assign home classrooms to all classes before generating timetables."
+            ]
+
+        shared_rooms = V30Validator.extract_shared_rooms(rooms)
+        room_ids = {r.id for r in rooms}
+        active_slots = [ts for ts in time_slots if not ts.is_break]
+        slot_index = {slot.id: i for i, slot in enumerate(active_slots)}
+        try:
+            availability = TeacherAvailability(teachers, active_slots)
+        except ValueError as exc:
+            return [], 0.0, [str(exc)], [
+                "Use 'HH:MM-HH:MM' windows or period numbers per day in teacher availability"
+            ]
+        subject_lookup = {s.id: s for s in subjects}
+        teacher_lookup = {t.id: t for t in teachers}
+        teacher_subjects = self._build_teacher_subject_map(teachers, subjects)
+        class_subject_distributions = self._build_distributions(
+            classes, subjects, subject_requirements, len(active_slots)
+        )
+        room_plan = self._build_room_plan(subjects, shared_rooms)
+
+        if isinstance(previous_timetable, dict):
+            previous_entries = previous_timetable.get("entries", [])
+        else:
+            previous_entries = [e.model_dump() for e in previous_timetable.entries]
+
+        changed_teachers = set(changed_teacher_ids or [])
+        changed_subjects = set(changed_subject_ids or [])
+        free_classes = set(changed_class_ids or [])
+        scheduler = BacktrackingScheduler(node_limit=search_node_limit, debug=self.debug)
+
+        # Repair the minimal freed region first. If freed periods do not fit
+        # around the fixed entries, widen it: free the short classes, then
+        # every class that shares a teacher with them
+        best = None
+        for widening in range(self.RESOLVE_WIDENINGS + 1):
+            scheduler.time_limit = min(search_time_limit, deadline.remaining())
+            repair = self._repair_region(
+                scheduler, previous_entries, classes, active_slots, shared_rooms,
+                teacher_subjects, teacher_lookup, subject_lookup, slot_index,
+                class_subject_distributions, changed_teachers, free_classes,
+                changed_subjects, random.Random(seed + widening), availability,
+                room_ids, cancel_token, room_plan
+            )
+            repair["widening"] = widening
+            if best is None or len(repair["placements"]) > len(best["placements"]):
+                best = repair
+
+            if self.debug:
+                print(f"\n[CSP v{self.version}] Incremental re-solve (widening {widening})")
+                print(f"  Kept entries: {len(repair['kept'])}, freed: {len(repair['freed'])}")
+                print(f"  Periods placed: {len(repair['result'].placements)}, "
+                      f"short classes: {len(repair['short_classes'])}")
+
+            short = repair["short_classes"]
+            if not short or deadline.expired():
+                break
+            if widening == 0:
+                grow = short
+            else:
+                teacher_for = repair["teacher_for"]
+                short_teachers = {t for (c, _), t in teacher_for.items() if c in short}
+                grow = {c for (c, _), t in teacher_for.items() if t in short_teachers}
+            if grow <= free_classes:
+                break
+            free_classes |= grow
+
+        kept, freed, result, placements = best["kept"], best["freed"], best["result"], best["placements"]
+        timed_out = result.budget_exhausted and deadline.expired()
+        if timed_out:
+            reason = "Time budget exhausted"
+        elif result.budget_exhausted:
+            reason = "Search budget exhausted"
+        elif result.unplaceable:
+            reason = "Demand exceeds teacher or shared room capacity"
+        else:
+            reason = "No subject demand left"
+
+        timetable = self._build_timetable_from_placements(
+            placements, classes, active_slots,
+            subject_lookup, teacher_lookup, teachers,
+            allow_partial_solutions, reason,
+            metadata={
+                "search_mode": "incremental",
+                "search_complete": result.complete,
+                "search_nodes": result.nodes,
+                "search_backtracks": result.backtracks,
+                "search_restarts": result.restarts,
+                "unplaceable_periods": sum(result.unplaceable.values()),
+                "seed": seed,
+                "timed_out": timed_out,
+                "cancelled": deadline.cancelled,
+                "incremental": {
+                    "kept_entries": len(kept),
+                    "freed_entries": len(freed),
+                    "placed_entries": len(result.placements),
+                    "widening": best["widening"],
+                    "changed_teachers": sorted(changed_teacher_ids or []),
+                    "changed_classes": sorted(changed_class_ids or []),
+                    "changed_subjects": sorted(changed_subject_ids or [])
+                }
+            }
+        )
+
+        generation_time = time.time() - start_time
+        if self.debug:
+            self._log_solution_stats(timetable, len(classes), len(active_slots))
+            print(f"  Time: {generation_time:.3f}s")
+
+        return [timetable], generation_time, None, None
+
+    def _repair_region(self, scheduler, previous_entries, classes, active_slots, shared_rooms,
+                       teacher_subjects, teacher_lookup, subject_lookup, slot_index,
+                       class_subject_distributions, changed_teachers, free_classes,
+                       changed_subjects, rng, availability, room_ids=None,
+                       cancel_token=None, room_plan=None):
+        """
+        One incremental repair: free entries, pick teachers, search the freed demand.
+
+        Returns a dict with kept/freed entries, the SearchResult, the teacher
+        map, all placements (kept + new) and the classes left short.
+        """
+        shared_room_ids = {r.id for r in shared_rooms}
+        kept, freed = self._split_previous_entries(
+            previous_entries, classes, teacher_subjects, slot_index,
+            class_subject_distributions, changed_teachers, free_classes, changed_subjects,
+            availability, room_ids
+        )
+
+        # Demand still to place, and a teacher per freed (class, subject)
+        kept_count: Dict[Tuple[str, str], int] = {}
+        teacher_for: Dict[Tuple[str, str], str] = {}
+        teacher_load: Dict[str, int] = {}
+        for entry in kept:
+            key = (entry["class_id"], entry["subject_id"])
+            kept_count[key] = kept_count.get(key, 0) + 1
+            teacher_for[key] = entry["teacher_id"]
+            teacher_load[entry["teacher_id"]] = teacher_load.get(entry["teacher_id"], 0) + 1
+        previous_teacher = {
+            (e["class_id"], e["subject_id"]): e["teacher_id"] for e in freed
+        }
+
+        deficits: Dict[str, Dict[str, int]] = {}
+        for class_obj in classes:
+            for subject_id, target in class_subject_distributions.get(class_obj.id, {}).items():
+                key = (class_obj.id, subject_id)
+                missing = target - kept_count.get(key, 0)
+                if missing <= 0:
+                    continue
+                deficits.setdefault(class_obj.id, {})[subject_id] = missing
+                if key not in teacher_for:
+                    teacher_id = self._pick_repair_teacher(
+                        teacher_subjects.get(subject_id, []), previous_teacher.get(key),
+                        teacher_load, missing, availability
+                    )
+                    if teacher_id:
+                        teacher_for[key] = teacher_id
+                        teacher_load[teacher_id] = teacher_load.get(teacher_id, 0) + missing
+
+        fixed = [
+            (e["class_id"], e["teacher_id"], slot_index[e["time_slot_id"]],
+             e["room_id"] if e["room_id"] in shared_room_ids else None)
+            for e in kept
+        ]
+        result = scheduler.search(
+            [c for c in classes if c.id in deficits], active_slots, shared_rooms, deficits,
+            teacher_for, teacher_lookup, subject_lookup,
+            lambda class_obj, subject: self._shared_room_candidates(
+                class_obj, subject, shared_rooms, room_plan
+            ),
+            rng=rng,
+            fixed=fixed,
+            teacher_slots=availability.masks,
+            cancel_token=cancel_token
+        )
+
+        placed: Dict[str, int] = {}
+        for placement in result.placements:
+            placed[placement[0]] = placed.get(placement[0], 0) + 1
+        short_classes = {
+            class_id for class_id, demand in deficits.items()
+            if placed.get(class_id, 0) < sum(demand.values())
+        }
+
+        placements = [
+            (class_id, entry["subject_id"], teacher_id, s, room_id)
+            for (class_id, teacher_id, s, room_id), entry in zip(fixed, kept)
+        ] + result.placements
+
+        return {
+            "kept": kept, "freed": freed, "result": result, "teacher_for": teacher_for,
+            "placements": placements, "short_classes": short_classes
+        }
+
+    def _split_previous_entries(self, entries, classes, teacher_subjects, slot_index,
+                                class_subject_distributions, changed_teachers,
+                                changed_classes, changed_subjects, availability=None,
+                                room_ids=None):
+        """
+        Split previous entries into (kept, freed) for an incremental re-solve.
+
+        Freed: SELF_STUDY fillers, entries touching a changed entity, entries
+        whose class/teacher/slot/room no longer exists, whose teacher no longer
+        teaches the subject or is no longer available in the slot, double
+        bookings, and periods above the new (class, subject) requirement.
+        """
+        class_ids = {c.id for c in classes}
+        qualified = {
+            subject_id: {t.id for t in subject_teachers}
+            for subject_id, subject_teachers in teacher_subjects.items()
+        }
+
+        kept, freed = [], []
+        count: Dict[Tuple[str, str], int] = {}
+        busy: Set[Tuple[str, str]] = set()
+        for entry in entries:
+            class_id = entry.get("class_id")
+            subject_id = entry.get("subject_id")
+            teacher_id = entry.get("teacher_id")
+            slot_id = entry.get("time_slot_id")
+            room_id = entry.get("room_id")
+            key = (class_id, subject_id)
+
+            if (subject_id == "SELF_STUDY"
+                    or teacher_id in changed_teachers
+                    or class_id in changed_classes
+                    or subject_id in changed_subjects
+                    or class_id not in class_ids
+                    or slot_id not in slot_index
+                    or (room_ids is not None and room_id and room_id not in room_ids)
+                    or teacher_id not in qualified.get(subject_id, ())
+                    or (availability and not availability.allows(teacher_id, slot_id))
+                    or count.get(key, 0) >= class_subject_distributions.get(class_id, {}).get(subject_id, 0)
+                    or ("class", class_id, slot_id) in busy
+                    or ("teacher", teacher_id, slot_id) in busy
+                    or ("room", room_id, slot_id) in busy):
+                freed.append(entry)
+                continue
+
+            count[key] = count.get(key, 0) + 1
+            busy.add(("class", class_id, slot_id))
+            busy.add(("teacher", teacher_id, slot_id))
+            busy.add(("room", room_id, slot_id))
+            kept.append(entry)
+
+        return kept, freed
+
+    def _pick_repair_teacher(self, candidates, previous_teacher_id, teacher_load, periods,
+                             availability=None):
+        """Previous teacher if still qualified and free enough, else the least loaded one."""
+        spare = {
+            t.id: (availability.capacity(t) if availability else t.max_periods_per_week)
+            - teacher_load.get(t.id, 0)
+            for t in candidates
+        }
+        if previous_teacher_id in spare and spare[previous_teacher_id] >= periods:
+            return previous_teacher_id
+        if not spare:
+            return None
+        return max(candidates, key=lambda t: spare[t.id]).id
+
     # ============================================================================
     # HELPER METHODS (mostly unchanged from v2.5.2)
     # ============================================================================
@@ -318,6 +934,27 @@ class CSPSolverCompleteV301:
 
         return teacher_subjects
 
+    def _build_occupancy_factory(self, state_engine, teachers, shared_rooms, active_slots,
+                                 availability=None):
+        """Return a zero-argument callable creating empty occupancy state for one attempt."""
+        if state_engine == "bitmask":
+            # Layout (indexes and cached group masks) is shared by all attempts
+            return BitmaskLayout(teachers, shared_rooms, active_slots, availability).new_state
+        if availability:
+            return partial(OccupancyIndex, availability)
+        return OccupancyIndex
+
+    def _build_distributions(self, classes, subjects, subject_requirements, total_slots):
+        """Periods per subject for every class (grade-specific when requirements given)."""
+        if subject_requirements:
+            if self.debug:
+                print(f"\n[CSP v{self.version}] Using grade-specific subject requirements")
+            return self._build_class_specific_distributions(
+                classes, subjects, subject_requirements, total_slots
+            )
+        subject_distribution = self._calculate_subject_distribution(total_slots, subjects)
+        return {c.id: subject_distribution for c in classes}
+
     def _calculate_subject_distribution(
         self, total_slots: int, subjects: List[Subject]
     ) -> Dict[str, int]:
@@ -391,44 +1028,27 @@ class CSPSolverCompleteV301:
         self, class_obj, subject, slot,
         class_subject_teacher_map,
         teacher_subjects,
-        teachers,
-        teacher_busy,
-        active_slots
+        teacher_lookup,
+        occupancy
     ):
         """Get teacher ensuring consistency (one teacher per subject per class)."""
         key = (class_obj.id, subject.id)
 
         # Check if teacher already assigned
         if key in class_subject_teacher_map:
-            teacher_id = class_subject_teacher_map[key]
-            teacher = next((t for t in teachers if t.id == teacher_id), None)
-
-            if teacher and (teacher.id, slot.id) not in teacher_busy:
-                # Check daily and weekly limits
-                day_count = sum(1 for k in teacher_busy
-                              if k[0] == teacher.id and
-                              any(s.id == k[1] and s.day_of_week == slot.day_of_week
-                                  for s in active_slots))
-
-                if day_count < teacher.max_periods_per_day:
-                    week_count = sum(1 for k in teacher_busy if k[0] == teacher.id)
-                    if week_count < teacher.max_periods_per_week:
-                        return teacher
+            teacher = teacher_lookup.get(class_subject_teacher_map[key])
+
+            # v3.0.1: O(1) daily and weekly limit check via occupancy index
+            if teacher and occupancy.can_assign(teacher, slot):
+                return teacher
 
         # Assign new teacher
-        qualified = teacher_subjects.get(subject.id, [])
-        for teacher in qualified:
-            if (teacher.id, slot.id) not in teacher_busy:
-                day_count = sum(1 for k in teacher_busy
-                              if k[0] == teacher.id and
-                              any(s.id == k[1] and s.day_of_week == slot.day_of_week
-                                  for s in active_slots))
-
-                if day_count < teacher.max_periods_per_day:
-                    week_count = sum(1 for k in teacher_busy if k[0] == teacher.id)
-                    if week_count < teacher.max_periods_per_week:
-                        class_subject_teacher_map[key] = teacher.id
-                        return teacher
+        teacher = occupancy.first_available_teacher(
+            teacher_subjects.get(subject.id, []), slot, group=subject.id
+        )
+        if teacher:
+            class_subject_teacher_map[key] = teacher.id
+            return teacher
 
         return None
 
@@ -442,7 +1062,8 @@ class CSPSolverCompleteV301:
         subject: Subject,
         slot: TimeSlot,
         shared_rooms: List[SharedRoom],
-        shared_room_busy: Set[Tuple[str, str]]
+        occupancy,
+        room_plan: Optional[Dict[str, Any]] = None
     ) -> Tuple[Optional[str], bool]:
         """
         v3.0 SIMPLIFIED ROOM ALLOCATION - 2-LEVEL LOGIC
@@ -456,7 +1077,8 @@ class CSPSolverCompleteV301:
             subject: Subject to schedule
             slot: Time slot
             shared_rooms: List of shared amenities (labs, sports, library, etc.)
-            shared_room_busy: Conflict tracker for ONLY shared rooms
+            occupancy: Occupancy state (tracks conflicts for ONLY shared rooms)
+            room_plan: Per-solve room plan (_build_room_plan); built on the fly if None
 
         Returns:
             Tuple of (room_id, is_shared_room)
@@ -467,7 +1089,10 @@ class CSPSolverCompleteV301:
         # ============================================================================
         # LEVEL 1: Regular subjects → Use pre-assigned home classroom
         # ============================================================================
-        if not self._requires_special_room(subject):
+        if room_plan is None:
+            room_plan = self._build_room_plan([subject], shared_rooms)
+        required_room_type = room_plan["room_type"].get(subject.id)
+        if required_room_type is None:
             # Home classroom is ALWAYS available (no conflict check needed)
             # Each class has its own dedicated home room, so no scheduling conflicts
             return class_obj.home_room_id, False
@@ -475,16 +1100,17 @@ class CSPSolverCompleteV301:
         # ============================================================================
         # LEVEL 2: Special subjects → Allocate from shared amenities
         # ============================================================================
-        required_room_type = self._get_required_room_type(subject)
-        available_shared_rooms = [r for r in shared_rooms if r.type == required_room_type]
-
-        # Find first available shared room
-        for room in available_shared_rooms:
-            conflict_key = (room.id, slot.id)
-            if conflict_key not in shared_room_busy:
-                # Check capacity
-                if room.capacity >= (class_obj.student_count or 30):
-                    return room.id, True
+        # v3.0.1: Rooms of the type are pre-sorted by capacity; the occupancy
+        # keeps them per slot and returns the best-fit free room
+        available_shared_rooms = room_plan["rooms"].get(required_room_type, [])
+
+        room = occupancy.first_free_room(
+            available_shared_rooms, slot,
+            min_capacity=class_obj.student_count or 30,
+            group=required_room_type
+        )
+        if room:
+            return room.id, True
 
         # No shared room available → Return None to trigger error
         if self.debug:
@@ -532,6 +1158,105 @@ class CSPSolverCompleteV301:
         # Art/Music can use classroom-type special rooms
         return RoomType.CLASSROOM
 
+    def _build_room_plan(self, subjects, shared_rooms) -> Dict[str, Any]:
+        """
+        v3.0.1: Room requirements resolved once per solve.
+
+        Returns:
+            {"room_type": {subject_id: RoomType, or None for the home classroom},
+             "rooms": {RoomType or "any": shared rooms sorted by capacity}}
+        """
+        room_type = {
+            subject.id: self._get_required_room_type(subject)
+            if self._requires_special_room(subject) else None
+            for subject in subjects
+        }
+        by_capacity = sorted(shared_rooms, key=lambda room: room.capacity)
+        rooms = {"any": by_capacity}
+        for room in by_capacity:
+            rooms.setdefault(room.type, []).append(room)
+        return {"room_type": room_type, "rooms": rooms}
+
+    # ============================================================================
+    # v3.0.1: MOST-CONSTRAINED-FIRST ORDERING
+    # ============================================================================
+
+    def _order_by_difficulty(
+        self, classes, class_subject_distributions, teacher_subjects,
+        subject_lookup, teacher_lookup, shared_rooms, greedy_assignment, total_slots,
+        availability=None, room_plan=None
+    ):
+        """
+        Order classes hardest first so they are not left with the leftovers.
+
+        A period is hard when the resources it needs are oversubscribed:
+        - Teacher pressure: school-wide periods of the subject per period of
+          qualified teacher capacity (or, with a greedy pre-assignment, the
+          assigned teacher's booked periods over their weekly limit)
+        - Room pressure: periods needing a shared room type per period that
+          rooms of that type offer
+        Periods with no qualified teacher or no room of the needed type cannot
+        be placed in any order and score 0. A class's difficulty is the sum of
+        its periods' pressures; equally hard classes keep request order.
+        """
+        if room_plan is None:
+            room_plan = self._build_room_plan(subject_lookup.values(), shared_rooms)
+        room_types = room_plan["room_type"]
+
+        subject_demand = {}
+        teacher_demand = {}
+        room_type_demand = {}
+        for class_obj in classes:
+            for subject_id, periods in class_subject_distributions.get(class_obj.id, {}).items():
+                subject_demand[subject_id] = subject_demand.get(subject_id, 0) + periods
+                teacher_id = greedy_assignment.get((class_obj.id, subject_id)) if greedy_assignment else None
+                if teacher_id:
+                    teacher_demand[teacher_id] = teacher_demand.get(teacher_id, 0) + periods
+                room_type = room_types.get(subject_id)
+                if room_type is not None:
+                    room_type_demand[room_type] = room_type_demand.get(room_type, 0) + periods
+
+        room_type_supply = {}
+        for room in shared_rooms:
+            room_type_supply[room.type] = room_type_supply.get(room.type, 0) + total_slots
+
+        def capacity(teacher):
+            if availability:
+                return max(1, availability.capacity(teacher))
+            return max(1, min(teacher.max_periods_per_week, total_slots))
+
+        # The greedy pre-assignment falls back to any teacher with capacity
+        # when nobody is qualified, so those teachers count as supply too
+        assigned_teachers = {}
+        for (_, subject_id), teacher_id in (greedy_assignment or {}).items():
+            assigned_teachers.setdefault(subject_id, set()).add(teacher_id)
+
+        subject_pressure = {}
+        for subject_id, demand in subject_demand.items():
+            qualified = {t.id for t in teacher_subjects.get(subject_id, [])}
+            qualified |= assigned_teachers.get(subject_id, set())
+            supply = sum(capacity(teacher_lookup[t]) for t in qualified if t in teacher_lookup)
+            pressure = demand / supply if supply else 0.0
+            room_type = room_types.get(subject_id)
+            if pressure and room_type is not None:
+                room_supply = room_type_supply.get(room_type, 0)
+                pressure = pressure + room_type_demand[room_type] / room_supply if room_supply else 0.0
+            subject_pressure[subject_id] = pressure
+
+        difficulty = {}
+        for class_obj in classes:
+            total = 0.0
+            for subject_id, periods in class_subject_distributions.get(class_obj.id, {}).items():
+                pressure = subject_pressure[subject_id]
+                teacher_id = greedy_assignment.get((class_obj.id, subject_id)) if greedy_assignment else None
+                teacher = teacher_lookup.get(teacher_id) if teacher_id else None
+                if teacher and pressure:
+                    pressure = max(pressure, teacher_demand[teacher_id] / capacity(teacher))
+                total += periods * pressure
+            difficulty[class_obj.id] = total
+
+        return sorted(classes, key=lambda c: -difficulty[c.id])
+
     # ============================================================================
     # MAIN SOLUTION GENERATION
     # ============================================================================
@@ -542,14 +1267,23 @@ class CSPSolverCompleteV301:
         teacher_subjects, class_subject_distributions,
         subject_lookup, teacher_lookup, room_lookup,
         enforce_teacher_consistency,
-        greedy_assignment=None
+        greedy_assignment=None,
+        occupancy_factory=OccupancyIndex,
+        rng=None,
+        deadline=None,
+        room_plan=None
     ):
         """Generate complete solution with v3.0 simplified room allocation."""
-        entries = []
-        entry_id = 1
-
-        teacher_busy = {}
-        shared_room_busy = set()  # v3.0: Only track shared room conflicts
+        rng = rng or random.Random()
+        deadline = deadline or Deadline()
+        room_plan = room_plan or self._build_room_plan(subjects, shared_rooms)
+        timed_out = False
+        # v3.0.1: Compact placement tuples; entries are built only for returned solutions
+        placements = []
+        gaps = {}
+
+        # v3.0.1: O(1) teacher busy/load checks + shared room conflicts
+        occupancy = occupancy_factory()
         class_subject_count = {}
 
         # Use greedy pre-assignment if available
@@ -563,11 +1297,6 @@ class CSPSolverCompleteV301:
             for subject in subjects:
                 class_subject_count[(class_obj.id, subject.id)] = 0
 
-        # v3.0.1: Pre-compute subject metadata to avoid repeated hasattr() checks
-        subject_has_metadata = {}
-        for subj_id, subj in subject_lookup.items():
-            subject_has_metadata[subj_id] = hasattr(subj, 'prefer_morning')
-
         # v3.0.1: Pre-shuffle subjects_to_assign once outside the loop
         shuffled_subjects_by_class = {}
         for class_obj in classes:
@@ -575,11 +1304,16 @@ class CSPSolverCompleteV301:
             subjects_to_assign = []
             for subject_id, count in subject_distribution.items():
                 subjects_to_assign.extend([subject_id] * count)
-            random.shuffle(subjects_to_assign)
+            rng.shuffle(subjects_to_assign)
             shuffled_subjects_by_class[class_obj.id] = subjects_to_assign[:len(active_slots)]
 
         # Schedule each class
-        for class_obj in classes:
+        for class_index, class_obj in enumerate(classes):
+            # v3.0.1: Anytime - stop between classes once the deadline passes
+            if class_index and deadline.expired():
+                timed_out = True
+                break
+
             if self.debug:
                 home_room = room_lookup.get(class_obj.home_room_id)
                 home_room_name = home_room.name if home_room else "MISSING"
@@ -592,9 +1326,6 @@ class CSPSolverCompleteV301:
             # Assign each slot
             for slot_index, slot in enumerate(active_slots):
                 assigned = False
-
-                # v3.0.1: Cache slot.id to avoid repeated attribute access
-                slot_id = slot.id
                 subjects_count = len(subjects_to_assign)
 
                 for try_index in range(subjects_count):
@@ -621,18 +1352,14 @@ class CSPSolverCompleteV301:
                             class_obj, subject, slot,
                             class_subject_teacher_map,
                             teacher_subjects,
-                            teachers,
-                            teacher_busy,
-                            active_slots
+                            teacher_lookup,
+                            occupancy
                         )
                     else:
                         # v3.0.1: Optimized teacher search
-                        available_teacher = None
-                        qualified = teacher_subjects.get(subject_id, [])
-                        for teacher in qualified:
-                            if (teacher.id, slot_id) not in teacher_busy:
-                                available_teacher = teacher
-                                break
+                        available_teacher = occupancy.first_available_teacher(
+                            teacher_subjects.get(subject_id, []), slot, group=subject_id
+                        )
 
                     if not available_teacher:
                         continue
@@ -641,43 +1368,25 @@ class CSPSolverCompleteV301:
                     room_id, is_shared = self._get_appropriate_room_v30(
                         class_obj, subject, slot,
                         shared_rooms,
-                        shared_room_busy
+                        occupancy,
+                        room_plan
                     )
 
                     if not room_id:
                         continue
 
-                    # v3.0.1: Pre-computed metadata check
-                    has_metadata = subject_has_metadata.get(subject_id, False)
-
-                    # Create entry
-                    entry = TimetableEntry(
-                        id=f"entry_{entry_id}",
-                        timetable_id="temp",
-                        class_id=class_id,
-                        subject_id=subject_id,
-                        teacher_id=available_teacher.id,
-                        room_id=room_id,
-                        time_slot_id=slot_id,
-                        day_of_week=slot.day_of_week,
-                        period_number=slot.period_number,
-                        is_shared_room=is_shared,  # v3.0: Mark if shared room
-                        subject_metadata={
-                            "prefer_morning": subject.prefer_morning,
-                            "requires_lab": subject.requires_lab
-                        } if has_metadata else None,
-                        teacher_metadata={
-                            "max_consecutive_periods": available_teacher.max_consecutive_periods
-                        }
-                    )
-
-                    entries.append(entry)
-                    entry_id += 1
+                    # Record placement (v3.0: shared room only if allocated)
+                    placements.append((
+                        class_id, subject_id, available_teacher.id, slot_index,
+                        room_id if is_shared else None
+                    ))
 
                     # Mark resources as busy
-                    teacher_busy[(available_teacher.id, slot_id)] = True
-                    if is_shared:
-                        shared_room_busy.add((room_id, slot_id))
+                    occupancy.commit(
+                        available_teacher.id, slot,
+                        room_id=room_id if is_shared else None,
+                        class_id=class_id
+                    )
 
                     # Update count
                     class_subject_count[count_key] = current_count + 1
@@ -685,39 +1394,20 @@ class CSPSolverCompleteV301:
                     break
 
                 if not assigned:
-                    # Fallback: Self-study
-                    fallback_teacher = teachers[0] if teachers else None
-                    if fallback_teacher:
-                        entry = TimetableEntry(
-                            id=f"entry_{entry_id}",
-                            timetable_id="temp",
-                            class_id=class_obj.id,
-                            subject_id="SELF_STUDY",
-                            teacher_id=fallback_teacher.id,
-                            room_id=class_obj.home_room_id,  # v3.0: Use home classroom
-                            time_slot_id=slot.id,
-                            day_of_week=slot.day_of_week,
-                            period_number=slot.period_number,
-                            is_shared_room=False
-                        )
-                        entries.append(entry)
-                        entry_id += 1
+                    # Fallback: Self-study (in the home classroom, when materialized)
+                    gaps[(class_obj.id, slot_index)] = None
 
-        # Create timetable
-        timetable = Timetable(
-            id="temp",
-            school_id=classes[0].school_id if classes else "",
-            academic_year_id="temp",
-            status=TimetableStatus.DRAFT,
-            entries=entries,
+        return SolutionDraft(
+            placements, gaps,
+            fill_self_study=bool(teachers),
+            expected_entries=len(classes) * len(active_slots),
             metadata={
                 "version": self.version,
                 "teacher_consistency": enforce_teacher_consistency,
-                "room_allocation": "simplified_v3.0"
+                "room_allocation": "simplified_v3.0",
+                "timed_out": timed_out
             }
         )
-
-        return timetable
     
     def _generate_partial_solution(
         self, classes, subjects, teachers, active_slots,
@@ -727,15 +1417,30 @@ class CSPSolverCompleteV301:
         enforce_teacher_consistency,
         greedy_assignment=None,
         relaxation_level=0.0,
-        min_coverage=0.70
+        min_coverage=0.70,
+        occupancy_factory=OccupancyIndex,
+        rng=None,
+        deadline=None,
+        room_plan=None,
+        fixed_placements=None
     ):
-        """Generate partial solution with constraint relaxation."""
-        entries = []
-        entry_id = 1
-        unfilled_slots = []  # Track gaps
+        """
+        Generate partial solution with constraint relaxation.
 
-        teacher_busy = {}
-        shared_room_busy = set()
+        relaxation_level is the top of the ladder: a strict pass at the
+        lowest level, then every RELAXATION_LEVELS step up to it retries only
+        the slots that are still empty (0.0 = strict pass only).
+        fixed_placements (e.g. a backtracking result) are kept as they are;
+        only the slots they leave empty are filled.
+        """
+        rng = rng or random.Random()
+        deadline = deadline or Deadline()
+        room_plan = room_plan or self._build_room_plan(subjects, shared_rooms)
+        timed_out = False
+        placements = []
+        gaps = {}  # Track gaps: (class_id, slot_index) -> GapFacts or reason
+
+        occupancy = occupancy_factory()
         class_subject_count = {}
 
         # Use greedy pre-assignment if available
@@ -749,10 +1454,17 @@ class CSPSolverCompleteV301:
             for subject in subjects:
                 class_subject_count[(class_obj.id, subject.id)] = 0
 
-        # Pre-compute subject metadata
-        subject_has_metadata = {}
-        for subj_id, subj in subject_lookup.items():
-            subject_has_metadata[subj_id] = hasattr(subj, 'prefer_morning')
+        # v3.0.1: Fixed placements occupy their resources and count towards
+        # the quotas before the strict pass starts
+        filled = set()
+        for class_id, subject_id, teacher_id, slot_index, shared_room_id in fixed_placements or []:
+            placements.append((class_id, subject_id, teacher_id, slot_index, shared_room_id))
+            occupancy.commit(teacher_id, active_slots[slot_index],
+                             room_id=shared_room_id, class_id=class_id)
+            class_subject_count[(class_id, subject_id)] = \
+                class_subject_count.get((class_id, subject_id), 0) + 1
+            class_subject_teacher_map[(class_id, subject_id)] = teacher_id
+            filled.add((class_id, slot_index))
 
         # Pre-shuffle subjects_to_assign
         shuffled_subjects_by_class = {}
@@ -761,180 +1473,626 @@ class CSPSolverCompleteV301:
             subjects_to_assign = []
             for subject_id, count in subject_distribution.items():
                 subjects_to_assign.extend([subject_id] * count)
-            random.shuffle(subjects_to_assign)
+            rng.shuffle(subjects_to_assign)
             shuffled_subjects_by_class[class_obj.id] = subjects_to_assign[:len(active_slots)]
 
-        # Schedule each class with relaxed constraints
-        for class_obj in classes:
-            subject_distribution = class_subject_distributions.get(class_obj.id, {})
-            subjects_to_assign = shuffled_subjects_by_class.get(class_obj.id, [])
+        # v3.0.1: Incremental relaxation ladder - the strict pass fills every
+        # slot it can, then each looser level only retries the slots still
+        # empty, keeping all placements, loads and teacher choices so far
+        ladder = [level for level in self.RELAXATION_LEVELS if level < relaxation_level]
+        ladder.append(relaxation_level)
+        level_fills = {level: 0 for level in ladder}
+
+        def fill_slot(class_obj, slot_index, slot, level):
+            """
+            Place the best-scoring subject for one slot at one relaxation level.
+
+            Returns None when a period was placed, otherwise the slot's
+            GapFacts (per-subject rejection counters).
+            """
+            class_id = class_obj.id
+            subject_distribution = class_subject_distributions.get(class_id, {})
+            subjects_to_assign = shuffled_subjects_by_class.get(class_id, [])
+            subjects_count = len(subjects_to_assign)
+            best_assignment = None
+            assignment_score = -1
+            quota_met = blocked_by_teacher = blocked_by_room = 0
+
+            for try_index in range(subjects_count):
+                actual_index = (slot_index + try_index) % subjects_count
+                subject_id = subjects_to_assign[actual_index]
+                subject = subject_lookup.get(subject_id)
+
+                if not subject:
+                    continue
+
+                count_key = (class_id, subject_id)
+                current_count = class_subject_count.get(count_key, 0)
+                target_count = subject_distribution.get(subject_id, 0)
+
+                # Relaxed constraint: allow some over-allocation
+                if level < 0.5 and current_count >= target_count:
+                    quota_met += 1
+                    continue
+                elif level >= 0.5 and current_count >= target_count * (1 + level):
+                    quota_met += 1
+                    continue
+
+                # Get teacher with relaxation
+                available_teacher = self._get_teacher_with_relaxation(
+                    class_obj, subject, slot,
+                    class_subject_teacher_map,
+                    teacher_subjects, teachers, teacher_lookup,
+                    occupancy,
+                    enforce_teacher_consistency,
+                    level
+                )
 
-            # Assign each slot
-            for slot_index, slot in enumerate(active_slots):
-                assigned = False
-                slot_id = slot.id
-                subjects_count = len(subjects_to_assign)
-                best_assignment = None
-                assignment_score = -1
+                if not available_teacher:
+                    blocked_by_teacher += 1
+                    continue
 
-                for try_index in range(subjects_count):
-                    actual_index = (slot_index + try_index) % subjects_count
-                    subject_id = subjects_to_assign[actual_index]
-                    subject = subject_lookup.get(subject_id)
+                # Get room with relaxation
+                room_id, is_shared = self._get_room_with_relaxation(
+                    class_obj, subject, slot,
+                    shared_rooms, occupancy,
+                    level,
+                    room_plan
+                )
 
-                    if not subject:
-                        continue
+                if not room_id:
+                    blocked_by_room += 1
+                    continue
 
-                    class_id = class_obj.id
-                    count_key = (class_id, subject_id)
-                    current_count = class_subject_count.get(count_key, 0)
-                    target_count = subject_distribution.get(subject_id, 0)
+                # Calculate assignment quality score
+                score = self._calculate_assignment_score(
+                    subject, slot, available_teacher, room_id,
+                    current_count, target_count, level
+                )
 
-                    # Relaxed constraint: allow some over-allocation
-                    if relaxation_level < 0.5 and current_count >= target_count:
-                        continue
-                    elif relaxation_level >= 0.5 and current_count >= target_count * (1 + relaxation_level):
-                        continue
+                # Keep the best assignment for this slot
+                if score > assignment_score:
+                    assignment_score = score
+                    best_assignment = {
+                        'subject': subject,
+                        'teacher': available_teacher,
+                        'room_id': room_id,
+                        'is_shared': is_shared,
+                        'count_key': count_key
+                    }
+
+            if not best_assignment:
+                return (quota_met, blocked_by_teacher, blocked_by_room)
+
+            # Apply the best assignment
+            shared_room_id = best_assignment['room_id'] if best_assignment['is_shared'] else None
+            placements.append((
+                class_id, best_assignment['subject'].id,
+                best_assignment['teacher'].id, slot_index, shared_room_id
+            ))
+
+            # Mark resources as busy
+            occupancy.commit(
+                best_assignment['teacher'].id, slot,
+                room_id=shared_room_id,
+                class_id=class_id
+            )
 
-                    # Get teacher with relaxation
-                    available_teacher = self._get_teacher_with_relaxation(
-                        class_obj, subject, slot,
-                        class_subject_teacher_map,
-                        teacher_subjects, teachers,
-                        teacher_busy, active_slots,
-                        enforce_teacher_consistency,
-                        relaxation_level
-                    )
+            # Update count
+            class_subject_count[best_assignment['count_key']] += 1
+            level_fills[level] += 1
+            return None
 
-                    if not available_teacher:
-                        continue
+        # Strict pass: schedule each class
+        for class_index, class_obj in enumerate(classes):
+            # v3.0.1: Anytime - stop between classes once the deadline passes;
+            # the remaining classes are reported as gaps
+            if class_index and deadline.expired():
+                timed_out = True
+                for skipped in classes[class_index:]:
+                    for slot_index in range(len(active_slots)):
+                        if (skipped.id, slot_index) not in filled:
+                            gaps[(skipped.id, slot_index)] = "Time budget exhausted"
+                break
 
-                    # Get room with relaxation
-                    room_id, is_shared = self._get_room_with_relaxation(
-                        class_obj, subject, slot,
-                        shared_rooms, shared_room_busy,
-                        relaxation_level
-                    )
+            for slot_index, slot in enumerate(active_slots):
+                if (class_obj.id, slot_index) in filled:
+                    continue
+                # v3.0.1: Only compact facts are kept for an empty slot; the
+                # human-readable reason is rendered for returned solutions
+                facts = fill_slot(class_obj, slot_index, slot, ladder[0])
+                if facts is not None:
+                    gaps[(class_obj.id, slot_index)] = facts
+
+        # Looser levels: only the slots still empty
+        class_lookup = {c.id: c for c in classes}
+        for level in ladder[1:]:
+            open_gaps = [key for key, facts in gaps.items() if isinstance(facts, tuple)]
+            if not open_gaps:
+                break
+            if deadline.expired():
+                timed_out = True
+                break
+            for key in open_gaps:
+                class_id, slot_index = key
+                facts = fill_slot(class_lookup[class_id], slot_index, active_slots[slot_index], level)
+                if facts is None:
+                    del gaps[key]
+                else:
+                    gaps[key] = facts
 
-                    if not room_id:
-                        continue
+        # Calculate coverage
+        expected_entries = len(classes) * len(active_slots)
+        actual_entries = len(placements)
+        coverage = actual_entries / expected_entries if expected_entries > 0 else 0
 
-                    # Calculate assignment quality score
-                    score = self._calculate_assignment_score(
-                        subject, slot, available_teacher, room_id,
-                        current_count, target_count, relaxation_level
-                    )
+        # Only return solution if it meets minimum coverage (a timed-out
+        # attempt is still returned, as a best-so-far candidate)
+        if coverage < min_coverage and not timed_out:
+            return None
 
-                    # Keep the best assignment for this slot
-                    if score > assignment_score:
-                        assignment_score = score
-                        best_assignment = {
-                            'subject': subject,
-                            'teacher': available_teacher,
-                            'room_id': room_id,
-                            'is_shared': is_shared,
-                            'count_key': count_key
-                        }
-
-                # Apply the best assignment if found
-                if best_assignment:
-                    entry = TimetableEntry(
-                        id=f"entry_{entry_id}",
-                        timetable_id="temp",
-                        class_id=class_obj.id,
-                        subject_id=best_assignment['subject'].id,
-                        teacher_id=best_assignment['teacher'].id,
-                        room_id=best_assignment['room_id'],
-                        time_slot_id=slot_id,
-                        day_of_week=slot.day_of_week,
-                        period_number=slot.period_number,
-                        is_shared_room=best_assignment['is_shared'],
-                        subject_metadata={
-                            "prefer_morning": best_assignment['subject'].prefer_morning,
-                            "requires_lab": best_assignment['subject'].requires_lab
-                        } if subject_has_metadata.get(best_assignment['subject'].id, False) else None,
-                        teacher_metadata={
-                            "max_consecutive_periods": best_assignment['teacher'].max_consecutive_periods
-                        }
-                    )
+        # Gap information (unfilled_slots) is added when the draft is materialized
+        return SolutionDraft(
+            placements, gaps,
+            fill_self_study=False,
+            expected_entries=expected_entries,
+            metadata={
+                "version": self.version,
+                "teacher_consistency": enforce_teacher_consistency,
+                "room_allocation": "simplified_v3.0",
+                "coverage": coverage,
+                # Loosest level that had to place a period (0.0 = strict pass only)
+                "relaxation_level": max([level for level in ladder if level_fills[level]] or [ladder[0]]),
+                "relaxation_fills": {str(level): count for level, count in level_fills.items()},
+                "timed_out": timed_out
+            }
+        )
+    
+    def _coverage_bound(self, classes, active_slots, teachers, availability,
+                        class_subject_distributions, subject_lookup):
+        """
+        Upper bound on the coverage any partial attempt can reach.
+
+        The relaxation ladder (which also fills the gaps backtracking leaves)
+        may hand a slot to any free teacher and exceed subject quotas by the
+        top relaxation level, so only two limits hold: one class per
+        available teacher in each slot, and each class's relaxed quotas.
+        """
+        expected = len(classes) * len(active_slots)
+        if expected == 0:
+            return 1.0
+
+        teacher_masks = [availability.slots(t.id) for t in teachers]
+        per_slot = sum(
+            min(len(classes), sum(mask >> i & 1 for mask in teacher_masks))
+            for i in range(len(active_slots))
+        )
+        top = self.RELAXATION_LEVELS[-1]
+        per_class = sum(
+            min(len(active_slots), sum(
+                math.ceil(count * (1 + top)) if top >= 0.5 else count
+                for subject_id, count in class_subject_distributions.get(class_obj.id, {}).items()
+                if subject_id in subject_lookup
+            ))
+            for class_obj in classes
+        )
+        return min(per_slot, per_class) / expected
+
+    def _build_attempt_plan(self, search_mode, allow_partial_solutions, num_solutions, seed):
+        """Ordered list of independent attempts, each with its own seed."""
+        if search_mode == "backtracking":
+            kinds = [("backtracking", None)] * num_solutions
+        elif allow_partial_solutions:
+            kinds = [("partial", self.RELAXATION_LEVELS[-1])] * num_solutions
+        else:
+            kinds = [("complete", None)] * num_solutions
+
+        seeds = plan_seeds(len(kinds), seed)
+        return [
+            Attempt(index=i, kind=kind, seed=seed, relaxation=relaxation)
+            for i, ((kind, relaxation), seed) in enumerate(zip(kinds, seeds))
+        ]
+
+    def _shared_room_ids(self, class_obj, class_subject_distributions, room_plan):
+        """Ids of the shared rooms a class may be given (any room of a required type)."""
+        room_ids = []
+        for subject_id, count in class_subject_distributions.get(class_obj.id, {}).items():
+            room_type = room_plan["room_type"].get(subject_id)
+            if count > 0 and room_type is not None:
+                room_ids.extend(room.id for room in room_plan["rooms"].get(room_type, []))
+        return room_ids
+
+    def _component_problem(self, problem, component, state_engine, availability):
+        """Problem instance restricted to one component's classes, teachers and shared rooms."""
+        class_ids = {c.id for c in component.classes}
+        teacher_ids = {t.id for t in component.teachers}
+        home_room_ids = {c.home_room_id for c in component.classes}
+        sub = dict(problem)
+        sub.update({
+            "classes": component.classes,
+            "teachers": component.teachers,
+            "shared_rooms": component.shared_rooms,
+            "rooms": [r for r in problem["rooms"] if r.id in home_room_ids] + component.shared_rooms,
+            "teacher_subjects": {
+                subject_id: [t for t in qualified if t.id in teacher_ids]
+                for subject_id, qualified in problem["teacher_subjects"].items()
+            },
+            "greedy_assignment": {
+                key: teacher_id for key, teacher_id in problem["greedy_assignment"].items()
+                if key[0] in class_ids
+            },
+            # Coverage is checked on the merged draft
+            "min_coverage": 0.0,
+            "occupancy_factory": self._build_occupancy_factory(
+                state_engine, component.teachers, component.shared_rooms,
+                problem["active_slots"], availability
+            ),
+            "room_plan": self._build_room_plan(problem["subjects"], component.shared_rooms),
+            "components": []
+        })
+        scheduler = problem["scheduler"]
+        if scheduler is not None:
+            # The attempt's node budget is shared by its components
+            share = len(component.classes) / len(problem["classes"])
+            sub["scheduler"] = BacktrackingScheduler(
+                node_limit=max(1, round(scheduler.node_limit * share)),
+                time_limit=scheduler.time_limit,
+                debug=scheduler.debug
+            )
+        return sub
+
+    def _merge_component_results(self, results, count):
+        """Yield one (attempt, merged draft) per attempt from its per-component results."""
+        pending = []
+        for attempt, result in results:
+            pending.append(result)
+            if len(pending) == count:
+                parts, pending = pending, []
+                yield replace(attempt, component=None), \
+                    lambda parts=parts: merge_drafts([part() for part in parts])
+
+    def _relax_backtracking_gaps(self, p, draft, rng):
+        """
+        Partial mode: hand the slots backtracking left empty to the ladder.
 
-                    entries.append(entry)
-                    entry_id += 1
+        Backtracking keeps the planned teachers and room types, so demand they
+        cannot carry stays unplaced; the ladder may relax quotas, teachers and
+        rooms for those slots only. The search placements are kept as they are.
+        """
+        relaxed = self._generate_partial_solution(
+            p["classes"], p["subjects"], p["teachers"], p["active_slots"],
+            p["rooms"], p["shared_rooms"],
+            p["teacher_subjects"], p["class_subject_distributions"],
+            p["subject_lookup"], p["teacher_lookup"], p["room_lookup"],
+            p["enforce_teacher_consistency"],
+            p["greedy_assignment"],
+            relaxation_level=self.RELAXATION_LEVELS[-1],
+            min_coverage=0.0,
+            occupancy_factory=p["occupancy_factory"],
+            rng=rng,
+            deadline=p["deadline"],
+            room_plan=p["room_plan"],
+            fixed_placements=draft.placements
+        )
+        metadata = dict(draft.metadata)
+        metadata.update(
+            teacher_consistency=relaxed.metadata["teacher_consistency"],
+            coverage=relaxed.metadata["coverage"],
+            relaxation_level=relaxed.metadata["relaxation_level"],
+            relaxation_fills=relaxed.metadata["relaxation_fills"],
+            timed_out=draft.metadata["timed_out"] or relaxed.metadata["timed_out"]
+        )
+        return SolutionDraft(
+            relaxed.placements, relaxed.gaps,
+            fill_self_study=False,
+            expected_entries=relaxed.expected_entries,
+            metadata=metadata
+        )
 
-                    # Mark resources as busy
-                    teacher_busy[(best_assignment['teacher'].id, slot_id)] = True
-                    if best_assignment['is_shared']:
-                        shared_room_busy.add((best_assignment['room_id'], slot_id))
+    def _run_attempt(self, problem, attempt):
+        """Run one planned attempt against a shipped problem instance."""
+        p = problem if attempt.component is None else problem["components"][attempt.component]
+        rng = random.Random(attempt.seed)
+        if attempt.kind == "backtracking":
+            solution = self._generate_backtracking_solution(
+                p["scheduler"], p["classes"], p["active_slots"], p["shared_rooms"],
+                p["teacher_subjects"], p["class_subject_distributions"],
+                p["subject_lookup"], p["teacher_lookup"],
+                p["greedy_assignment"], p["teachers"],
+                p["allow_partial_solutions"],
+                rng=rng,
+                deadline=p["deadline"],
+                teacher_slots=p["teacher_slots"],
+                slot_domains=p["slot_domains"],
+                room_plan=p["room_plan"]
+            )
+            if p["allow_partial_solutions"] and solution.gaps and not p["deadline"].expired():
+                solution = self._relax_backtracking_gaps(p, solution, rng)
+        elif attempt.kind == "partial":
+            solution = self._generate_partial_solution(
+                p["classes"], p["subjects"], p["teachers"], p["active_slots"],
+                p["rooms"], p["shared_rooms"],
+                p["teacher_subjects"], p["class_subject_distributions"],
+                p["subject_lookup"], p["teacher_lookup"], p["room_lookup"],
+                p["enforce_teacher_consistency"],
+                p["greedy_assignment"],
+                relaxation_level=attempt.relaxation,
+                min_coverage=p["min_coverage"],
+                occupancy_factory=p["occupancy_factory"],
+                rng=rng,
+                deadline=p["deadline"],
+                room_plan=p["room_plan"]
+            )
+        else:
+            solution = self._generate_complete_solution(
+                p["classes"], p["subjects"], p["teachers"], p["active_slots"],
+                p["rooms"], p["shared_rooms"],
+                p["teacher_subjects"], p["class_subject_distributions"],
+                p["subject_lookup"], p["teacher_lookup"], p["room_lookup"],
+                p["enforce_teacher_consistency"],
+                p["greedy_assignment"],
+                occupancy_factory=p["occupancy_factory"],
+                rng=rng,
+                deadline=p["deadline"],
+                room_plan=p["room_plan"]
+            )
 
-                    # Update count
-                    class_subject_count[best_assignment['count_key']] += 1
-                    assigned = True
+        if solution:
+            solution.metadata["seed"] = p["seed"]
+            solution.metadata["attempt_seed"] = attempt.seed
+        return solution
 
-                if not assigned:
-                    # Track unfilled slot
-                    unfilled_slots.append({
-                        'class_id': class_obj.id,
-                        'class_name': class_obj.name,
-                        'time_slot_id': slot_id,
-                        'day': slot.day_of_week.value,
-                        'period': slot.period_number,
-                        'reason': self._determine_gap_reason(class_obj, slot, subjects_to_assign,
-                                                           teacher_subjects, teachers,
-                                                           shared_rooms, teacher_busy,
-                                                           shared_room_busy)
-                    })
+    def _generate_backtracking_solution(
+        self, scheduler, classes, active_slots, shared_rooms,
+        teacher_subjects, class_subject_distributions,
+        subject_lookup, teacher_lookup,
+        greedy_assignment, teachers,
+        allow_partial_solutions,
+        rng=None,
+        deadline=None,
+        teacher_slots=None,
+        slot_domains=None,
+        room_plan=None
+    ):
+        """
+        Build one timetable with BacktrackingScheduler.
+
+        Slots left empty by the search become SELF_STUDY in complete mode and
+        unfilled_slots in partial mode, like the greedy generators.
+        """
+        teacher_for = self._build_fixed_teacher_map(
+            classes, class_subject_distributions, greedy_assignment, teacher_subjects
+        )
+
+        result = scheduler.search(
+            classes, active_slots, shared_rooms, class_subject_distributions,
+            teacher_for, teacher_lookup, subject_lookup,
+            lambda class_obj, subject: self._shared_room_candidates(
+                class_obj, subject, shared_rooms, room_plan
+            ),
+            slot_domains=slot_domains,
+            rng=rng,
+            teacher_slots=teacher_slots,
+            cancel_token=deadline.cancel_token if deadline is not None else None
+        )
+
+        # The scheduler's time limit is capped by the solve deadline
+        timed_out = result.budget_exhausted and deadline is not None and deadline.expired()
+
+        if timed_out:
+            reason = "Time budget exhausted"
+        elif result.budget_exhausted:
+            reason = "Search budget exhausted"
+        elif result.unplaceable:
+            reason = "Demand exceeds teacher or shared room capacity"
+        else:
+            reason = "No subject demand left"
 
-        # Calculate coverage
         expected_entries = len(classes) * len(active_slots)
-        actual_entries = len(entries)
-        coverage = actual_entries / expected_entries if expected_entries > 0 else 0
+        filled = {(placement[0], placement[3]) for placement in result.placements}
+        gaps = {
+            (class_obj.id, slot_index): reason
+            for class_obj in classes for slot_index in range(len(active_slots))
+            if (class_obj.id, slot_index) not in filled
+        }
+        return SolutionDraft(
+            result.placements, gaps,
+            fill_self_study=not allow_partial_solutions and bool(teachers),
+            expected_entries=expected_entries,
+            metadata={
+                "version": self.version,
+                "teacher_consistency": True,
+                "room_allocation": "simplified_v3.0",
+                "coverage": len(result.placements) / expected_entries if expected_entries > 0 else 0.0,
+                "relaxation_level": 0.0,
+                "search_mode": "backtracking",
+                "search_complete": result.complete,
+                "search_nodes": result.nodes,
+                "search_backtracks": result.backtracks,
+                "search_restarts": result.restarts,
+                "unplaceable_periods": sum(result.unplaceable.values()),
+                "timed_out": timed_out
+            }
+        )
+
+    def _build_fixed_teacher_map(self, classes, class_subject_distributions,
+                                 greedy_assignment, teacher_subjects):
+        """Teacher per (class, subject): greedy map, else first qualified teacher."""
+        teacher_for = dict(greedy_assignment or {})
+        for class_obj in classes:
+            for subject_id in class_subject_distributions.get(class_obj.id, {}):
+                key = (class_obj.id, subject_id)
+                if key not in teacher_for and teacher_subjects.get(subject_id):
+                    teacher_for[key] = teacher_subjects[subject_id][0].id
+        return teacher_for
+
+    def _shared_room_candidates(self, class_obj, subject, shared_rooms, room_plan=None):
+        """
+        Shared-room indices a (class, subject) may use.
 
-        # Only return solution if it meets minimum coverage
-        if coverage < min_coverage:
+        Returns None for home-classroom subjects, otherwise the indices of
+        shared rooms of the required type that fit the class (may be empty).
+        The required type comes from room_plan (built on the fly if None).
+        """
+        if room_plan is None:
+            room_plan = self._build_room_plan([subject], shared_rooms)
+        required_room_type = room_plan["room_type"].get(subject.id)
+        if required_room_type is None:
             return None
+        min_capacity = class_obj.student_count or 30
+        return [k for k, r in enumerate(shared_rooms)
+                if r.type == required_room_type and r.capacity >= min_capacity]
+
+    def _materialize_draft(self, draft, problem):
+        """Build the Timetable for a SolutionDraft that is being returned."""
+        p = problem
+        return self._build_timetable_from_placements(
+            draft.placements, p["classes"], p["active_slots"],
+            p["subject_lookup"], p["teacher_lookup"], p["teachers"],
+            not draft.fill_self_study, None, draft.metadata,
+            gaps=draft.gaps
+        )
+
+    def _build_timetable_from_placements(
+        self, placements, classes, active_slots,
+        subject_lookup, teacher_lookup, teachers,
+        allow_partial_solutions, gap_reason, metadata,
+        gaps=None
+    ):
+        """
+        Materialize (class, subject, teacher, slot index, shared room) placements.
+
+        Used for every returned solution (greedy and backtracking drafts,
+        CP-SAT, incremental re-solve). Empty slots become SELF_STUDY in
+        complete mode and unfilled_slots in partial mode. gaps maps
+        (class_id, slot_index) to a reason or GapFacts; when given, only those
+        slots are treated as empty, otherwise every unplaced slot is, with
+        gap_reason.
+
+        Entries come from trusted solver state, so they are constructed
+        without re-validation, and entries of the same subject/teacher share
+        one metadata dict. Each slot's day is converted to the v3.0 DayOfWeek
+        once, since the request's time slots carry the v2.5 enum.
+        """
+        class_lookup = {c.id: c for c in classes}
+        subject_metadata = {
+            subj_id: {"prefer_morning": subj.prefer_morning, "requires_lab": subj.requires_lab}
+            if hasattr(subj, 'prefer_morning') else None
+            for subj_id, subj in subject_lookup.items()
+        }
+        teacher_metadata = {}
+        slot_days = [DayOfWeek(slot.day_of_week.value) for slot in active_slots]
 
-        # Create timetable with gap information
-        timetable = Timetable(
+        entries = []
+        filled = set()
+        for class_id, subject_id, teacher_id, slot_index, shared_room_id in placements:
+            slot = active_slots[slot_index]
+            if teacher_id not in teacher_metadata:
+                teacher_metadata[teacher_id] = {
+                    "max_consecutive_periods": teacher_lookup[teacher_id].max_consecutive_periods
+                }
+            entries.append(TimetableEntry.model_construct(
+                id=f"entry_{len(entries) + 1}",
+                timetable_id="temp",
+                class_id=class_id,
+                subject_id=subject_id,
+                teacher_id=teacher_id,
+                room_id=shared_room_id or class_lookup[class_id].home_room_id,
+                time_slot_id=slot.id,
+                day_of_week=slot_days[slot_index],
+                period_number=slot.period_number,
+                is_shared_room=shared_room_id is not None,
+                subject_metadata=subject_metadata[subject_id],
+                teacher_metadata=teacher_metadata[teacher_id]
+            ))
+            filled.add((class_id, slot_index))
+
+        if gaps is None:
+            gaps = {
+                (class_obj.id, slot_index): gap_reason
+                for class_obj in classes for slot_index in range(len(active_slots))
+                if (class_obj.id, slot_index) not in filled
+            }
+
+        unfilled_slots = []
+        for (class_id, slot_index), reason in gaps.items():
+            class_obj = class_lookup[class_id]
+            slot = active_slots[slot_index]
+            if allow_partial_solutions:
+                unfilled_slots.append({
+                    'class_id': class_id,
+                    'class_name': class_obj.name,
+                    'time_slot_id': slot.id,
+                    'day': slot.day_of_week.value,
+                    'period': slot.period_number,
+                    'reason': describe_gap(reason)
+                })
+            elif teachers:
+                # Fallback: Self-study
+                entries.append(TimetableEntry.model_construct(
+                    id=f"entry_{len(entries) + 1}",
+                    timetable_id="temp",
+                    class_id=class_id,
+                    subject_id="SELF_STUDY",
+                    teacher_id=teachers[0].id,
+                    room_id=class_obj.home_room_id,
+                    time_slot_id=slot.id,
+                    day_of_week=slot_days[slot_index],
+                    period_number=slot.period_number,
+                    is_shared_room=False
+                ))
+
+        expected_entries = len(classes) * len(active_slots)
+        timetable_metadata = {
+            "version": self.version,
+            "teacher_consistency": True,
+            "room_allocation": "simplified_v3.0",
+            "coverage": len(placements) / expected_entries if expected_entries > 0 else 0.0,
+            "relaxation_level": 0.0,
+            "unfilled_slots": unfilled_slots,
+            "gaps_count": len(unfilled_slots),
+            "entries_count": len(entries),
+            "expected_entries": expected_entries
+        }
+        timetable_metadata.update(metadata)
+
+        return Timetable(
             id="temp",
             school_id=classes[0].school_id if classes else "",
             academic_year_id="temp",
             status=TimetableStatus.DRAFT,
             entries=entries,
-            metadata={
-                "version": self.version,
-                "teacher_consistency": enforce_teacher_consistency,
-                "room_allocation": "simplified_v3.0",
-                "coverage": coverage,
-                "relaxation_level": relaxation_level,
-                "unfilled_slots": unfilled_slots,
-                "gaps_count": len(unfilled_slots),
-                "entries_count": len(entries),
-                "expected_entries": expected_entries
-            }
+            metadata=timetable_metadata
         )
 
-        return timetable
-    
     def _calculate_coverage(self, timetable, num_classes, num_slots):
-        """Calculate coverage percentage for a timetable."""
-        if not timetable or not timetable.entries:
+        """Calculate coverage percentage for a timetable or SolutionDraft."""
+        if not timetable:
             return 0.0
-        
+
         expected_entries = num_classes * num_slots
-        actual_entries = len(timetable.entries)
+        if isinstance(timetable, SolutionDraft):
+            actual_entries = timetable.entries_count
+        else:
+            actual_entries = len(timetable.entries)
         return actual_entries / expected_entries if expected_entries > 0 else 0.0
     
     def _log_solution_stats(self, solution, num_classes, num_slots):
-        """Log statistics about a generated solution."""
-        entries_count = len(solution.entries)
+        """Log statistics about a generated solution (Timetable or SolutionDraft)."""
         expected = num_classes * num_slots
         coverage = solution.metadata.get('coverage', 0)
         relaxation = solution.metadata.get('relaxation_level', 0)
-        gaps = solution.metadata.get('gaps_count', 0)
-        
+
         # Count room allocation types
-        home_room_count = sum(1 for e in solution.entries if not getattr(e, 'is_shared_room', False))
-        shared_room_count = sum(1 for e in solution.entries if getattr(e, 'is_shared_room', False))
+        if isinstance(solution, SolutionDraft):
+            entries_count = solution.entries_count
+            gaps = 0 if solution.fill_self_study else len(solution.gaps)
+            shared_room_count = solution.shared_room_count
+        else:
+            entries_count = len(solution.entries)
+            gaps = solution.metadata.get('gaps_count', 0)
+            shared_room_count = sum(1 for e in solution.entries if getattr(e, 'is_shared_room', False))
+        home_room_count = entries_count - shared_room_count
         
         print(f"  [OK] Generated {entries_count}/{expected} entries ({coverage*100:.1f}% coverage)")
         print(f"  Relaxation Level: {relaxation:.1f}, Gaps: {gaps}")
@@ -944,7 +2102,7 @@ class CSPSolverCompleteV301:
             print(f"    - Shared Amenities: {shared_room_count} periods ({(shared_room_count/entries_count)*100:.1f}%)")
     
     def _get_teacher_with_relaxation(self, class_obj, subject, slot, class_subject_teacher_map,
-                                   teacher_subjects, teachers, teacher_busy, active_slots,
+                                   teacher_subjects, teachers, teacher_lookup, occupancy,
                                    enforce_teacher_consistency, relaxation_level):
         """Get available teacher with constraint relaxation."""
         
@@ -952,39 +2110,41 @@ class CSPSolverCompleteV301:
             # Try to get consistent teacher first
             available_teacher = self._get_consistent_teacher(
                 class_obj, subject, slot, class_subject_teacher_map,
-                teacher_subjects, teachers, teacher_busy, active_slots
+                teacher_subjects, teacher_lookup, occupancy
             )
             if available_teacher:
                 return available_teacher
             
-            # If relaxation allows, try any qualified teacher
+            # If relaxation allows, try any qualified teacher (load limits relaxed)
             if relaxation_level >= 0.3:
                 qualified = teacher_subjects.get(subject.id, [])
                 for teacher in qualified:
-                    if (teacher.id, slot.id) not in teacher_busy:
+                    if occupancy.is_teacher_free(teacher.id, slot.id):
                         return teacher
         else:
             # Standard teacher search
-            qualified = teacher_subjects.get(subject.id, [])
-            for teacher in qualified:
-                if (teacher.id, slot.id) not in teacher_busy:
-                    return teacher
+            teacher = occupancy.first_available_teacher(
+                teacher_subjects.get(subject.id, []), slot, group=subject.id
+            )
+            if teacher:
+                return teacher
         
         # High relaxation: allow any teacher for any subject (emergency measure)
         if relaxation_level >= 0.8:
             for teacher in teachers:
-                if (teacher.id, slot.id) not in teacher_busy:
+                if occupancy.is_teacher_free(teacher.id, slot.id):
                     return teacher
         
         return None
     
     def _get_room_with_relaxation(self, class_obj, subject, slot, shared_rooms, 
-                                shared_room_busy, relaxation_level):
+                                occupancy, relaxation_level, room_plan=None):
         """Get appropriate room with constraint relaxation."""
-        
+        room_plan = room_plan or self._build_room_plan([subject], shared_rooms)
+
         # Try standard room allocation first
         room_id, is_shared = self._get_appropriate_room_v30(
-            class_obj, subject, slot, shared_rooms, shared_room_busy
+            class_obj, subject, slot, shared_rooms, occupancy, room_plan
         )
         
         if room_id:
@@ -997,11 +2157,13 @@ class CSPSolverCompleteV301:
         
         # High relaxation: try any available shared room regardless of type
         if relaxation_level >= 0.8:
-            for room in shared_rooms:
-                conflict_key = (room.id, slot.id)
-                if conflict_key not in shared_room_busy:
-                    if room.capacity >= (class_obj.student_count or 30):
-                        return room.id, True
+            room = occupancy.first_free_room(
+                room_plan["rooms"]["any"], slot,
+                min_capacity=class_obj.student_count or 30,
+                group="any"
+            )
+            if room:
+                return room.id, True
         
         return None, False
     
@@ -1031,42 +2193,3 @@ class CSPSolverCompleteV301:
         score -= int(relaxation_level * 20)
         
         return score
-    
-    def _determine_gap_reason(self, class_obj, slot, subjects_to_assign, 
-                            teacher_subjects, teachers, shared_rooms, 
-                            teacher_busy, shared_room_busy):
-        """Determine why a slot couldn't be filled."""
-        reasons = []
-        
-        # Check if any subjects need to be assigned
-        if not subjects_to_assign:
-            reasons.append("No subjects configured for this class")
-            return "; ".join(reasons)
-        
-        # Check teacher availability
-        available_teachers = 0
-        for subject_id in subjects_to_assign[:3]:  # Check first few subjects
-            qualified = teacher_subjects.get(subject_id, [])
-            for teacher in qualified:
-                if (teacher.id, slot.id) not in teacher_busy:
-                    available_teachers += 1
-                    break
-        
-        if available_teachers == 0:
-            reasons.append("No teachers available")
-        
-        # Check room availability for lab subjects
-        lab_subjects = [s for s in subjects_to_assign[:3] if s in [sub.id for sub in shared_rooms if 'lab' in sub.name.lower()]]
-        if lab_subjects:
-            available_labs = 0
-            for room in shared_rooms:
-                if room.type.value == "LAB":
-                    if (room.id, slot.id) not in shared_room_busy:
-                        available_labs += 1
-            if available_labs == 0:
-                reasons.append("No lab rooms available")
-        
-        if not reasons:
-            reasons.append("Complex constraint conflicts")
-        
-        return "; ".join(reasons)
@@ -0,0 +1,164 @@
+"""
+School Decomposition - independent class/teacher/shared-room components
+
+PURPOSE:
+Teachers, shared rooms and classes often form nearly independent clusters:
+primary and secondary wings share no teachers, kindergarten never uses the
+physics lab. Every solver attempt still scheduled the whole school as one
+problem, so run time grew with the total class count even when the wings
+never interact.
+
+This module builds the conflict graph of one solve - a class is linked to
+the teacher pre-assigned to each of its subjects and to every shared room
+it may use - and splits it into connected components with union-find. Each
+component is a self-contained sub-problem (its classes, teachers and shared
+rooms only), so its attempts can run in their own worker processes, and
+merge_drafts() joins the component drafts of one attempt back into a single
+SolutionDraft for the whole school.
+
+Teachers and shared rooms no class is linked to go to the first component,
+so the relaxation ladder can still fall back on them.
+
+USAGE:
+    components = find_components(classes, teacher_for, room_ids_for, teachers, shared_rooms)
+    for component in components:
+        component.classes, component.teachers, component.shared_rooms
+    draft = merge_drafts([draft_a, draft_b])
+
+VERSION: 1.0.0
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from dataclasses import dataclass, field
+
+from src.solution_draft import SolutionDraft
+
+
+@dataclass
+class Component:
+    """Classes that share teachers or shared rooms, plus those resources."""
+    classes: List = field(default_factory=list)
+    teachers: List = field(default_factory=list)
+    shared_rooms: List = field(default_factory=list)
+
+
+class _UnionFind:
+    """Disjoint sets with path halving and union by size."""
+
+    def __init__(self):
+        self.parent: Dict = {}
+        self.size: Dict = {}
+
+    def add(self, node):
+        if node not in self.parent:
+            self.parent[node] = node
+            self.size[node] = 1
+
+    def find(self, node):
+        parent = self.parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+
+
+def find_components(
+    classes: List,
+    teacher_for: Dict[Tuple[str, str], str],
+    room_ids_for: Callable[[object], Iterable[str]],
+    teachers: List,
+    shared_rooms: List
+) -> List[Component]:
+    """
+    Connected components of the class-teacher-shared-room graph.
+
+    Args:
+        classes: Classes in scheduling order (components keep this order)
+        teacher_for: (class_id, subject_id) -> pre-assigned teacher_id
+        room_ids_for: f(class_obj) -> ids of the shared rooms the class may use
+        teachers: All teachers of the solve
+        shared_rooms: All shared rooms of the solve
+
+    Returns:
+        Components ordered by their first class; teachers and shared rooms
+        keep their input order within a component
+    """
+    sets = _UnionFind()
+    for class_obj in classes:
+        sets.add(("class", class_obj.id))
+    for (class_id, _), teacher_id in teacher_for.items():
+        if ("class", class_id) in sets.parent:
+            sets.add(("teacher", teacher_id))
+            sets.union(("class", class_id), ("teacher", teacher_id))
+    for class_obj in classes:
+        for room_id in room_ids_for(class_obj):
+            sets.add(("room", room_id))
+            sets.union(("class", class_obj.id), ("room", room_id))
+
+    components: Dict = {}
+    for class_obj in classes:
+        root = sets.find(("class", class_obj.id))
+        components.setdefault(root, Component()).classes.append(class_obj)
+    ordered = list(components.values())
+    if not ordered:
+        return []
+
+    for kind, resources, attribute in (("teacher", teachers, "teachers"),
+                                       ("room", shared_rooms, "shared_rooms")):
+        for resource in resources:
+            node = (kind, resource.id)
+            component = components.get(sets.find(node)) if node in sets.parent else None
+            getattr(component or ordered[0], attribute).append(resource)
+    return ordered
+
+
+def merge_drafts(drafts: List[Optional[SolutionDraft]]) -> Optional[SolutionDraft]:
+    """
+    Join the component drafts of one attempt into one whole-school draft.
+
+    Counts add up, coverage is recomputed over all classes, and the loosest
+    relaxation level and any timeout carry over. None if a component
+    produced no draft.
+    """
+    if not drafts or any(draft is None for draft in drafts):
+        return None
+
+    placements, gaps = [], {}
+    for draft in drafts:
+        placements.extend(draft.placements)
+        gaps.update(draft.gaps)
+    expected_entries = sum(draft.expected_entries for draft in drafts)
+
+    metadata = dict(drafts[0].metadata)
+    metadata["timed_out"] = any(draft.metadata.get("timed_out", False) for draft in drafts)
+    if "coverage" in metadata:
+        metadata["coverage"] = len(placements) / expected_entries if expected_entries > 0 else 0.0
+    if "relaxation_level" in metadata:
+        metadata["relaxation_level"] = max(draft.metadata["relaxation_level"] for draft in drafts)
+    if "relaxation_fills" in metadata:
+        fills: Dict[str, int] = {}
+        for draft in drafts:
+            for level, count in draft.metadata["relaxation_fills"].items():
+                fills[level] = fills.get(level, 0) + count
+        metadata["relaxation_fills"] = fills
+    for key in ("search_nodes", "search_backtracks", "search_restarts", "unplaceable_periods"):
+        if key in metadata:
+            metadata[key] = sum(draft.metadata[key] for draft in drafts)
+    if "search_complete" in metadata:
+        metadata["search_complete"] = all(draft.metadata["search_complete"] for draft in drafts)
+
+    return SolutionDraft(
+        placements, gaps,
+        fill_self_study=any(draft.fill_self_study for draft in drafts),
+        expected_entries=expected_entries,
+        metadata=metadata
+    )
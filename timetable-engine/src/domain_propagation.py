@@ -0,0 +1,344 @@
+"""
+Domain Propagation - arc-consistency stage before scheduling
+
+PURPOSE:
+Before the first slot is placed the solver already knows how many periods
+each (class, subject) needs, which teacher the greedy pre-assignment picked,
+the teachers' availability and daily/weekly caps, and how many shared rooms
+of each type exist. This stage turns that into a feasible slot domain per
+(class, subject) - a bitmask over the active-slot index - and narrows the
+domains to a fixpoint, AC-3 style, with a worklist of constraint groups:
+
+- CLASS group: a class attends one period per slot. A variable whose domain
+  is no larger than its period count needs every slot of it ("tight"), so
+  those slots are removed from the class's other variables.
+- TEACHER group: the same for every variable taught by one teacher, plus the
+  daily cap - once tight variables fill a teacher's day, the teacher's other
+  variables lose the rest of that day.
+- ROOM group: variables sharing one shared-room pool; a slot that tight
+  variables already fill with every room of the pool is removed from the
+  others.
+
+Whenever a domain shrinks, the groups it belongs to are queued again. At the
+fixpoint, counting checks (variable domain, class slots, teacher capacity,
+room pool x slots) trim demand that can never be placed and record a precise
+reason for it, e.g. "Teacher Math Teacher 1 is assigned 40 periods but can
+teach at most 30 (weekly cap 30)".
+
+Reasons are aggregated per resource kind (teacher, class, shared room):
+missing teachers and rooms are reported once per subject, and only the
+REASONS_PER_KIND limits with the largest deficit are listed, followed by one
+"... more" line - a big school gets a few lines, not one per class.
+Every trimmed limit stays available in PropagationResult.deficits.
+
+Only search_mode="backtracking" searches the pruned domains; the greedy
+generators use the result for its reasons (fail-fast conflicts and
+metadata["propagation"]) and the unplaceable demand.
+
+USAGE:
+    result = DomainPropagator().propagate(
+        classes, active_slots, class_subject_distributions, teacher_for,
+        teacher_lookup, subject_lookup, room_candidates, teacher_slots)
+    result.domains[(class_id, subject_id)]     # feasible slot mask
+    result.reasons                             # why demand is unplaceable (aggregated)
+
+VERSION: 1.1.0
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+from collections import deque
+
+
+@dataclass
+class PropagationResult:
+    """Pre-reduced domains and the demand proven unplaceable."""
+    domains: Dict[Tuple[str, str], int]                                    # (class, subject) -> slot mask
+    unplaceable: Dict[Tuple[str, str], int] = field(default_factory=dict)  # (class, subject) -> periods
+    reasons: List[str] = field(default_factory=list)                      # aggregated, a few per kind
+    deficits: List[Tuple[str, int, str]] = field(default_factory=list)    # (kind, periods, reason), all
+    pruned: int = 0                # slot values removed from domains
+    revisions: int = 0             # constraint groups processed
+
+    @property
+    def infeasible(self) -> bool:
+        return bool(self.unplaceable)
+
+    @property
+    def unplaceable_periods(self) -> int:
+        return sum(self.unplaceable.values())
+
+    def summary(self) -> Dict:
+        """Compact form for timetable metadata."""
+        return {
+            "pruned_slots": self.pruned,
+            "revisions": self.revisions,
+            "unplaceable_periods": self.unplaceable_periods,
+            "reasons": list(self.reasons)
+        }
+
+
+class DomainPropagator:
+    """
+    AC-3 style slot-domain narrowing over class, teacher and room capacity.
+    """
+
+    REASON_KINDS = ("teacher", "class", "room")
+    REASONS_PER_KIND = 3  # Largest deficits listed per kind; the rest are summed up
+
+    def __init__(self, debug: bool = False):
+        self.debug = debug
+
+    def propagate(
+        self,
+        classes: List,
+        active_slots: List,
+        class_subject_distributions: Dict[str, Dict[str, int]],
+        teacher_for: Dict[Tuple[str, str], str],
+        teacher_lookup: Dict,
+        subject_lookup: Dict,
+        room_candidates: Callable,
+        teacher_slots: Optional[Dict[str, int]] = None
+    ) -> PropagationResult:
+        """
+        Narrow every (class, subject) slot domain to a fixpoint.
+
+        Args:
+            classes: Classes to schedule
+            active_slots: Non-break time slots (bit i = active_slots[i])
+            class_subject_distributions: class_id -> {subject_id: periods}
+            teacher_for: (class_id, subject_id) -> planned teacher_id
+            teacher_lookup: teacher_id -> Teacher
+            subject_lookup: subject_id -> Subject
+            room_candidates: f(class_obj, subject) -> None for the home
+                classroom, else list of shared-room indices that fit
+            teacher_slots: Available-slot masks of restricted teachers
+
+        Returns:
+            PropagationResult with the reduced domains (unplaceable demand
+            already trimmed from the counts behind them)
+        """
+        teacher_slots = teacher_slots or {}
+        n_slots = len(active_slots)
+        all_slots = (1 << n_slots) - 1
+        day_masks: Dict = {}
+        for i, slot in enumerate(active_slots):
+            day_masks[slot.day_of_week] = day_masks.get(slot.day_of_week, 0) | (1 << i)
+
+        result = PropagationResult(domains={})
+        keys, counts, domains, teachers, pools = [], [], [], [], []
+        missing: Dict[Tuple[str, str], List[int]] = {}  # (kind, subject name) -> [classes, periods]
+
+        def record(key, periods, kind, subject):
+            result.unplaceable[key] = result.unplaceable.get(key, 0) + periods
+            totals = missing.setdefault((kind, subject.name), [0, 0])
+            totals[0] += 1
+            totals[1] += periods
+
+        # ------------------------------------------------------------------
+        # Variables and initial (unary) domains
+        # ------------------------------------------------------------------
+        for class_obj in classes:
+            for subject_id, count in class_subject_distributions.get(class_obj.id, {}).items():
+                subject = subject_lookup.get(subject_id)
+                key = (class_obj.id, subject_id)
+                if not subject or count <= 0:
+                    continue
+                teacher_id = teacher_for.get(key)
+                if teacher_id not in teacher_lookup:
+                    record(key, count, "teacher", subject)
+                    result.domains[key] = 0
+                    continue
+                rooms = room_candidates(class_obj, subject)
+                if rooms == []:
+                    record(key, count, "room", subject)
+                    result.domains[key] = 0
+                    continue
+                pool = None
+                if rooms is not None:
+                    pool = 0
+                    for k in rooms:
+                        pool |= 1 << k
+                keys.append(key)
+                counts.append(count)
+                domains.append(all_slots & teacher_slots.get(teacher_id, all_slots))
+                teachers.append(teacher_id)
+                pools.append(pool)
+
+        # ------------------------------------------------------------------
+        # Constraint groups
+        # ------------------------------------------------------------------
+        groups: List[Tuple[str, object, List[int]]] = []
+        member_of: List[List[int]] = [[] for _ in keys]
+        by_class: Dict[str, List[int]] = {}
+        by_teacher: Dict[str, List[int]] = {}
+        by_pool: Dict[int, List[int]] = {}
+        for v, key in enumerate(keys):
+            by_class.setdefault(key[0], []).append(v)
+            by_teacher.setdefault(teachers[v], []).append(v)
+            if pools[v]:
+                by_pool.setdefault(pools[v], []).append(v)
+        for kind, grouped in (("class", by_class), ("teacher", by_teacher), ("room", by_pool)):
+            for owner, members in grouped.items():
+                for v in members:
+                    member_of[v].append(len(groups))
+                groups.append((kind, owner, members))
+
+        def tight(v) -> bool:
+            return counts[v] >= domains[v].bit_count()
+
+        queue = deque(range(len(groups)))
+        queued = set(queue)
+
+        def narrow(u, new):
+            if new == domains[u]:
+                return
+            result.pruned += (domains[u] & ~new).bit_count()
+            domains[u] = new
+            for g in member_of[u]:
+                if g not in queued:
+                    queued.add(g)
+                    queue.append(g)
+
+        # ------------------------------------------------------------------
+        # AC-3 style fixpoint
+        # ------------------------------------------------------------------
+        while queue:
+            g = queue.popleft()
+            queued.discard(g)
+            result.revisions += 1
+            kind, owner, members = groups[g]
+            forced = [v for v in members if tight(v) and domains[v]]
+            if not forced:
+                continue
+
+            if kind == "room":
+                capacity = owner.bit_count()
+                used = [0] * n_slots
+                full = 0
+                for v in forced:
+                    mask = domains[v]
+                    while mask:
+                        low = mask & -mask
+                        s = low.bit_length() - 1
+                        used[s] += 1
+                        if used[s] >= capacity:
+                            full |= low
+                        mask ^= low
+                if full:
+                    for u in members:
+                        if u not in forced:
+                            narrow(u, domains[u] & ~full)
+                continue
+
+            # Class and teacher: one period per slot
+            for v in forced:
+                for u in members:
+                    if u != v and not (tight(u) and domains[u] == domains[v]):
+                        narrow(u, domains[u] & ~domains[v])
+
+            if kind == "teacher":
+                teacher = teacher_lookup[owner]
+                for day, day_mask in day_masks.items():
+                    taken = 0
+                    for v in forced:
+                        taken |= domains[v] & day_mask
+                    if taken.bit_count() >= teacher.max_periods_per_day:
+                        for u in members:
+                            if u not in forced:
+                                narrow(u, domains[u] & ~day_mask)
+
+        # ------------------------------------------------------------------
+        # Counting checks: trim what can never fit, with a reason
+        # ------------------------------------------------------------------
+        for (kind, subject_name), (class_count, periods) in missing.items():
+            what = "teacher for" if kind == "teacher" else "shared room fits"
+            result.deficits.append((kind, periods, f"No {what} {subject_name}: {class_count} "
+                                                   f"class(es), {periods} periods unplaceable"))
+
+        def trim(indices, capacity, kind, reason):
+            excess = sum(counts[v] for v in indices) - capacity
+            if excess <= 0:
+                return
+            demand = sum(counts[v] for v in indices)
+            trimmed = 0
+            while excess > 0:
+                v = max(indices, key=lambda u: counts[u])
+                if counts[v] == 0:
+                    break
+                counts[v] -= 1
+                result.unplaceable[keys[v]] = result.unplaceable.get(keys[v], 0) + 1
+                excess -= 1
+                trimmed += 1
+            result.deficits.append((kind, trimmed, reason(demand, capacity, trimmed)))
+
+        class_names = {c.id: c.name for c in classes}
+        for v, (class_id, subject_id) in enumerate(keys):
+            teacher = teacher_lookup[teachers[v]]
+            subject = subject_lookup[subject_id]
+            trim([v], domains[v].bit_count(), "class", lambda demand, capacity, trimmed: (
+                f"{class_names[class_id]}: {subject.name} needs {demand} periods but only "
+                f"{capacity} slots are feasible with {teacher.name or teacher.id} "
+                f"({trimmed} unplaceable)"
+            ))
+
+        for class_id, members in by_class.items():
+            union = 0
+            for v in members:
+                union |= domains[v]
+            trim(members, union.bit_count(), "class", lambda demand, capacity, trimmed: (
+                f"{class_names[class_id]} needs {demand} periods but only {capacity} slots "
+                f"are feasible ({trimmed} unplaceable)"
+            ))
+
+        for teacher_id, members in by_teacher.items():
+            teacher = teacher_lookup[teacher_id]
+            union = 0
+            for v in members:
+                union |= domains[v]
+            daily = sum(min(teacher.max_periods_per_day, (union & day_mask).bit_count())
+                        for day_mask in day_masks.values())
+            capacity = min(teacher.max_periods_per_week, daily)
+            limit = (f"weekly cap {teacher.max_periods_per_week}"
+                     if capacity == teacher.max_periods_per_week
+                     else f"daily cap {teacher.max_periods_per_day} over {union.bit_count()} free slots")
+            trim(members, capacity, "teacher", lambda demand, capacity, trimmed: (
+                f"Teacher {teacher.name or teacher.id} is assigned {demand} periods but can teach "
+                f"at most {capacity} ({limit}; {trimmed} unplaceable)"
+            ))
+
+        for pool, members in by_pool.items():
+            inside = [v for v in range(len(keys)) if pools[v] and not pools[v] & ~pool]
+            union = 0
+            for v in inside:
+                union |= domains[v]
+            subject_names = sorted({subject_lookup[keys[v][1]].name for v in inside})
+            trim(inside, pool.bit_count() * union.bit_count(), "room", lambda demand, capacity, trimmed: (
+                f"{', '.join(subject_names)} need {demand} periods in {pool.bit_count()} shared "
+                f"room(s) but only {capacity} room-slots are feasible ({trimmed} unplaceable)"
+            ))
+
+        for v, key in enumerate(keys):
+            result.domains[key] = domains[v]
+        result.reasons = self._aggregate_reasons(result.deficits)
+
+        if self.debug:
+            print(f"[PROPAGATION] {len(keys)} variables, {result.revisions} revisions, "
+                  f"{result.pruned} slots pruned, {result.unplaceable_periods} periods unplaceable")
+            for reason in result.reasons:
+                print(f"  - {reason}")
+
+        return result
+
+    def _aggregate_reasons(self, deficits: List[Tuple[str, int, str]]) -> List[str]:
+        """The REASONS_PER_KIND largest deficits per kind, plus one line for the rest."""
+        reasons = []
+        for kind in self.REASON_KINDS:
+            ranked = sorted((d for d in deficits if d[0] == kind), key=lambda d: -d[1])
+            reasons.extend(reason for _, _, reason in ranked[:self.REASONS_PER_KIND])
+            rest = ranked[self.REASONS_PER_KIND:]
+            if rest:
+                label = "shared room" if kind == "room" else kind
+                reasons.append(f"... and {len(rest)} more {label} limit(s), "
+                               f"{sum(periods for _, periods, _ in rest)} periods unplaceable")
+        return reasons
@@ -18,7 +18,11 @@ from evaluation.models import (
     PenaltyType,
     ComparisonResult,
     RankedTimetable,
-    BatchEvaluationResult
+    BatchEvaluationResult,
+    EvaluationState,
+    TimeSwap,
+    RoomSwap,
+    ClassBlockExchange
 )
 
 from evaluation.timetable_evaluator import TimetableEvaluator
@@ -31,5 +35,9 @@ __all__ = [
     'PenaltyType',
     'ComparisonResult',
     'RankedTimetable',
-    'BatchEvaluationResult'
+    'BatchEvaluationResult',
+    'EvaluationState',
+    'TimeSwap',
+    'RoomSwap',
+    'ClassBlockExchange'
 ]
\ No newline at end of file
@@ -6,8 +6,8 @@ and RankingService to represent evaluation results, penalty breakdowns,
 and comparison outcomes.
 """
 
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Any
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Any, Set, Tuple
 from enum import Enum
 
 
@@ -110,6 +110,67 @@ class BatchEvaluationResult:
         return sum(e.total_score for e in self.evaluations) / len(self.evaluations)
 
 
+# ===============================
+# DELTA EVALUATION
+# ===============================
+
+Position = Tuple[Any, int]  # (day_of_week, period_number)
+
+
+@dataclass
+class TimeSwap:
+    """Exchange the time slots of entries a and b (indexes into the state)."""
+    a: int
+    b: int
+
+
+@dataclass
+class RoomSwap:
+    """Exchange the rooms of entries a and b. Rooms are not scored: delta 0."""
+    a: int
+    b: int
+
+
+@dataclass
+class ClassBlockExchange:
+    """
+    Replace (part of) one or more class blocks: every listed entry takes the
+    given position, None removes it, a position for an absent entry adds it.
+    A one-entry exchange is a move into a free slot.
+    """
+    positions: Dict[int, Optional[Position]]
+
+
+@dataclass
+class EvaluationState:
+    """
+    Incremental evaluation state of one timetable.
+
+    Built by TimetableEvaluator.build_state(). The lookup fields are shared
+    between copies; positions, teacher_counts and the raw penalty totals
+    change with apply_move(). Raw totals are unweighted, as in
+    PenaltyBreakdown.raw_score.
+    """
+    entries: List[Dict[str, Any]]
+    by_class: Dict[str, List[int]]
+    by_teacher: Dict[str, List[int]]
+    max_consecutive: Dict[str, int]
+    unfilled_positions: Set[Tuple[Any, Any, Any]]
+    base_score: float
+    coverage: float
+    positions: List[Optional[Position]]
+    teacher_counts: Dict[str, int]
+    workload: float = 0.0
+    gaps: float = 0.0
+    preferences: float = 0.0
+    consecutive: float = 0.0
+    score: float = 0.0
+
+    def copy(self) -> 'EvaluationState':
+        """Independent dynamic state sharing the lookup fields."""
+        return replace(self, positions=list(self.positions), teacher_counts=dict(self.teacher_counts))
+
+
 class EvaluationConfig:
     """Configuration for timetable evaluation."""
     
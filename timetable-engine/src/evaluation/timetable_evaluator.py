@@ -5,6 +5,12 @@ This module provides a fast, reusable evaluator for ranking and scoring
 timetables without the overhead of genetic algorithm operations. It can be
 used for ranking partial solutions, comparing alternatives, or providing
 fitness scores to optimization algorithms.
+
+v3.0.1: Delta evaluation. build_state() indexes a timetable once; the score
+after a TimeSwap, RoomSwap or ClassBlockExchange is then computed from the
+class-days and teacher-days the move touches only (move_penalty /
+delta_evaluate), and apply_move() commits it. GA children and tabu search
+moves are scored this way instead of with a full evaluate().
 """
 
 import statistics
@@ -20,7 +26,8 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from evaluation.models import (
     EvaluationResult, EvaluationConfig, PenaltyBreakdown, PenaltyType,
-    ComparisonResult, BatchEvaluationResult
+    ComparisonResult, BatchEvaluationResult,
+    EvaluationState, TimeSwap, RoomSwap, ClassBlockExchange, Position
 )
 
 logger = logging.getLogger(__name__)
@@ -263,6 +270,206 @@ class TimetableEvaluator:
             summary=summary
         )
     
+    # ===============================
+    # DELTA EVALUATION (v3.0.1)
+    # ===============================
+
+    def build_state(self, timetable: Dict[str, Any],
+                    positions: Optional[List[Optional[Position]]] = None) -> EvaluationState:
+        """
+        Index a timetable for delta evaluation (O(entries), once).
+
+        Args:
+            timetable: Timetable dictionary, as for evaluate()
+            positions: Optional (day_of_week, period_number) per entry that
+                overrides the entries' own; None marks an absent entry (used
+                by the GA, whose state covers every gene of the population)
+
+        Returns:
+            EvaluationState whose score equals evaluate(timetable).total_score
+        """
+        metadata = timetable.get('metadata', {})
+        coverage = metadata.get('coverage', 1.0)
+        unfilled_slots = metadata.get('unfilled_slots', [])
+        entries = self._extract_assignments(timetable)
+        if positions is None:
+            positions = [(e.get("day_of_week"), e.get("period_number")) for e in entries]
+        else:
+            positions = list(positions)
+
+        by_class: Dict[str, List[int]] = defaultdict(list)
+        by_teacher: Dict[str, List[int]] = defaultdict(list)
+        max_consecutive: Dict[str, int] = {}
+        teacher_counts: Dict[str, int] = {}
+        for i, entry in enumerate(entries):
+            if entry.get("class_id"):
+                by_class[entry["class_id"]].append(i)
+            teacher_id = entry.get("teacher_id")
+            if teacher_id:
+                by_teacher[teacher_id].append(i)
+                if positions[i] is not None:
+                    teacher_counts[teacher_id] = teacher_counts.get(teacher_id, 0) + 1
+                    if teacher_id not in max_consecutive:
+                        # Same rule as evaluate(): the teacher's first assignment
+                        max_consecutive[teacher_id] = self._max_consecutive(entry)
+
+        for teacher_id in by_teacher:
+            if teacher_id not in max_consecutive:
+                max_consecutive[teacher_id] = self._max_consecutive(entries[by_teacher[teacher_id][0]])
+
+        state = EvaluationState(
+            entries=entries,
+            by_class=dict(by_class),
+            by_teacher=dict(by_teacher),
+            max_consecutive=max_consecutive,
+            unfilled_positions=self._unfilled_positions(unfilled_slots),
+            base_score=1000.0 * coverage,
+            coverage=self._calculate_coverage_penalty(unfilled_slots),
+            positions=positions,
+            teacher_counts=teacher_counts
+        )
+        if any(p is not None for p in positions):
+            days = {p[0] for p in positions if p is not None and p[0]}
+            state.workload = self._workload_from_counts(teacher_counts)
+            state.gaps = sum(self._class_day_gaps(state, c, d) for c in state.by_class for d in days)
+            state.consecutive = sum(self._teacher_day_excess(state, t, d)
+                                    for t in state.by_teacher for d in days)
+            state.preferences = float(sum(self._entry_preference(state, i) for i in range(len(entries))))
+            state.score = self._state_score(state, state.workload, state.gaps,
+                                            state.preferences, state.consecutive)
+        return state
+
+    def move_penalty(self, state: EvaluationState, move: Any) -> float:
+        """
+        Change of the total weighted penalty if move were applied; the state
+        is not modified. Cost: the entries of the touched classes and teachers.
+        """
+        totals = self._move_totals(state, move)
+        if totals is None:
+            return 0.0
+        workload, gaps, preferences, consecutive = totals[:4]
+        config = self.config
+        # Per-component differences: exact for the integer-valued terms
+        return ((workload - state.workload) * config.workload_balance_weight
+                + (gaps - state.gaps) * config.gap_minimization_weight
+                + (preferences - state.preferences) * config.time_preferences_weight
+                + (consecutive - state.consecutive) * config.consecutive_periods_weight)
+
+    def delta_evaluate(self, state: EvaluationState, move: Any) -> float:
+        """Total score after move (as evaluate() would return it); state unchanged."""
+        totals = self._move_totals(state, move)
+        if totals is None:
+            return state.score
+        return self._state_score(state, *totals[:4])
+
+    def apply_move(self, state: EvaluationState, move: Any) -> float:
+        """Apply move to state in place and return the new total score."""
+        totals = self._move_totals(state, move)
+        if totals is None:
+            return state.score
+        state.workload, state.gaps, state.preferences, state.consecutive, changes, counts = totals
+        for i, position in changes.items():
+            state.positions[i] = position
+        state.teacher_counts = counts
+        state.score = self._state_score(state, state.workload, state.gaps,
+                                        state.preferences, state.consecutive)
+        return state.score
+
+    def _move_changes(self, state: EvaluationState, move: Any) -> Dict[int, Optional[Position]]:
+        """New position per entry the move relocates, adds or removes."""
+        if isinstance(move, TimeSwap):
+            if move.a == move.b:
+                return {}
+            return {move.a: state.positions[move.b], move.b: state.positions[move.a]}
+        if isinstance(move, ClassBlockExchange):
+            return {i: p for i, p in move.positions.items() if state.positions[i] != p}
+        if isinstance(move, RoomSwap):
+            return {}
+        raise ValueError(f"Unknown move: {move!r}")
+
+    def _move_totals(self, state: EvaluationState, move: Any):
+        """
+        Raw penalty totals after move, plus its position changes and teacher
+        counts; None if the move changes nothing that is scored.
+        """
+        changes = self._move_changes(state, move)
+        if not changes:
+            return None
+        entries, positions = state.entries, state.positions
+
+        class_keys, teacher_keys = set(), set()
+        counts = state.teacher_counts
+        for i, new in changes.items():
+            entry, old = entries[i], positions[i]
+            teacher_id = entry.get("teacher_id")
+            for position in (old, new):
+                if position is not None and position[0]:
+                    if entry.get("class_id"):
+                        class_keys.add((entry["class_id"], position[0]))
+                    if teacher_id:
+                        teacher_keys.add((teacher_id, position[0]))
+            if teacher_id and (old is None) != (new is None):
+                if counts is state.teacher_counts:
+                    counts = dict(counts)
+                counts[teacher_id] = counts.get(teacher_id, 0) + (1 if old is None else -1)
+                if counts[teacher_id] == 0:
+                    del counts[teacher_id]
+
+        def local_terms():
+            return (sum(self._class_day_gaps(state, c, d) for c, d in class_keys),
+                    sum(self._teacher_day_excess(state, t, d) for t, d in teacher_keys),
+                    sum(self._entry_preference(state, i) for i in changes))
+
+        previous = {i: positions[i] for i in changes}
+        gaps_before, consecutive_before, preferences_before = local_terms()
+        for i, position in changes.items():
+            positions[i] = position
+        try:
+            gaps_after, consecutive_after, preferences_after = local_terms()
+        finally:
+            for i, position in previous.items():
+                positions[i] = position
+
+        workload = state.workload if counts is state.teacher_counts else self._workload_from_counts(counts)
+        return (workload,
+                state.gaps + gaps_after - gaps_before,
+                state.preferences + preferences_after - preferences_before,
+                state.consecutive + consecutive_after - consecutive_before,
+                changes, counts)
+
+    def _state_penalty(self, state: EvaluationState, workload: float, gaps: float,
+                       preferences: float, consecutive: float) -> float:
+        """Weighted penalty, summed in evaluate()'s order (same float result)."""
+        config = self.config
+        return (state.coverage * config.coverage_penalty_weight
+                + workload * config.workload_balance_weight
+                + gaps * config.gap_minimization_weight
+                + preferences * config.time_preferences_weight
+                + consecutive * config.consecutive_periods_weight)
+
+    def _state_score(self, state: EvaluationState, *totals: float) -> float:
+        if not any(p is not None for p in state.positions):
+            return 0.0
+        return max(0.0, state.base_score - self._state_penalty(state, *totals))
+
+    def _class_day_gaps(self, state: EvaluationState, class_id: str, day: Any) -> float:
+        positions = state.positions
+        periods = sorted(p[1] for p in (positions[i] for i in state.by_class.get(class_id, ()))
+                         if p is not None and p[0] == day and p[1])
+        return self._day_gaps(class_id, day, periods, state.unfilled_positions)
+
+    def _teacher_day_excess(self, state: EvaluationState, teacher_id: str, day: Any) -> int:
+        positions = state.positions
+        periods = sorted(p[1] for p in (positions[i] for i in state.by_teacher.get(teacher_id, ()))
+                         if p is not None and p[0] == day and p[1])
+        return self._consecutive_excess(periods, state.max_consecutive[teacher_id])
+
+    def _entry_preference(self, state: EvaluationState, i: int) -> int:
+        position = state.positions[i]
+        if position is None:
+            return 0
+        return self._preference_violations(position[1], state.entries[i].get("subject_metadata"))
+
     # ===============================
     # PRIVATE HELPER METHODS
     # (Extracted from GA optimizer)
@@ -349,19 +556,19 @@ class TimetableEvaluator:
         # Use standard deviation as penalty
         std_dev = statistics.stdev(workload_counts)
         return float(std_dev)
+
+    def _workload_from_counts(self, teacher_counts: Dict[str, int]) -> float:
+        """Workload imbalance from per-teacher assignment counts."""
+        if len(teacher_counts) < 2:
+            return 0.0
+        return float(statistics.stdev(teacher_counts.values()))
     
     def _calculate_gap_penalty_partial(self, class_schedules: Dict, unfilled_slots: List[Dict]) -> float:
         """Calculate gap penalty for partial solutions, distinguishing gaps from unfilled slots."""
         penalty = 0.0
         
         # Create set of unfilled slot positions for quick lookup
-        unfilled_positions = set()
-        for slot in unfilled_slots:
-            day = slot.get('day')
-            period = slot.get('period')
-            class_name = slot.get('class')
-            if day and period and class_name:
-                unfilled_positions.add((class_name, day, period))
+        unfilled_positions = self._unfilled_positions(unfilled_slots)
         
         for class_name, schedule in class_schedules.items():
             # Group by day for gap detection
@@ -377,58 +584,76 @@ class TimetableEvaluator:
             # Calculate gaps for each day
             for day, periods in daily_schedules.items():
                 periods.sort()
-                
-                # Check for gaps between scheduled periods
-                for i in range(len(periods) - 1):
-                    gap_start = periods[i] + 1
-                    gap_end = periods[i + 1]
-                    
-                    # Count gaps that are not unfilled slots
-                    for period in range(gap_start, gap_end):
-                        if (class_name, day, period) not in unfilled_positions:
-                            penalty += 1.0  # This is a true gap, not just unfilled
+                penalty += self._day_gaps(class_name, day, periods, unfilled_positions)
         
         return penalty
+
+    def _unfilled_positions(self, unfilled_slots: List[Dict]) -> set:
+        """(class, day, period) of unfilled slots, which are not counted as gaps."""
+        unfilled_positions = set()
+        for slot in unfilled_slots:
+            day = slot.get('day')
+            period = slot.get('period')
+            class_name = slot.get('class')
+            if day and period and class_name:
+                unfilled_positions.add((class_name, day, period))
+        return unfilled_positions
+
+    def _day_gaps(self, class_name: str, day: Any, periods: List[int], unfilled_positions: set) -> float:
+        """Gaps between the sorted periods of one class-day."""
+        gaps = 0.0
+        # Check for gaps between scheduled periods
+        for i in range(len(periods) - 1):
+            # Count gaps that are not unfilled slots
+            for period in range(periods[i] + 1, periods[i + 1]):
+                if (class_name, day, period) not in unfilled_positions:
+                    gaps += 1.0  # This is a true gap, not just unfilled
+        return gaps
     
     def _calculate_time_preference_penalty(self, assignments: List[Dict]) -> float:
         """Calculate penalty for scheduling subjects at non-preferred times."""
         penalty = 0
         
         for assignment in assignments:
-            period_num = assignment.get("period_number")
-            if not period_num:
-                continue
-            
-            # Read from subject metadata
-            subject_metadata = assignment.get("subject_metadata", {})
-            
-            # Boolean flag preference
-            prefer_morning = subject_metadata.get("prefer_morning", False)
-            if prefer_morning and period_num > self.config.morning_period_cutoff:
-                penalty += 1
-            
-            # Preferred periods list
-            preferred_periods = subject_metadata.get("preferred_periods")
-            if preferred_periods and period_num not in preferred_periods:
-                if not prefer_morning:  # Don't double-penalize
-                    penalty += 1
-            
-            # Avoid periods list
-            avoid_periods = subject_metadata.get("avoid_periods")
-            if avoid_periods and period_num in avoid_periods:
-                penalty += 1
+            penalty += self._preference_violations(assignment.get("period_number"),
+                                                   assignment.get("subject_metadata"))
         
         return float(penalty)
+
+    def _preference_violations(self, period_num: Optional[int], subject_metadata: Optional[Dict]) -> int:
+        """Time preference violations of one assignment."""
+        if not period_num:
+            return 0
+        
+        # Read from subject metadata
+        subject_metadata = subject_metadata or {}  # None on SELF_STUDY
+        violations = 0
+        
+        # Boolean flag preference
+        prefer_morning = subject_metadata.get("prefer_morning", False)
+        if prefer_morning and period_num > self.config.morning_period_cutoff:
+            violations += 1
+        
+        # Preferred periods list
+        preferred_periods = subject_metadata.get("preferred_periods")
+        if preferred_periods and period_num not in preferred_periods:
+            if not prefer_morning:  # Don't double-penalize
+                violations += 1
+        
+        # Avoid periods list
+        avoid_periods = subject_metadata.get("avoid_periods")
+        if avoid_periods and period_num in avoid_periods:
+            violations += 1
+        
+        return violations
     
     def _calculate_consecutive_period_penalty(self, teacher_loads: Dict[str, List[Dict]]) -> float:
         """Calculate penalty for teachers teaching too many consecutive periods."""
         penalty = 0
-        default_max_consecutive = 3
         
         for teacher_id, assignments in teacher_loads.items():
             # Read teacher's specific limit from metadata
-            teacher_metadata = assignments[0].get("teacher_metadata", {}) if assignments else {}
-            max_consecutive = teacher_metadata.get("max_consecutive_periods", default_max_consecutive)
+            max_consecutive = self._max_consecutive(assignments[0] if assignments else {})
             
             # Group by day
             by_day = defaultdict(list)
@@ -441,21 +666,35 @@ class TimetableEvaluator:
             
             # Check consecutive periods per day
             for day, periods in by_day.items():
-                sorted_periods = sorted(periods)
-                consecutive = 1
-                
-                # Count consecutive runs
-                for i in range(len(sorted_periods) - 1):
-                    if sorted_periods[i + 1] == sorted_periods[i] + 1:
-                        consecutive += 1
-                    else:
-                        # Run ended, check if it exceeded limit
-                        if consecutive > max_consecutive:
-                            penalty += (consecutive - max_consecutive)
-                        consecutive = 1
-                
-                # Check final run
+                penalty += self._consecutive_excess(sorted(periods), max_consecutive)
+        
+        return float(penalty)
+
+    def _max_consecutive(self, assignment: Dict) -> int:
+        """Teacher's consecutive period limit, from its assignment's teacher_metadata."""
+        default_max_consecutive = 3
+        teacher_metadata = assignment.get("teacher_metadata") or {}
+        return teacher_metadata.get("max_consecutive_periods", default_max_consecutive)
+
+    def _consecutive_excess(self, sorted_periods: List[int], max_consecutive: int) -> int:
+        """Periods beyond max_consecutive in the runs of one teacher-day."""
+        if not sorted_periods:
+            return 0
+        excess = 0
+        consecutive = 1
+        
+        # Count consecutive runs
+        for i in range(len(sorted_periods) - 1):
+            if sorted_periods[i + 1] == sorted_periods[i] + 1:
+                consecutive += 1
+            else:
+                # Run ended, check if it exceeded limit
                 if consecutive > max_consecutive:
-                    penalty += (consecutive - max_consecutive)
+                    excess += (consecutive - max_consecutive)
+                consecutive = 1
+        
+        # Check final run
+        if consecutive > max_consecutive:
+            excess += (consecutive - max_consecutive)
         
-        return float(penalty)
\ No newline at end of file
+        return excess
@@ -0,0 +1,457 @@
+"""
+Flow Teacher Assignment - balanced teacher pre-assignment via min-cost flow
+
+PURPOSE:
+GreedyTeacherAssignment walks (class, subject) pairs in priority order and
+hands each one to the qualified teacher with the most spare capacity. An
+early choice can strand capacity that a later subject needed: a teacher
+qualified for two subjects fills up with the first, and the second subject
+ends up on a teacher that is already over their limit.
+
+This assigner decides the whole mapping at once as a flow problem:
+
+    source --demand--> subject --> qualified teacher --capacity--> sink
+
+- Subject supply = periods needed for that subject across all classes
+- Teacher capacity = TeacherAvailability.capacity (weekly cap, daily caps
+  and available slots)
+- Cost = teacher load: the k-th period a teacher takes costs k, so the
+  cost rises with the load and the cheapest flow gives every teacher a
+  first period before anyone takes a second, and so on. The largest load
+  of the flow is therefore the smallest one possible
+
+Because the costs are per load level, the min-cost flow is found as
+successive max-flows: level k opens min(capacity, k) periods for every
+teacher and the flow is augmented (Dinic) from the previous level's flow.
+Loads never drop along an augmenting path, so each stage keeps the maximum
+flow of all lower levels, which is exactly the min-cost solution. The graph
+has one node per subject and teacher (not per class), so even the huge
+config solves in milliseconds.
+
+The flow gives each teacher a period quota per subject. Classes are then
+packed into the quotas, largest demand first, best fit (a class keeps one
+teacher per subject, so quotas cannot be split). Pairs that fit no quota go
+to the qualified teacher with the most spare capacity, as in the greedy
+algorithm, so the mapping stays complete. A last pass moves or swaps pairs
+off teachers left over capacity while that lowers the total overflow, and
+a final pass does the same for the most loaded teachers while that lowers
+their load without adding overflow.
+When demand exceeds what the qualified teachers can take, the overflow
+stays close to the flow's lower bound (demand - routed periods).
+
+The packing is a heuristic, so the greedy mapping is computed as well and
+kept instead when it covers every pair with less total overflow; the flow
+is therefore never worse than the greedy loop.
+
+USAGE:
+    assigner = FlowTeacherAssignment()
+    mapping = assigner.assign_teachers(classes, subjects, teachers, time_slots,
+                                       subject_requirements, availability=availability)
+
+VERSION: 1.2.0
+"""
+
+from typing import List, Dict, Tuple, Optional
+from collections import defaultdict, deque
+
+from src.models_phase1_v25 import Class, Subject, Teacher, TimeSlot
+from src.teacher_availability import TeacherAvailability
+from src.greedy_teacher_assignment import GreedyTeacherAssignment
+
+
+class _FlowNetwork:
+    """Residual graph with Dinic max-flow (adjacency lists of edge indices)."""
+
+    def __init__(self, num_nodes: int):
+        self.adjacency: List[List[int]] = [[] for _ in range(num_nodes)]
+        self.heads: List[int] = []
+        self.capacity: List[int] = []
+
+    def add_edge(self, tail: int, head: int, capacity: int) -> int:
+        """Add tail -> head (and its reverse); returns the forward edge index."""
+        self.adjacency[tail].append(len(self.heads))
+        self.heads.append(head)
+        self.capacity.append(capacity)
+        self.adjacency[head].append(len(self.heads))
+        self.heads.append(tail)
+        self.capacity.append(0)
+        return len(self.heads) - 2
+
+    def flow(self, edge: int) -> int:
+        """Flow on a forward edge (= residual capacity of its reverse)."""
+        return self.capacity[edge ^ 1]
+
+    def max_flow(self, source: int, sink: int) -> int:
+        """Augment from the current flow until no augmenting path is left."""
+        total = 0
+        heads, capacity, adjacency = self.heads, self.capacity, self.adjacency
+        while True:
+            level = [-1] * len(adjacency)
+            level[source] = 0
+            queue = deque([source])
+            while queue:
+                node = queue.popleft()
+                for e in adjacency[node]:
+                    if capacity[e] > 0 and level[heads[e]] < 0:
+                        level[heads[e]] = level[node] + 1
+                        queue.append(heads[e])
+            if level[sink] < 0:
+                return total
+
+            cursor = [0] * len(adjacency)
+
+            def push(node: int, limit: int) -> int:
+                if node == sink:
+                    return limit
+                edges = adjacency[node]
+                while cursor[node] < len(edges):
+                    e = edges[cursor[node]]
+                    head = heads[e]
+                    if capacity[e] > 0 and level[head] == level[node] + 1:
+                        pushed = push(head, min(limit, capacity[e]))
+                        if pushed:
+                            capacity[e] -= pushed
+                            capacity[e ^ 1] += pushed
+                            return pushed
+                    cursor[node] += 1
+                return 0
+
+            while True:
+                pushed = push(source, float('inf'))
+                if not pushed:
+                    break
+                total += pushed
+
+
+class FlowTeacherAssignment(GreedyTeacherAssignment):
+    """
+    Min-cost-flow teacher assignment with load-balancing costs.
+    """
+
+    def assign_teachers(
+        self,
+        classes: List[Class],
+        subjects: List[Subject],
+        teachers: List[Teacher],
+        time_slots: List[TimeSlot],
+        subject_requirements: Optional[Dict[str, int]] = None,
+        availability: Optional[TeacherAvailability] = None
+    ) -> Dict[Tuple[str, str], str]:
+        """
+        Assign teachers to (class_id, subject_id) pairs from a balanced flow.
+
+        Args:
+            classes: List of classes
+            subjects: List of subjects
+            teachers: List of teachers
+            time_slots: List of time slots (to calculate availability)
+            subject_requirements: Optional dict mapping subject_id to periods_per_week
+            availability: Compiled teacher availability (built from
+                time_slots when not given)
+
+        Returns:
+            Dictionary mapping (class_id, subject_id) -> teacher_id
+        """
+        if self.debug:
+            print("\n[FLOW] Starting teacher assignment")
+            print(f"  Classes: {len(classes)}")
+            print(f"  Subjects: {len(subjects)}")
+            print(f"  Teachers: {len(teachers)}")
+
+        active_slots = [ts for ts in time_slots if not ts.is_break]
+        if availability is None:
+            availability = TeacherAvailability(teachers, active_slots)
+
+        teacher_qualifications = self._build_qualification_map(teachers, subjects)
+        subject_demand = self._calculate_subject_demand(
+            classes, subjects, subject_requirements
+        )
+        teacher_capacity = {t.id: availability.capacity(t) for t in teachers}
+
+        # Subjects nobody is qualified for may go to any teacher (as in greedy)
+        candidates = {
+            subject.id: teacher_qualifications.get(subject.id) or teachers
+            for subject in subjects
+        }
+
+        # ------------------------------------------------------------------
+        # Flow network: source -> subject -> teacher -> sink
+        # ------------------------------------------------------------------
+        source, sink = 0, 1
+        subject_node = {s.id: 2 + i for i, s in enumerate(subjects)}
+        teacher_node = {t.id: 2 + len(subjects) + i for i, t in enumerate(teachers)}
+        network = _FlowNetwork(2 + len(subjects) + len(teachers))
+
+        total_subject_demand = defaultdict(int)
+        for (class_id, subject_id), periods in subject_demand.items():
+            total_subject_demand[subject_id] += periods
+        for subject in subjects:
+            network.add_edge(source, subject_node[subject.id], total_subject_demand[subject.id])
+
+        quota_edges = {}
+        for subject in subjects:
+            for teacher in candidates[subject.id]:
+                quota_edges[(subject.id, teacher.id)] = network.add_edge(
+                    subject_node[subject.id], teacher_node[teacher.id],
+                    total_subject_demand[subject.id]
+                )
+        sink_edges = {
+            t.id: network.add_edge(teacher_node[t.id], sink, 0) for t in teachers
+        }
+
+        # Min-cost flow: open one load level per stage, augment to max flow
+        routed = 0
+        for level in range(1, max(teacher_capacity.values(), default=0) + 1):
+            for teacher in teachers:
+                edge = sink_edges[teacher.id]
+                opened = min(teacher_capacity[teacher.id], level)
+                network.capacity[edge] = opened - network.flow(edge)
+            routed += network.max_flow(source, sink)
+
+        quota = {key: network.flow(edge) for key, edge in quota_edges.items()}
+
+        if self.debug:
+            total = sum(total_subject_demand.values())
+            print(f"  Flow routed {routed}/{total} periods within teacher capacity")
+
+        # ------------------------------------------------------------------
+        # Pack classes into the per-subject quotas (best fit decreasing)
+        # ------------------------------------------------------------------
+        teacher_workload = {t.id: 0 for t in teachers}
+        class_order = {c.id: i for i, c in enumerate(classes)}
+        pairs = sorted(
+            (key for key in subject_demand if key[1] in candidates),
+            key=lambda key: (-subject_demand[key], class_order[key[0]])
+        )
+
+        assignment_map = {}
+        for key in pairs:
+            class_id, subject_id = key
+            periods_needed = subject_demand[key]
+            spare = {
+                t.id: teacher_capacity[t.id] - teacher_workload[t.id]
+                for t in candidates[subject_id]
+            }
+
+            fitting = [
+                t for t in candidates[subject_id]
+                if quota[(subject_id, t.id)] >= periods_needed and spare[t.id] >= periods_needed
+            ]
+            if fitting:
+                best_teacher = min(fitting, key=lambda t: quota[(subject_id, t.id)])
+            else:
+                best_teacher = max(candidates[subject_id], key=lambda t: spare[t.id])
+
+            assignment_map[key] = best_teacher.id
+            quota[(subject_id, best_teacher.id)] -= periods_needed
+            teacher_workload[best_teacher.id] += periods_needed
+
+        moves = self._rebalance(assignment_map, subject_demand, candidates,
+                                teacher_workload, teacher_capacity)
+        moves += self._level_peaks(assignment_map, subject_demand, candidates,
+                                   teacher_workload, teacher_capacity)
+
+        if self.debug:
+            overloaded = [t for t in teachers if teacher_workload[t.id] > teacher_capacity[t.id]]
+            print("\n[FLOW] Assignment complete")
+            print(f"  Total assignments: {len(assignment_map)}")
+            print(f"  Expected: {len(classes) * len(subjects)}")
+            print(f"  Rebalancing moves/swaps: {moves}")
+            print(f"  Teachers over capacity: {len(overloaded)}")
+
+        # Whole classes do not always pack into the quotas: keep the greedy
+        # mapping when it is complete and overflows less
+        greedy_map = super().assign_teachers(
+            classes, subjects, teachers, time_slots, subject_requirements, availability
+        )
+        if greedy_map.keys() >= assignment_map.keys():
+            flow_overflow = self._overflow(assignment_map, subject_demand, teacher_capacity)
+            greedy_overflow = self._overflow(greedy_map, subject_demand, teacher_capacity)
+            if greedy_overflow < flow_overflow:
+                if self.debug:
+                    print(f"  Greedy mapping overflows less ({greedy_overflow} vs "
+                          f"{flow_overflow} periods), keeping it")
+                return greedy_map
+
+        return assignment_map
+
+    @staticmethod
+    def _overflow(
+        assignment_map: Dict[Tuple[str, str], str],
+        subject_demand: Dict[Tuple[str, str], int],
+        teacher_capacity: Dict[str, int]
+    ) -> int:
+        """Periods the mapping puts on teachers beyond their capacity."""
+        workload = defaultdict(int)
+        for key, teacher_id in assignment_map.items():
+            workload[teacher_id] += subject_demand.get(key, 0)
+        return sum(
+            max(0, load - teacher_capacity.get(teacher_id, 0))
+            for teacher_id, load in workload.items()
+        )
+
+    def _rebalance(
+        self,
+        assignment_map: Dict[Tuple[str, str], str],
+        subject_demand: Dict[Tuple[str, str], int],
+        candidates: Dict[str, List[Teacher]],
+        teacher_workload: Dict[str, int],
+        teacher_capacity: Dict[str, int]
+    ) -> int:
+        """
+        Move or swap pairs off over-capacity teachers while total overflow drops.
+
+        Packing whole classes into the flow's quotas can leave a teacher a
+        few periods over capacity while a colleague has the room. Updates
+        assignment_map and teacher_workload in place; returns the moves made.
+        """
+        def overflow(teacher_id, workload):
+            return max(0, workload - teacher_capacity[teacher_id])
+
+        pairs_of = defaultdict(list)
+        for key, teacher_id in assignment_map.items():
+            pairs_of[teacher_id].append(key)
+        qualified = {
+            subject_id: {t.id for t in teachers}
+            for subject_id, teachers in candidates.items()
+        }
+
+        moves = 0
+        improved = True
+        while improved:
+            improved = False
+            for source_id in list(pairs_of):
+                if overflow(source_id, teacher_workload[source_id]) == 0:
+                    continue
+                for key in sorted(pairs_of[source_id], key=lambda k: -subject_demand[k]):
+                    periods = subject_demand[key]
+                    if periods == 0:
+                        continue
+                    best = None
+                    best_gain = 0
+                    for target in candidates[key[1]]:
+                        target_id = target.id
+                        if target_id == source_id:
+                            continue
+                        before = overflow(source_id, teacher_workload[source_id]) + \
+                            overflow(target_id, teacher_workload[target_id])
+                        # Plain move
+                        gain = before - overflow(source_id, teacher_workload[source_id] - periods) - \
+                            overflow(target_id, teacher_workload[target_id] + periods)
+                        if gain > best_gain:
+                            best, best_gain = (target_id, None), gain
+                        # Swap with a smaller pair the source teacher can take
+                        for other in pairs_of[target_id]:
+                            back = subject_demand[other]
+                            if back >= periods or source_id not in qualified[other[1]]:
+                                continue
+                            gain = before - \
+                                overflow(source_id, teacher_workload[source_id] - periods + back) - \
+                                overflow(target_id, teacher_workload[target_id] + periods - back)
+                            if gain > best_gain:
+                                best, best_gain = (target_id, other), gain
+                    if best is None:
+                        continue
+
+                    target_id, other = best
+                    assignment_map[key] = target_id
+                    pairs_of[source_id].remove(key)
+                    pairs_of[target_id].append(key)
+                    teacher_workload[source_id] -= periods
+                    teacher_workload[target_id] += periods
+                    if other is not None:
+                        assignment_map[other] = source_id
+                        pairs_of[target_id].remove(other)
+                        pairs_of[source_id].append(other)
+                        teacher_workload[target_id] -= subject_demand[other]
+                        teacher_workload[source_id] += subject_demand[other]
+                    moves += 1
+                    improved = True
+                    if overflow(source_id, teacher_workload[source_id]) == 0:
+                        break
+        return moves
+
+    def _level_peaks(
+        self,
+        assignment_map: Dict[Tuple[str, str], str],
+        subject_demand: Dict[Tuple[str, str], int],
+        candidates: Dict[str, List[Teacher]],
+        teacher_workload: Dict[str, int],
+        teacher_capacity: Dict[str, int]
+    ) -> int:
+        """
+        Move or swap pairs off the most loaded teachers while their load drops.
+
+        The flow's quotas keep the largest load minimal, but whole classes
+        do not always fit them. A move is taken when both teachers end below
+        the source teacher's load and no overflow is added, so the sum of
+        squared loads falls and the pass terminates. Updates assignment_map
+        and teacher_workload in place; returns the moves made.
+        """
+        def overflow(teacher_id, workload):
+            return max(0, workload - teacher_capacity[teacher_id])
+
+        pairs_of = defaultdict(list)
+        for key, teacher_id in assignment_map.items():
+            pairs_of[teacher_id].append(key)
+        qualified = {
+            subject_id: {t.id for t in teachers}
+            for subject_id, teachers in candidates.items()
+        }
+
+        moves = 0
+        improved = True
+        while improved:
+            improved = False
+            for source_id in sorted(pairs_of, key=lambda t: -teacher_workload[t]):
+                peak = teacher_workload[source_id]
+                best = None
+                best_peak = peak
+                for key in pairs_of[source_id]:
+                    periods = subject_demand[key]
+                    if periods == 0:
+                        continue
+                    for target in candidates[key[1]]:
+                        target_id = target.id
+                        load = teacher_workload[target_id]
+                        # The target must end below best_peak after giving back less than periods
+                        if target_id == source_id or load + 1 >= best_peak:
+                            continue
+                        before = overflow(source_id, peak) + overflow(target_id, load)
+                        # Plain move, then swaps with a smaller pair the source can take
+                        options = [(None, 0)]
+                        if load + periods >= best_peak:
+                            options += [
+                                (other, subject_demand[other]) for other in pairs_of[target_id]
+                                if load + periods - best_peak < subject_demand[other] < periods
+                                and source_id in qualified[other[1]]
+                            ]
+                        for other, back in options:
+                            source_load = peak - periods + back
+                            target_load = load + periods - back
+                            new_peak = max(source_load, target_load)
+                            if new_peak >= best_peak:
+                                continue
+                            if overflow(source_id, source_load) + \
+                                    overflow(target_id, target_load) > before:
+                                continue
+                            best, best_peak = (key, target_id, other), new_peak
+                if best is None:
+                    continue
+
+                key, target_id, other = best
+                periods = subject_demand[key]
+                assignment_map[key] = target_id
+                pairs_of[source_id].remove(key)
+                pairs_of[target_id].append(key)
+                teacher_workload[source_id] -= periods
+                teacher_workload[target_id] += periods
+                if other is not None:
+                    assignment_map[other] = source_id
+                    pairs_of[target_id].remove(other)
+                    pairs_of[source_id].append(other)
+                    teacher_workload[target_id] -= subject_demand[other]
+                    teacher_workload[source_id] += subject_demand[other]
+                moves += 1
+                improved = True
+        return moves
@@ -14,14 +14,18 @@ ALGORITHM:
    - Most available time slots
 4. Track teacher workload to ensure fair distribution
 
-VERSION: 1.0.0
+A teacher's capacity is what Teacher.availability, the daily cap and the
+weekly cap leave open (TeacherAvailability.capacity), so a part-time teacher
+is never handed more periods than slots they can teach.
+
+VERSION: 1.1.0
 """
 
 from typing import List, Dict, Tuple, Optional
 from collections import defaultdict
-import random
 
 from src.models_phase1_v25 import Class, Subject, Teacher, TimeSlot
+from src.teacher_availability import TeacherAvailability
 
 
 class GreedyTeacherAssignment:
@@ -38,7 +42,8 @@ class GreedyTeacherAssignment:
         subjects: List[Subject],
         teachers: List[Teacher],
         time_slots: List[TimeSlot],
-        subject_requirements: Optional[Dict[str, int]] = None
+        subject_requirements: Optional[Dict[str, int]] = None,
+        availability: Optional[TeacherAvailability] = None
     ) -> Dict[Tuple[str, str], str]:
         """
         Assign teachers to (class_id, subject_id) pairs using greedy algorithm.
@@ -49,6 +54,8 @@ class GreedyTeacherAssignment:
             teachers: List of teachers
             time_slots: List of time slots (to calculate availability)
             subject_requirements: Optional dict mapping subject_id to periods_per_week
+            availability: Compiled teacher availability (built from
+                time_slots when not given)
 
         Returns:
             Dictionary mapping (class_id, subject_id) -> teacher_id
@@ -62,6 +69,8 @@ class GreedyTeacherAssignment:
         # Filter active slots
         active_slots = [ts for ts in time_slots if not ts.is_break]
         total_slots_per_week = len(active_slots)
+        if availability is None:
+            availability = TeacherAvailability(teachers, active_slots)
 
         # Build teacher-subject qualification map
         teacher_qualifications = self._build_qualification_map(teachers, subjects)
@@ -122,7 +131,7 @@ class GreedyTeacherAssignment:
 
         # Track teacher workload
         teacher_workload = {t.id: 0 for t in teachers}
-        teacher_max_workload = {t.id: t.max_periods_per_week for t in teachers}
+        teacher_max_workload = {t.id: availability.capacity(t) for t in teachers}
 
         # Assignment result
         assignment_map = {}
@@ -181,7 +190,7 @@ class GreedyTeacherAssignment:
                 teacher_workload[best_teacher.id] += periods_needed
 
                 if self.debug:
-                    workload_pct = (teacher_workload[best_teacher.id] / teacher_max_workload[best_teacher.id]) * 100
+                    workload_pct = (teacher_workload[best_teacher.id] / max(1, teacher_max_workload[best_teacher.id])) * 100
                     print(f"  [ASSIGN] {class_obj.name} - {subject.name} → "
                           f"Teacher {best_teacher.id[:8]} "
                           f"({periods_needed}p, {workload_pct:.0f}% capacity)")
@@ -199,7 +208,7 @@ class GreedyTeacherAssignment:
             for teacher in teachers:
                 workload = teacher_workload[teacher.id]
                 max_workload = teacher_max_workload[teacher.id]
-                if workload > 0:
+                if workload > 0 and max_workload > 0:
                     pct = (workload / max_workload) * 100
                     print(f"  Teacher {teacher.id[:8]}: {workload}/{max_workload} periods ({pct:.0f}%)")
 
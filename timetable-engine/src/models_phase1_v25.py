@@ -216,6 +216,31 @@ class GenerateRequest(BaseModel):
     timeout: int = Field(60, ge=10, le=300)
     max_violations: int = Field(0, ge=0, le=3, description="Maximum number of constraint violations allowed (0-3)")
     weights: OptimizationWeights = OptimizationWeights()
+    solver: str = Field(default='csp', pattern='^(csp|cpsat)$',
+                        description="Scheduling engine: 'csp' (greedy CSP v3.0.1) or 'cpsat' (OR-Tools CP-SAT)")
+    seed: Optional[int] = Field(None, ge=0, lt=2 ** 31,
+                                description="Random seed; replaying a request with the seed from diagnostics reproduces it")
+    reference_timetable_id: Optional[str] = Field(None,
+                                                  description="Warm start from a cached timetable (an id from diagnostics['timetable_ids'])")
+    reference_timetable: Optional[Dict[str, Any]] = Field(None,
+                                                          description="Warm start from this timetable (e.g. the previous term's); overrides reference_timetable_id")
+    job_id: Optional[str] = Field(None, min_length=1, max_length=128,
+                                  description="Client-chosen job id; POST /jobs/{job_id}/cancel stops the running request")
+
+class EntityChanges(BaseModel):
+    """IDs of entities edited since the previous timetable was generated."""
+    teacher_ids: List[str] = []
+    class_ids: List[str] = []
+    subject_ids: List[str] = []
+
+class ResolveRequest(GenerateRequest):
+    """
+    Incremental re-solve: current (updated) school data plus the previous
+    timetable and what changed. Only entries touching changed entities are
+    re-scheduled; the rest of previous_timetable is kept.
+    """
+    previous_timetable: Dict[str, Any]
+    changes: EntityChanges = EntityChanges()
 
 class TimetableSolution(BaseModel):
     timetable: Dict[str, Any]  # Changed from Timetable to Dict for flexibility
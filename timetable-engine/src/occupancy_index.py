@@ -0,0 +1,182 @@
+"""
+Occupancy Index - per-solve resource bookkeeping for the CSP solver
+
+PURPOSE:
+The v3.0.1 solver used to recompute a teacher's daily and weekly load on every
+candidate check by scanning the whole teacher_busy dict (and, for the daily
+load, scanning active_slots again for every key). That made each slot
+assignment O(|assignments| x |slots|).
+
+This index keeps per-(teacher, day) and per-teacher counters that are updated
+when an entry is committed, so every load check is O(1). It also tracks
+shared room conflicts, so the solver talks to a single state object.
+
+Shared rooms are handed out best-fit: for each (room group, slot) the index
+keeps the free rooms sorted by capacity, and a bisect on the class size
+returns the smallest room that fits without scanning the busy ones.
+
+Teacher availability (TeacherAvailability, compiled once per solve) is
+checked before the busy set, so unavailable teachers are pruned first.
+
+ENGINES:
+- OccupancyIndex (this module): dict/set based, the default engine
+- BitmaskOccupancy (bitmask_occupancy.py): same interface, bitmask based
+
+USAGE:
+    occupancy = OccupancyIndex(availability)   # availability is optional
+    teacher = occupancy.first_available_teacher(qualified, slot)
+    if teacher:
+        occupancy.commit(teacher.id, slot, room_id=None, class_id=class_obj.id)
+
+VERSION: 1.3.0
+"""
+
+from typing import Dict, Set, Tuple, Any, List, Optional, Hashable
+from collections import defaultdict
+from bisect import bisect_left
+
+
+class OccupancyIndex:
+    """
+    Teacher and shared room occupancy for a single solve.
+
+    One index is created per generated solution and discarded afterwards.
+    """
+
+    engine = "dict"
+
+    def __init__(self, availability=None):
+        # TeacherAvailability or None (every teacher available everywhere)
+        self.availability = availability or None
+        self.teacher_busy: Set[Tuple[str, str]] = set()
+        self.teacher_day_load: Dict[Tuple[str, Any], int] = defaultdict(int)
+        self.teacher_week_load: Dict[str, int] = defaultdict(int)
+        self.shared_room_busy: Set[Tuple[str, str]] = set()
+        # Best-fit room lookup: group -> rooms sorted by capacity, and
+        # (group, slot_id) -> [capacities, rooms] of the rooms still free
+        self._group_rooms: Dict[Hashable, List] = {}
+        self._free_rooms: Dict[Tuple[Hashable, str], List[List]] = {}
+        self._room_groups: Dict[str, Set[Hashable]] = defaultdict(set)
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        """Support `(teacher_id, slot_id) in occupancy` like the old busy dict."""
+        return key in self.teacher_busy
+
+    # ------------------------------------------------------------------
+    # Teachers
+    # ------------------------------------------------------------------
+
+    def is_teacher_free(self, teacher_id: str, slot_id: str) -> bool:
+        """True if the teacher is available and has nothing scheduled in this slot."""
+        if self.availability is not None and not self.availability.allows(teacher_id, slot_id):
+            return False
+        return (teacher_id, slot_id) not in self.teacher_busy
+
+    def within_limits(self, teacher, day) -> bool:
+        """True if one more period keeps the teacher within daily and weekly caps."""
+        if self.teacher_day_load[(teacher.id, day)] >= teacher.max_periods_per_day:
+            return False
+        return self.teacher_week_load[teacher.id] < teacher.max_periods_per_week
+
+    def can_assign(self, teacher, slot) -> bool:
+        """True if the teacher is available, free in this slot and within load limits."""
+        if self.availability is not None and not self.availability.allows(teacher.id, slot.id):
+            return False
+        if (teacher.id, slot.id) in self.teacher_busy:
+            return False
+        return self.within_limits(teacher, slot.day_of_week)
+
+    def first_available_teacher(self, candidates: List, slot, group: Hashable = None):
+        """
+        First candidate teacher that can take this slot, in list order.
+
+        Args:
+            candidates: Teachers to consider (e.g. qualified teachers for a subject)
+            slot: Time slot
+            group: Optional cache key identifying the candidate list (unused here)
+        """
+        for teacher in candidates:
+            if self.can_assign(teacher, slot):
+                return teacher
+        return None
+
+    # ------------------------------------------------------------------
+    # Shared rooms
+    # ------------------------------------------------------------------
+
+    def is_room_free(self, room_id: str, slot_id: str) -> bool:
+        """True if the shared room is not booked in this slot."""
+        return (room_id, slot_id) not in self.shared_room_busy
+
+    def first_free_room(self, rooms: List, slot, min_capacity: int = 0,
+                        group: Hashable = None):
+        """
+        Smallest free room that is large enough (best fit; ties in list order).
+
+        Args:
+            rooms: Candidate shared rooms
+            slot: Time slot
+            min_capacity: Minimum room capacity (class size)
+            group: Optional cache key identifying the candidate list; with it,
+                the free rooms of (group, slot) are kept sorted by capacity
+                and found by bisect
+        """
+        if group is None:
+            best = None
+            for room in rooms:
+                if (room.id, slot.id) not in self.shared_room_busy and room.capacity >= min_capacity:
+                    if best is None or room.capacity < best.capacity:
+                        best = room
+            return best
+
+        free = self._free_rooms.get((group, slot.id))
+        if free is None:
+            free = self._build_free_rooms(rooms, slot, group)
+        capacities, free_rooms = free
+        k = bisect_left(capacities, min_capacity)
+        return free_rooms[k] if k < len(free_rooms) else None
+
+    def _build_free_rooms(self, rooms: List, slot, group: Hashable) -> List[List]:
+        """Free-room list of one (group, slot), created on first use."""
+        group_rooms = self._group_rooms.get(group)
+        if group_rooms is None:
+            group_rooms = sorted(rooms, key=lambda room: room.capacity)  # Stable: ties keep list order
+            self._group_rooms[group] = group_rooms
+            for room in group_rooms:
+                self._room_groups[room.id].add(group)
+        free_rooms = [room for room in group_rooms
+                      if (room.id, slot.id) not in self.shared_room_busy]
+        free = [[room.capacity for room in free_rooms], free_rooms]
+        self._free_rooms[(group, slot.id)] = free
+        return free
+
+    # ------------------------------------------------------------------
+    # Commit
+    # ------------------------------------------------------------------
+
+    def commit(self, teacher_id: str, slot, room_id: Optional[str] = None,
+               class_id: Optional[str] = None) -> None:
+        """
+        Record a scheduled period.
+
+        Args:
+            teacher_id: Teacher teaching the period
+            slot: Time slot
+            room_id: Shared room booked for the period (None for home classrooms)
+            class_id: Class attending (tracked by engines that index classes)
+        """
+        self.teacher_busy.add((teacher_id, slot.id))
+        self.teacher_day_load[(teacher_id, slot.day_of_week)] += 1
+        self.teacher_week_load[teacher_id] += 1
+        if room_id is not None:
+            self.shared_room_busy.add((room_id, slot.id))
+            for group in self._room_groups.get(room_id, ()):
+                free = self._free_rooms.get((group, slot.id))
+                if free is None:
+                    continue
+                capacities, free_rooms = free
+                for k, room in enumerate(free_rooms):
+                    if room.id == room_id:
+                        del capacities[k]
+                        del free_rooms[k]
+                        break
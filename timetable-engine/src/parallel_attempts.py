@@ -0,0 +1,175 @@
+"""
+Parallel Attempts - run independent solver attempts across a process pool
+
+PURPOSE:
+CSPSolverCompleteV301.solve() builds its candidate timetables one attempt at
+a time on one core. Attempts only share the read-only problem instance
+(lookups, greedy teacher assignment, subject distributions), so they can run
+in separate processes:
+
+- The problem is shipped to every worker ONCE (pool initializer), not per task
+- Every attempt carries its own seed (the attempt function builds a
+  random.Random from it), so results do not depend on which worker ran it
+  or in which order workers finished
+- Results are handed back in plan order; the caller replays its usual
+  early-stop logic over them, so the outcome is identical to a sequential run
+  with the same seeds
+
+With workers == 1 no pool is created and attempts run lazily in-process:
+an attempt the caller skips is never computed.
+
+A long-running service passes one shared ProcessPoolExecutor (created at
+startup) instead of starting a pool per solve. The problem is then pickled
+once per solve and sent with its tasks; each worker unpickles it once and
+keeps the last SHARED_PROBLEM_CACHE problems by key. close() only cancels
+the solve's own pending tasks and leaves the shared pool running.
+
+USAGE:
+    runner = AttemptRunner(problem, run_attempt, workers=4)
+    for attempt, result in runner.run(plan):
+        solution = result()          # blocks until this attempt is done
+    runner.close()
+
+    pool = ProcessPoolExecutor(max_workers=os.cpu_count())   # once, at startup
+    runner = AttemptRunner(problem, run_attempt, workers=4, executor=pool)
+
+VERSION: 1.0.0
+"""
+
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+import pickle
+import random
+import uuid
+
+SHARED_PROBLEM_CACHE = 8  # Problems a shared-pool worker keeps unpickled
+
+
+@dataclass(frozen=True)
+class Attempt:
+    """One independent solver attempt."""
+    index: int                        # Position in the plan (merge order)
+    kind: str                         # "partial", "complete" or "backtracking"
+    seed: int                         # Seed for the attempt's random choices
+    relaxation: Optional[float] = None
+    component: Optional[int] = None   # Sub-problem index when the school is decomposed
+
+
+# Worker-side state, set once per process by the pool initializer
+_WORKER_PROBLEM: Optional[Dict[str, Any]] = None
+_WORKER_FN: Optional[Callable] = None
+
+
+def _init_worker(problem: Dict[str, Any], fn: Callable):
+    global _WORKER_PROBLEM, _WORKER_FN
+    _WORKER_PROBLEM = problem
+    _WORKER_FN = fn
+
+
+def _run_in_worker(attempt: Attempt):
+    return _WORKER_FN(_WORKER_PROBLEM, attempt)
+
+
+# Shared-pool worker state: problem key -> (problem, fn), oldest first
+_SHARED_PROBLEMS: Dict[str, Tuple[Dict[str, Any], Callable]] = {}
+
+
+def _run_in_shared_worker(key: str, payload: bytes, attempt: Attempt):
+    if key not in _SHARED_PROBLEMS:
+        while len(_SHARED_PROBLEMS) >= SHARED_PROBLEM_CACHE:
+            del _SHARED_PROBLEMS[next(iter(_SHARED_PROBLEMS))]
+        _SHARED_PROBLEMS[key] = pickle.loads(payload)
+    problem, fn = _SHARED_PROBLEMS[key]
+    return fn(problem, attempt)
+
+
+class AttemptRunner:
+    """
+    Runs attempts sequentially (workers <= 1) or on a ProcessPoolExecutor.
+
+    Args:
+        problem: Read-only problem instance (must be picklable)
+        fn: Module-level or bound-method callable fn(problem, attempt) -> result
+        workers: Number of worker processes
+        executor: Optional shared ProcessPoolExecutor to run on instead of a
+            pool of its own (its size bounds the parallelism)
+    """
+
+    def __init__(self, problem: Dict[str, Any], fn: Callable, workers: int = 1,
+                 executor: Optional[Executor] = None):
+        self.problem = problem
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.shared_executor = executor
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._futures = []
+
+    def run(self, plan: List[Attempt]) -> Iterator[Tuple[Attempt, Callable[[], Any]]]:
+        """
+        Yield (attempt, result) in plan order; result() returns the attempt output.
+
+        In parallel mode every attempt is submitted up front; in sequential
+        mode result() computes the attempt on first call.
+        """
+        if self.workers == 1 or len(plan) <= 1:
+            for attempt in plan:
+                yield attempt, _Lazy(lambda a=attempt: self.fn(self.problem, a))
+            return
+
+        if self.shared_executor is not None:
+            key = uuid.uuid4().hex
+            payload = pickle.dumps((self.problem, self.fn))
+            self._futures = [
+                self.shared_executor.submit(_run_in_shared_worker, key, payload, attempt)
+                for attempt in plan
+            ]
+            for attempt, future in zip(plan, self._futures):
+                yield attempt, future.result
+            return
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=min(self.workers, len(plan)),
+            initializer=_init_worker,
+            initargs=(self.problem, self.fn)
+        )
+        futures = [self._executor.submit(_run_in_worker, attempt) for attempt in plan]
+        for attempt, future in zip(plan, futures):
+            yield attempt, future.result
+
+    def close(self):
+        """Stop the pool, dropping attempts nobody asked for."""
+        for future in self._futures:
+            future.cancel()
+        self._futures = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _Lazy:
+    """Compute-once wrapper for sequential attempts."""
+
+    def __init__(self, compute: Callable[[], Any]):
+        self._compute = compute
+        self._done = False
+        self._value = None
+
+    def __call__(self):
+        if not self._done:
+            self._value = self._compute()
+            self._done = True
+        return self._value
+
+
+def plan_seeds(count: int, base_seed: Optional[int] = None) -> List[int]:
+    """Per-attempt seeds derived from one base seed (drawn if not given)."""
+    if base_seed is None:
+        base_seed = random.randrange(2 ** 31)
+    return [base_seed + i for i in range(count)]
@@ -0,0 +1,100 @@
+"""
+Solution Draft - compact attempt result for the v3.0.1 solver
+
+PURPOSE:
+The greedy and backtracking generators used to build a validated pydantic
+TimetableEntry (plus two fresh metadata dicts and an f-string id) for every
+period they committed, in every attempt - tens of thousands of model
+instances per request on large schools, most of them thrown away when the
+attempt was not among the returned solutions.
+
+During search an attempt now only records placement tuples:
+
+    (class_id, subject_id, teacher_id, slot_index, shared_room_id | None)
+
+plus the slots it left empty. For an empty slot the partial generator keeps
+only GapFacts - how many subjects were rejected because their quota was met,
+no teacher was free, or no room was free - and describe_gap() turns them into
+the human-readable unfilled_slots reason when the draft is materialized.
+CSPSolverCompleteV301 ranks drafts by their
+metadata and materializes TimetableEntry/Timetable objects only for the
+solutions it returns. Drafts are also what worker processes send back, so
+they keep the pickled payload small.
+
+USAGE:
+    draft = SolutionDraft(placements, gaps, fill_self_study=True,
+                          expected_entries=len(classes) * len(active_slots),
+                          metadata={"version": "3.0.1"})
+    draft.entries_count          # entries the timetable will have
+    timetable = solver._materialize_draft(draft, problem)
+    describe_gap((0, 3, 0))      # "No teachers available"
+
+VERSION: 1.1.0
+"""
+
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+Placement = Tuple[str, str, str, int, Optional[str]]
+# (quota_met, blocked_by_teacher, blocked_by_room) subject counts for one slot
+GapFacts = Tuple[int, int, int]
+
+
+def describe_gap(facts: Union[GapFacts, str, None]) -> Optional[str]:
+    """Human-readable reason for an empty slot; plain reasons pass through."""
+    if not isinstance(facts, tuple):
+        return facts
+    quota_met, blocked_by_teacher, blocked_by_room = facts
+    if not (quota_met or blocked_by_teacher or blocked_by_room):
+        return "No subjects configured for this class"
+
+    reasons = []
+    if blocked_by_teacher:
+        reasons.append("No teachers available")
+    if blocked_by_room:
+        reasons.append("No rooms available")
+    if not reasons:
+        reasons.append("All subject quotas met")
+    return "; ".join(reasons)
+
+
+class SolutionDraft:
+    """
+    Placements and empty slots of one attempt, not yet built into a Timetable.
+
+    Args:
+        placements: (class_id, subject_id, teacher_id, slot_index, shared_room_id)
+        gaps: {(class_id, slot_index): reason or GapFacts} for slots left
+            empty; slots in neither placements nor gaps (classes skipped on
+            timeout in complete mode) get no entry at all
+        fill_self_study: True if gaps become SELF_STUDY entries (complete
+            mode with a fallback teacher), False if they are reported as
+            unfilled_slots (partial mode)
+        expected_entries: Classes x active slots
+        metadata: Timetable metadata; keys here win over the defaults added
+            when the draft is materialized
+    """
+
+    __slots__ = ("placements", "gaps", "fill_self_study", "expected_entries", "metadata")
+
+    def __init__(self, placements: List[Placement], gaps: Dict[Tuple[str, int], Union[GapFacts, str, None]],
+                 fill_self_study: bool, expected_entries: int, metadata: Dict[str, Any]):
+        self.placements = placements
+        self.gaps = gaps
+        self.fill_self_study = fill_self_study
+        self.expected_entries = expected_entries
+        self.metadata = metadata
+
+    @property
+    def entries_count(self) -> int:
+        """Entries the materialized timetable will hold (SELF_STUDY included)."""
+        if self.fill_self_study:
+            return len(self.placements) + len(self.gaps)
+        return len(self.placements)
+
+    @property
+    def shared_room_count(self) -> int:
+        return sum(1 for placement in self.placements if placement[4] is not None)
+
+    def __repr__(self) -> str:
+        return (f"SolutionDraft({len(self.placements)} placements, {len(self.gaps)} gaps, "
+                f"coverage={self.metadata.get('coverage', 0):.3f})")
@@ -0,0 +1,118 @@
+"""
+Solve Control - wall-clock budgets and cancellation for anytime solving
+
+PURPOSE:
+GenerateRequest.timeout bounds the whole /generate pipeline, but the CSP and
+GA phases used to run for as long as they needed. A Deadline is created once
+per request and handed to every phase:
+
+- CSP attempts check it between classes and between attempts
+- The backtracking search never gets more than the remaining budget
+- GA evolution checks it between generations
+
+Each phase keeps its best-so-far result and, when the deadline passes, stops
+and returns that incumbent with a timed_out flag instead of failing.
+
+A Deadline is an absolute wall-clock time, so it can be shipped to worker
+processes (parallel_attempts.py) and still mean the same moment there.
+
+A CancellationToken stops a solve that nobody is waiting for any more (the
+client disconnected, or POST /jobs/{job_id}/cancel). A Deadline built with a
+token expires as soon as the token is cancelled, so every loop that already
+checks its deadline - CSP attempts, backtracking, GA generations, tabu
+iterations - also stops on cancellation, without a second check. The token
+wraps a multiprocessing Event, so it reaches attempts running in worker
+processes too (it travels with the problem in the pool initializer). Tasks
+for a shared, long-lived pool are pickled, which a plain multiprocessing
+Event does not allow; such tokens wrap a Manager().Event() instead.
+
+USAGE:
+    deadline = Deadline(request.timeout)
+    for class_obj in classes:
+        if deadline.expired():
+            break                      # keep what was built so far
+    ga.evolve(population, timeout=deadline.remaining())
+
+    token = CancellationToken()
+    solver.solve(..., timeout=60, cancel_token=token)   # token.cancel() from another thread
+
+    token = CancellationToken(manager.Event())          # for solve(..., executor=shared_pool)
+
+VERSION: 1.1.0
+"""
+
+from typing import Optional
+import multiprocessing
+import time
+
+
+class CancellationToken:
+    """
+    Cooperative cancellation flag shared by a request and its solver loops.
+
+    cancel() may be called from any thread; the loops notice it at their
+    next deadline check and return their best result so far.
+
+    Args:
+        event: Event to wrap; defaults to a new multiprocessing.Event. Pass a
+            multiprocessing.Manager().Event() when the token must reach a
+            shared process pool
+    """
+
+    def __init__(self, event=None):
+        self._event = event if event is not None else multiprocessing.Event()
+        self.reason: Optional[str] = None
+
+    def cancel(self, reason: str = "Cancelled"):
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until cancelled or timeout; True if cancelled."""
+        return self._event.wait(timeout)
+
+    def __repr__(self) -> str:
+        return f"CancellationToken({self.reason or 'active'})"
+
+
+class Deadline:
+    """
+    Absolute wall-clock deadline; Deadline(None) never expires (unless cancelled).
+
+    Args:
+        seconds: Budget from now, in seconds (None = unlimited)
+        cancel_token: Optional CancellationToken; once cancelled the deadline
+            counts as expired
+    """
+
+    def __init__(self, seconds: Optional[float] = None,
+                 cancel_token: Optional[CancellationToken] = None):
+        self.expires_at: Optional[float] = None if seconds is None else time.time() + seconds
+        self.cancel_token = cancel_token
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_token is not None and self.cancel_token.cancelled
+
+    def remaining(self) -> float:
+        """Seconds left (0.0 once expired or cancelled, inf if unlimited)."""
+        if self.cancelled:
+            return 0.0
+        if self.expires_at is None:
+            return float("inf")
+        return max(0.0, self.expires_at - time.time())
+
+    def expired(self) -> bool:
+        return self.cancelled or (self.expires_at is not None and time.time() >= self.expires_at)
+
+    def __repr__(self) -> str:
+        if self.cancelled:
+            return "Deadline(cancelled)"
+        if self.expires_at is None:
+            return "Deadline(unlimited)"
+        return f"Deadline({self.remaining():.2f}s left)"
@@ -0,0 +1,132 @@
+"""
+Teacher Availability - per-solve slot bitmasks from Teacher.availability
+
+PURPOSE:
+Teacher.availability was carried through every request but never read by a
+solver, so part-time teachers had to be stripped from the input by hand.
+This module compiles it once per solve into a bitmask over the active-slot
+index (bit i set = the teacher can teach active_slots[i]). The occupancy
+engines check the mask before any busy-map probe, the greedy pre-assignment
+sizes a teacher's capacity from it, and the backtracking search removes the
+unavailable slots from the teacher's domains.
+
+FORMAT (same shape as the backend seed data):
+    {"monday": ["09:00-12:00", "14:00-16:00"], "tuesday": [1, 2, 3],
+     "wednesday": True, "thursday": []}
+
+- Keys are day names (case-insensitive); other keys are ignored
+- A value is True (whole day), False/None/[] (not available), or a list of
+  "HH:MM-HH:MM" windows (the slot must lie inside one) and period numbers
+- Once any day is listed, days that are not listed are unavailable
+- No day keys at all (the default {}) means available in every slot
+
+USAGE:
+    availability = TeacherAvailability(teachers, active_slots)   # once per solve
+    availability.allows(teacher.id, slot.id)   # False = prune before busy checks
+    availability.capacity(teacher)             # periods the teacher can take per week
+
+VERSION: 1.0.0
+"""
+
+from typing import Any, Dict, List, Optional
+
+from src.models_phase1_v30 import DayOfWeek
+
+DAY_NAMES = {day.value.lower(): day for day in DayOfWeek}
+
+
+def _minutes(value: str) -> int:
+    hours, minutes = value.strip().split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def compile_teacher_mask(teacher, active_slots: List) -> Optional[int]:
+    """
+    Available-slot bitmask of one teacher, or None if the teacher is unrestricted.
+
+    Raises:
+        ValueError: availability entry that is neither a window nor a period
+    """
+    availability = getattr(teacher, "availability", None) or {}
+    days: Dict[Any, Any] = {}
+    for key, value in availability.items():
+        day = DAY_NAMES.get(str(key).strip().lower())
+        if day is not None:
+            days[day] = value
+    if not days:
+        return None
+
+    mask = 0
+    for i, slot in enumerate(active_slots):
+        allowed = days.get(slot.day_of_week)
+        if allowed is True:
+            mask |= 1 << i
+            continue
+        for item in allowed or []:
+            if isinstance(item, bool):
+                raise ValueError(f"Teacher {teacher.id}: invalid availability entry {item!r}")
+            if isinstance(item, int):
+                if item == slot.period_number:
+                    mask |= 1 << i
+                    break
+                continue
+            try:
+                start, end = str(item).split("-")
+                inside = _minutes(start) <= _minutes(slot.start_time) and \
+                    _minutes(slot.end_time) <= _minutes(end)
+            except ValueError:
+                raise ValueError(
+                    f"Teacher {teacher.id}: invalid availability entry {item!r} "
+                    f"(expected 'HH:MM-HH:MM' or a period number)"
+                ) from None
+            if inside:
+                mask |= 1 << i
+                break
+    return mask
+
+
+class TeacherAvailability:
+    """
+    Available-slot bitmasks for the teachers of one solve.
+
+    Only restricted teachers are stored; everyone else is available in every
+    active slot.
+    """
+
+    def __init__(self, teachers: List, active_slots: List):
+        self.slot_index = {slot.id: i for i, slot in enumerate(active_slots)}
+        self.all_slots = (1 << len(active_slots)) - 1
+        self.day_slots: Dict[Any, int] = {}
+        for i, slot in enumerate(active_slots):
+            self.day_slots[slot.day_of_week] = self.day_slots.get(slot.day_of_week, 0) | (1 << i)
+
+        self.masks: Dict[str, int] = {}
+        for teacher in teachers:
+            mask = compile_teacher_mask(teacher, active_slots)
+            if mask is not None:
+                self.masks[teacher.id] = mask
+
+    def __bool__(self) -> bool:
+        """True if at least one teacher is restricted."""
+        return bool(self.masks)
+
+    def slots(self, teacher_id: str) -> int:
+        """Bitmask of the active slots the teacher can teach."""
+        return self.masks.get(teacher_id, self.all_slots)
+
+    def allows(self, teacher_id: str, slot_id: str) -> bool:
+        """True if the teacher can teach in this slot (unknown slots are allowed)."""
+        mask = self.masks.get(teacher_id)
+        if mask is None:
+            return True
+        i = self.slot_index.get(slot_id)
+        return i is None or bool(mask >> i & 1)
+
+    def capacity(self, teacher) -> int:
+        """Periods per week the teacher can take: weekly cap, daily caps and available slots."""
+        mask = self.slots(teacher.id)
+        daily = sum(
+            min(teacher.max_periods_per_day, (mask & bits).bit_count())
+            for bits in self.day_slots.values()
+        )
+        return min(teacher.max_periods_per_week, daily)
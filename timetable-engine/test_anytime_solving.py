@@ -0,0 +1,105 @@
+"""
+Test: Anytime solving (v3.0.1 timeout / GenerateRequest.timeout)
+
+Verifies that:
+- Without a timeout nothing is flagged as timed out
+- An expired budget stops between classes and returns the best solution
+  so far (even below min_coverage) with metadata["timed_out"]
+- The skipped classes are reported as gaps in partial mode
+- GA evolution stops between generations and keeps the population; every
+  returned timetable reports its own run in metadata["ga"]
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.csp_solver_complete_v301 import CSPSolverCompleteV301
+from src.algorithms.core.ga_optimizer_v25 import GAOptimizerV25
+from src.algorithms.core.genome import GenomeTable
+from src.solve_control import Deadline
+from school_fixtures import build_school
+
+
+def solve(**kwargs):
+    classes, subjects, teachers, time_slots, rooms = build_school(num_classes=6)
+    return CSPSolverCompleteV301(debug=False).solve(
+        classes=classes, subjects=subjects, teachers=teachers,
+        time_slots=time_slots, rooms=rooms, constraints=[],
+        num_solutions=3, seed=11, **kwargs
+    ), len(time_slots)
+
+
+def test_deadline():
+    assert not Deadline().expired()
+    assert Deadline().remaining() == float("inf")
+    assert Deadline(0).expired()
+    assert Deadline(0).remaining() == 0.0
+    assert 59 < Deadline(60).remaining() <= 60
+
+
+def test_no_timeout_is_not_flagged():
+    (timetables, _, conflicts, _), _ = solve(allow_partial_solutions=False)
+    assert conflicts is None
+    assert len(timetables) == 3
+    assert not any(tt.metadata["timed_out"] for tt in timetables)
+
+
+def test_expired_budget_returns_incumbent():
+    (timetables, _, conflicts, _), num_slots = solve(allow_partial_solutions=True,
+                                                     min_coverage=0.9, timeout=0)
+    assert conflicts is None
+    assert len(timetables) == 1
+    timetable = timetables[0]
+    assert timetable.metadata["timed_out"]
+    # Only the first class was scheduled before the deadline check
+    assert {e.class_id for e in timetable.entries} == {"C0"}
+    assert timetable.metadata["coverage"] < 0.9
+    skipped = [g for g in timetable.metadata["unfilled_slots"]
+               if g["reason"] == "Time budget exhausted"]
+    assert len(skipped) == 5 * num_slots
+
+
+def test_expired_budget_complete_and_backtracking():
+    (timetables, _, _, _), _ = solve(allow_partial_solutions=False, timeout=0)
+    assert len(timetables) == 1 and timetables[0].metadata["timed_out"]
+
+    (timetables, _, _, _), _ = solve(allow_partial_solutions=False, timeout=0,
+                                     search_mode="backtracking")
+    assert len(timetables) == 1 and timetables[0].metadata["timed_out"]
+
+
+def test_ga_stops_between_generations():
+    (timetables, _, _, _), _ = solve(allow_partial_solutions=False)
+    population = [tt.model_dump() for tt in timetables]
+
+    ga = GAOptimizerV25(enable_caching=False)
+    result = ga.evolve(population, generations=5, seed=3, timeout=0)
+    assert ga.timed_out
+    assert ga.stats_history == []
+    assert len(result) == len(population)
+    assert all(tt["metadata"]["ga"]["timed_out"] for tt in result)
+    assert result[0]["metadata"]["ga"]["generations"] == 0
+
+    second = ga.evolve(population, generations=2, seed=3)
+    assert not ga.timed_out
+    assert len(ga.stats_history) == 2
+    table = GenomeTable(population, evaluator=ga.evaluator)
+    initial = max(table.encode(i).score for i in range(len(population)))
+    assert second[0]["metadata"]["ga"] == {
+        "seed": 3, "generations": 2, "timed_out": False, "stop_reason": "generations",
+        "best_fitness": ga.stats_history[-1].best_fitness,
+        "improvement": ga.stats_history[-1].best_fitness - initial
+    }
+    # The first run's results are unaffected by the second run
+    assert result[0]["metadata"]["ga"]["timed_out"]
+
+
+if __name__ == "__main__":
+    test_deadline()
+    test_no_timeout_is_not_flagged()
+    test_expired_budget_returns_incumbent()
+    test_expired_budget_complete_and_backtracking()
+    test_ga_stops_between_generations()
+    print("✅ PASSED: anytime solving tests")
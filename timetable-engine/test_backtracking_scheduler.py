@@ -0,0 +1,130 @@
+"""
+Test: Backtracking search mode (v3.0.1 search_mode="backtracking")
+
+Verifies that:
+- A fully packed school (demand == slots for every class) is scheduled
+  completely in one attempt, without SELF_STUDY fallbacks
+- The result respects class, teacher, daily/weekly cap and shared room limits
+- Demand that can never fit is trimmed up front instead of exhausting the budget
+- A tiny node budget stops the search after its 10 placements; the ladder
+  fills the rest
+- In partial mode the relaxation ladder fills the slots backtracking cannot
+  (e.g. lab periods without a lab), keeping every search placement
+"""
+
+import sys
+import random
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.models_phase1_v30 import Room, RoomType, Subject
+from src.csp_solver_complete_v301 import CSPSolverCompleteV301
+from school_fixtures import build_school, assert_valid
+
+
+def solve(classes, subjects, teachers, time_slots, rooms, **kwargs):
+    random.seed(7)
+    return CSPSolverCompleteV301(debug=False).solve(
+        classes=classes, subjects=subjects, teachers=teachers,
+        time_slots=time_slots, rooms=rooms, constraints=[],
+        num_solutions=1, search_mode="backtracking", **kwargs
+    )
+
+
+def test_packed_school_is_complete_in_one_attempt():
+    classes, subjects, teachers, time_slots, rooms = build_school()
+    # Two classes share a single lab for Science
+    subjects[2] = Subject(id="SCI", school_id="S1", name="Science", code="SCI",
+                          periods_per_week=7, requires_lab=True)
+    rooms.append(Room(id="LAB1", school_id="S1", name="Lab 1", capacity=40, type=RoomType.LAB))
+
+    timetables, _, conflicts, _ = solve(classes, subjects, teachers, time_slots, rooms,
+                                        allow_partial_solutions=False)
+    assert conflicts is None
+    timetable = timetables[0]
+    assert timetable.metadata["search_complete"]
+    assert timetable.metadata["unplaceable_periods"] == 0
+    assert not any(e.subject_id == "SELF_STUDY" for e in timetable.entries)
+    assert len(timetable.entries) == len(classes) * len(time_slots)
+    assert all(e.room_id == "LAB1" and e.is_shared_room
+               for e in timetable.entries if e.subject_id == "SCI")
+    assert_valid(timetable, teachers)
+
+
+def test_unplaceable_demand_is_trimmed():
+    classes, subjects, teachers, time_slots, rooms = build_school()
+    # Science teachers can only cover 5 periods each per week
+    for teacher in teachers:
+        if teacher.id.startswith("T_SCI"):
+            teacher.max_periods_per_week = 5
+
+    timetables, _, _, _ = solve(classes, subjects, teachers, time_slots, rooms,
+                                allow_partial_solutions=False)
+    metadata = timetables[0].metadata
+    assert metadata["search_complete"]
+    assert metadata["unplaceable_periods"] == 4 * 7 - 2 * 5
+    assert metadata["search_backtracks"] == 0
+    assert_valid(timetables[0], teachers)
+
+
+def test_node_budget_returns_best_partial():
+    classes, subjects, teachers, time_slots, rooms = build_school()
+    timetables, _, _, _ = solve(classes, subjects, teachers, time_slots, rooms,
+                                allow_partial_solutions=True, min_coverage=0.0,
+                                search_node_limit=10)
+    metadata = timetables[0].metadata
+    assert not metadata["search_complete"]
+    assert metadata["search_nodes"] == 10
+    # Every other period comes from the ladder's strict pass
+    assert metadata["relaxation_fills"]["0.0"] == len(classes) * len(time_slots) - 10
+    assert metadata["entries_count"] == len(classes) * len(time_slots)
+
+
+def test_partial_mode_relaxes_the_remaining_gaps():
+    classes, subjects, teachers, time_slots, rooms = build_school()
+    # Science needs a lab, and the school has none
+    subjects[2] = Subject(id="SCI", school_id="S1", name="Science", code="SCI",
+                          periods_per_week=7, requires_lab=True)
+    for teacher in teachers:
+        teacher.max_periods_per_day = 6
+        teacher.max_periods_per_week = 30
+
+    strict, _, _, _ = solve(classes, subjects, teachers, time_slots, rooms,
+                            allow_partial_solutions=False)
+    searched = {(e.class_id, e.time_slot_id): e for e in strict[0].entries
+                if e.subject_id != "SELF_STUDY"}
+    timetables, _, conflicts, _ = solve(classes, subjects, teachers, time_slots, rooms,
+                                        allow_partial_solutions=True, min_coverage=0.0)
+    assert conflicts is None
+    metadata = timetables[0].metadata
+    assert metadata["search_complete"]
+    assert metadata["unplaceable_periods"] == 4 * 7
+    assert len(searched) == len(classes) * len(time_slots) - 4 * 7
+    assert metadata["coverage"] == 1.0
+    assert sum(metadata["relaxation_fills"].values()) == 4 * 7
+    assert any(e.subject_id == "SCI" for e in timetables[0].entries)
+    for entry in timetables[0].entries:
+        kept = searched.get((entry.class_id, entry.time_slot_id))
+        assert kept is None or (kept.subject_id, kept.teacher_id) == (entry.subject_id, entry.teacher_id)
+    assert_valid(timetables[0], teachers)
+
+
+def test_unknown_search_mode_is_rejected():
+    classes, subjects, teachers, time_slots, rooms = build_school()
+    timetables, _, conflicts, _ = CSPSolverCompleteV301(debug=False).solve(
+        classes=classes, subjects=subjects, teachers=teachers,
+        time_slots=time_slots, rooms=rooms, constraints=[],
+        search_mode="annealing"
+    )
+    assert timetables == []
+    assert "Unknown search mode" in conflicts[0]
+
+
+if __name__ == "__main__":
+    test_packed_school_is_complete_in_one_attempt()
+    test_unplaceable_demand_is_trimmed()
+    test_node_budget_returns_best_partial()
+    test_partial_mode_relaxes_the_remaining_gaps()
+    test_unknown_search_mode_is_rejected()
+    print("✅ PASSED: backtracking search tests")
@@ -0,0 +1,153 @@
+"""
+Test: Bitmask slot-domain engine (v3.0.1 state_engine="bitmask")
+
+Verifies that:
+- BitmaskOccupancy answers teacher/room/class queries like OccupancyIndex
+- Slot-domain intersections ("teacher X and a lab free") are correct
+- Both engines hand out shared rooms best-fit (smallest room that fits)
+- The solver produces identical timetables with both engines
+"""
+
+import sys
+import random
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.models_phase1_v30 import Room, RoomType, Subject, V30Validator
+from src.occupancy_index import OccupancyIndex
+from src.bitmask_occupancy import BitmaskLayout, iter_bits
+from src.csp_solver_complete_v301 import CSPSolverCompleteV301
+from school_fixtures import build_school
+
+
+def build_layout():
+    classes, subjects, teachers, time_slots, rooms = build_school()
+    rooms = rooms + [
+        Room(id="LAB1", school_id="S1", name="Lab 1", capacity=35, type=RoomType.LAB),
+        Room(id="LAB2", school_id="S1", name="Lab 2", capacity=20, type=RoomType.LAB),
+    ]
+    shared_rooms = V30Validator.extract_shared_rooms(rooms)
+    return BitmaskLayout(teachers, shared_rooms, time_slots), teachers, shared_rooms, time_slots
+
+
+def test_iter_bits():
+    assert list(iter_bits(0b101001)) == [0, 3, 5]
+    assert list(iter_bits(0)) == []
+
+
+def test_teacher_queries_match_dict_engine():
+    layout, teachers, _, time_slots = build_layout()
+    bitmask = layout.new_state()
+    reference = OccupancyIndex()
+
+    teacher = teachers[0]
+    monday = [ts for ts in time_slots if ts.day_of_week.value == "MONDAY"]
+    for slot in monday[:teacher.max_periods_per_day]:
+        bitmask.commit(teacher.id, slot)
+        reference.commit(teacher.id, slot)
+
+    for slot in time_slots:
+        for t in teachers:
+            assert bitmask.can_assign(t, slot) == reference.can_assign(t, slot)
+            assert bitmask.is_teacher_free(t.id, slot.id) == reference.is_teacher_free(t.id, slot.id)
+
+    # Daily cap reached: first available teacher skips teacher 0 on Monday
+    assert bitmask.first_available_teacher(teachers[:2], monday[-1], group="pair") == teachers[1]
+    assert reference.first_available_teacher(teachers[:2], monday[-1]) == teachers[1]
+
+
+def test_room_queries_and_capacity():
+    layout, teachers, shared_rooms, time_slots = build_layout()
+    occupancy = layout.new_state()
+    slot = time_slots[0]
+
+    # Lab 2 is too small for 30 students, so Lab 1 is the only fit
+    room = occupancy.first_free_room(shared_rooms, slot, min_capacity=30, group=RoomType.LAB)
+    assert room.id == "LAB1"
+
+    occupancy.commit(teachers[0].id, slot, room_id="LAB1", class_id="C0")
+    assert not occupancy.is_room_free("LAB1", slot.id)
+    assert occupancy.first_free_room(shared_rooms, slot, min_capacity=30, group=RoomType.LAB) is None
+    assert occupancy.first_free_room(shared_rooms, slot, min_capacity=20, group="any").id == "LAB2"
+
+
+def test_best_fit_room_matches_dict_engine():
+    layout, teachers, shared_rooms, time_slots = build_layout()
+    slot = time_slots[0]
+    for occupancy in (layout.new_state(), OccupancyIndex()):
+        # 20 students fit both labs: the smaller Lab 2 is chosen, then Lab 1
+        assert occupancy.first_free_room(shared_rooms, slot, min_capacity=20, group=RoomType.LAB).id == "LAB2"
+        occupancy.commit(teachers[0].id, slot, room_id="LAB2")
+        assert occupancy.first_free_room(shared_rooms, slot, min_capacity=20, group=RoomType.LAB).id == "LAB1"
+        assert occupancy.first_free_room(shared_rooms, slot, min_capacity=40, group=RoomType.LAB) is None
+        # Other slots are unaffected
+        assert occupancy.first_free_room(shared_rooms, time_slots[1], min_capacity=20, group="any").id == "LAB2"
+
+
+def test_room_plan_is_resolved_once():
+    _, subjects, _, _, _ = build_school()
+    _, _, shared_rooms, _ = build_layout()
+    subjects = subjects + [Subject(id="CHEM", school_id="S1", name="Chemistry", code="CHEM",
+                                   periods_per_week=2, requires_lab=True)]
+    plan = CSPSolverCompleteV301(debug=False)._build_room_plan(subjects, shared_rooms)
+    assert plan["room_type"]["CHEM"] == RoomType.LAB
+    assert plan["room_type"]["MATH"] is None
+    assert [r.id for r in plan["rooms"][RoomType.LAB]] == ["LAB2", "LAB1"]
+
+
+def test_common_free_slots():
+    layout, teachers, _, time_slots = build_layout()
+    occupancy = layout.new_state()
+
+    # Book both labs in slot 0, teacher 0 in slot 1, class C0 in slot 2
+    occupancy.commit(teachers[1].id, time_slots[0], room_id="LAB1")
+    occupancy.commit(teachers[2].id, time_slots[0], room_id="LAB2")
+    occupancy.commit(teachers[0].id, time_slots[1])
+    occupancy.commit(teachers[3].id, time_slots[2], class_id="C0")
+
+    mask = occupancy.common_free_slots(teachers[0].id, RoomType.LAB, class_id="C0")
+    free = set(iter_bits(mask))
+    assert 0 not in free and 1 not in free and 2 not in free
+    assert free == set(range(3, len(time_slots)))
+
+
+def test_engines_produce_identical_timetables():
+    classes, subjects, teachers, time_slots, rooms = build_school()
+    signatures = {}
+    for engine in ("dict", "bitmask"):
+        random.seed(42)
+        timetables, _, _, _ = CSPSolverCompleteV301(debug=False).solve(
+            classes=classes, subjects=subjects, teachers=teachers,
+            time_slots=time_slots, rooms=rooms, constraints=[],
+            num_solutions=2, state_engine=engine
+        )
+        signatures[engine] = [
+            [(e.class_id, e.subject_id, e.teacher_id, e.room_id, e.time_slot_id) for e in tt.entries]
+            for tt in timetables
+        ]
+    assert signatures["dict"]
+    assert signatures["dict"] == signatures["bitmask"]
+
+
+def test_unknown_engine_is_rejected():
+    classes, subjects, teachers, time_slots, rooms = build_school()
+    timetables, _, conflicts, _ = CSPSolverCompleteV301(debug=False).solve(
+        classes=classes, subjects=subjects, teachers=teachers,
+        time_slots=time_slots, rooms=rooms, constraints=[],
+        state_engine="numpy"
+    )
+    assert timetables == []
+    assert "Unknown state engine" in conflicts[0]
+
+
+if __name__ == "__main__":
+    test_iter_bits()
+    test_teacher_queries_match_dict_engine()
+    test_room_queries_and_capacity()
+    test_best_fit_room_matches_dict_engine()
+    test_room_plan_is_resolved_once()
+    test_common_free_slots()
+    test_engines_produce_identical_timetables()
+    test_unknown_engine_is_rejected()
+    print("✅ PASSED: bitmask engine tests")
@@ -0,0 +1,183 @@
+"""
+Test: Cooperative cancellation (v3.0.1 CancellationToken)
+
+Verifies that:
+- A Deadline with a cancelled token counts as expired
+- Solve, resolve and the backtracking search stop at once when cancelled
+- Attempts in worker processes see a cancel issued by the parent, also on
+  a shared pool with a Manager-backed token
+- Tabu search stops mid-run and GA between generations
+- /jobs/{job_id}/cancel and a client disconnect cancel a registered job,
+  and a cancelled /generate answers 499
+"""
+
+import asyncio
+import multiprocessing
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fastapi.testclient import TestClient
+
+import main_v301
+from src.models_phase1_v25 import GenerateRequest
+from src.csp_solver_complete_v301 import CSPSolverCompleteV301
+from src.backtracking_scheduler import BacktrackingScheduler
+from src.parallel_attempts import Attempt, AttemptRunner
+from src.algorithms.core.ga_optimizer_v25 import GAOptimizerV25
+from src.algorithms.core.local_search import TabuSearchOptimizer
+from src.solve_control import CancellationToken, Deadline
+from school_fixtures import build_school, payload, baseline
+
+
+def cancelled_token(reason="Test"):
+    token = CancellationToken()
+    token.cancel(reason)
+    return token
+
+
+def test_cancelled_deadline_counts_as_expired():
+    token = CancellationToken()
+    deadline = Deadline(60, token)
+    assert not deadline.expired() and deadline.remaining() > 59
+    token.cancel("Client disconnected")
+    token.cancel("ignored")
+    assert deadline.expired() and deadline.cancelled
+    assert deadline.remaining() == 0.0
+    assert token.reason == "Client disconnected"
+    assert Deadline(None, token).expired()
+
+
+def test_cancelled_solves_stop_at_once():
+    classes, subjects, teachers, time_slots, rooms = build_school(num_classes=6)
+    for search_mode in ("greedy", "backtracking"):
+        timetables, _, conflicts, _ = CSPSolverCompleteV301(debug=False).solve(
+            classes=classes, subjects=subjects, teachers=teachers, time_slots=time_slots,
+            rooms=rooms, constraints=[], num_solutions=3, seed=1, search_mode=search_mode,
+            cancel_token=cancelled_token()
+        )
+        assert timetables == [] and conflicts == ["Solve cancelled: Test"]
+
+    active_slots = [ts for ts in time_slots if not ts.is_break]
+    result = BacktrackingScheduler().search(
+        classes, active_slots, [], {c.id: {"MATH": 8} for c in classes},
+        {(c.id, "MATH"): "T_MATH_0" for c in classes}, {t.id: t for t in teachers},
+        {s.id: s for s in subjects}, lambda class_obj, subject: None,
+        cancel_token=cancelled_token()
+    )
+    assert result.budget_exhausted and result.nodes == 0
+
+    (classes, subjects, teachers, time_slots, rooms), previous = baseline()
+    teachers[0].subjects = []
+    timetables, _, _, _ = CSPSolverCompleteV301(debug=False).resolve(
+        previous, classes, subjects, teachers, time_slots, rooms,
+        changed_teacher_ids=[teachers[0].id], seed=2, cancel_token=cancelled_token()
+    )
+    metadata = timetables[0].metadata
+    assert metadata["cancelled"] and metadata["incremental"]["placed_entries"] == 0
+
+
+def wait_for_cancel(problem, attempt):
+    """Attempt that runs until its deadline is cancelled (or 10s pass)."""
+    start = time.time()
+    while not problem["deadline"].expired() and time.time() - start < 10:
+        time.sleep(0.01)
+    return time.time() - start
+
+
+def test_worker_processes_see_cancellation():
+    token = CancellationToken()
+    problem = {"deadline": Deadline(None, token)}
+    plan = [Attempt(index=i, kind="partial", seed=i) for i in range(2)]
+    threading.Timer(0.5, token.cancel).start()
+    with AttemptRunner(problem, wait_for_cancel, workers=2) as runner:
+        durations = [result() for _, result in runner.run(plan)]
+    assert all(duration < 5 for duration in durations)
+
+    # Shared pool: tasks are pickled, so the token wraps a Manager event
+    with multiprocessing.Manager() as manager, ProcessPoolExecutor(max_workers=2) as pool:
+        token = CancellationToken(manager.Event())
+        problem = {"deadline": Deadline(None, token)}
+        threading.Timer(0.5, token.cancel).start()
+        with AttemptRunner(problem, wait_for_cancel, workers=2, executor=pool) as runner:
+            durations = [result() for _, result in runner.run(plan)]
+        assert all(duration < 5 for duration in durations)
+
+
+def test_tabu_and_ga_stop_when_cancelled():
+    classes, subjects, teachers, time_slots, rooms = build_school(num_classes=6)
+    for subject in subjects[:2]:
+        subject.prefer_morning = True
+    timetables, _, _, _ = CSPSolverCompleteV301(debug=False).solve(
+        classes=classes, subjects=subjects, teachers=teachers, time_slots=time_slots,
+        rooms=rooms, constraints=[], num_solutions=2, allow_partial_solutions=False, seed=1
+    )
+    population = [tt.model_dump() for tt in timetables]
+
+    token = CancellationToken()
+    threading.Timer(0.3, token.cancel).start()
+    start = time.time()
+    improved = TabuSearchOptimizer(max_iterations=10 ** 9, patience=10 ** 9).optimize(
+        population[0], teachers=teachers, time_slots=time_slots, seed=3, cancel_token=token
+    )
+    assert time.time() - start < 5
+    stats = improved["metadata"]["local_search"]
+    assert stats["cancelled"] and stats["timed_out"] and stats["iterations"] > 0
+
+    ga = GAOptimizerV25(enable_caching=False)
+    result = ga.evolve(population, generations=5, seed=3, cancel_token=cancelled_token())
+    assert ga.timed_out and ga.stats_history == []
+    assert len(result) == len(population)
+
+
+class FakeClient:
+    """Stands in for the Starlette request: disconnects after `after` checks."""
+
+    def __init__(self, after=None):
+        self.after = after
+        self.checks = 0
+
+    async def is_disconnected(self):
+        self.checks += 1
+        return self.after is not None and self.checks > self.after
+
+
+def test_cancel_endpoint_and_disconnect():
+    with TestClient(main_v301.app) as client:
+        assert client.post("/jobs/nope/cancel").status_code == 404
+
+        async def cancel_by_endpoint():
+            async with main_v301.cancellable_job("job-1", FakeClient()) as (job_id, token):
+                assert main_v301.app.state.jobs[job_id] is token
+                assert (await main_v301.cancel_job(job_id))["status"] == "cancelling"
+                return token
+
+        token = asyncio.run(cancel_by_endpoint())
+        assert token.reason == "Cancelled by request"
+        assert "job-1" not in main_v301.app.state.jobs
+
+        async def cancel_by_disconnect():
+            async with main_v301.cancellable_job(None, FakeClient(after=1)) as (job_id, token):
+                await asyncio.sleep(1.2)
+                return token
+
+        assert asyncio.run(cancel_by_disconnect()).reason == "Client disconnected"
+        assert main_v301.app.state.jobs == {}
+
+        # A cancelled generate answers 499 without running the later phases
+        request = GenerateRequest(**payload())
+        response = asyncio.run(main_v301.run_generate(request, "job-2", cancelled_token()))
+        assert response.status_code == 499
+
+
+if __name__ == "__main__":
+    test_cancelled_deadline_counts_as_expired()
+    test_cancelled_solves_stop_at_once()
+    test_worker_processes_see_cancellation()
+    test_tabu_and_ga_stop_when_cancelled()
+    test_cancel_endpoint_and_disconnect()
+    print("✅ PASSED: cancellation tests")
@@ -0,0 +1,96 @@
+"""
+Test: Most-constrained-first class ordering (v3.0.1 class_ordering)
+
+Verifies that:
+- Classes needing an oversubscribed teacher are ranked before the others
+- Equally hard classes keep request order
+- Periods that cannot be placed at all (no room of the type) add nothing
+- solve() keeps request order by default, fills the hardest class first
+  with class_ordering="difficulty" and rejects unknown orderings
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.models_phase1_v30 import Room, RoomType, Subject, Teacher, V30Validator
+from src.csp_solver_complete_v301 import CSPSolverCompleteV301
+from school_fixtures import build_school
+
+
+def lab_school():
+    """build_school() plus Chemistry (one part-time teacher) for C2 and Drama (no room) for C1."""
+    classes, subjects, teachers, time_slots, rooms = build_school(num_classes=4)
+    subjects.append(Subject(id="CHEM", school_id="S1", name="Chemistry", code="CHEM",
+                            periods_per_week=4, requires_lab=True))
+    subjects.append(Subject(id="DRAMA", school_id="S1", name="Drama", code="DRAMA",
+                            periods_per_week=4))
+    teachers.append(Teacher(id="T_CHEM", user_id="U_CHEM", subjects=["Chemistry"],
+                            max_periods_per_day=2, max_periods_per_week=4))
+    teachers[0].subjects = teachers[0].subjects + ["Drama"]
+    rooms.append(Room(id="LAB1", school_id="S1", name="Lab", capacity=40, type=RoomType.LAB))
+    base = {"MATH": 8, "ENG": 8, "SCI": 7, "HIST": 7}
+    distributions = {c.id: dict(base) for c in classes}
+    distributions["C2"] = {"MATH": 8, "ENG": 8, "SCI": 3, "HIST": 7, "CHEM": 4}
+    distributions["C1"] = {"MATH": 8, "ENG": 8, "SCI": 3, "HIST": 7, "DRAMA": 4}
+    return classes, subjects, teachers, time_slots, rooms, distributions
+
+
+def rank(solver, classes, subjects, teachers, time_slots, rooms, distributions):
+    return [c.id for c in solver._order_by_difficulty(
+        classes, distributions, solver._build_teacher_subject_map(teachers, subjects),
+        {s.id: s for s in subjects}, {t.id: t for t in teachers},
+        V30Validator.extract_shared_rooms(rooms), {}, len(time_slots)
+    )]
+
+
+def test_lab_class_ranks_first_and_ties_keep_order():
+    classes, subjects, teachers, time_slots, rooms, distributions = lab_school()
+    order = rank(CSPSolverCompleteV301(debug=False), classes, subjects, teachers,
+                 time_slots, rooms, distributions)
+    assert order[0] == "C2"
+    # Drama has no room at all, so C1 is easier than the plain classes
+    assert order == ["C2", "C0", "C3", "C1"]
+
+
+def test_solve_fills_hardest_class_first():
+    classes, subjects, teachers, time_slots, rooms, _ = lab_school()
+    classes[3].grade = 7
+    grade_periods = {
+        6: {"MATH": 8, "ENG": 8, "SCI": 7, "HIST": 7},
+        7: {"MATH": 8, "ENG": 8, "SCI": 3, "HIST": 7, "CHEM": 4},
+    }
+    requirements = [
+        {"grade": grade, "subject_id": subject_id, "periods_per_week": periods}
+        for grade, periods_by_subject in grade_periods.items()
+        for subject_id, periods in periods_by_subject.items()
+    ]
+    solver = CSPSolverCompleteV301(debug=False)
+    kwargs = dict(classes=classes, subjects=subjects[:5], teachers=teachers,
+                  time_slots=time_slots, rooms=rooms, constraints=[], num_solutions=1,
+                  subject_requirements=requirements, allow_partial_solutions=False, seed=1)
+
+    timetables, _, _, _ = solver.solve(class_ordering="difficulty", **kwargs)
+    assert timetables[0].entries[0].class_id == "C3"
+    assert timetables[0].metadata["attempts"] == 1
+
+    timetables, _, _, _ = solver.solve(**kwargs)
+    assert timetables[0].entries[0].class_id == "C0"
+
+
+def test_unknown_class_ordering_is_rejected():
+    classes, subjects, teachers, time_slots, rooms = build_school()
+    timetables, _, conflicts, _ = CSPSolverCompleteV301(debug=False).solve(
+        classes=classes, subjects=subjects, teachers=teachers, time_slots=time_slots,
+        rooms=rooms, constraints=[], class_ordering="alphabetical"
+    )
+    assert timetables == []
+    assert "Unknown class ordering" in conflicts[0]
+
+
+if __name__ == "__main__":
+    test_lab_class_ranks_first_and_ties_keep_order()
+    test_solve_fills_hardest_class_first()
+    test_unknown_class_ordering_is_rejected()
+    print("✅ PASSED: class ordering tests")
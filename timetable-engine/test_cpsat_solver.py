@@ -0,0 +1,176 @@
+"""
+Test: CP-SAT backend (CPSATSolverV301)
+
+Verifies that:
+- The CP-SAT engine schedules a packed school completely (no SELF_STUDY)
+  where the greedy engine leaves gaps
+- Teacher, class and shared room limits are respected
+- Morning preferences are honoured when there is room for them
+- Every solution differs from each earlier one
+- Teachers come from the same pre-assignment as the CSP engine (flow)
+- Without a CP-SAT incumbent in time the warm start placement is returned,
+  and a later miss keeps the solutions already found
+- A teacher with limited availability is only scheduled in their open slots
+- GenerateRequest selects the engine per request
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.models_phase1_v30 import Room, RoomType, Subject
+from src.models_phase1_v25 import GenerateRequest
+from src.cpsat_solver import CPSATSolverV301
+from src.teacher_availability import TeacherAvailability
+from school_fixtures import build_school, assert_valid
+
+
+def test_packed_school_is_optimal():
+    classes, subjects, teachers, time_slots, rooms = build_school()
+    subjects[2] = Subject(id="SCI", school_id="S1", name="Science", code="SCI",
+                          periods_per_week=7, requires_lab=True)
+    rooms.append(Room(id="LAB1", school_id="S1", name="Lab 1", capacity=40, type=RoomType.LAB))
+
+    timetables, _, conflicts, _ = CPSATSolverV301(num_workers=1).solve(
+        classes, subjects, teachers, time_slots, rooms, [],
+        num_solutions=1, allow_partial_solutions=False, timeout=20
+    )
+    assert conflicts is None
+    timetable = timetables[0]
+    assert timetable.metadata["cpsat_status"] == "OPTIMAL"
+    assert timetable.metadata["unplaceable_periods"] == 0
+    assert not any(e.subject_id == "SELF_STUDY" for e in timetable.entries)
+    assert all(e.room_id == "LAB1" for e in timetable.entries if e.subject_id == "SCI")
+    assert_valid(timetable, teachers)
+
+
+def test_morning_preference_and_multiple_solutions():
+    classes, subjects, teachers, time_slots, rooms = build_school()
+    subjects[0] = Subject(id="MATH", school_id="S1", name="Mathematics", code="MATH",
+                          periods_per_week=8, prefer_morning=True)
+
+    timetables, _, _, _ = CPSATSolverV301(num_workers=1).solve(
+        classes, subjects, teachers, time_slots, rooms, [],
+        num_solutions=2, timeout=20, morning_period_cutoff=4
+    )
+    assert len(timetables) == 2
+    first = timetables[0]
+    assert first.metadata["cpsat_objective"] == 0
+    assert all(e.period_number <= 4 for e in first.entries if e.subject_id == "MATH")
+
+    signatures = [set((e.class_id, e.subject_id, e.time_slot_id) for e in tt.entries)
+                  for tt in timetables]
+    assert signatures[0] != signatures[1]
+    for timetable in timetables:
+        assert_valid(timetable, teachers)
+
+
+class NoIncumbentAfter(CPSATSolverV301):
+    """Gives CP-SAT no time once `solved` solves have run, so it ends UNKNOWN."""
+
+    def __init__(self, solved):
+        super().__init__(num_workers=1)
+        self.solved = solved
+
+    def _solve_cancellable(self, solver, model, cancel_token):
+        if self.solved:
+            self.solved -= 1
+        else:
+            solver.parameters.max_time_in_seconds = 1e-9
+        return super()._solve_cancellable(solver, model, cancel_token)
+
+
+def test_every_solution_differs_from_all_earlier_ones():
+    classes, subjects, teachers, time_slots, rooms = build_school()
+    timetables, _, _, _ = CPSATSolverV301(num_workers=1).solve(
+        classes, subjects, teachers, time_slots, rooms, [],
+        num_solutions=3, timeout=30, seed=3
+    )
+    assert len(timetables) == 3
+    signatures = [frozenset((e.class_id, e.subject_id, e.time_slot_id) for e in tt.entries)
+                  for tt in timetables]
+    assert len(set(signatures)) == 3
+
+
+def test_teachers_follow_the_flow_assignment():
+    classes, subjects, teachers, time_slots, rooms = build_school()
+    solver = CPSATSolverV301(num_workers=1)
+    expected = solver.flow_assigner.assign_teachers(classes, subjects, teachers, time_slots)
+    timetables, _, _, _ = solver.solve(
+        classes, subjects, teachers, time_slots, rooms, [],
+        num_solutions=1, timeout=20, seed=3
+    )
+    assert all(expected[(e.class_id, e.subject_id)] == e.teacher_id for e in timetables[0].entries)
+
+    _, _, conflicts, _ = solver.solve(
+        classes, subjects, teachers, time_slots, rooms, [], teacher_assignment="simplex"
+    )
+    assert conflicts == ["Unknown teacher assignment: simplex"]
+
+
+def test_unknown_status_returns_warm_start():
+    classes, subjects, teachers, time_slots, rooms = build_school()
+    timetables, _, conflicts, _ = NoIncumbentAfter(solved=0).solve(
+        classes, subjects, teachers, time_slots, rooms, [],
+        num_solutions=2, timeout=20, seed=3
+    )
+    assert conflicts is None and len(timetables) == 1
+    timetable = timetables[0]
+    assert timetable.metadata["cpsat_status"] == "UNKNOWN"
+    assert timetable.metadata["warm_start_only"] and timetable.metadata["timed_out"]
+    assert timetable.metadata["coverage"] > 0.9
+    assert_valid(timetable, teachers)
+
+    # A miss after the first solution keeps that solution
+    timetables, _, conflicts, _ = NoIncumbentAfter(solved=1).solve(
+        classes, subjects, teachers, time_slots, rooms, [],
+        num_solutions=3, timeout=20, seed=3
+    )
+    assert conflicts is None
+    assert [tt.metadata["cpsat_status"] for tt in timetables] == ["OPTIMAL"]
+
+
+def test_teacher_availability_is_respected():
+    classes, subjects, teachers, time_slots, rooms = build_school()
+    teachers[0].availability = {"monday": True, "Tuesday": ["08:00-10:00"], "WEDNESDAY": [5, 6]}
+
+    timetables, _, conflicts, _ = CPSATSolverV301(num_workers=1).solve(
+        classes, subjects, teachers, time_slots, rooms, [],
+        num_solutions=1, timeout=20, seed=7
+    )
+    assert conflicts is None
+    availability = TeacherAvailability(teachers, time_slots)
+    taught = [e for e in timetables[0].entries if e.teacher_id == teachers[0].id]
+    assert taught, "the part-time teacher still teaches"
+    assert all(availability.allows(e.teacher_id, e.time_slot_id) for e in taught)
+    assert_valid(timetables[0], teachers)
+
+
+def test_request_selects_engine():
+    classes, subjects, teachers, time_slots, rooms = build_school()
+    payload = dict(
+        school_id="S1", academic_year_id="AY1", constraints=[],
+        classes=[c.model_dump() for c in classes],
+        subjects=[s.model_dump() for s in subjects],
+        teachers=[t.model_dump() for t in teachers],
+        time_slots=[ts.model_dump() for ts in time_slots],
+        rooms=[r.model_dump() for r in rooms]
+    )
+    assert GenerateRequest(**payload).solver == "csp"
+    assert GenerateRequest(**payload, solver="cpsat").solver == "cpsat"
+    with pytest.raises(ValueError):
+        GenerateRequest(**payload, solver="simplex")
+
+
+if __name__ == "__main__":
+    test_packed_school_is_optimal()
+    test_morning_preference_and_multiple_solutions()
+    test_every_solution_differs_from_all_earlier_ones()
+    test_teachers_follow_the_flow_assignment()
+    test_unknown_status_returns_warm_start()
+    test_teacher_availability_is_respected()
+    test_request_selects_engine()
+    print("✅ PASSED: CP-SAT backend tests")
@@ -0,0 +1,129 @@
+"""
+Test: Component decomposition (v3.0.1 decompose=True)
+
+Verifies that:
+- Classes linked by a pre-assigned teacher or a usable shared room end up
+  in one component; unlinked wings are split, with their own resources
+- merge_drafts() adds up the component drafts of one attempt
+- solve(decompose=True) merges the wings into one valid timetable per
+  solution, records metadata["components"], and gives the same result for
+  any worker count
+"""
+
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.models_phase1_v30 import Room, RoomType
+from src.csp_solver_complete_v301 import CSPSolverCompleteV301
+from src.decomposition import find_components, merge_drafts
+from src.solution_draft import SolutionDraft
+from school_fixtures import build_school
+
+
+def two_wing_school():
+    """Secondary wing (C*) plus a primary wing (P*) with its own subjects and teachers."""
+    classes, subjects, teachers, time_slots, rooms = build_school(num_classes=4)
+    p_classes, p_subjects, p_teachers, _, p_rooms = build_school(num_classes=4)
+    for subject in p_subjects:
+        subject.id = f"P_{subject.id}"
+        subject.name = f"Primary {subject.name}"
+        subject.code = f"P_{subject.code}"
+    for teacher in p_teachers:
+        teacher.id = f"P{teacher.id}"
+        teacher.subjects = [f"Primary {name}" for name in teacher.subjects]
+    for class_obj in p_classes:
+        class_obj.id = f"P{class_obj.id}"
+        class_obj.grade = 2
+        class_obj.home_room_id = f"P{class_obj.home_room_id}"
+    for room in p_rooms:
+        room.id = f"P{room.id}"
+    requirements = [
+        {"grade": grade, "subject_id": subject.id, "periods_per_week": subject.periods_per_week}
+        for grade, wing in ((6, subjects), (2, p_subjects)) for subject in wing
+    ]
+    return (classes + p_classes, subjects + p_subjects, teachers + p_teachers,
+            time_slots, rooms + p_rooms, requirements)
+
+
+def components_of(classes, teachers, rooms, teacher_for, room_ids):
+    return find_components(classes, teacher_for, lambda c: room_ids.get(c.id, []), teachers, rooms)
+
+
+def test_components_follow_teachers_and_shared_rooms():
+    classes, _, teachers, _, _ = build_school(num_classes=4)
+    lab = Room(id="LAB1", school_id="S1", name="Lab", capacity=40, type=RoomType.LAB)
+    teacher_for = {("C0", "MATH"): "T_MATH_0", ("C1", "MATH"): "T_MATH_0",
+                   ("C2", "MATH"): "T_MATH_1", ("C3", "ENG"): "T_ENG_1"}
+
+    components = components_of(classes, teachers, [lab], teacher_for, {})
+    assert [[c.id for c in comp.classes] for comp in components] == [["C0", "C1"], ["C2"], ["C3"]]
+    assert [t.id for t in components[1].teachers] == ["T_MATH_1"]
+    # Unused teachers and rooms go to the first component
+    assert "T_SCI_0" in [t.id for t in components[0].teachers]
+    assert components[0].shared_rooms == [lab]
+
+    # A lab both C1 and C2 may use joins their components
+    components = components_of(classes, teachers, [lab], teacher_for,
+                               {"C1": ["LAB1"], "C2": ["LAB1"]})
+    assert [[c.id for c in comp.classes] for comp in components] == [["C0", "C1", "C2"], ["C3"]]
+
+
+def test_merge_drafts_adds_up_components():
+    first = SolutionDraft([("C0", "MATH", "T1", 0, None)], {("C0", 1): (0, 1, 0)}, False, 2,
+                          {"coverage": 0.5, "relaxation_level": 0.0, "relaxation_fills": {"0.0": 1},
+                           "timed_out": False})
+    second = SolutionDraft([("P0", "ART", "T2", 0, None), ("P0", "ART", "T2", 1, None)], {}, False, 2,
+                           {"coverage": 1.0, "relaxation_level": 0.3, "relaxation_fills": {"0.3": 2},
+                            "timed_out": True})
+    merged = merge_drafts([first, second])
+    assert len(merged.placements) == 3 and merged.expected_entries == 4
+    assert merged.metadata["coverage"] == 0.75
+    assert merged.metadata["relaxation_level"] == 0.3
+    assert merged.metadata["relaxation_fills"] == {"0.0": 1, "0.3": 2}
+    assert merged.metadata["timed_out"]
+    assert merge_drafts([first, None]) is None
+
+
+def solve_wings(**kwargs):
+    classes, subjects, teachers, time_slots, rooms, requirements = two_wing_school()
+    return CSPSolverCompleteV301(debug=False).solve(
+        classes=classes, subjects=subjects, teachers=teachers, time_slots=time_slots,
+        rooms=rooms, constraints=[], subject_requirements=requirements, seed=9,
+        decompose=True, **kwargs
+    )[0]
+
+
+def test_solve_merges_wings_into_one_timetable():
+    for kwargs in ({"search_mode": "backtracking"}, {"allow_partial_solutions": True},
+                   {"allow_partial_solutions": False}):
+        timetables = solve_wings(num_solutions=2, **kwargs)
+        assert len(timetables) == 2
+        for timetable in timetables:
+            assert timetable.metadata["components"] >= 2
+            entries = timetable.entries
+            assert {e.class_id[0] for e in entries} == {"C", "P"}
+            assert max(Counter((e.class_id, e.time_slot_id) for e in entries).values()) == 1
+            assert max(Counter((e.teacher_id, e.time_slot_id) for e in entries
+                               if e.subject_id != "SELF_STUDY").values()) == 1
+            # A wing never borrows the other wing's teachers
+            assert all(e.class_id[0] == e.teacher_id[0] or
+                       (e.class_id[0] == "C" and e.teacher_id[0] == "T")
+                       for e in entries if e.subject_id != "SELF_STUDY")
+
+
+def test_decomposed_result_does_not_depend_on_workers():
+    def signature(workers):
+        return [[(e.class_id, e.subject_id, e.teacher_id, e.time_slot_id) for e in tt.entries]
+                for tt in solve_wings(num_solutions=2, workers=workers)]
+    assert signature(1) == signature(2)
+
+
+if __name__ == "__main__":
+    test_components_follow_teachers_and_shared_rooms()
+    test_merge_drafts_adds_up_components()
+    test_solve_merges_wings_into_one_timetable()
+    test_decomposed_result_does_not_depend_on_workers()
+    print("✅ PASSED: decomposition tests")
@@ -0,0 +1,130 @@
+"""
+Test: Delta fitness evaluation (v3.0.1 TimetableEvaluator.build_state)
+
+Verifies that:
+- A state's score equals evaluate(), and stays equal to a full evaluation
+  of the changed timetable over a long run of TimeSwap and
+  ClassBlockExchange moves
+- delta_evaluate/move_penalty leave the state unchanged; RoomSwap is free
+- Removing and adding entries updates the workload balance term
+- GA children scored by delta match a full evaluation of their timetable
+"""
+
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.csp_solver_complete_v301 import CSPSolverCompleteV301
+from src.algorithms.core.genome import GenomeTable
+from src.evaluation import (
+    TimetableEvaluator, EvaluationConfig, TimeSwap, RoomSwap, ClassBlockExchange
+)
+from school_fixtures import build_school
+
+
+def timetables(num_solutions=1):
+    classes, subjects, teachers, time_slots, rooms = build_school(num_classes=6)
+    for subject in subjects[:2]:
+        subject.prefer_morning = True
+    solved, _, _, _ = CSPSolverCompleteV301(debug=False).solve(
+        classes=classes, subjects=subjects, teachers=teachers, time_slots=time_slots,
+        rooms=rooms, constraints=[], num_solutions=num_solutions, seed=1
+    )
+    return [tt.model_dump() for tt in solved]
+
+
+def evaluator():
+    return TimetableEvaluator(EvaluationConfig(workload_balance_weight=2.0, gap_minimization_weight=3.0,
+                                               consecutive_periods_weight=4.0))
+
+
+def test_delta_matches_full_evaluation():
+    timetable = timetables()[0]
+    entries = timetable["entries"]
+    scorer = evaluator()
+    state = scorer.build_state(timetable)
+    assert state.score == scorer.evaluate(timetable).total_score
+
+    rng = random.Random(0)
+    days = sorted({e["day_of_week"] for e in entries})
+    for _ in range(200):
+        a, b = rng.sample(range(len(entries)), 2)
+        if rng.random() < 0.6:
+            move = TimeSwap(a, b)
+            for key in ("day_of_week", "period_number"):
+                entries[a][key], entries[b][key] = entries[b][key], entries[a][key]
+        else:
+            position = (rng.choice(days), rng.randint(1, 8))
+            move = ClassBlockExchange({a: position})
+            entries[a]["day_of_week"], entries[a]["period_number"] = position
+
+        score, penalty = state.score, scorer.move_penalty(state, move)
+        predicted = scorer.delta_evaluate(state, move)
+        assert state.score == score
+        assert scorer.apply_move(state, move) == predicted == state.score
+        full = scorer.evaluate(timetable)
+        assert abs(full.total_score - state.score) < 1e-9
+        if score > 0 and predicted > 0:
+            assert abs((score - predicted) - penalty) < 1e-9
+
+
+def test_room_swap_is_free_and_unknown_moves_fail():
+    timetable = timetables()[0]
+    scorer = evaluator()
+    state = scorer.build_state(timetable)
+    assert scorer.move_penalty(state, RoomSwap(0, 1)) == 0.0
+    assert scorer.apply_move(state, RoomSwap(0, 1)) == state.score
+    try:
+        scorer.delta_evaluate(state, ("swap", 0, 1))
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+
+def test_removing_and_adding_entries_updates_workload():
+    timetable = timetables()[0]
+    entries = timetable["entries"]
+    scorer = evaluator()
+    state = scorer.build_state(timetable)
+    teacher_id = entries[0]["teacher_id"]
+    removed = [i for i, e in enumerate(entries) if e["teacher_id"] == teacher_id][:3]
+
+    move = ClassBlockExchange({i: None for i in removed})
+    scorer.apply_move(state, move)
+    remaining = dict(timetable, entries=[e for i, e in enumerate(entries) if i not in removed])
+    assert abs(scorer.evaluate(remaining).total_score - state.score) < 1e-9
+    assert state.teacher_counts[teacher_id] == sum(1 for e in remaining["entries"]
+                                                   if e["teacher_id"] == teacher_id)
+
+    back = ClassBlockExchange({i: (entries[i]["day_of_week"], entries[i]["period_number"])
+                               for i in removed})
+    assert abs(scorer.apply_move(state, back) - scorer.evaluate(timetable).total_score) < 1e-9
+
+
+def test_ga_children_are_delta_scored():
+    population = timetables(num_solutions=4)
+    scorer = evaluator()
+    table = GenomeTable(population, evaluator=scorer)
+    genomes = [table.encode(i) for i in range(len(population))]
+    for genome, timetable in zip(genomes, population):
+        assert abs(genome.score - scorer.evaluate(timetable).total_score) < 1e-9
+
+    rng = random.Random(4)
+    for _ in range(30):
+        parent1, parent2 = rng.sample(genomes, 2)
+        children = list(table.crossover(parent1, parent2, rng))
+        children.append(table.mutate(children[0], rng))
+        for child in children:
+            assert abs(child.score - scorer.evaluate(table.decode(child)).total_score) < 1e-9
+        genomes[genomes.index(parent1)] = children[-1]
+    assert parent1.state is not children[-1].state
+
+
+if __name__ == "__main__":
+    test_delta_matches_full_evaluation()
+    test_room_swap_is_free_and_unknown_moves_fail()
+    test_removing_and_adding_entries_updates_workload()
+    test_ga_children_are_delta_scored()
+    print("✅ PASSED: delta evaluation tests")
@@ -0,0 +1,117 @@
+"""
+Test: Arc-consistency propagation before scheduling (v3.0.1 DomainPropagator)
+
+Verifies that:
+- A variable that needs every slot of its domain removes those slots from
+  its class and teacher peers, down to a fixpoint
+- Demand that can never fit is trimmed with a precise reason (teacher cap,
+  missing room)
+- Reasons are aggregated: one line per missing teacher/room subject, and
+  only the largest deficits per kind, plus a line for the rest
+- solve() attaches metadata["propagation"] and fails fast, with reasons, when
+  no attempt can reach min_coverage
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.csp_solver_complete_v301 import CSPSolverCompleteV301
+from src.domain_propagation import DomainPropagator
+from src.models_phase1_v30 import Subject
+from src.teacher_availability import TeacherAvailability
+from school_fixtures import build_school
+
+
+def propagate(classes, subjects, teachers, time_slots, distributions, teacher_for):
+    solver = CSPSolverCompleteV301(debug=False)
+    return DomainPropagator().propagate(
+        classes, time_slots, distributions, teacher_for,
+        {t.id: t for t in teachers}, {s.id: s for s in subjects},
+        lambda class_obj, subject: solver._shared_room_candidates(class_obj, subject, []),
+        TeacherAvailability(teachers, time_slots).masks
+    )
+
+
+def test_tight_domain_prunes_class_and_teacher_peers():
+    classes, subjects, teachers, time_slots, _ = build_school(num_classes=2)
+    teachers[0].availability = {"monday": [1, 2, 3]}          # T_MATH_0
+    distributions = {"C0": {"MATH": 3, "ENG": 3}, "C1": {"MATH": 1}}
+    teacher_for = {("C0", "MATH"): "T_MATH_0", ("C0", "ENG"): "T_ENG_0", ("C1", "MATH"): "T_MATH_0"}
+    result = propagate(classes, subjects, teachers, time_slots, distributions, teacher_for)
+
+    monday_1_3 = 0b111
+    full = (1 << len(time_slots)) - 1
+    assert result.domains[("C0", "MATH")] == monday_1_3
+    assert result.domains[("C0", "ENG")] == full & ~monday_1_3   # class peer
+    assert result.domains[("C1", "MATH")] == 0                   # teacher peer
+    assert result.pruned == 3 + 3
+    assert result.unplaceable == {("C1", "MATH"): 1}
+    assert result.reasons == [
+        "Grade 6-1: Mathematics needs 1 periods but only 0 slots are feasible with T_MATH_0 (1 unplaceable)"
+    ]
+
+
+def test_teacher_cap_and_missing_room_are_reported():
+    classes, subjects, teachers, time_slots, _ = build_school(num_classes=4)
+    subjects.append(Subject(id="CHEM", school_id="S1", name="Chemistry", code="CHEM",
+                            periods_per_week=2, requires_lab=True))
+    distributions = {c.id: {"MATH": 8, "CHEM": 2} for c in classes}
+    teacher_for = {(c.id, s): "T_MATH_0" for c in classes for s in ("MATH", "CHEM")}
+    result = propagate(classes, subjects, teachers, time_slots, distributions, teacher_for)
+
+    assert result.unplaceable_periods == 4 * 2 + (32 - 20)
+    assert result.reasons == [
+        "Teacher T_MATH_0 is assigned 32 periods but can teach at most 20 (weekly cap 20; 12 unplaceable)",
+        "No shared room fits Chemistry: 4 class(es), 8 periods unplaceable"
+    ]
+    assert result.summary()["unplaceable_periods"] == 20
+
+
+def test_reasons_are_aggregated_per_kind():
+    classes, subjects, teachers, time_slots, _ = build_school(num_classes=12)
+    distributions = {c.id: {"MATH": 8, "ENG": 8} for c in classes}
+    # No English teacher at all; 12 classes share one Math teacher
+    teacher_for = {(c.id, "MATH"): "T_MATH_0" for c in classes}
+    for teacher in teachers:
+        teacher.availability = {"monday": True}
+    result = propagate(classes, subjects, teachers, time_slots, distributions, teacher_for)
+
+    assert len(result.deficits) > 12
+    assert result.reasons[0] == "No teacher for English: 12 class(es), 96 periods unplaceable"
+    assert result.reasons[1].startswith("Teacher T_MATH_0 is assigned")
+    class_deficits = sorted((periods for kind, periods, _ in result.deficits if kind == "class"),
+                            reverse=True)
+    rest = class_deficits[DomainPropagator.REASONS_PER_KIND:]
+    assert len([r for r in result.reasons if r.startswith("Grade")]) == DomainPropagator.REASONS_PER_KIND
+    assert result.reasons[-1] == f"... and {len(rest)} more class limit(s), {sum(rest)} periods unplaceable"
+    assert len(result.reasons) <= len(DomainPropagator.REASON_KINDS) * (DomainPropagator.REASONS_PER_KIND + 1)
+
+
+def test_solve_reports_propagation_and_fails_fast():
+    classes, subjects, teachers, time_slots, rooms = build_school(num_classes=4)
+    solver = CSPSolverCompleteV301(debug=False)
+    kwargs = dict(classes=classes, subjects=subjects, teachers=teachers, time_slots=time_slots,
+                  rooms=rooms, constraints=[], num_solutions=1, seed=2)
+
+    timetables, _, _, _ = solver.solve(**kwargs)
+    assert timetables[0].metadata["propagation"]["unplaceable_periods"] == 0
+
+    # Every teacher only teaches Monday: at most 6 of 30 slots per class
+    for teacher in teachers:
+        teacher.availability = {"monday": True}
+    for search_mode in ("greedy", "backtracking"):
+        timetables, elapsed, conflicts, _ = solver.solve(search_mode=search_mode, **kwargs)
+        assert timetables == []
+        assert conflicts[0].startswith("At most 20.0% coverage is achievable")
+    assert "Grade 6-0 needs 24 periods but only 6 slots are feasible (18 unplaceable)" in conflicts
+    assert len(conflicts) <= 1 + len(DomainPropagator.REASON_KINDS) * (DomainPropagator.REASONS_PER_KIND + 1)
+
+
+if __name__ == "__main__":
+    test_tight_domain_prunes_class_and_teacher_peers()
+    test_teacher_cap_and_missing_room_are_reported()
+    test_reasons_are_aggregated_per_kind()
+    test_solve_reports_propagation_and_fails_fast()
+    print("✅ PASSED: domain propagation tests")
@@ -0,0 +1,83 @@
+"""
+Test: Pluggable GA evaluation executor (v3.0.1 EvaluationExecutor)
+
+Verifies that:
+- Unknown backends are rejected
+- Thread and process backends score genomes like a full evaluation, with
+  the table held by the workers and only (slots, rooms, shell) sent per
+  genome
+- A seeded evolve() gives identical results and statistics with the serial,
+  thread and process backends, and the pool is closed afterwards
+"""
+
+import pickle
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.csp_solver_complete_v301 import CSPSolverCompleteV301
+from src.algorithms.core.ga_optimizer_v25 import GAOptimizerV25
+from src.algorithms.core.genome import GenomeTable
+from src.algorithms.core.evaluation_executor import EvaluationExecutor
+from src.evaluation import TimetableEvaluator, EvaluationConfig
+from school_fixtures import build_school
+
+
+def population(num_solutions=4):
+    classes, subjects, teachers, time_slots, rooms = build_school(num_classes=6)
+    for subject in subjects[:2]:
+        subject.prefer_morning = True
+    timetables, _, _, _ = CSPSolverCompleteV301(debug=False).solve(
+        classes=classes, subjects=subjects, teachers=teachers, time_slots=time_slots,
+        rooms=rooms, constraints=[], num_solutions=num_solutions, seed=3
+    )
+    return [tt.model_dump() for tt in timetables]
+
+
+def test_unknown_backend_is_rejected():
+    try:
+        EvaluationExecutor("gpu")
+        assert False, "expected ValueError"
+    except ValueError as e:
+        assert "serial, thread, process" in str(e)
+
+
+def test_parallel_backends_score_like_full_evaluation():
+    timetables = population()
+    evaluator = TimetableEvaluator(EvaluationConfig())
+    expected = [evaluator.evaluate(t).total_score for t in timetables]
+    table = GenomeTable(timetables)
+    # What a task carries per genome: far smaller than the timetable itself
+    genome = table.encode(0)
+    assert len(pickle.dumps((genome.slots, genome.rooms, genome.shell))) * 5 < len(pickle.dumps(timetables[0]))
+
+    for backend in ("thread", "process"):
+        with EvaluationExecutor(backend, workers=2).start(table, evaluator) as executor:
+            genomes = [table.encode(i) for i in range(len(timetables))]
+            assert executor.score(genomes) == expected
+        assert executor._pool is None
+
+
+def test_evolve_is_backend_independent():
+    timetables = population()
+
+    def evolve(backend):
+        ga = GAOptimizerV25(enable_caching=False)
+        executor = EvaluationExecutor(backend, workers=2)
+        result = ga.evolve(timetables, generations=6, mutation_rate=0.5, seed=21, executor=executor)
+        assert executor._pool is None
+        return ([[(e["class_id"], e["time_slot_id"], e["room_id"]) for e in tt["entries"]] for tt in result],
+                [(s.best_fitness, s.avg_fitness) for s in ga.stats_history])
+
+    serial = evolve("serial")
+    assert len(serial[1]) == 6
+    assert evolve("thread") == serial
+    assert evolve("process") == serial
+
+
+if __name__ == "__main__":
+    test_unknown_backend_is_rejected()
+    test_parallel_backends_score_like_full_evaluation()
+    test_evolve_is_backend_independent()
+    print("✅ PASSED: evaluation executor tests")
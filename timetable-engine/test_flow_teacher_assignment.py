@@ -0,0 +1,197 @@
+"""
+Test: Min-cost-flow teacher pre-assignment (v3.0.1 FlowTeacherAssignment)
+
+Verifies that:
+- The flow finds a complete mapping within capacity where the greedy loop
+  strands capacity and overloads a teacher
+- Loads are balanced and availability-limited capacity is respected
+- Overflow that no mapping can avoid is spread, and every pair is assigned
+- The largest teacher load is never above the greedy loop's, also when
+  teachers of different capacity may all take a subject
+- Total overflow is never above the greedy loop's on random schools (seed
+  312 packs worse than greedy, so the greedy mapping is kept)
+- solve() uses the flow by default, keeps "greedy" selectable and rejects
+  unknown assignment modes
+"""
+
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.models_phase1_v30 import Subject, Teacher
+from src.csp_solver_complete_v301 import CSPSolverCompleteV301
+from src.flow_teacher_assignment import FlowTeacherAssignment
+from src.greedy_teacher_assignment import GreedyTeacherAssignment
+from src.teacher_availability import TeacherAvailability
+from school_fixtures import build_school
+
+
+def stranding_school():
+    """
+    3 classes x (Mathematics 8 + English 4). The greedy loop gives Maths to
+    the dual-qualified teacher first, which leaves no room for English.
+    """
+    classes, _, _, time_slots, rooms = build_school(num_classes=3)
+    subjects = [
+        Subject(id="MATH", school_id="S1", name="Mathematics", code="MATH", periods_per_week=8),
+        Subject(id="ENG", school_id="S1", name="English", code="ENG", periods_per_week=4),
+    ]
+    teachers = [
+        Teacher(id="T_BOTH", user_id="U1", subjects=["Mathematics", "English"],
+                max_periods_per_day=4, max_periods_per_week=20),
+        Teacher(id="T_MATH", user_id="U2", subjects=["Mathematics"],
+                max_periods_per_day=4, max_periods_per_week=16),
+        Teacher(id="T_ENG", user_id="U3", subjects=["English"],
+                max_periods_per_day=4, max_periods_per_week=4),
+    ]
+    return classes, subjects, teachers, time_slots, rooms
+
+
+def generalist_school():
+    """
+    4 classes; only Maths has qualified teachers, so the other subjects may
+    go to anyone (as in the tt_tester configs). Capacities differ from 16 to
+    30 periods, which must not put the most periods on the largest teacher.
+    """
+    classes, subjects, _, time_slots, rooms = build_school(num_classes=4)
+    teachers = [
+        Teacher(id=f"T{i}", user_id=f"U{i}", subjects=["Mathematics"] if i in (2, 5, 7) else [],
+                max_periods_per_day=6, max_periods_per_week=capacity)
+        for i, capacity in enumerate([16, 24, 16, 16, 20, 16, 30, 20])
+    ]
+    return classes, subjects, teachers, time_slots, rooms
+
+
+def random_school(seed):
+    """2-6 classes, random period counts and 3-7 teachers with 1-2 subjects."""
+    rng = random.Random(seed)
+    classes, _, _, time_slots, rooms = build_school(num_classes=rng.randint(2, 6))
+    names = ["Mathematics", "English", "Science", "History", "Art"]
+    subjects = [
+        Subject(id=name[:3].upper(), school_id="S1", name=name, code=name[:3].upper(),
+                periods_per_week=rng.randint(2, 8))
+        for name in names
+    ]
+    teachers = [
+        Teacher(id=f"T{i}", user_id=f"U{i}", subjects=rng.sample(names, rng.randint(1, 2)),
+                max_periods_per_day=rng.randint(3, 6), max_periods_per_week=rng.randint(8, 24))
+        for i in range(rng.randint(3, 7))
+    ]
+    return classes, subjects, teachers, time_slots, rooms
+
+
+def overflow(mapping, subjects, teachers, time_slots):
+    availability = TeacherAvailability(teachers, [ts for ts in time_slots if not ts.is_break])
+    load = loads(mapping, subjects)
+    return sum(max(0, load.get(t.id, 0) - availability.capacity(t)) for t in teachers)
+
+
+def loads(mapping, subjects):
+    periods = {s.id: s.periods_per_week for s in subjects}
+    result = {}
+    for (_, subject_id), teacher_id in mapping.items():
+        result[teacher_id] = result.get(teacher_id, 0) + periods[subject_id]
+    return result
+
+
+def test_flow_avoids_stranded_capacity():
+    classes, subjects, teachers, time_slots, _ = stranding_school()
+    caps = {t.id: t.max_periods_per_week for t in teachers}
+
+    greedy = GreedyTeacherAssignment().assign_teachers(classes, subjects, teachers, time_slots)
+    assert any(load > caps[t] for t, load in loads(greedy, subjects).items())
+
+    flow = FlowTeacherAssignment().assign_teachers(classes, subjects, teachers, time_slots)
+    assert len(flow) == len(classes) * len(subjects)
+    assert all(load <= caps[t] for t, load in loads(flow, subjects).items())
+    # One teacher per (class, subject), always a qualified one
+    assert all(flow[(c.id, "ENG")] in ("T_BOTH", "T_ENG") for c in classes)
+
+
+def test_flow_balances_loads_and_respects_availability():
+    classes, subjects, teachers, time_slots, _ = build_school(num_classes=4)
+    # Two Maths teachers; the part-time one can take 8 periods at most
+    teachers[1].subjects = ["Mathematics"]
+    teachers[1].availability = {"monday": True, "tuesday": [1, 2, 3, 4]}
+    mapping = FlowTeacherAssignment().assign_teachers(classes, subjects, teachers, time_slots)
+    load = loads(mapping, subjects)
+    assert load["T_MATH_1"] <= 8
+    assert load["T_MATH_0"] + load["T_MATH_1"] == 32
+
+    # Equal teachers share equal demand evenly
+    assert load["T_ENG_0"] == load["T_ENG_1"] == 16
+
+
+def test_unavoidable_overflow_is_spread_and_mapping_complete():
+    classes, subjects, teachers, time_slots, _ = build_school(num_classes=6)
+    teachers = [t for t in teachers if t.id != "T_SCI_2"]   # Science: 42 periods, 40 capacity
+    mapping = FlowTeacherAssignment().assign_teachers(classes, subjects, teachers, time_slots)
+    assert len(mapping) == len(classes) * len(subjects)
+    load = loads(mapping, subjects)
+    assert sorted(load[t] for t in ("T_SCI_0", "T_SCI_1")) == [21, 21]
+
+
+def test_max_load_never_above_greedy():
+    for classes, subjects, teachers, time_slots, _ in (
+        stranding_school(), build_school(num_classes=6), generalist_school()
+    ):
+        greedy = GreedyTeacherAssignment().assign_teachers(classes, subjects, teachers, time_slots)
+        flow = FlowTeacherAssignment().assign_teachers(classes, subjects, teachers, time_slots)
+        assert max(loads(flow, subjects).values()) <= max(loads(greedy, subjects).values())
+
+    # Load-dependent costs spread the anyone-may-teach subjects evenly
+    classes, subjects, teachers, time_slots, _ = generalist_school()
+    flow = FlowTeacherAssignment().assign_teachers(classes, subjects, teachers, time_slots)
+    assert max(loads(flow, subjects).values()) == 16
+
+
+def test_overflow_never_above_greedy():
+    classes, subjects, teachers, time_slots, _ = random_school(312)
+    greedy = GreedyTeacherAssignment().assign_teachers(classes, subjects, teachers, time_slots)
+    flow = FlowTeacherAssignment().assign_teachers(classes, subjects, teachers, time_slots)
+    assert overflow(greedy, subjects, teachers, time_slots) == 0
+    assert overflow(flow, subjects, teachers, time_slots) == 0
+
+    for seed in range(100):
+        classes, subjects, teachers, time_slots, _ = random_school(seed)
+        greedy = GreedyTeacherAssignment().assign_teachers(classes, subjects, teachers, time_slots)
+        flow = FlowTeacherAssignment().assign_teachers(classes, subjects, teachers, time_slots)
+        assert len(flow) == len(classes) * len(subjects)
+        if len(greedy) == len(flow):
+            assert overflow(flow, subjects, teachers, time_slots) <= \
+                overflow(greedy, subjects, teachers, time_slots), seed
+
+
+def test_solve_selects_teacher_assignment():
+    classes, subjects, teachers, time_slots, rooms = stranding_school()
+    solver = CSPSolverCompleteV301(debug=False)
+    kwargs = dict(classes=classes, subjects=subjects, teachers=teachers, time_slots=time_slots,
+                  rooms=rooms, constraints=[], num_solutions=1, seed=2,
+                  search_mode="backtracking", allow_partial_solutions=False)
+
+    def taught(timetable):
+        return sum(e.subject_id != "SELF_STUDY" for e in timetable.entries)
+
+    # Backtracking keeps the pre-assigned teachers, so every period fits only with the flow
+    timetables, _, _, _ = solver.solve(**kwargs)
+    assert taught(timetables[0]) == 36
+    assert timetables[0].metadata["propagation"]["unplaceable_periods"] == 0
+
+    timetables, _, _, _ = solver.solve(teacher_assignment="greedy", **kwargs)
+    assert taught(timetables[0]) < 36
+
+    timetables, _, conflicts, _ = solver.solve(teacher_assignment="hungarian", **kwargs)
+    assert timetables == []
+    assert "Unknown teacher assignment" in conflicts[0]
+
+
+if __name__ == "__main__":
+    test_flow_avoids_stranded_capacity()
+    test_flow_balances_loads_and_respects_availability()
+    test_unavoidable_overflow_is_spread_and_mapping_complete()
+    test_max_load_never_above_greedy()
+    test_overflow_never_above_greedy()
+    test_solve_selects_teacher_assignment()
+    print("✅ PASSED: flow teacher assignment tests")
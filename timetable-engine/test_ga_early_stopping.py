@@ -0,0 +1,118 @@
+"""
+Test: GA early stopping (v3.0.1 GAOptimizerV25.evolve stopping rules)
+
+Verifies that:
+- Without stopping rules evolve() runs every generation ("generations")
+- stall_generations stops once the best fitness stops improving, and
+  min_improvement decides what counts as improvement
+- target_fitness stops as soon as the best fitness reaches it
+- Timeout and cancellation are recorded as the stop reason
+- The evolution report and each run's metadata["ga"] name the termination
+  reason
+- metadata["ga"]["improvement"] counts from the initial population, so a
+  gain in generation 1 is included (evolve and evolve_islands)
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.algorithms.core.ga_optimizer_v25 import GAOptimizerV25
+from src.algorithms.core.genome import GenomeTable
+from src.solve_control import CancellationToken
+from school_fixtures import population
+
+
+def evolve(timetables, **kwargs):
+    # Seed 2 at mutation rate 0.5: the best fitness first improves in generation 4
+    ga = GAOptimizerV25(enable_caching=False)
+    result = ga.evolve(timetables, seed=2, mutation_rate=0.5, **kwargs)
+    return ga, result
+
+
+def best_fitness(ga):
+    return [s.best_fitness for s in ga.stats_history]
+
+
+def test_runs_all_generations_without_rules():
+    ga, result = evolve(population(), generations=8)
+    assert ga.stop_reason == "generations" and len(ga.stats_history) == 8
+    assert not ga.timed_out and len(result) == 4
+    assert all(tt["metadata"]["ga"]["stop_reason"] == "generations" for tt in result)
+
+
+def test_stall_generations_and_min_improvement():
+    timetables = population()
+    full, _ = evolve(timetables, generations=30)
+    best = best_fitness(full)
+
+    # The gain resets the stall count: stop 5 generations after the last gain
+    ga, result = evolve(timetables, generations=200, stall_generations=5)
+    assert ga.stop_reason == "stalled"
+    assert result[0]["metadata"]["ga"]["stop_reason"] == "stalled"
+    stopped = best_fitness(ga)
+    assert stopped == best[:len(stopped)]
+    assert stopped[-1] == stopped[-6] > stopped[-7]
+
+    # A gain below min_improvement (relative) does not count
+    strict, _ = evolve(timetables, generations=200, stall_generations=5, min_improvement=0.5)
+    assert strict.stop_reason == "stalled" and len(strict.stats_history) == 5
+
+
+def test_target_fitness():
+    timetables = population()
+    full, _ = evolve(timetables, generations=10)
+    best = best_fitness(full)
+    target = best[-1]
+    assert target > best[0]
+    ga, _ = evolve(timetables, generations=10, target_fitness=target)
+    assert ga.stop_reason == "target_fitness"
+    assert len(ga.stats_history) == best.index(target) + 1
+
+    # A population that already reaches the target is returned unchanged
+    ga, result = evolve(timetables, generations=10, target_fitness=float("-inf"))
+    assert ga.stop_reason == "target_fitness" and ga.stats_history == []
+    assert len(result) == len(timetables)
+
+
+def test_improvement_counts_from_initial_population():
+    timetables = population()
+    # Seed 21 at mutation rate 0.5 improves the best fitness in generation 1
+    ga = GAOptimizerV25(enable_caching=False)
+    result = ga.evolve(timetables, seed=21, mutation_rate=0.5, generations=1)
+    table = GenomeTable(timetables, evaluator=ga.evaluator)
+    initial = max(table.encode(i).score for i in range(len(timetables)))
+    best = best_fitness(ga)
+    assert best[0] > initial
+    assert result[0]["metadata"]["ga"]["improvement"] == best[-1] - initial
+
+    result = ga.evolve_islands(timetables, islands=2, generations=3, seed=5, processes=False)
+    assert result[0]["metadata"]["ga"]["improvement"] == best_fitness(ga)[-1] - initial
+
+
+def test_timeout_and_cancel_reasons():
+    timetables = population(num_solutions=2)
+    ga, timed_out = evolve(timetables, generations=10 ** 6, timeout=0.3)
+    assert ga.timed_out and ga.stop_reason == "timeout"
+    assert "Stopped: timeout" in ga.get_evolution_report()
+
+    # A later run on the same optimizer does not change this run's result
+    ga.evolve(timetables, generations=2, seed=1)
+    assert ga.stop_reason == "generations"
+    assert timed_out[0]["metadata"]["ga"]["stop_reason"] == "timeout"
+    assert timed_out[0]["metadata"]["ga"]["timed_out"]
+
+    token = CancellationToken()
+    token.cancel("Test")
+    ga, _ = evolve(timetables, generations=10, cancel_token=token)
+    assert ga.timed_out and ga.stop_reason == "cancelled"
+
+
+if __name__ == "__main__":
+    test_runs_all_generations_without_rules()
+    test_stall_generations_and_min_improvement()
+    test_target_fitness()
+    test_improvement_counts_from_initial_population()
+    test_timeout_and_cancel_reasons()
+    print("✅ PASSED: GA early stopping tests")
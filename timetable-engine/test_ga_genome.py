@@ -0,0 +1,196 @@
+"""
+Test: Compact GA genomes (v3.0.1 algorithms/core/genome.py)
+
+Verifies that:
+- encode/decode round-trips a timetable (same placements, shared metadata)
+- Crossover swaps whole class blocks, so teacher assignments stay intact
+- Mutation swaps slots within one (class, subject) and never touches parents
+- With teacher availability, mutation and evolve() never move a period
+  into a slot its teacher cannot teach
+- evolve() returns valid, independent timetables without deep-copying
+  children, and never runs a full evaluation
+"""
+
+import copy
+import random
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.algorithms.core.ga_optimizer_v25 import GAOptimizerV25
+from src.algorithms.core.genome import GenomeTable, MISSING
+from src.evaluation import TimetableEvaluator, EvaluationConfig
+from src.models_phase1_v30 import Teacher
+from src.teacher_availability import TeacherAvailability
+from school_fixtures import build_school, population, teachers_by_class
+
+
+def placements(timetable):
+    return sorted((e["class_id"], e["subject_id"], e["teacher_id"], e["time_slot_id"], e["room_id"])
+                  for e in timetable["entries"])
+
+
+def test_encode_decode_round_trip():
+    timetables = population()
+    table = GenomeTable(timetables)
+    for i, timetable in enumerate(timetables):
+        genome = table.encode(i)
+        assert len(genome.slots) == table.size
+        decoded = table.decode(genome)
+        assert placements(decoded) == placements(timetable)
+        assert decoded["id"] == timetable["id"]
+        # Decoded entries share the table's metadata instead of copying it
+        assert any(e["subject_metadata"] is t["subject_metadata"]
+                   for e, t in zip(decoded["entries"], table.templates))
+    assert table.class_starts[0] == 0 and len(table.class_starts) == 6
+
+
+def test_crossover_swaps_class_blocks():
+    timetables = population()
+    table = GenomeTable(timetables)
+    parent1, parent2 = table.encode(0), table.encode(1)
+    before = (parent1.slots.tobytes(), parent2.slots.tobytes())
+    child1, child2 = table.crossover(parent1, parent2, random.Random(3))
+    assert (parent1.slots.tobytes(), parent2.slots.tobytes()) == before
+
+    decoded1 = table.decode(child1)
+    by_class = {}
+    for e in decoded1["entries"]:
+        by_class.setdefault(e["class_id"], []).append(e)
+    # Every class comes whole from one parent, with that parent's teachers
+    for class_id, entries in by_class.items():
+        sources = [tt for tt in timetables[:2]
+                   if placements({"entries": entries}) ==
+                   placements({"entries": [e for e in tt["entries"] if e["class_id"] == class_id]})]
+        assert sources
+    assert max(Counter((e["class_id"], e["time_slot_id"]) for e in decoded1["entries"]).values()) == 1
+    assert teachers_by_class(table.decode(child2)) <= \
+        teachers_by_class(timetables[0]) | teachers_by_class(timetables[1])
+
+
+def test_mutation_swaps_within_class_subject():
+    timetables = population(num_solutions=1)
+    table = GenomeTable(timetables)
+    parent = table.encode(0)
+    child = table.mutate(parent, random.Random(5))
+    assert child is not parent and child.rooms is parent.rooms
+    changed = [g for g in range(table.size) if child.slots[g] != parent.slots[g]]
+    assert len(changed) == 2
+    g1, g2 = changed
+    assert table.templates[g1]["class_id"] == table.templates[g2]["class_id"]
+    assert table.templates[g1]["subject_id"] == table.templates[g2]["subject_id"]
+    assert sorted(child.slots) == sorted(parent.slots)
+    assert MISSING not in (child.slots[g1], child.slots[g2])
+
+
+def shared_subject_population():
+    """
+    population() where a part-time teacher T_PT takes every other Math period
+    of class C0 and is only available in the slots it was given.
+    """
+    timetables = population(num_solutions=2)
+    math = [e for e in timetables[0]["entries"] if e["class_id"] == "C0" and e["subject_id"] == "MATH"]
+    availability = {}
+    for entry in math[::2]:
+        entry["teacher_id"] = "T_PT"
+        availability.setdefault(entry["day_of_week"].lower(), []).append(entry["period_number"])
+    _, _, teachers, time_slots, _ = build_school(num_classes=6)
+    teachers.append(Teacher(id="T_PT", user_id="U_PT", subjects=["Mathematics"],
+                            availability=availability))
+    allowed = {e["time_slot_id"] for e in math[::2]}
+    return timetables, teachers, time_slots, allowed
+
+
+def part_time_slots(timetable):
+    return {e["time_slot_id"] for e in timetable["entries"] if e["teacher_id"] == "T_PT"}
+
+
+def test_mutation_respects_teacher_availability():
+    timetables, teachers, time_slots, allowed = shared_subject_population()
+    availability = TeacherAvailability(teachers, time_slots)
+    unrestricted, restricted = GenomeTable(timetables), GenomeTable(timetables, availability=availability)
+
+    def mutated(table, seed):
+        genome = table.encode(0)
+        rng = random.Random(seed)
+        for _ in range(50):
+            genome = table.mutate(genome, rng)
+        return table.decode(genome)
+
+    # Without availability the swaps move T_PT into Math slots of the other teacher
+    assert any(part_time_slots(mutated(unrestricted, seed)) != allowed for seed in range(5))
+    for seed in range(5):
+        timetable = mutated(restricted, seed)
+        assert part_time_slots(timetable) <= allowed
+        assert placements(timetable) != placements(timetables[0])
+
+    ga = GAOptimizerV25(enable_caching=False)
+    for timetable in ga.evolve(timetables, generations=20, mutation_rate=1.0, seed=3,
+                               teachers=teachers, time_slots=time_slots):
+        assert part_time_slots(timetable) <= allowed
+
+
+class CountingEvaluator(TimetableEvaluator):
+    def __init__(self):
+        super().__init__(EvaluationConfig())
+        self.calls = 0
+
+    def evaluate(self, timetable, timetable_id=None):
+        self.calls += 1
+        return super().evaluate(timetable, timetable_id)
+
+
+def test_evolve_is_copy_free_and_valid():
+    timetables = population()
+    originals = copy.deepcopy(timetables)
+    deepcopies = []
+    real_deepcopy = copy.deepcopy
+
+    def counting_deepcopy(obj, *args, **kwargs):
+        deepcopies.append(obj)
+        return real_deepcopy(obj, *args, **kwargs)
+
+    evaluator = CountingEvaluator()
+    ga = GAOptimizerV25(evaluator=evaluator, enable_caching=False)
+    copy.deepcopy = counting_deepcopy
+    try:
+        result = ga.evolve(timetables, generations=10, mutation_rate=0.5, seed=7)
+    finally:
+        copy.deepcopy = real_deepcopy
+
+    # Only the returned population is copied, never a child per generation
+    assert len(deepcopies) == len(timetables)
+    # Elites and clones keep their score, changed children are delta-scored
+    assert evaluator.calls == 0
+    assert timetables == originals
+    for timetable in result:
+        entries = timetable["entries"]
+        assert len(entries) == len(originals[0]["entries"])
+        assert max(Counter((e["class_id"], e["time_slot_id"]) for e in entries).values()) == 1
+        assert teachers_by_class(timetable) <= set().union(*map(teachers_by_class, originals))
+    result[0]["entries"][0]["subject_metadata"]["changed"] = True
+    assert "changed" not in result[1]["entries"][0]["subject_metadata"]
+
+
+def test_dict_operators_still_work():
+    timetables = population(num_solutions=2)
+    ga = GAOptimizerV25(enable_caching=False)
+    child1, child2 = ga._safe_crossover(timetables[0], timetables[1])
+    assert len(child1["entries"]) == len(timetables[0]["entries"])
+    assert child1["entries"] is not timetables[0]["entries"]
+    mutated = ga._safe_mutate(timetables[0])
+    assert len(placements(mutated)) == len(placements(timetables[0]))
+    slots = lambda tt: {e["id"]: e["time_slot_id"] for e in tt["entries"]}
+    assert slots(mutated) != slots(timetables[0])
+
+
+if __name__ == "__main__":
+    test_encode_decode_round_trip()
+    test_crossover_swaps_class_blocks()
+    test_mutation_swaps_within_class_subject()
+    test_mutation_respects_teacher_availability()
+    test_evolve_is_copy_free_and_valid()
+    test_dict_operators_still_work()
+    print("✅ PASSED: GA genome tests")
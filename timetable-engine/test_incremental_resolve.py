@@ -0,0 +1,70 @@
+"""
+Test: Incremental re-solve (v3.0.1 CSPSolverCompleteV301.resolve)
+
+Verifies that:
+- With no changes every entry is kept and nothing is searched
+- A one-teacher change frees that teacher's entries, widens to the affected
+  classes when the freed periods do not fit, keeps every other class in
+  place and re-places the freed periods with a qualified teacher
+- The repaired timetable still respects class, teacher and room limits
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.csp_solver_complete_v301 import CSPSolverCompleteV301
+from school_fixtures import baseline, assert_valid
+
+
+def cells(entries):
+    return {(e["class_id"], e["time_slot_id"], e["subject_id"], e["teacher_id"]) for e in entries}
+
+
+def test_no_changes_keeps_everything():
+    (classes, subjects, teachers, time_slots, rooms), previous = baseline()
+    timetables, _, conflicts, _ = CSPSolverCompleteV301(debug=False).resolve(
+        previous, classes, subjects, teachers, time_slots, rooms, seed=2
+    )
+    assert conflicts is None
+    metadata = timetables[0].metadata
+    assert metadata["incremental"]["freed_entries"] == 0
+    assert metadata["incremental"]["placed_entries"] == 0
+    assert cells(e.model_dump() for e in timetables[0].entries) == cells(previous["entries"])
+
+
+def test_one_teacher_change_frees_only_its_entries():
+    (classes, subjects, teachers, time_slots, rooms), previous = baseline()
+    changed = teachers[0]
+    assert changed.subjects == ["Mathematics"]
+    changed.subjects = []  # No longer teaches Mathematics
+
+    timetables, _, conflicts, _ = CSPSolverCompleteV301(debug=False).resolve(
+        previous, classes, subjects, teachers, time_slots, rooms,
+        changed_teacher_ids=[changed.id], allow_partial_solutions=False, seed=2
+    )
+    assert conflicts is None
+    timetable = timetables[0]
+    incremental = timetable.metadata["incremental"]
+    assert timetable.metadata["search_complete"]
+    assert incremental["placed_entries"] == incremental["freed_entries"]
+
+    # The freed periods do not fit into the old slots, so the repair widens
+    # to the two affected classes; all other classes keep their timetable
+    affected = {e["class_id"] for e in previous["entries"] if e["teacher_id"] == changed.id}
+    assert incremental["widening"] == 1
+    assert incremental["freed_entries"] == len(affected) * len(time_slots)
+
+    repaired = [e.model_dump() for e in timetable.entries]
+    untouched = [e for e in previous["entries"] if e["class_id"] not in affected]
+    assert cells(untouched) <= cells(repaired)
+    assert not any(e["teacher_id"] == changed.id for e in repaired)
+    assert not any(e["subject_id"] == "SELF_STUDY" for e in repaired)
+    assert_valid(timetable, teachers)
+
+
+if __name__ == "__main__":
+    test_no_changes_keeps_everything()
+    test_one_teacher_change_frees_only_its_entries()
+    print("✅ PASSED: incremental re-solve tests")
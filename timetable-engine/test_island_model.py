@@ -0,0 +1,100 @@
+"""
+Test: Island-model GA (v3.0.1 algorithms/core/island_model.py)
+
+Verifies that:
+- Islands get their own seed (seed + index) and a spread of mutation rates
+- Islands migrate every migration_interval generations
+- Worker processes give the same result as the in-process runner
+- evolve_islands() returns valid timetables, preferring distinct schedules
+- A cancelled island run returns at once with the initial population
+"""
+
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.algorithms.core.ga_optimizer_v25 import GAOptimizerV25
+from src.algorithms.core.island_model import IslandSettings
+from src.solve_control import CancellationToken
+from school_fixtures import population, teachers_by_class
+
+
+def placements(timetables):
+    return [sorted((e["class_id"], e["subject_id"], e["time_slot_id"], e["room_id"]) for e in tt["entries"])
+            for tt in timetables]
+
+
+def test_epochs_follow_migration_interval():
+    settings = IslandSettings(generations=12, crossover_rate=0.7, elitism_count=2,
+                              migration_interval=5, migration_size=1)
+    assert settings.epochs() == [5, 5, 2]
+    assert IslandSettings(10, 0.7, 2, 5, 1).epochs() == [5, 5]
+    assert IslandSettings(3, 0.7, 2, 0, 1).epochs() == [1, 1, 1]
+
+
+def test_processes_match_in_process_run():
+    timetables = population()
+    runs = []
+    for processes in (False, True):
+        ga = GAOptimizerV25(enable_caching=False)
+        result = ga.evolve_islands(timetables, islands=3, generations=12, migration_interval=4,
+                                   migration_size=1, mutation_rate=0.2, seed=5,
+                                   processes=processes)
+        runs.append((placements(result), [s.best_fitness for s in ga.stats_history], ga.islands))
+
+    assert runs[0] == runs[1]
+    islands = runs[0][2]
+    assert [island["seed"] for island in islands] == [5, 6, 7]
+    assert [island["mutation_rate"] for island in islands] == [0.1, 0.25, 0.4]
+    # 12 generations in epochs of 4: two migrations per island
+    assert all(island["migrations"] == 2 and island["generations"] == 12 for island in islands)
+    assert len(runs[0][1]) == 12
+
+
+def test_evolve_islands_returns_valid_distinct_timetables():
+    timetables = population()
+    ga = GAOptimizerV25(enable_caching=False)
+    result = ga.evolve_islands(timetables, islands=2, generations=6, migration_interval=3,
+                               mutation_rates=[0.1, 0.6], seed=9, processes=False)
+    assert len(result) == len(timetables)
+    # Every distinct schedule is kept before any repeat is (repeats only fill up)
+    schedules = [str(p) for p in placements(result)]
+    assert schedules[:len(set(schedules))] == list(dict.fromkeys(schedules))
+    fitness = [ga.evaluator.evaluate(tt).total_score for tt in result]
+    assert fitness == sorted(fitness, reverse=True)
+    assert abs(fitness[0] - max(island["best_fitness"] for island in ga.islands)) < 1e-6
+    for timetable in result:
+        entries = timetable["entries"]
+        assert len(entries) == len(timetables[0]["entries"])
+        assert max(Counter((e["class_id"], e["time_slot_id"]) for e in entries).values()) == 1
+        assert teachers_by_class(timetable) <= set().union(*map(teachers_by_class, timetables))
+    assert "Islands: 2" in ga.get_evolution_report()
+
+    try:
+        ga.evolve_islands(timetables, islands=3, mutation_rates=[0.1], processes=False)
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+
+def test_cancelled_islands_return_initial_population():
+    timetables = population(num_solutions=2)
+    token = CancellationToken()
+    token.cancel("Test")
+    for processes in (False, True):
+        ga = GAOptimizerV25(enable_caching=False)
+        result = ga.evolve_islands(timetables, islands=2, generations=20, seed=1,
+                                   cancel_token=token, processes=processes)
+        assert ga.timed_out and ga.stats_history == []
+        assert all(island["generations"] == 0 for island in ga.islands)
+        assert sorted(map(str, placements(result))) == sorted(map(str, placements(timetables)))
+
+
+if __name__ == "__main__":
+    test_epochs_follow_migration_interval()
+    test_processes_match_in_process_run()
+    test_evolve_islands_returns_valid_distinct_timetables()
+    test_cancelled_islands_return_initial_population()
+    print("✅ PASSED: island model tests")
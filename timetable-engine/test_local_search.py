@@ -0,0 +1,132 @@
+"""
+Test: Teacher-preserving tabu search (v3.0.1 TabuSearchOptimizer)
+
+Verifies that:
+- The soft-constraint penalty never gets worse, and the incrementally tracked
+  penalty matches a full evaluator run
+- Moves keep every (class, subject) -> teacher assignment and never create
+  class, teacher or room clashes or break daily teacher limits
+- The same seed reproduces the same timetable
+- An exhausted time budget returns the input unchanged with timed_out set
+- Partial timetables keep their unfilled-slot bookkeeping
+- Periods of a teacher with restricted availability stay in their slots
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from src.csp_solver_complete_v301 import CSPSolverCompleteV301
+from src.algorithms.core.local_search import TabuSearchOptimizer
+from src.models_phase1_v25 import OptimizationWeights
+from evaluation import TimetableEvaluator, EvaluationConfig
+from school_fixtures import DAYS, build_school, assert_valid
+
+
+def baseline(allow_partial_solutions=False, availability=None):
+    classes, subjects, teachers, time_slots, rooms = build_school(num_classes=6)
+    for subject in subjects[:2]:
+        subject.prefer_morning = True
+    for teacher in teachers:
+        teacher.availability = (availability or {}).get(teacher.id, {})
+    timetables, _, _, _ = CSPSolverCompleteV301(debug=False).solve(
+        classes=classes, subjects=subjects, teachers=teachers,
+        time_slots=time_slots, rooms=rooms, constraints=[],
+        num_solutions=1, allow_partial_solutions=allow_partial_solutions, seed=1
+    )
+    return timetables[0], teachers, time_slots
+
+
+def soft_penalty(timetable_dict, weights):
+    summary = TimetableEvaluator(
+        EvaluationConfig.from_optimization_weights(weights)
+    ).evaluate(timetable_dict).penalty_summary
+    return sum(summary.get(key, 0) for key in ("student_gaps", "time_preferences", "consecutive_periods"))
+
+
+def teacher_map(entries):
+    return {(e["class_id"], e["subject_id"], e["teacher_id"]) for e in entries}
+
+
+def test_tabu_improves_without_breaking_constraints():
+    timetable, teachers, time_slots = baseline()
+    weights = OptimizationWeights()
+    before = timetable.model_dump()
+
+    improved = TabuSearchOptimizer().optimize(
+        before, weights=weights, teachers=teachers, time_slots=time_slots, seed=3
+    )
+    stats = improved["metadata"]["local_search"]
+    assert stats["method"] == "tabu"
+    assert stats["penalty_after"] <= stats["penalty_before"]
+    assert stats["penalty_before"] == soft_penalty(before, weights)
+    assert stats["penalty_after"] == soft_penalty(improved, weights)
+
+    assert teacher_map(improved["entries"]) == teacher_map(before["entries"])
+    assert len(improved["entries"]) == len(before["entries"])
+    assert_valid(type(timetable).model_validate(improved), teachers)
+
+
+def test_same_seed_same_timetable():
+    timetable, teachers, time_slots = baseline()
+    runs = [
+        TabuSearchOptimizer(max_iterations=300).optimize(
+            timetable.model_dump(), teachers=teachers, time_slots=time_slots, seed=11
+        )
+        for _ in range(2)
+    ]
+    assert runs[0]["entries"] == runs[1]["entries"]
+
+
+def test_exhausted_budget_returns_input():
+    timetable, teachers, time_slots = baseline()
+    before = timetable.model_dump()
+    improved = TabuSearchOptimizer().optimize(
+        before, teachers=teachers, time_slots=time_slots, seed=3, timeout=0
+    )
+    assert improved["metadata"]["local_search"]["timed_out"]
+    assert improved["metadata"]["local_search"]["iterations"] == 0
+    assert improved["entries"] == before["entries"]
+
+
+def test_partial_timetable_keeps_unfilled_count():
+    timetable, teachers, time_slots = baseline(allow_partial_solutions=True)
+    before = timetable.model_dump()
+    improved = TabuSearchOptimizer().optimize(
+        before, teachers=teachers, time_slots=time_slots, seed=5
+    )
+    self_study = lambda tt: sum(e["subject_id"] == "SELF_STUDY" for e in tt["entries"])
+    assert self_study(improved) == self_study(before)
+    assert teacher_map(improved["entries"]) == teacher_map(before["entries"])
+    assert_valid(type(timetable).model_validate(improved), teachers)
+
+
+def test_tabu_respects_teacher_availability():
+    # Math is preferred in the morning, but T_MATH_0 only teaches periods 4-6
+    afternoons = {day.lower(): [4, 5, 6] for day in DAYS}
+    timetable, teachers, time_slots = baseline(availability={"T_MATH_0": afternoons})
+    unavailable = lambda tt: [
+        e for e in tt["entries"]
+        if e["teacher_id"] == "T_MATH_0" and e["period_number"] < 4
+    ]
+    before = timetable.model_dump()
+    assert any(e["teacher_id"] == "T_MATH_0" for e in before["entries"])
+    assert not unavailable(before)
+
+    improved = TabuSearchOptimizer().optimize(
+        before, weights=OptimizationWeights(), teachers=teachers, time_slots=time_slots, seed=3
+    )
+    assert improved["metadata"]["local_search"]["iterations"] > 0
+    assert not unavailable(improved)
+    assert_valid(type(timetable).model_validate(improved), teachers)
+
+
+if __name__ == "__main__":
+    test_tabu_improves_without_breaking_constraints()
+    test_same_seed_same_timetable()
+    test_exhausted_budget_returns_input()
+    test_partial_timetable_keeps_unfilled_count()
+    test_tabu_respects_teacher_availability()
+    print("✅ PASSED: tabu search tests")
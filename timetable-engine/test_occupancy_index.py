@@ -0,0 +1,83 @@
+"""
+Test: Occupancy Index (v3.0.1 constant-time teacher load accounting)
+
+Verifies that:
+- OccupancyIndex counters track per-(teacher, day) and per-teacher load
+- The v3.0.1 solver never exceeds teacher daily/weekly limits
+"""
+
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.occupancy_index import OccupancyIndex
+from src.csp_solver_complete_v301 import CSPSolverCompleteV301
+from school_fixtures import build_school
+
+
+def test_occupancy_counters():
+    """Commits update busy set and both load counters."""
+    _, _, teachers, time_slots, _ = build_school()
+    teacher = teachers[0]
+    occupancy = OccupancyIndex()
+
+    occupancy.commit(teacher.id, time_slots[0])
+    occupancy.commit(teacher.id, time_slots[1])
+    occupancy.commit(teacher.id, time_slots[7])  # Tuesday
+
+    assert (teacher.id, time_slots[0].id) in occupancy
+    assert not occupancy.is_teacher_free(teacher.id, time_slots[1].id)
+    assert occupancy.teacher_day_load[(teacher.id, time_slots[0].day_of_week)] == 2
+    assert occupancy.teacher_week_load[teacher.id] == 3
+    assert not occupancy.can_assign(teacher, time_slots[0])
+    assert occupancy.can_assign(teacher, time_slots[2])
+
+
+def test_occupancy_daily_limit():
+    """A teacher at the daily cap cannot take another period that day."""
+    _, _, teachers, time_slots, _ = build_school()
+    teacher = teachers[0]
+    occupancy = OccupancyIndex()
+
+    monday = [ts for ts in time_slots if ts.day_of_week.value == "MONDAY"]
+    for slot in monday[:teacher.max_periods_per_day]:
+        occupancy.commit(teacher.id, slot)
+
+    assert not occupancy.can_assign(teacher, monday[-1])
+    tuesday = [ts for ts in time_slots if ts.day_of_week.value == "TUESDAY"]
+    assert occupancy.can_assign(teacher, tuesday[0])
+
+
+def test_solver_respects_teacher_limits():
+    """Generated timetables keep every teacher within daily and weekly limits."""
+    classes, subjects, teachers, time_slots, rooms = build_school()
+    solver = CSPSolverCompleteV301(debug=False)
+
+    timetables, _, conflicts, _ = solver.solve(
+        classes=classes, subjects=subjects, teachers=teachers,
+        time_slots=time_slots, rooms=rooms, constraints=[],
+        num_solutions=1, allow_partial_solutions=False
+    )
+
+    assert timetables, conflicts
+    teacher_lookup = {t.id: t for t in teachers}
+    entries = [e for e in timetables[0].entries if e.subject_id != "SELF_STUDY"]
+
+    day_load = Counter((e.teacher_id, e.day_of_week) for e in entries)
+    week_load = Counter(e.teacher_id for e in entries)
+    for (teacher_id, _), count in day_load.items():
+        assert count <= teacher_lookup[teacher_id].max_periods_per_day
+    for teacher_id, count in week_load.items():
+        assert count <= teacher_lookup[teacher_id].max_periods_per_week
+
+    busy = Counter((e.teacher_id, e.time_slot_id) for e in entries)
+    assert max(busy.values()) == 1
+
+
+if __name__ == "__main__":
+    test_occupancy_counters()
+    test_occupancy_daily_limit()
+    test_solver_respects_teacher_limits()
+    print("✅ PASSED: occupancy index tests")
@@ -0,0 +1,121 @@
+"""
+Test: Incremental relaxation ladder (v3.0.1 partial solutions)
+
+Verifies that:
+- The strict pass is kept: looser levels only fill slots it left empty
+- relaxation_level reports the loosest level that placed a period
+- The ladder keeps climbing while gaps remain, even above min_coverage
+- A school the strict pass can solve gets no over-quota periods or
+  unqualified teachers
+- A partial solve runs num_solutions attempts, not one per relaxation level
+"""
+
+import sys
+import random
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.csp_solver_complete_v301 import CSPSolverCompleteV301
+from src.models_phase1_v30 import V30Validator
+from school_fixtures import build_school
+
+
+def partial(solver, relaxation_level, num_classes=9, seed=5, min_coverage=0.0):
+    classes, subjects, teachers, time_slots, rooms = build_school(num_classes=num_classes)
+    active_slots = [ts for ts in time_slots if not ts.is_break]
+    return solver._generate_partial_solution(
+        classes, subjects, teachers, active_slots, rooms,
+        V30Validator.extract_shared_rooms(rooms),
+        solver._build_teacher_subject_map(teachers, subjects),
+        solver._build_distributions(classes, subjects, None, len(active_slots)),
+        {s.id: s for s in subjects}, {t.id: t for t in teachers}, {r.id: r for r in rooms},
+        True, {}, relaxation_level=relaxation_level, min_coverage=min_coverage,
+        rng=random.Random(seed)
+    )
+
+
+def test_looser_levels_extend_the_strict_pass():
+    solver = CSPSolverCompleteV301(debug=False)
+    strict = partial(solver, 0.0)
+    assert strict.gaps, "9 classes exceed teacher capacity"
+    assert strict.metadata["relaxation_level"] == 0.0
+
+    laddered = partial(solver, 0.8)
+    fills = laddered.metadata["relaxation_fills"]
+    assert set(fills) == {"0.0", "0.3", "0.5", "0.8"}
+    # Same seed: the strict pass places exactly the same periods first
+    assert laddered.placements[:fills["0.0"]] == strict.placements
+    # Later levels only touch slots the strict pass left empty
+    extra = {(p[0], p[3]) for p in laddered.placements[fills["0.0"]:]}
+    assert extra <= set(strict.gaps)
+    assert len(laddered.placements) >= len(strict.placements)
+    assert len(laddered.placements) + len(laddered.gaps) == laddered.expected_entries
+    used = [float(level) for level, count in fills.items() if count]
+    assert laddered.metadata["relaxation_level"] == max(used)
+
+
+def test_easy_school_stays_strict():
+    draft = partial(CSPSolverCompleteV301(debug=False), 0.8, num_classes=2)
+    assert not draft.gaps
+    assert draft.metadata["relaxation_level"] == 0.0
+    assert draft.metadata["relaxation_fills"]["0.3"] == 0
+
+
+def test_ladder_climbs_past_min_coverage():
+    solver = CSPSolverCompleteV301(debug=False)
+    strict = partial(solver, 0.0)
+    assert strict.gaps and strict.metadata["coverage"] >= 0.7
+    # min_coverage only accepts or rejects the attempt; relaxed levels
+    # still fill the gaps the strict pass left open
+    draft = partial(solver, 0.8, min_coverage=0.7)
+    assert len(draft.gaps) < len(strict.gaps)
+    assert draft.metadata["coverage"] > strict.metadata["coverage"]
+    assert sum(count for level, count in draft.metadata["relaxation_fills"].items()
+               if level != "0.0") == len(draft.placements) - len(strict.placements)
+
+
+def test_strict_school_gets_no_relaxed_entries():
+    classes, subjects, teachers, time_slots, rooms = build_school(num_classes=6)
+    solver = CSPSolverCompleteV301(debug=False)
+    timetables, _, _, _ = solver.solve(
+        classes=classes, subjects=subjects, teachers=teachers,
+        time_slots=time_slots, rooms=rooms, constraints=[],
+        num_solutions=2, allow_partial_solutions=True, min_coverage=0.7, seed=3
+    )
+    assert timetables
+    active_slots = [ts for ts in time_slots if not ts.is_break]
+    quotas = solver._build_distributions(classes, subjects, None, len(active_slots))
+    subject_names = {s.id: s.name for s in subjects}
+    qualified = {t.id: set(t.subjects) for t in teachers}
+    for timetable in timetables:
+        assert timetable.metadata["coverage"] == 1.0
+        assert timetable.metadata["relaxation_level"] == 0.0
+        assert not any(count for level, count in timetable.metadata["relaxation_fills"].items()
+                       if level != "0.0")
+        for entry in timetable.entries:
+            assert subject_names[entry.subject_id] in qualified[entry.teacher_id]
+        periods = Counter((e.class_id, e.subject_id) for e in timetable.entries)
+        assert all(count <= quotas[c][s] for (c, s), count in periods.items())
+
+
+def test_partial_solve_runs_one_attempt_per_solution():
+    classes, subjects, teachers, time_slots, rooms = build_school(num_classes=9)
+    timetables, _, _, _ = CSPSolverCompleteV301(debug=False).solve(
+        classes=classes, subjects=subjects, teachers=teachers,
+        time_slots=time_slots, rooms=rooms, constraints=[],
+        num_solutions=2, allow_partial_solutions=True, min_coverage=0.5, seed=3
+    )
+    assert len(timetables) == 2
+    assert all(t.metadata["attempts"] == 2 for t in timetables)
+    assert all("relaxation_fills" in t.metadata for t in timetables)
+
+
+if __name__ == "__main__":
+    test_looser_levels_extend_the_strict_pass()
+    test_easy_school_stays_strict()
+    test_ladder_climbs_past_min_coverage()
+    test_strict_school_gets_no_relaxed_entries()
+    test_partial_solve_runs_one_attempt_per_solution()
+    print("✅ PASSED: relaxation ladder tests")
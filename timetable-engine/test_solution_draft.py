@@ -0,0 +1,134 @@
+"""
+Test: Deferred timetable materialization (v3.0.1 SolutionDraft)
+
+Verifies that:
+- Greedy attempts return compact drafts (placement tuples, no entries)
+- A draft survives pickling (worker processes send drafts back)
+- Only the returned solutions are materialized, with SELF_STUDY and
+  unfilled_slots built from the draft's gaps
+- Entries of one subject/teacher share a single metadata dict
+- Partial drafts keep compact GapFacts, rendered as reasons only on
+  materialization
+- v2.5 time slots (as /generate passes them) give entries the v3.0
+  DayOfWeek, so model_dump() raises no serialization warnings
+"""
+
+import sys
+import pickle
+import random
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.models_phase1_v25 import TimeSlot as TimeSlotV25
+from src.models_phase1_v30 import DayOfWeek
+from src.csp_solver_complete_v301 import CSPSolverCompleteV301
+from src.solution_draft import SolutionDraft, describe_gap
+from school_fixtures import build_school
+
+
+def solve(allow_partial_solutions, num_classes=9):
+    classes, subjects, teachers, time_slots, rooms = build_school(num_classes=num_classes)
+    return CSPSolverCompleteV301(debug=False).solve(
+        classes=classes, subjects=subjects, teachers=teachers,
+        time_slots=time_slots, rooms=rooms, constraints=[],
+        num_solutions=2, allow_partial_solutions=allow_partial_solutions, seed=3
+    )[0]
+
+
+def test_attempts_return_picklable_drafts():
+    classes, subjects, teachers, time_slots, rooms = build_school(num_classes=9)
+    solver = CSPSolverCompleteV301(debug=False)
+    active_slots = [ts for ts in time_slots if not ts.is_break]
+    draft = solver._generate_complete_solution(
+        classes, subjects, teachers, active_slots, rooms, [],
+        solver._build_teacher_subject_map(teachers, subjects),
+        solver._build_distributions(classes, subjects, None, len(active_slots)),
+        {s.id: s for s in subjects}, {t.id: t for t in teachers}, {r.id: r for r in rooms},
+        True, rng=random.Random(1)
+    )
+    assert isinstance(draft, SolutionDraft)
+    assert isinstance(draft.placements[0], tuple)
+    assert draft.entries_count == len(classes) * len(active_slots)
+
+    copy = pickle.loads(pickle.dumps(draft))
+    assert copy.placements == draft.placements and copy.gaps == draft.gaps
+
+
+def test_complete_solution_materializes_self_study():
+    timetables = solve(allow_partial_solutions=False)
+    assert len(timetables) == 2
+    timetable = timetables[0]
+    self_study = [e for e in timetable.entries if e.subject_id == "SELF_STUDY"]
+    assert self_study, "9 classes exceed teacher capacity"
+    assert len(timetable.entries) == timetable.metadata["expected_entries"]
+    assert [e.id for e in timetable.entries] == [f"entry_{i + 1}" for i in range(len(timetable.entries))]
+
+
+def test_partial_solution_materializes_gaps():
+    timetable = solve(allow_partial_solutions=True)[0]
+    gaps = timetable.metadata["unfilled_slots"]
+    assert timetable.metadata["gaps_count"] == len(gaps)
+    assert len(timetable.entries) + len(gaps) == timetable.metadata["expected_entries"]
+    assert all(gap["reason"] for gap in gaps)
+    assert not {(g["class_id"], g["time_slot_id"]) for g in gaps} & \
+        {(e.class_id, e.time_slot_id) for e in timetable.entries}
+
+
+def test_metadata_dicts_are_shared():
+    timetable = solve(allow_partial_solutions=True, num_classes=4)[0]
+    by_teacher = {}
+    for entry in timetable.entries:
+        by_teacher.setdefault(entry.teacher_id, entry.teacher_metadata)
+        assert entry.teacher_metadata is by_teacher[entry.teacher_id]
+    dumped = timetable.model_dump()
+    assert dumped["entries"][0]["teacher_metadata"] == {"max_consecutive_periods": 3}
+
+
+def test_v25_time_slots_dump_without_warnings():
+    # 9 classes exceed teacher capacity: SELF_STUDY entries are built too
+    classes, subjects, teachers, time_slots, rooms = build_school(num_classes=9)
+    time_slots = [TimeSlotV25(**ts.model_dump()) for ts in time_slots]
+    for allow_partial_solutions in (False, True):
+        timetable = CSPSolverCompleteV301(debug=False).solve(
+            classes=classes, subjects=subjects, teachers=teachers,
+            time_slots=time_slots, rooms=rooms, constraints=[],
+            num_solutions=1, allow_partial_solutions=allow_partial_solutions, seed=3
+        )[0][0]
+        assert all(type(e.day_of_week) is DayOfWeek for e in timetable.entries)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            dumped = timetable.model_dump()
+        assert dumped["entries"][0]["day_of_week"] == timetable.entries[0].day_of_week
+
+
+def test_gap_facts_are_rendered_lazily():
+    assert describe_gap((0, 3, 0)) == "No teachers available"
+    assert describe_gap((1, 2, 1)) == "No teachers available; No rooms available"
+    assert describe_gap((4, 0, 0)) == "All subject quotas met"
+    assert describe_gap((0, 0, 0)) == "No subjects configured for this class"
+    assert describe_gap("Time budget exhausted") == "Time budget exhausted"
+
+    classes, subjects, teachers, time_slots, rooms = build_school(num_classes=9)
+    solver = CSPSolverCompleteV301(debug=False)
+    active_slots = [ts for ts in time_slots if not ts.is_break]
+    draft = solver._generate_partial_solution(
+        classes, subjects, teachers, active_slots, rooms, [],
+        solver._build_teacher_subject_map(teachers, subjects),
+        solver._build_distributions(classes, subjects, None, len(active_slots)),
+        {s.id: s for s in subjects}, {t.id: t for t in teachers}, {r.id: r for r in rooms},
+        True, {}, relaxation_level=0.0, min_coverage=0.0, rng=random.Random(1)
+    )
+    assert draft.gaps
+    assert all(isinstance(facts, tuple) and len(facts) == 3 for facts in draft.gaps.values())
+
+
+if __name__ == "__main__":
+    test_attempts_return_picklable_drafts()
+    test_complete_solution_materializes_self_study()
+    test_partial_solution_materializes_gaps()
+    test_metadata_dicts_are_shared()
+    test_v25_time_slots_dump_without_warnings()
+    test_gap_facts_are_rendered_lazily()
+    print("✅ PASSED: solution draft tests")
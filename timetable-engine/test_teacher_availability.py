@@ -0,0 +1,123 @@
+"""
+Test: Teacher availability bitmasks (v3.0.1 TeacherAvailability)
+
+Verifies that:
+- Day windows, period numbers and whole days compile to slot bitmasks;
+  unlisted days are unavailable, {} means unrestricted
+- Capacity counts only available slots under the daily and weekly caps
+- Both occupancy engines prune unavailable teachers
+- solve() (greedy, partial and backtracking) never schedules a teacher in
+  an unavailable slot, and rejects malformed availability
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.csp_solver_complete_v301 import CSPSolverCompleteV301
+from src.bitmask_occupancy import BitmaskLayout
+from src.occupancy_index import OccupancyIndex
+from src.teacher_availability import TeacherAvailability
+from school_fixtures import build_school
+
+PART_TIME = {"monday": True, "Tuesday": ["08:00-10:00"], "WEDNESDAY": [5, 6], "notes": "part-time"}
+
+
+def part_time_school(num_classes=4):
+    classes, subjects, teachers, time_slots, rooms = build_school(num_classes=num_classes)
+    teachers[0].availability = dict(PART_TIME)
+    return classes, subjects, teachers, time_slots, rooms
+
+
+def test_availability_compiles_to_slot_masks():
+    _, _, teachers, time_slots, _ = part_time_school()
+    availability = TeacherAvailability(teachers, time_slots)
+    assert list(availability.masks) == [teachers[0].id]
+
+    open_slots = [s.id for i, s in enumerate(time_slots) if availability.slots(teachers[0].id) >> i & 1]
+    assert open_slots == [f"MON_P{p}" for p in range(1, 7)] + ["TUE_P1", "TUE_P2", "WED_P5", "WED_P6"]
+    assert not availability.allows(teachers[0].id, "THU_P1")
+    assert availability.allows(teachers[1].id, "THU_P1")
+
+    # Monday is capped at 4 periods a day
+    assert availability.capacity(teachers[0]) == 4 + 2 + 2
+    assert availability.capacity(teachers[1]) == 20
+
+    teachers[1].availability = {"monday": ["8-10"]}
+    with pytest.raises(ValueError, match="invalid availability entry"):
+        TeacherAvailability(teachers, time_slots)
+
+
+def test_occupancy_engines_prune_unavailable_teachers():
+    _, _, teachers, time_slots, _ = part_time_school()
+    availability = TeacherAvailability(teachers, time_slots)
+    slots = {s.id: s for s in time_slots}
+    math_teachers = [t for t in teachers if t.id.startswith("T_MATH")]
+
+    for occupancy in (OccupancyIndex(availability),
+                      BitmaskLayout(teachers, [], time_slots, availability).new_state()):
+        assert occupancy.can_assign(teachers[0], slots["MON_P1"])
+        assert not occupancy.can_assign(teachers[0], slots["THU_P1"])
+        assert not occupancy.is_teacher_free(teachers[0].id, "TUE_P3")
+        assert occupancy.first_available_teacher(math_teachers, slots["FRI_P2"]).id == "T_MATH_1"
+        assert occupancy.first_available_teacher(math_teachers, slots["WED_P5"]).id == "T_MATH_0"
+
+
+@pytest.mark.parametrize("search_mode,allow_partial,state_engine", [
+    ("greedy", False, "dict"),
+    ("greedy", True, "bitmask"),
+    ("backtracking", True, "dict"),
+])
+def test_solve_respects_availability(search_mode, allow_partial, state_engine):
+    classes, subjects, teachers, time_slots, rooms = part_time_school()
+    solver = CSPSolverCompleteV301(debug=False)
+    timetables, _, _, _ = solver.solve(
+        classes=classes, subjects=subjects, teachers=teachers, time_slots=time_slots,
+        rooms=rooms, constraints=[], num_solutions=2, seed=7,
+        search_mode=search_mode, allow_partial_solutions=allow_partial,
+        state_engine=state_engine, min_coverage=0.5
+    )
+    assert timetables
+    availability = TeacherAvailability(teachers, time_slots)
+    for timetable in timetables:
+        taught = [e for e in timetable.entries
+                  if e.teacher_id == teachers[0].id and e.subject_id != "SELF_STUDY"]
+        assert taught, "the part-time teacher still teaches"
+        assert all(availability.allows(e.teacher_id, e.time_slot_id) for e in taught)
+        # Load limits are only relaxed from ladder level 0.3 on
+        if timetable.metadata.get("relaxation_level", 0.0) < 0.3:
+            assert len(taught) <= availability.capacity(teachers[0])
+
+
+def test_greedy_assignment_uses_available_capacity():
+    classes, subjects, teachers, time_slots, _ = part_time_school()
+    assignment = CSPSolverCompleteV301(debug=False).greedy_assigner.assign_teachers(
+        classes, subjects, teachers, time_slots
+    )
+    # 8 periods of Math fit the part-time teacher once; the full-time one takes the rest
+    math = [assignment[(c.id, "MATH")] for c in classes]
+    assert math.count("T_MATH_0") == 1
+
+
+def test_malformed_availability_is_rejected():
+    classes, subjects, teachers, time_slots, rooms = part_time_school()
+    teachers[2].availability = {"friday": ["morning"]}
+    timetables, _, conflicts, _ = CSPSolverCompleteV301(debug=False).solve(
+        classes=classes, subjects=subjects, teachers=teachers, time_slots=time_slots,
+        rooms=rooms, constraints=[]
+    )
+    assert timetables == []
+    assert teachers[2].id in conflicts[0]
+
+
+if __name__ == "__main__":
+    test_availability_compiles_to_slot_masks()
+    test_occupancy_engines_prune_unavailable_teachers()
+    for params in [("greedy", False, "dict"), ("greedy", True, "bitmask"), ("backtracking", True, "dict")]:
+        test_solve_respects_availability(*params)
+    test_greedy_assignment_uses_available_capacity()
+    test_malformed_availability_is_rejected()
+    print("✅ PASSED: teacher availability tests")
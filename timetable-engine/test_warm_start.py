@@ -0,0 +1,114 @@
+"""
+Test: Warm-start generation (v3.0.1 GenerateRequest.reference_timetable[_id])
+
+Verifies that:
+- /generate caches every returned timetable and reports its id
+- A request naming a cached id keeps the reference entries that are still
+  valid and searches only the rest (here: a new class for the next term)
+- An inline reference frees entries the new data no longer allows
+- An unknown reference id is rejected with 404
+- Entries in a room that no longer exists are freed by the repair
+- The GA caches its runs apart from the warm-start references
+"""
+
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fastapi.testclient import TestClient
+
+import main_v301
+from src.models_phase1_v30 import Class, Room, RoomType
+from src.csp_solver_complete_v301 import CSPSolverCompleteV301
+from school_fixtures import payload, baseline
+
+
+def assert_no_double_booking(entries):
+    assert max(Counter((e["class_id"], e["time_slot_id"]) for e in entries).values()) == 1
+    assert max(Counter((e["teacher_id"], e["time_slot_id"]) for e in entries
+                       if e["subject_id"] != "SELF_STUDY").values()) == 1
+
+
+def test_warm_start_from_cached_id():
+    request = payload()
+    with TestClient(main_v301.app) as client:
+        first = client.post("/generate", json=request).json()
+        timetable_ids = first["diagnostics"]["timetable_ids"]
+        assert len(timetable_ids) == 1
+        assert first["diagnostics"]["warm_start"] is None
+        reference = first["solutions"][0]["timetable"]
+        taught = [e for e in reference["entries"] if e["subject_id"] != "SELF_STUDY"]
+
+        # Next term: one more section, everything else unchanged
+        new_class = Class(id="C6", school_id="S1", name="Grade 6-6", grade=6, section="6",
+                          student_count=30, home_room_id="R6")
+        new_room = Room(id="R6", school_id="S1", name="Room 6", capacity=40, type=RoomType.CLASSROOM)
+        request["classes"].append(new_class.model_dump())
+        request["rooms"].append(new_room.model_dump())
+        response = client.post("/generate", json=dict(request, reference_timetable_id=timetable_ids[0]))
+
+    assert response.status_code == 200
+    diagnostics = response.json()["diagnostics"]
+    warm_start = diagnostics["warm_start"]
+    assert warm_start["reference_timetable_id"] == timetable_ids[0]
+    assert warm_start["kept_entries"] == len(taught)
+    assert warm_start["placed_entries"] > 0
+    entries = response.json()["solutions"][0]["timetable"]["entries"]
+    assert any(e["class_id"] == "C6" and e["subject_id"] != "SELF_STUDY" for e in entries)
+    assert_no_double_booking(entries)
+
+
+def test_inline_reference_frees_invalid_entries():
+    request = payload()
+    with TestClient(main_v301.app) as client:
+        reference = client.post("/generate", json=request).json()["solutions"][0]["timetable"]
+        dropped = request["teachers"][0]
+        assert dropped["subjects"] == ["MATH"]
+        dropped["subjects"] = []
+        response = client.post("/generate", json=dict(request, reference_timetable=reference))
+
+    assert response.status_code == 200
+    warm_start = response.json()["diagnostics"]["warm_start"]
+    assert warm_start["inline"] and warm_start["reference_timetable_id"] is None
+    assert warm_start["freed_entries"] >= sum(1 for e in reference["entries"]
+                                              if e["teacher_id"] == dropped["id"])
+    entries = response.json()["solutions"][0]["timetable"]["entries"]
+    assert not any(e["teacher_id"] == dropped["id"] for e in entries)
+    assert_no_double_booking(entries)
+
+
+def test_unknown_reference_id_is_rejected():
+    with TestClient(main_v301.app) as client:
+        response = client.post("/generate", json=dict(payload(), reference_timetable_id="missing"))
+    assert response.status_code == 404
+
+
+def test_ga_cache_is_separate_from_references():
+    with TestClient(main_v301.app):
+        references = main_v301.app.state.timetable_cache
+        ga_cache = main_v301.app.state.ga_optimizer.cache
+    assert ga_cache is not references
+    assert ga_cache.index_file != references.index_file
+
+
+def test_entries_in_removed_rooms_are_freed():
+    (classes, subjects, teachers, time_slots, rooms), previous = baseline()
+    previous["entries"][0]["room_id"] = "OLD_LAB"
+    timetables, _, conflicts, _ = CSPSolverCompleteV301(debug=False).resolve(
+        previous, classes, subjects, teachers, time_slots, rooms, seed=2
+    )
+    assert conflicts is None
+    incremental = timetables[0].metadata["incremental"]
+    assert incremental["freed_entries"] == 1 and incremental["placed_entries"] == 1
+    assert not any(e.room_id == "OLD_LAB" for e in timetables[0].entries)
+
+
+if __name__ == "__main__":
+    test_warm_start_from_cached_id()
+    test_inline_reference_frees_invalid_entries()
+    test_unknown_reference_id_is_rejected()
+    test_ga_cache_is_separate_from_references()
+    test_entries_in_removed_rooms_are_freed()
+    print("✅ PASSED: warm start tests")
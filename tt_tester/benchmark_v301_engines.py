@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+v3.0.1 State Engine Benchmark: dict vs bitmask
+
+Runs CSPSolverCompleteV301 on tt_tester configs 1-5 with both occupancy
+engines and reports wall time and coverage. Both engines pick the same
+candidates, so with the same seed they must produce identical
+timetables - the benchmark checks that too.
+
+Usage:
+    python3 benchmark_v301_engines.py             # all configs, 3 runs each
+    python3 benchmark_v301_engines.py --runs 5 --configs 3 4 5
+"""
+
+import sys
+import os
+import time
+import argparse
+import importlib
+import statistics
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'timetable-engine'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.csp_solver_complete_v301 import CSPSolverCompleteV301
+
+CONFIGS = {
+    1: ("test_v30_config1_small", "create_small_school_data", "small"),
+    2: ("test_v30_config2_medium", "create_medium_school_data", "medium"),
+    3: ("test_v30_config3_large", "create_large_school_data", "large"),
+    4: ("test_v30_config4_big", "create_big_school_data", "big"),
+    5: ("test_v30_config5_huge", "create_huge_school_data", "huge"),
+}
+
+ENGINES = ["dict", "bitmask"]
+
+
+def load_config(config_number):
+    """Import a tt_tester config module and build its school data."""
+    module_name, factory_name, label = CONFIGS[config_number]
+    module = importlib.import_module(module_name)
+    classes, subjects, teachers, time_slots, rooms = getattr(module, factory_name)()[:5]
+    return label, classes, subjects, teachers, time_slots, rooms
+
+
+def run_once(engine, data, seed, num_solutions, allow_partial):
+    """Run one solve, return (seconds, coverages, entry signatures)."""
+    classes, subjects, teachers, time_slots, rooms = data
+    solver = CSPSolverCompleteV301(debug=False)
+    start = time.perf_counter()
+    timetables, _, _, _ = solver.solve(
+        classes=classes, subjects=subjects, teachers=teachers,
+        time_slots=time_slots, rooms=rooms, constraints=[],
+        num_solutions=num_solutions,
+        allow_partial_solutions=allow_partial,
+        state_engine=engine,
+        seed=seed
+    )
+    elapsed = time.perf_counter() - start
+    coverages = [tt.metadata.get("coverage", 0.0) for tt in timetables]
+    signature = [
+        [(e.class_id, e.subject_id, e.teacher_id, e.room_id, e.time_slot_id) for e in tt.entries]
+        for tt in timetables
+    ]
+    return elapsed, coverages, signature
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark v3.0.1 state engines")
+    parser.add_argument("--configs", type=int, nargs="+", default=[1, 2, 3, 4, 5])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--solutions", type=int, default=3)
+    parser.add_argument("--complete", action="store_true",
+                        help="Use complete-solution mode instead of partial solutions")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("v3.0.1 STATE ENGINE BENCHMARK (dict vs bitmask)")
+    print("=" * 80)
+    print(f"Runs per engine: {args.runs}, solutions per run: {args.solutions}, "
+          f"mode: {'complete' if args.complete else 'partial'}\n")
+
+    header = f"{'Config':<10}{'Classes':>8}{'Engine':>10}{'Median s':>11}{'Best s':>10}{'Coverage':>11}{'Speedup':>10}"
+    print(header)
+    print("-" * len(header))
+
+    for config_number in args.configs:
+        label, *data = load_config(config_number)
+        results = {}
+        for engine in ENGINES:
+            times, coverages, signatures = [], [], []
+            for run in range(args.runs):
+                elapsed, cov, sig = run_once(engine, data, seed=run,
+                                             num_solutions=args.solutions,
+                                             allow_partial=not args.complete)
+                times.append(elapsed)
+                coverages.extend(cov)
+                signatures.append(sig)
+            results[engine] = (times, coverages, signatures)
+
+        base_median = statistics.median(results["dict"][0])
+        for engine in ENGINES:
+            times, coverages, _ = results[engine]
+            median = statistics.median(times)
+            avg_cov = (sum(coverages) / len(coverages) * 100) if coverages else 0.0
+            speedup = base_median / median if median > 0 else 0.0
+            print(f"{label:<10}{len(data[0]):>8}{engine:>10}{median:>11.3f}{min(times):>10.3f}"
+                  f"{avg_cov:>10.1f}%{speedup:>9.2f}x")
+
+        identical = results["dict"][2] == results["bitmask"][2]
+        print(f"{'':<10}{'':>8}{'':>10}  identical timetables: {'YES' if identical else 'NO'}")
+
+    print("\nDone.")
+
+
+if __name__ == "__main__":
+    main()
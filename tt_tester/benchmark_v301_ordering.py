@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+v3.0.1 Class Ordering Benchmark: input order vs most-constrained-first
+
+Runs CSPSolverCompleteV301 on tt_tester configs 3-5 with
+class_ordering="input" (request order, v3.0 behaviour) and
+class_ordering="difficulty" and reports coverage, SELF_STUDY/unfilled
+periods, attempts run (1 + retries across relaxation levels) and wall time.
+
+The config generators create every teacher with subjects=[] and encode the
+subject only in the name ("Math Teacher 3"), so no subject is scarcer than
+another. By default the benchmark qualifies each teacher for the subjects
+whose name starts with that prefix (substitutes stay unqualified); --raw
+runs the configs as generated.
+
+Usage:
+    python3 benchmark_v301_ordering.py              # configs 3-5, 3 runs each
+    python3 benchmark_v301_ordering.py --runs 5 --configs 1 2 3 4 5
+    python3 benchmark_v301_ordering.py --complete   # complete-solution mode
+    python3 benchmark_v301_ordering.py --raw        # keep subjects=[] teachers
+"""
+
+import sys
+import os
+import time
+import argparse
+import statistics
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'timetable-engine'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.csp_solver_complete_v301 import CSPSolverCompleteV301
+from benchmark_v301_engines import CONFIGS, load_config
+
+ORDERINGS = ["input", "difficulty"]
+
+
+def qualify_teachers(subjects, teachers):
+    """Give "<Prefix> Teacher N" the subjects whose name starts with Prefix."""
+    qualified = []
+    for teacher in teachers:
+        prefix = (teacher.name or "").split(" Teacher")[0]
+        codes = [s.code for s in subjects if prefix and s.name.startswith(prefix)]
+        qualified.append(teacher.model_copy(update={"subjects": codes}))
+    return qualified
+
+
+def run_once(ordering, data, seed, num_solutions, allow_partial):
+    """Run one solve, return (seconds, best coverage, gap periods, attempts)."""
+    classes, subjects, teachers, time_slots, rooms = data
+    solver = CSPSolverCompleteV301(debug=False)
+    start = time.perf_counter()
+    timetables, _, _, _ = solver.solve(
+        classes=classes, subjects=subjects, teachers=teachers,
+        time_slots=time_slots, rooms=rooms, constraints=[],
+        num_solutions=num_solutions,
+        allow_partial_solutions=allow_partial,
+        class_ordering=ordering,
+        seed=seed
+    )
+    elapsed = time.perf_counter() - start
+    if not timetables:
+        return elapsed, 0.0, None, None
+    best = timetables[0]
+    if allow_partial:
+        gaps = best.metadata.get("gaps_count", 0)
+    else:
+        gaps = sum(1 for e in best.entries if e.subject_id == "SELF_STUDY")
+    return elapsed, best.metadata.get("coverage", 0.0), gaps, best.metadata.get("attempts")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark v3.0.1 class ordering")
+    parser.add_argument("--configs", type=int, nargs="+", default=[3, 4, 5],
+                        choices=sorted(CONFIGS))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--solutions", type=int, default=3)
+    parser.add_argument("--complete", action="store_true",
+                        help="Use complete-solution mode instead of partial solutions")
+    parser.add_argument("--raw", action="store_true",
+                        help="Do not derive teacher qualifications from teacher names")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("v3.0.1 CLASS ORDERING BENCHMARK (input vs difficulty)")
+    print("=" * 80)
+    print(f"Runs per ordering: {args.runs}, solutions per run: {args.solutions}, "
+          f"mode: {'complete' if args.complete else 'partial'}, "
+          f"teachers: {'as generated' if args.raw else 'qualified by name'}\n")
+
+    gap_label = "SelfStudy" if args.complete else "Gaps"
+    header = (f"{'Config':<10}{'Classes':>8}{'Ordering':>12}{'Coverage':>11}"
+              f"{gap_label:>11}{'Attempts':>10}{'Median s':>10}")
+    print(header)
+    print("-" * len(header))
+
+    for config_number in args.configs:
+        label, *data = load_config(config_number)
+        if not args.raw:
+            data[2] = qualify_teachers(data[1], data[2])
+        for ordering in ORDERINGS:
+            times, coverages, gaps, attempts = [], [], [], []
+            for run in range(args.runs):
+                elapsed, coverage, gap_count, attempt_count = run_once(
+                    ordering, data, seed=run,
+                    num_solutions=args.solutions,
+                    allow_partial=not args.complete
+                )
+                times.append(elapsed)
+                coverages.append(coverage)
+                if gap_count is not None:
+                    gaps.append(gap_count)
+                    attempts.append(attempt_count)
+
+            avg_cov = sum(coverages) / len(coverages) * 100
+            avg_gaps = f"{statistics.mean(gaps):.1f}" if gaps else "-"
+            avg_attempts = f"{statistics.mean(attempts):.1f}" if attempts else "-"
+            print(f"{label:<10}{len(data[0]):>8}{ordering:>12}{avg_cov:>10.1f}%"
+                  f"{avg_gaps:>11}{avg_attempts:>10}{statistics.median(times):>10.3f}")
+
+    print("\nDone.")
+
+
+if __name__ == "__main__":
+    main()